@@ -24,6 +24,9 @@ SOFTWARE.
 
 
 import sys
+import numpy as np
+# colours of ascon.sty, see tugcolors.sty
+svg_colors = {"one" : "#F70146", "upperunknown" : "#285F82", "lowerunknown" : "#54CA50"}
 
 def trim(docstring):
     if not docstring:
@@ -63,6 +66,28 @@ class DrawDL():
         self.lower_trail = idobject.lower_trail
         self.attack_summary = idobject.attack_summary
 
+    @staticmethod
+    def fill_cells(state, fill, unknown):
+        """
+        Generate one fill path per colour for the nonzero cells of a 5x64 ternary state
+        """
+
+        commands = ""
+        for color, cells in [("one", state == 1), (unknown, (state != 0) & (state != 1))]:
+            cells = np.argwhere(cells).tolist()
+            if cells != []:
+                commands += fill + "[" + color + "]{" + ",".join(f"{row}/{column}" for row, column in cells) + "}"
+        return commands
+
+    def state_box(self, commands, boxes):
+        """
+        Return the box of a state given its fill paths. Identical states share the same box, which is typeset only once
+        """
+
+        if commands not in boxes:
+            boxes[commands] = r"""\asconstate""" + "".join(chr(ord("A") + int(digit)) for digit in str(len(boxes)))
+        return r"""\usebox{""" + boxes[commands] + "}"
+
     def generate_distinguisher_shape(self):
         """
         Draw the figure of the Rectangle distinguisher
@@ -74,75 +99,33 @@ class DrawDL():
                     \documentclass[varwidth=100cm]{standalone}
                     \usepackage{ascon}
                     \usepackage{comment}
-                    \begin{document}
-                    \begin{tikzpicture}""") + "\n\n"
-        # draw EU
-        for r in range(self.RD + 1):
-            fillcolor_x = []
-            for row in range(5):
-                for column in range(64):
-                    if self.upper_trail["x"][r][row][column] == 1:
-                        fillcolor_x.append(r"""\TFill[one]""" + f"{{{row}}}{{{column}}}")
-                    elif self.upper_trail["x"][r][row][column] == -1:
-                        fillcolor_x.append(r"""\TFill[upperunknown]""" + f"{{{row}}}{{{column}}}")
-            fillcolor_x = ",".join(fillcolor_x)
-            if r < self.RD:
-                fillcolor_y = []
-                for row in range(5):
-                    for column in range(64):
-                        if self.upper_trail["y"][r][row][column] == 1:
-                            fillcolor_y.append(r"""\TFill[one]""" + f"{{{row}}}{{{column}}}")
-                        elif self.upper_trail["y"][r][row][column] == -1:
-                            fillcolor_y.append(r"""\TFill[upperunknown]""" + f"{{{row}}}{{{column}}}")
-                fillcolor_y = ",".join(fillcolor_y)
-            if r == 0:
-                contents += trim(r"""
-                        \node[matrix node]""" + "(x" + str(r) + "){" +
-                    r"""\drawArray{""" + fillcolor_x + r"""}};""") + "\n"
-            else:
-                contents += trim(r"""
-                        \node[matrix node, below=5cm of """ + "y" + str(r - 1) + ".center]" + "(x" + str(r) + "){" +
-                    r"""\drawArray{""" + fillcolor_x + r"""}};""") + "\n"
-                contents += r""" \draw[-latex, line width=3.5pt]""" + "(y" + str(r - 1) + r""".south) --node[right]{\Huge$L$}""" + "(x" + str(r) + ".north);"
-            if r < self.RD:
-                contents += trim(r"""
-                            \node[matrix node, below=5cm of """ + "x" + str(r) + ".center]" + "(y" + str(r) + "){" +
-                        r"""\drawArray{""" + fillcolor_y + r"""}};""") + "\n"
-                contents += r""" \draw[-latex, line width=3.5pt]""" + "(x" + str(r) + r""".south) --node[right]{\Huge$S$}""" + "(y" + str(r) + ".north);"
-
-        # draw EL
+                    \begin{document}""") + "\n\n"
+        # both trails are drawn on the same states: upper triangles for EU and lower triangles for EL
+        boxes = dict()
+        picture = ""
         for r in range(self.RD + 1):
-            fillcolor_x = []
-            for row in range(5):
-                for column in range(64):
-                    if self.lower_trail["x"][r][row][column] == 1:
-                        fillcolor_x.append(r"""\BFill[one]""" + f"{{{row}}}{{{column}}}")
-                    elif self.lower_trail["x"][r][row][column] == -1:
-                        fillcolor_x.append(r"""\BFill[lowerunknown]""" + f"{{{row}}}{{{column}}}")
-            fillcolor_x = ",".join(fillcolor_x)
+            fillcolor_x = self.fill_cells(self.upper_trail["x"][r], r"""\TFills""", "upperunknown") + \
+                          self.fill_cells(self.lower_trail["x"][r], r"""\BFills""", "lowerunknown")
             if r < self.RD:
-                fillcolor_y = []
-                for row in range(5):
-                    for column in range(64):
-                        if self.lower_trail["y"][r][row][column] == 1:
-                            fillcolor_y.append(r"""\BFill[one]""" + f"{{{row}}}{{{column}}}")
-                        elif self.lower_trail["y"][r][row][column] == -1:
-                            fillcolor_y.append(r"""\BFill[lowerunknown]""" + f"{{{row}}}{{{column}}}")
-                fillcolor_y = ",".join(fillcolor_y)
+                fillcolor_y = self.fill_cells(self.upper_trail["y"][r], r"""\TFills""", "upperunknown") + \
+                              self.fill_cells(self.lower_trail["y"][r], r"""\BFills""", "lowerunknown")
             if r == 0:
-                contents += trim(r"""
-                        \node[matrix node]""" + "(x" + str(r) + "){" +
-                    r"""\drawArray{""" + fillcolor_x + r"""}};""") + "\n"
+                picture += trim(r"""
+                        \node[state node]""" + "(x" + str(r) + "){" + self.state_box(fillcolor_x, boxes) + r"""};""") + "\n"
             else:
-                contents += trim(r"""
-                        \node[matrix node, below=5cm of """ + "y" + str(r - 1) + ".center]" + "(x" + str(r) + "){" +
-                    r"""\drawArray{""" + fillcolor_x + r"""}};""") + "\n"
-                contents += r""" \draw[-latex, line width=3.5pt]""" + "(y" + str(r - 1) + r""".south) --node[right]{\Huge$L$}""" + "(x" + str(r) + ".north);" + "\n"
+                picture += trim(r"""
+                        \node[state node, below=5cm of """ + "y" + str(r - 1) + ".center]" + "(x" + str(r) + "){" +
+                    self.state_box(fillcolor_x, boxes) + r"""};""") + "\n"
+                picture += r""" \draw[-latex, line width=3.5pt]""" + "(y" + str(r - 1) + r""".south) --node[right]{\Huge$L$}""" + "(x" + str(r) + ".north);" + "\n"
             if r < self.RD:
-                contents += trim(r"""
-                        \node[matrix node, below=5cm of """ +  "x" + str(r) + ".center]" + "(y" + str(r) + "){" +
-                    r"""\drawArray{""" + fillcolor_y + r"""}};""") + "\n"
-                contents += r""" \draw[-latex, line width=3.5pt]""" + "(x" + str(r) + r""".south) --node[right]{\Huge$S$}""" + "(y" + str(r) + ".north);" + "\n"
+                picture += trim(r"""
+                        \node[state node, below=5cm of """ + "x" + str(r) + ".center]" + "(y" + str(r) + "){" +
+                    self.state_box(fillcolor_y, boxes) + r"""};""") + "\n"
+                picture += r""" \draw[-latex, line width=3.5pt]""" + "(x" + str(r) + r""".south) --node[right]{\Huge$S$}""" + "(y" + str(r) + ".north);" + "\n"
+        for commands, name in boxes.items():
+            contents += r"""\newsavebox{""" + name + r"""}\sbox{""" + name + r"""}{\begin{tikzpicture}\drawState{""" + commands + r"""}\end{tikzpicture}}""" + "\n"
+        contents += "\n" + r"""\begin{tikzpicture}""" + "\n\n"
+        contents += picture
         contents += "\n\n" + r"""\begin{comment}""" + "\n"
         contents += self.attack_summary
         contents += r"""\end{comment}""" + "\n"
@@ -150,3 +133,48 @@ class DrawDL():
         contents += trim(r"""\end{document}""")
         with open(self.output_file_name, "w") as output_file:
             output_file.write(contents)
+
+    @staticmethod
+    def svg_state(upper, lower, x, y):
+        """
+        SVG elements of a 5x64 state whose top left corner is (x, y): upper triangles for EU and lower triangles for EL
+        """
+
+        elements = ""
+        upper, lower = np.reshape(upper, (5, 64)), np.reshape(lower, (5, 64))
+        for state, triangle, corner, unknown in [(upper, "M{} {}v1l1-1Z", 0, "upperunknown"), (lower, "M{} {}v-1l-1 1Z", 1, "lowerunknown")]:
+            for color, cells in [("one", state == 1), (unknown, (state != 0) & (state != 1))]:
+                path = "".join(triangle.format(x + column + corner, y + row + corner) for row, column in np.argwhere(cells).tolist())
+                if path != "":
+                    elements += '<path d="{}" fill="{}"/>\n'.format(path, svg_colors[color])
+        grid = "".join("M{} {}h{}".format(x, y + row, 64) for row in range(1, 5)) + "".join("M{} {}v{}".format(x + column, y, 5) for column in range(1, 64))
+        elements += '<path d="{}" stroke="black" stroke-width=".04"/>\n'.format(grid)
+        elements += '<rect x="{}" y="{}" width="64" height="5" fill="none" stroke="black" stroke-width=".12"/>\n'.format(x, y)
+        return elements
+
+    def generate_distinguisher_svg(self):
+        """
+        Draw the figure of the distinguisher into an SVG file, without LaTeX
+        """
+
+        # both trails are drawn on the same states: upper triangles for EU and lower triangles for EL
+        states = []
+        for r in range(self.RD + 1):
+            states.append((self.upper_trail["x"][r], self.lower_trail["x"][r], "L" if r > 0 else None))
+            if r < self.RD:
+                states.append((self.upper_trail["y"][r], self.lower_trail["y"][r], "S"))
+        gap = 3
+        width, height = 64 + 4, len(states)*(5 + gap) - gap + 2
+        contents = '<svg xmlns="http://www.w3.org/2000/svg" width="{}" height="{}" viewBox="-1 -1 {} {}">\n'.format(
+            width*12, height*12, width, height)
+        contents += '<defs><marker id="arrow" viewBox="0 0 10 10" refX="9" refY="5" markerWidth="3" markerHeight="3" orient="auto"><path d="M0 0L10 5L0 10Z"/></marker></defs>\n'
+        contents += '<rect x="-1" y="-1" width="{}" height="{}" fill="white"/>\n'.format(width, height)
+        for i, (upper, lower, operation) in enumerate(states):
+            y = i*(5 + gap)
+            if operation is not None:
+                contents += '<line x1="{0}" y1="{1}" x2="{0}" y2="{2}" stroke="black" stroke-width=".3" marker-end="url(#arrow)"/>\n'.format(64/2, y - gap + .2, y - .1)
+                contents += '<text x="{}" y="{}" font-size="2" font-family="serif" font-style="italic" dominant-baseline="central">{}</text>\n'.format(64/2 + .8, y - gap/2, operation)
+            contents += self.svg_state(upper, lower, 0, y)
+        contents += "</svg>\n"
+        with open(self.output_file_name, "w") as output_file:
+            output_file.write(contents)
@@ -0,0 +1,292 @@
+#!/usr/env/bin python3
+#-*- coding: UTF-8 -*-
+
+"""
+MIT License
+
+Copyright (c) 2023 Hosein Hadipour
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+
+
+"""
+Bit-vector propagation of deterministic differences through Ascon, following exactly
+the propagation rules of distinguisher.mzn. It is used to screen many low-weight input/output
+differences quickly, so that only the promising pairs are passed to the CP model.
+
+A state is a tuple of five rows, and each row is a pair (value, unknown) of 64-bit integers:
+bit j of unknown is set if column j of the row is unknown (-1 in the CP model), otherwise
+bit j of value is the difference bit.
+"""
+
+import itertools
+import time
+from concurrent.futures import ProcessPoolExecutor
+from argparse import ArgumentParser, RawTextHelpFormatter
+
+MASK = (1 << 64) - 1
+
+rotation_dictionary = [(19, 28), (61, 39), (1, 6), (10, 17), (7, 41)]
+
+# Deterministic rules of the predicates sbox and sbox_inv in distinguisher.mzn: the bits of a column are
+# given in the order of the rows and '?' stands for an unknown bit. Any other nonzero input leads to an
+# unknown output
+sbox_rules = {"00001": "?1???", "00010": "1???1", "00011": "???0?", "00100": "??110", "00101": "1????", "00110": "????1",
+              "00111": "0??1?", "00?00": "????0", "00?10": "????1", "01000": "??11?", "01011": "???1?", "01100": "??00?",
+              "01110": "?0???", "01111": "?1?0?", "10000": "?10??", "10001": "10??1", "10011": "0???0", "10100": "0?1??",
+              "10101": "????1", "10110": "1????", "10111": "????0", "10?01": "????1", "10?11": "????0", "11000": "??1??",
+              "11100": "??0??", "11110": "?1???", "11111": "?0???", "?0000": "??0??", "?0100": "??1??", "?1000": "??1??",
+              "?1100": "??0??"}
+sbox_inv_rules = {"00010": "???1?", "01000": "?1???"}
+
+def ternary_table(rules, width=5):
+    """
+    Build a lookup table mapping (unknown << width) | value to the (value, unknown) pair of the output
+    """
+
+    table = [(0, (1 << width) - 1)] * (1 << (2 * width))
+    for value, unknown in itertools.product(range(1 << width), repeat=2):
+        if value & unknown:
+            continue
+        pattern = "".join("?" if (unknown >> k) & 1 else str((value >> k) & 1) for k in range(width))
+        if unknown == 0 and value == 0:
+            output = "0" * width
+        else:
+            output = rules.get(pattern, "?" * width)
+        table[(unknown << width) | value] = (sum(int(b == "1") << k for k, b in enumerate(output)),
+                                             sum(int(b == "?") << k for k, b in enumerate(output)))
+    return table
+
+def rotl(word, amount):
+    amount %= 64
+    return ((word << amount) | (word >> (64 - amount))) & MASK
+
+def cyclic_multiply(a, b):
+    """
+    Compose two circulant linear maps given as sets of offsets (bit d set means that
+    column j depends on column j - d)
+    """
+
+    product = 0
+    for d in range(64):
+        if (b >> d) & 1:
+            product ^= rotl(a, d)
+    return product
+
+def cyclic_inverse(a):
+    """
+    Invert a circulant linear map: the units of GF(2)[z]/(z^64 + 1) have an order dividing 64
+    """
+
+    inverse = 1
+    for _ in range(63):
+        inverse = cyclic_multiply(inverse, a)
+    return inverse
+
+def offsets(a):
+    return [d for d in range(64) if (a >> d) & 1]
+
+SBOX = ternary_table(sbox_rules)
+SBOX_INV = ternary_table(sbox_inv_rules)
+LINEAR = [offsets(1 | (1 << r0) | (1 << r1)) for r0, r1 in rotation_dictionary]
+LINEAR_INV = [offsets(cyclic_inverse(1 | (1 << r0) | (1 << r1))) for r0, r1 in rotation_dictionary]
+
+def apply_sbox(state, table):
+    active = 0
+    for value, unknown in state:
+        active |= value | unknown
+    new_state = [[0, 0] for _ in range(5)]
+    while active:
+        column = (active & -active).bit_length() - 1
+        active &= active - 1
+        value, unknown = 0, 0
+        for row in range(5):
+            value |= ((state[row][0] >> column) & 1) << row
+            unknown |= ((state[row][1] >> column) & 1) << row
+        v, u = table[(unknown << 5) | value]
+        for row in range(5):
+            new_state[row][0] |= ((v >> row) & 1) << column
+            new_state[row][1] |= ((u >> row) & 1) << column
+    return tuple(map(tuple, new_state))
+
+def apply_linear(state, linear):
+    new_state = []
+    for (value, unknown), row_offsets in zip(state, linear):
+        new_value, new_unknown = 0, 0
+        for d in row_offsets:
+            new_value ^= rotl(value, d)
+            new_unknown |= rotl(unknown, d)
+        new_state.append((new_value & ~new_unknown & MASK, new_unknown))
+    return tuple(new_state)
+
+def propagate_forward(input_diff, RD):
+    """
+    Propagate an input difference through RD rounds (xu, yu in distinguisher.mzn)
+    """
+
+    x = [input_diff]
+    y = []
+    for _ in range(RD):
+        y.append(apply_sbox(x[-1], SBOX))
+        x.append(apply_linear(y[-1], LINEAR))
+    return x, y
+
+def propagate_backward(output_diff, RD):
+    """
+    Propagate an output difference backward through RD rounds, skipping the last
+    linear layer (xl, yl in distinguisher.mzn)
+    """
+
+    x = [output_diff]
+    y = []
+    for r in range(RD):
+        y.insert(0, x[0] if r == 0 else apply_linear(x[0], LINEAR_INV))
+        x.insert(0, apply_sbox(y[0], SBOX_INV))
+    return x, y
+
+def signature(trail):
+    """
+    Pack the rounds 0, ..., RD - 1 of the x and y states of a trail into one (known, value) pair
+    """
+
+    x, y = trail
+    known, value = 0, 0
+    for position, (v, u) in enumerate(row for state in x[:len(y)] + y for row in state):
+        known |= (~u & MASK) << (64 * position)
+        value |= v << (64 * position)
+    return known, value
+
+def contradicts(upper, lower):
+    """
+    Check the meeting-point constraint of distinguisher.mzn: there must be a bit of x or y in
+    rounds 0, ..., RD - 1 that is fixed to different values in the upper and lower trails
+    """
+
+    return upper[0] & lower[0] & (upper[1] ^ lower[1]) != 0
+
+def low_weight_states(weight):
+    """
+    All states with 1 to weight active bits
+    """
+
+    for w in range(1, weight + 1):
+        for bits in itertools.combinations(range(320), w):
+            rows = [0] * 5
+            for b in bits:
+                rows[b // 64] |= 1 << (b % 64)
+            yield tuple((row, 0) for row in rows)
+
+def upper_signature(args):
+    state, RD = args
+    return signature(propagate_forward(state, RD))
+
+def lower_signature(args):
+    state, RD = args
+    return signature(propagate_backward(state, RD))
+
+_lower = None
+
+def _init_lower(lower):
+    global _lower
+    _lower = lower
+
+def check_chunk(chunk):
+    """
+    Return the pairs (input, output) of a chunk of inputs that lead to a contradiction
+    """
+
+    pairs = []
+    for state, upper in chunk:
+        for output_state, lower in _lower:
+            if contradicts(upper, lower):
+                pairs.append((state, output_state))
+    return pairs
+
+def weight(state):
+    return sum(bin(value).count("1") for value, _ in state)
+
+def is_canonical(state):
+    """
+    Same canonical form as in distinguisher.mzn: the activity pattern of the columns, read from column 0 on,
+    is lexicographically largest among all its rotations
+    """
+
+    columns = 0
+    for value, unknown in state:
+        columns |= value | unknown
+    # the lexicographic order of the columns from column 0 on is the order of the bit-reversed integers
+    key = lambda word: int(format(word, "064b")[::-1], 2)
+    return all(key(columns) >= key(rotl(columns, 64 - shift)) for shift in range(1, 64))
+
+def screen(RD, input_weight=1, output_weight=1, keep=1, processes=None, chunk_size=16, symmetry_breaking=False):
+    """
+    Screen all pairs of input/output differences with at most input_weight/output_weight active bits
+    on a process pool, and return the keep pairs with the lowest total weight (the objective of the CP model)
+    """
+
+    inputs = list(low_weight_states(input_weight))
+    if symmetry_breaking:
+        inputs = [state for state in inputs if is_canonical(state)]
+    outputs = list(low_weight_states(output_weight))
+    with ProcessPoolExecutor(max_workers=processes) as pool:
+        upper = list(pool.map(upper_signature, ((s, RD) for s in inputs), chunksize=chunk_size))
+        lower = list(pool.map(lower_signature, ((s, RD) for s in outputs), chunksize=chunk_size))
+    uppers = list(zip(inputs, upper))
+    chunks = [uppers[i:i + chunk_size] for i in range(0, len(uppers), chunk_size)]
+    pairs = []
+    with ProcessPoolExecutor(max_workers=processes, initializer=_init_lower, initargs=(list(zip(outputs, lower)),)) as pool:
+        for chunk_pairs in pool.map(check_chunk, chunks):
+            pairs.extend(chunk_pairs)
+            pairs.sort(key=lambda pair: weight(pair[0]) + weight(pair[1]))
+            del pairs[keep:]
+    return pairs
+
+def active_bits(state):
+    return {64 * row + column for row in range(5) for column in range(64) if (state[row][0] >> column) & 1}
+
+def to_string(state, name):
+    return "".join(f"{name}[{row}] = " + "".join(str((state[row][0] >> column) & 1) for column in range(64)) + ";\n" for row in range(5))
+
+def main():
+    '''
+    Screen low-weight input/output differences of Ascon for impossible-differential distinguishers
+    '''
+
+    parser = ArgumentParser(description="This tool screens low-weight impossible-differential distinguishers of Ascon",
+                            formatter_class=RawTextHelpFormatter)
+    parser.add_argument("-RD", type=int, default=5, help="Number of rounds for distinguisher")
+    parser.add_argument("-wi", "--input_weight", type=int, default=1, help="Maximum number of active bits in the input difference")
+    parser.add_argument("-wo", "--output_weight", type=int, default=1, help="Maximum number of active bits in the output difference")
+    parser.add_argument("-k", "--keep", type=int, default=10, help="Number of distinguishers to report")
+    parser.add_argument("-p", default=None, type=int, help="Number of processes")
+    parser.add_argument("-sb", "--symmetry_breaking", action="store_true", help="Only screen the canonical rotation of each input (as in distinguisher.mzn)")
+    args = parser.parse_args()
+
+    start_time = time.time()
+    pairs = screen(args.RD, args.input_weight, args.output_weight, args.keep, args.p, symmetry_breaking=args.symmetry_breaking)
+    print("Time used to screen the distinguishers: {:0.02f} seconds".format(time.time() - start_time))
+    print(f"Number of distinguishers reported: {len(pairs)}")
+    for input_diff, output_diff in pairs:
+        print("#"*50)
+        print(f"input.: \n{to_string(input_diff, 'input')}", end="")
+        print(f"output: \n{to_string(output_diff, 'output')}", end="")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,139 @@
+"""
+MIT License
+
+Copyright (c) 2023 Hosein Hadipour
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+
+
+"""
+Experimental verification of impossible-differential distinguishers on small-scale variants of Ascon.
+
+The variant with rows of w columns (a power of two) applies the Ascon S-box to the columns of the 5 x w state
+and XORs every row with two rotations of itself. The rotation amounts are those of Ascon reduced modulo w, unless
+given explicitly. As in distinguisher.mzn, an RD-round distinguisher covers RD S-box layers and the RD - 1 linear
+layers between them, and column j of a row depends on the columns j - d for the offsets d of the linear layer.
+The round constants are omitted since they do not change the differences.
+
+The distinguishers of the variant are derived with the propagation rules of distinguisher.mzn (see screening.py)
+and then checked experimentally: no input difference matching the input pattern may lead to an output difference
+matching the output pattern. For small states all inputs are evaluated; otherwise random inputs are sampled, so
+that a reported pair is always a genuine counterexample. With w = 64, the distinguishers of distinguisher.py can
+be checked by sampling.
+"""
+
+import sys
+import time
+from pathlib import Path
+from concurrent.futures import ProcessPoolExecutor
+from argparse import ArgumentParser, RawTextHelpFormatter
+import numpy as np
+import screening
+# the modules shared by the tools of several ciphers are in the folder shared of the repository
+sys.path.append(str(Path(__file__).resolve().parents[2] / "shared"))
+from smallascon import SmallAscon, sbox, parse_pattern, completions, to_string
+import verifier
+
+def check_task(args):
+    """
+    For each (input differences, output pattern) of a chunk, count the pairs (input, input difference)
+    leading to an output difference that matches the output pattern
+    """
+
+    width, RD, rotations, seed, samples, chunk = args
+    cipher = SmallAscon(width, RD, rotations)
+    if samples is None:
+        inputs = np.arange(1 << (5 * width), dtype=np.uint64)
+        outputs = cipher.pack(cipher.permute(cipher.unpack(inputs)))
+    else:
+        inputs = np.random.default_rng(seed).integers(0, 1 << width, size=(5, samples), dtype=np.uint64)
+        outputs = cipher.permute(inputs)
+    counts = []
+    for differences, output_pattern in chunk:
+        value, fixed = parse_pattern(output_pattern, width)
+        counterexamples = 0
+        for difference in differences.T:
+            if samples is None:
+                output_differences = outputs ^ outputs[inputs ^ cipher.pack(difference[:, None])[0]]
+                matches = ((output_differences & np.uint64(fixed)) == np.uint64(value)) & (output_differences != 0)
+            else:
+                output_differences = outputs ^ cipher.permute(inputs ^ difference[:, None])
+                matches = output_differences.any(axis=0)
+                for row in range(5):
+                    row_value, row_fixed = (np.uint64((w >> (row * width)) & cipher.mask) for w in (value, fixed))
+                    matches &= (output_differences[row] & row_fixed) == row_value
+            counterexamples += int(np.count_nonzero(matches))
+        counts.append(counterexamples)
+    return counts
+
+def verify(width, RD, pairs, rotations=None, processes=None, exhaustive_bits=20, samples=1 << 16, limit=1 << 10, chunk_size=64):
+    """
+    Check impossible differentials (input pattern, output pattern) of the variant on a process pool, and
+    return the number of counterexamples of each of them (0 for a genuine one)
+    """
+
+    rng = np.random.default_rng(width)
+    patterns = [(completions(input_pattern, width, limit, rng), output_pattern) for input_pattern, output_pattern in pairs]
+    chunks = [patterns[i:i + chunk_size] for i in range(0, len(patterns), chunk_size)]
+    tasks = [(width, RD, rotations, seed, None if 5 * width <= exhaustive_bits else samples, chunk) for seed, chunk in enumerate(chunks)]
+    counterexamples = []
+    with ProcessPoolExecutor(max_workers=processes) as pool:
+        for counts in pool.map(check_task, tasks):
+            counterexamples.extend(counts)
+    return counterexamples
+
+def main():
+    '''
+    Verify impossible-differential distinguishers of small-scale Ascon experimentally
+    '''
+
+    parser = ArgumentParser(description="This tool verifies impossible-differential distinguishers of small-scale Ascon experimentally",
+                            formatter_class=RawTextHelpFormatter)
+    parser.add_argument("-RD", type=int, default=3, help="Number of rounds for distinguisher")
+    parser.add_argument("-n", "--width", type=int, default=4, help="Number of columns of the Ascon-like variant (a power of two)")
+    parser.add_argument("-r", "--rotations", type=int, nargs=10, default=None, help="Rotation amounts of the five rows (default: those of Ascon modulo the width)")
+    parser.add_argument("-i", "--input", type=str, default=None, help="Input difference to verify, as 5 rows of 0/1/? separated by '|' (character j is column j)\n"
+                                                                          "If not given, the distinguishers of the variant are derived with the rules of distinguisher.mzn")
+    parser.add_argument("-o", "--output", type=str, default=None, help="Output difference to verify, as 5 rows of 0/1/? separated by '|'")
+    parser.add_argument("-wi", "--input_weight", type=int, default=1, help="Maximum number of active bits in the derived input differences")
+    parser.add_argument("-wo", "--output_weight", type=int, default=1, help="Maximum number of active bits in the derived output differences")
+    parser.add_argument("-eb", "--exhaustive_bits", type=int, default=20, help="Maximum state size for which all inputs are evaluated")
+    parser.add_argument("-s", "--samples", type=int, default=1 << 16, help="Number of random inputs above the exhaustive state size")
+    parser.add_argument("-l", "--limit", type=int, default=1 << 10, help="Maximum number of input differences per pattern (sampled beyond)")
+    parser.add_argument("-p", default=None, type=int, help="Number of processes")
+    args = parser.parse_args()
+
+    rotations = None if args.rotations is None else list(zip(args.rotations[0::2], args.rotations[1::2]))
+    start_time = time.time()
+    rules_hold = verifier.ddt_rules_hold(sbox, screening.sbox_rules, screening.sbox_inv_rules)
+    print(f"Rules of distinguisher.mzn agree with the DDT of the S-box: {rules_hold}")
+    if args.input is not None and args.output is not None:
+        pairs = [(args.input, args.output)]
+    else:
+        cipher = SmallAscon(args.width, args.RD, rotations, screening)
+        pairs = [(to_string(i, args.width), to_string(o, args.width)) for i, o in cipher.distinguishers(args.input_weight, args.output_weight)]
+        print(f"Number of distinguishers derived for {args.RD} rounds of Ascon with {args.width} columns: {len(pairs)}")
+    counts = verify(args.width, args.RD, pairs, rotations, args.p, args.exhaustive_bits, args.samples, args.limit)
+    status = verifier.report(rules_hold, pairs, counts, "Number of counterexamples")
+    print("Time used to verify the distinguishers: {:0.02f} seconds".format(time.time() - start_time))
+    sys.exit(status)
+
+if __name__ == "__main__":
+    main()
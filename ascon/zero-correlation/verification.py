@@ -0,0 +1,136 @@
+"""
+MIT License
+
+Copyright (c) 2023 Hosein Hadipour
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+
+
+"""
+Experimental verification of zero-correlation distinguishers on small-scale variants of Ascon.
+
+The variant with rows of w columns (a power of two) applies the Ascon S-box to the columns of the 5 x w state
+and XORs every row with two rotations of itself. The rotation amounts are those of Ascon reduced modulo w, unless
+given explicitly. As in distinguisher.mzn, an RD-round distinguisher covers RD S-box layers and the RD - 1 linear
+layers between them, and column j of a row depends on the columns j - d for the offsets d of the linear layer.
+The round constants are omitted since they only change the signs of the correlations.
+
+The distinguishers of the variant are derived with the propagation rules of distinguisher.mzn (see screening.py)
+and then checked experimentally: the correlation between any input mask matching the input pattern and any output
+mask matching the output pattern must be zero. For small states all correlations of an output mask are computed
+exactly with one Walsh-Hadamard transform; otherwise they are estimated from random inputs, and a pair is reported
+when its estimate exceeds a given number of standard deviations (correlations below the sampling noise cannot be
+detected). With w = 64, the distinguishers of distinguisher.py can be checked by sampling.
+"""
+
+import sys
+import time
+from pathlib import Path
+from concurrent.futures import ProcessPoolExecutor
+from argparse import ArgumentParser, RawTextHelpFormatter
+import numpy as np
+import screening
+# the modules shared by the tools of several ciphers are in the folder shared of the repository
+sys.path.append(str(Path(__file__).resolve().parents[2] / "shared"))
+from smallascon import SmallAscon, sbox, parse_pattern, completions, to_string
+import verifier
+
+def check_task(args):
+    """
+    For each (input masks, output masks) of a chunk, count the pairs of masks with a nonzero correlation
+    """
+
+    width, RD, rotations, seed, samples, threshold, chunk = args
+    cipher = SmallAscon(width, RD, rotations)
+    if samples is None:
+        outputs = cipher.pack(cipher.permute(cipher.unpack(np.arange(1 << (5 * width), dtype=np.uint64))))
+    else:
+        inputs = np.random.default_rng(seed).integers(0, 1 << width, size=(5, samples), dtype=np.uint64)
+        outputs = cipher.permute(inputs)
+    counts = []
+    for input_masks, output_masks in chunk:
+        nonzero = 0
+        for output_mask in output_masks.T:
+            if samples is None:
+                signs = 1 - 2 * verifier.parity(outputs & cipher.pack(output_mask[:, None])[0]).astype(np.int64)
+                nonzero += int(np.count_nonzero(verifier.walsh_hadamard(signs)[cipher.pack(input_masks).astype(np.int64)]))
+            else:
+                signs = 1 - 2 * verifier.parity(np.bitwise_xor.reduce(outputs & output_mask[:, None], axis=0)).astype(np.int64)
+                for input_mask in input_masks.T:
+                    correlation = np.sum(signs * (1 - 2 * verifier.parity(np.bitwise_xor.reduce(inputs & input_mask[:, None], axis=0)).astype(np.int64)))
+                    nonzero += int(abs(correlation) > threshold * np.sqrt(samples))
+        counts.append(nonzero)
+    return counts
+
+def verify(width, RD, pairs, rotations=None, processes=None, exhaustive_bits=20, samples=1 << 16, limit=1 << 10, threshold=6, chunk_size=64):
+    """
+    Check zero-correlation approximations (input pattern, output pattern) of the variant on a process pool,
+    and return the number of nonzero correlations found for each of them (0 for a genuine one)
+    """
+
+    rng = np.random.default_rng(width)
+    patterns = [(completions(input_pattern, width, limit, rng), completions(output_pattern, width, limit, rng)) for input_pattern, output_pattern in pairs]
+    chunks = [patterns[i:i + chunk_size] for i in range(0, len(patterns), chunk_size)]
+    tasks = [(width, RD, rotations, seed, None if 5 * width <= exhaustive_bits else samples, threshold, chunk) for seed, chunk in enumerate(chunks)]
+    nonzero = []
+    with ProcessPoolExecutor(max_workers=processes) as pool:
+        for counts in pool.map(check_task, tasks):
+            nonzero.extend(counts)
+    return nonzero
+
+def main():
+    '''
+    Verify zero-correlation distinguishers of small-scale Ascon experimentally
+    '''
+
+    parser = ArgumentParser(description="This tool verifies zero-correlation distinguishers of small-scale Ascon experimentally",
+                            formatter_class=RawTextHelpFormatter)
+    parser.add_argument("-RD", type=int, default=3, help="Number of rounds for distinguisher")
+    parser.add_argument("-n", "--width", type=int, default=4, help="Number of columns of the Ascon-like variant (a power of two)")
+    parser.add_argument("-r", "--rotations", type=int, nargs=10, default=None, help="Rotation amounts of the five rows (default: those of Ascon modulo the width)")
+    parser.add_argument("-i", "--input", type=str, default=None, help="Input mask to verify, as 5 rows of 0/1/? separated by '|' (character j is column j)\n"
+                                                                          "If not given, the distinguishers of the variant are derived with the rules of distinguisher.mzn")
+    parser.add_argument("-o", "--output", type=str, default=None, help="Output mask to verify, as 5 rows of 0/1/? separated by '|'")
+    parser.add_argument("-wi", "--input_weight", type=int, default=1, help="Maximum number of active bits in the derived input masks")
+    parser.add_argument("-wo", "--output_weight", type=int, default=1, help="Maximum number of active bits in the derived output masks")
+    parser.add_argument("-eb", "--exhaustive_bits", type=int, default=20, help="Maximum state size for which all inputs are evaluated")
+    parser.add_argument("-s", "--samples", type=int, default=1 << 16, help="Number of random inputs above the exhaustive state size")
+    parser.add_argument("-l", "--limit", type=int, default=1 << 10, help="Maximum number of masks per pattern (sampled beyond)")
+    parser.add_argument("-t", "--threshold", type=float, default=6, help="Number of standard deviations above which a sampled correlation is reported")
+    parser.add_argument("-p", default=None, type=int, help="Number of processes")
+    args = parser.parse_args()
+
+    rotations = None if args.rotations is None else list(zip(args.rotations[0::2], args.rotations[1::2]))
+    start_time = time.time()
+    rules_hold = verifier.lat_rules_hold(sbox, screening.sbox_rules, screening.sbox_inv_rules)
+    print(f"Rules of distinguisher.mzn agree with the LAT of the S-box: {rules_hold}")
+    if args.input is not None and args.output is not None:
+        pairs = [(args.input, args.output)]
+    else:
+        cipher = SmallAscon(args.width, args.RD, rotations, screening, masks=True)
+        pairs = [(to_string(i, args.width), to_string(o, args.width)) for i, o in cipher.distinguishers(args.input_weight, args.output_weight)]
+        print(f"Number of distinguishers derived for {args.RD} rounds of Ascon with {args.width} columns: {len(pairs)}")
+    counts = verify(args.width, args.RD, pairs, rotations, args.p, args.exhaustive_bits, args.samples, args.limit, args.threshold)
+    status = verifier.report(rules_hold, pairs, counts, "Number of nonzero correlations")
+    print("Time used to verify the distinguishers: {:0.02f} seconds".format(time.time() - start_time))
+    sys.exit(status)
+
+if __name__ == "__main__":
+    main()
@@ -29,14 +29,38 @@ email: hsn.hadipour@gmail.com
 
 import time
 import os
+import sys
 import uuid
 import minizinc
 import datetime
+import asyncio
+import itertools
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED, as_completed
+from functools import lru_cache
+from dataclasses import dataclass, field
 from argparse import ArgumentParser, RawTextHelpFormatter
 from draw import *
 from pathlib import Path
 from tweakeyschedule import *
+# the modules shared by the tools of several ciphers are in the folder shared of the repository
+sys.path.append(str(Path(__file__).resolve().parents[2] / "shared"))
+import complexity
+import lookuptables
 line_separator = "#"*55
+tables_folder = Path(__file__).resolve().parent / "tables"
+tweakey_permutation = (9, 15, 8, 13, 10, 14, 12, 11, 0, 1, 2, 3, 4, 5, 6, 7)
+inv_tweakey_permutation = (8, 9, 10, 11, 12, 13, 14, 15, 2, 0, 4, 7, 6, 3, 5, 1)
+
+@lru_cache(maxsize=None)
+def permutation_at_rounds(permutation, number_of_rounds):
+    """
+    Return the table whose row r is the r-th power of the given tweakey permutation, for r = 0, ..., number_of_rounds - 1
+    """
+
+    table = [tuple(range(16))]
+    for _ in range(1, number_of_rounds):
+        table.append(tuple(permutation[cell] for cell in table[-1]))
+    return tuple(table)
 
 # Check if "OR Tools" appears in the output of "minizinc --solvers" command 
 import subprocess
@@ -51,15 +75,29 @@ try:
 except FileNotFoundError:
     ortools_available = False
 
-class ID:
-    ID_counter = 0
+@dataclass
+class SearchResult:
+    """
+    Result of a search, without printing or drawing: the solver status, the elapsed time, the summary printed
+    by search(), the quantities of the attack (see ID.solution_record) and the MiniZinc result
+    """
+
+    status: minizinc.Status
+    elapsed_time: float
+    summary: str = ""
+    values: dict = field(default_factory=dict)
+    solution: minizinc.Result = None
 
+    @property
+    def has_solution(self):
+        return self.status.has_solution()
+
+class ID:
     def __init__(self, params) -> None:
-        ID.ID_counter += 1
-        self.id = ID.ID_counter
-        self.name = "ID" + str(self.id)
+        self.name = "ID_v{}_RB{}_RD{}_RF{}_Ri{}_R0{}".format(params["variant"], params["RB"], params["RD"], params["RF"], params["Ri"], params["R0"])
         self.type = "ID"
 
+        self.params = params
         self.variant = params["variant"]
         self.cell_size = params["cell_size"]
         self.RB = params["RB"]
@@ -72,8 +110,11 @@ class ID:
         self.is_related_tweakey = params["rt"]
         self.cp_solver_name = params["cp_solver_name"]
         self.time_limit = params["time_limit"]
+        self.counter = params.get("counter")
         self.num_of_threads = params["num_of_threads"]
         self.output_file_name = params["output_file_name"]
+        # the attacks found are only stored if a solutions file is given
+        self.solutions_file = params.get("solutions_file")
         self.supported_cp_solvers = [solver_name for solver_name in minizinc.default_driver.available_solvers().keys()]
         assert(self.cp_solver_name in self.supported_cp_solvers)
         self.cp_solver = minizinc.Solver.lookup(self.cp_solver_name)
@@ -83,6 +124,8 @@ class ID:
             self.mzn_file_name = "attack.mzn"
 
         self.tksch_mzn_file_name = "tweakeyschedule.mzn"
+        self.tkperm_at_round = permutation_at_rounds(tweakey_permutation, self.RT + self.R0)
+        self.inv_tkp = permutation_at_rounds(inv_tweakey_permutation, self.RT + self.R0)
 
         # SKINNY-n-n   (n-bit tweakey): 1
         # SKINNY-n-2n (2n-bit tweakey): 2
@@ -145,9 +188,44 @@ class ID:
     #  ___) || (_) || | \ V /|  __/ | |_ | | | ||  __/ | |  | || (_) || (_| ||  __/| |
     # |____/  \___/ |_|  \_/  \___|  \__||_| |_| \___| |_|  |_| \___/  \__,_| \___||_|
         
-    def search(self):
+    def create_instance(self, constraints=[]):
+        """
+        Create the CP instance of the search, with additional constraints given as MiniZinc strings
+        """
+
+        cp_model = minizinc.Model()
+        cp_model.add_file(self.mzn_file_name)
+        if self.mzn_file_name == "attack.mzn":
+            for file_name in lookuptables.data_files(tables_folder, "lfsr", "xor", "log2", "filters"):
+                cp_model.add_file(file_name)
+        for constraint in constraints:
+            cp_model.add_string(constraint)
+        cp_inst = minizinc.Instance(solver=self.cp_solver, model=cp_model)
+        cp_inst["RB"] = self.RB
+        cp_inst["RD"] = self.RD
+        cp_inst["RF"] = self.RF
+        cp_inst["Ri"] = self.Ri
+        cp_inst["R0"] = self.R0
+        cp_inst["skip_first_sbox_layer"] = self.skip_first_sbox_layer
+        cp_inst["is_related_tweakey"] = self.is_related_tweakey
+        cp_inst["cell_size"] = self.cell_size
+        cp_inst["variant"] = self.variant
+        cp_inst["NPT"] = self.NPT
+        cp_inst["GuessingThreshold1"] = self.GuessingThreshold1
+        cp_inst["GuessingThreshold2"] = self.GuessingThreshold2
+        cp_inst["tkperm_at_round"] = self.tkperm_at_round
+        if self.mzn_file_name == "attack.mzn":
+            cp_inst["inv_tkp"] = self.inv_tkp
+        return cp_inst
+
+    #############################################################################################################################################
+    #############################################################################################################################################
+    #############################################################################################################################################
+
+    async def solve_async(self, count_distinguishers=False, debug_output=None):
         """
-        Search for a zero-correlation distinguisher optimized for key recovery
+        Search for an attack and return it as a SearchResult, without printing, drawing or storing it.
+        The number of distinguishers (with the tweakey schedule) is only counted if count_distinguishers is set
         """
 
         if self.time_limit != -1:
@@ -156,76 +234,102 @@ class ID:
             time_limit = None
     
         start_time = time.time()
-        ####################################################################################################
-        ####################################################################################################
-        self.cp_model = minizinc.Model()
-        self.cp_model.add_file(self.mzn_file_name)
-        self.cp_inst = minizinc.Instance(solver=self.cp_solver, model=self.cp_model)
-        self.cp_inst["RB"] = self.RB
-        self.cp_inst["RD"] = self.RD
-        self.cp_inst["RF"] = self.RF
-        self.cp_inst["Ri"] = self.Ri
-        self.cp_inst["R0"] = self.R0
-        self.cp_inst["skip_first_sbox_layer"] = self.skip_first_sbox_layer
-        self.cp_inst["is_related_tweakey"] = self.is_related_tweakey
-        self.cp_inst["cell_size"] = self.cell_size
-        self.cp_inst["variant"] = self.variant
-        self.cp_inst["NPT"] = self.NPT
-        self.cp_inst["GuessingThreshold1"] = self.GuessingThreshold1
-        self.cp_inst["GuessingThreshold2"] = self.GuessingThreshold2
-        self.result = self.cp_inst.solve(timeout=time_limit, 
-                                         processes=self.num_of_threads, 
-                                         #verbose=True, 
-                                         debug_output=Path("./debug_output.txt", intermediate_solutions=True),                                         
-                                         optimisation_level=2)
-        ####################################################################################################
-        ####################################################################################################
-        elapsed_time = time.time() - start_time
-        print("Elapsed time: {:0.02f} seconds".format(elapsed_time))
-
-
-        if self.result.status == minizinc.Status.OPTIMAL_SOLUTION or self.result.status == minizinc.Status.SATISFIED or \
-                            self.result.status == minizinc.Status.ALL_SOLUTIONS:                        
-            params_default = {"cell_size" : self.cell_size,
-                            "NPT" : self.NPT,
-                            "RB" : self.RB,
-                            "RD" : self.RD,
-                            "RF" : self.RF,
-                            "RT" : self.RT,
-                            "Ri" : self.Ri,
-                            "R0" : self.R0,
-                            "nonzero_tweakey_cells" : dict(),
-                            "timelimit" : self.time_limit,
-                            "fixedVariables" : {}}
-            self.nonzero_tweakey_cells = dict()            
-            for r in range(self.RT + self.R0):
-                self.nonzero_tweakey_cells[r] = list()
-                for cell in range(8):
-                    if self.result["ASTK"][r][cell] == 0:
-                        params_default["fixedVariables"][f"tk_{r}_{cell}"] = "0"
-                    else:
-                        self.nonzero_tweakey_cells[r].append(cell)
-            params_default["nonzero_tweakey_cells"] = self.nonzero_tweakey_cells
+        cp_inst = self.create_instance()
+        result = await cp_inst.solve_async(timeout=time_limit, 
+                                           processes=self.num_of_threads, 
+                                           debug_output=debug_output, 
+                                           optimisation_level=2)
+        search_result = SearchResult(status=result.status, elapsed_time=time.time() - start_time, solution=result)
+        if search_result.has_solution:
+            search_result.summary = self.print_attack_parameters(result)
+            if count_distinguishers:
+                # the counting is blocking, hence it runs in a thread to keep the event loop responsive
+                search_result.values["number_of_distinguishers"] = await asyncio.get_running_loop().run_in_executor(
+                    None, self.number_of_distinguishers, result)
+                search_result.summary += "\nNumber of distinguishers: {}\n".format(search_result.values["number_of_distinguishers"])
+            search_result.summary += line_separator + "\n"
+            if self.RB + self.RF > 0:
+                search_result.values.update(self.solution_record(result))
+        return search_result
+
+    def solve(self, count_distinguishers=False, debug_output=None):
+        """
+        Blocking variant of solve_async
+        """
+
+        return asyncio.run(self.solve_async(count_distinguishers, debug_output))
+
+    def number_of_distinguishers(self, result):
+        """
+        Count the distinguishers of an attack with the tweakey schedule (see tweakeyschedule.py)
+        """
+
+        params_default = {"cell_size" : self.cell_size,
+                          "NPT" : self.NPT,
+                          "RB" : self.RB,
+                          "RD" : self.RD,
+                          "RF" : self.RF,
+                          "RT" : self.RT,
+                          "Ri" : self.Ri,
+                          "R0" : self.R0,
+                          "nonzero_tweakey_cells" : dict(),
+                          "timelimit" : self.time_limit,
+                          "counter" : self.counter,
+                          "fixedVariables" : {}}
+        nonzero_tweakey_cells = dict()
+        for r in range(self.RT + self.R0):
+            nonzero_tweakey_cells[r] = list()
+            for cell in range(8):
+                if result["ASTK"][r][cell] == 0:
+                    params_default["fixedVariables"][f"tk_{r}_{cell}"] = "0"
+                else:
+                    nonzero_tweakey_cells[r].append(cell)
+        params_default["nonzero_tweakey_cells"] = nonzero_tweakey_cells
+        for i in range(16):
+            if result["ASTK1"][i] == 0:
+                params_default["fixedVariables"][f"tk1_0_{i}"] = "0"
+        if self.NPT >= 2:
             for i in range(16):
-                if self.result["ASTK1"][i] == 0:
-                    params_default["fixedVariables"][f"tk1_0_{i}"] = "0"
-            if self.NPT >= 2:
-                for i in range(16):
-                    if self.result["ASTK2"][i] == 0:
-                        params_default["fixedVariables"][f"tk2_0_{i}"] = "0"
-            if self.NPT >= 3:
-                for i in range(16):
-                    if self.result["ASTK3"][i] == 0:
-                        params_default["fixedVariables"][f"tk3_0_{i}"] = "0"
-            sktksch = SKINNYTKSCH(param=params_default)
-            num_of_solutions = sktksch.compute_no_of_solutions()
-            attack_summary = self.print_attack_parameters()
-            attack_summary += "\nNumber of distinguishers: {}\n".format(num_of_solutions)
-            attack_summary += line_separator + "\n"
-            print(attack_summary)
-            draw = Draw(self, output_file_name=self.output_file_name, attack_summary=attack_summary)
-            draw.generate_attack_shape()            
-        elif self.result.status == minizinc.Status.UNSATISFIABLE:
+                if result["ASTK2"][i] == 0:
+                    params_default["fixedVariables"][f"tk2_0_{i}"] = "0"
+        if self.NPT >= 3:
+            for i in range(16):
+                if result["ASTK3"][i] == 0:
+                    params_default["fixedVariables"][f"tk3_0_{i}"] = "0"
+        sktksch = SKINNYTKSCH(param=params_default)
+        return sktksch.compute_no_of_solutions()
+
+    def draw(self, search_result, output_file_name=None):
+        """
+        Write the shape of the attack of a SearchResult into a Tikz file, or into an SVG file if its name ends with .svg
+        """
+
+        draw = Draw(self, output_file_name=self.output_file_name if output_file_name is None else output_file_name, 
+                    attack_summary=search_result.summary, result=search_result.solution)
+        if draw.output_file_name.endswith(".svg"):
+            draw.generate_attack_shape_svg()
+        else:
+            draw.generate_attack_shape()
+
+    #############################################################################################################################################
+    #############################################################################################################################################
+    #############################################################################################################################################
+
+    def search(self):
+        """
+        Search for an attack, print its parameters, store it in the solutions file and draw its shape
+        """
+
+        search_result = self.solve(count_distinguishers=True, debug_output=Path("./debug_output.txt"))
+        self.result = search_result.solution
+        print("Elapsed time: {:0.02f} seconds".format(search_result.elapsed_time))
+        print(f"Solver status: {search_result.status}")
+        if search_result.has_solution:
+            print(search_result.summary)
+            if self.RB + self.RF > 0 and self.solutions_file is not None:
+                complexity.save_solution(self.solutions_file, search_result.values)
+            self.draw(search_result)
+        elif search_result.status == minizinc.Status.UNSATISFIABLE:
             print("Model is unsatisfiable")
         else:
             print("Solving process was interrupted")
@@ -233,11 +337,105 @@ class ID:
     #############################################################################################################################################
     #############################################################################################################################################
 
-    def print_attack_parameters(self):
+    def solve_with_bounds(self, data_bound, memory_bound, time_lower_bound=None, time_upper_bound=None, num_of_threads=None):
+        """
+        Minimize the time complexity of the attack subject to upper bounds on its data and memory complexities
+        (epsilon-constraint sub-problem of the Pareto front). Known bounds on the optimal time complexity can be given
+        """
+
+        if self.time_limit != -1:
+            time_limit = datetime.timedelta(seconds=self.time_limit)
+        else:
+            time_limit = None
+        constraints = ["constraint t_complexity[0] - bool2int(is_related_tweakey) <= {};".format(data_bound),
+                       "constraint memory_complexity <= {};".format(memory_bound)]
+        if time_lower_bound is not None:
+            constraints.append("constraint max_term >= {};".format(time_lower_bound))
+        if time_upper_bound is not None:
+            constraints.append("constraint max_term <= {};".format(time_upper_bound))
+        start_time = time.time()
+        cp_inst = self.create_instance(constraints)
+        result = cp_inst.solve(timeout=time_limit, 
+                               processes=num_of_threads if num_of_threads is not None else self.num_of_threads, 
+                               optimisation_level=2)
+        record = {"data_bound" : data_bound,
+                  "memory_bound" : memory_bound,
+                  "status" : result.status.name,
+                  "optimal" : result.status == minizinc.Status.OPTIMAL_SOLUTION,
+                  "elapsed_time" : time.time() - start_time}
+        if result.solution is not None:
+            record.update(self.solution_record(result))
+            record["data"] = result["t_complexity"][0] - int(self.is_related_tweakey)
+        return record
+
+    def pareto_front(self, data_bounds, memory_bounds, num_of_processes=1):
+        """
+        Find the attacks with a non-dominated (time, data, memory) complexity by solving the epsilon-constraint
+        sub-problems for all pairs of data and memory bounds in parallel processes. The sub-problems are started
+        from the loosest bounds, so that each one is given the best time complexity known within its bounds as
+        an upper bound and, from the sub-problems with looser bounds that were solved to optimality, a lower bound
+        """
+
+        assert self.RB + self.RF > 0, "The Pareto front is only defined for complete attacks (RB + RF > 0)"
+        boxes = sorted(itertools.product(data_bounds, memory_bounds), reverse=True)
+        num_of_threads = max(1, self.num_of_threads // num_of_processes)
+        points = []
+        pending = dict()
+        with ProcessPoolExecutor(max_workers=num_of_processes) as pool:
+            while boxes or pending:
+                while boxes and len(pending) < num_of_processes:
+                    data_bound, memory_bound = boxes.pop(0)
+                    looser = [point for point in points if point["optimal"] and point["data_bound"] >= data_bound and point["memory_bound"] >= memory_bound]
+                    inside = [point for point in points if "max_term" in point and point["data"] <= data_bound and point["memory_complexity"] <= memory_bound]
+                    # an optimal attack of a looser sub-problem that satisfies the bounds is optimal here as well
+                    if any(point in inside for point in looser):
+                        continue
+                    time_lower_bound = max((point["max_term"] for point in looser), default=None)
+                    time_upper_bound = min((point["max_term"] for point in inside), default=None)
+                    future = pool.submit(solve_with_bounds, self.params, data_bound, memory_bound, time_lower_bound, time_upper_bound, num_of_threads)
+                    pending[future] = (data_bound, memory_bound)
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    data_bound, memory_bound = pending.pop(future)
+                    point = future.result()
+                    points.append(point)
+                    print("data <= {:3d}, memory <= {:3d}: {:>20s} {}".format(data_bound, memory_bound, point["status"],
+                          "(time, data, memory) = ({}, {}, {})".format(point["max_term"], point["data"], point["memory_complexity"]) if "max_term" in point else ""))
+                    if "max_term" in point and self.solutions_file is not None:
+                        complexity.save_solution(self.solutions_file, point)
+        front = []
+        for point in points:
+            if "max_term" not in point:
+                continue
+            costs = (point["max_term"], point["data"], point["memory_complexity"])
+            if any((p["max_term"], p["data"], p["memory_complexity"]) == costs for p in front):
+                continue
+            if not any(all(a <= b for a, b in zip((q["max_term"], q["data"], q["memory_complexity"]), costs)) and \
+                       (q["max_term"], q["data"], q["memory_complexity"]) != costs for q in points if "max_term" in q):
+                front.append(point)
+        front.sort(key=lambda point: (point["max_term"], point["data"], point["memory_complexity"]))
+        str_output = line_separator + "\n"
+        str_output += "Pareto front (time, data, memory) for RB + RD + RF = {:02d} + {:02d} + {:02d}:\n".format(self.RB, self.RD, self.RF)
+        str_output += "{:>6s} {:>6s} {:>8s} {:>5s} {:>5s} {:>5s} {:>5s} {:>5s} {:>5s} {:>9s}\n".format("time", "data", "memory", "g", "CB", "CF", "WB", "WF", "KS", "optimal")
+        for point in front:
+            str_output += "{:>6d} {:>6d} {:>8d} {:>5d} {:>5d} {:>5d} {:>5d} {:>5d} {:>5d} {:>9s}\n".format(point["max_term"], point["data"], point["memory_complexity"],
+                                                                                                       point["g"], point["CB_tot"], point["CF_tot"], point["WB"],
+                                                                                                       point["WF"], point["KS"], str(point["optimal"]))
+        str_output += line_separator + "\n"
+        print(str_output)
+        return front
+
+    #############################################################################################################################################
+    #############################################################################################################################################
+    #############################################################################################################################################
+
+    def print_attack_parameters(self, result=None):
         """
         Print attack parameters
         """
-        
+
+        if result is None:
+            result = self.result
         if self.RB + self.RF > 0:
             str_output = line_separator + "\n"
             str_output += "Attack parameters:\n"
@@ -247,31 +445,31 @@ class ID:
             str_output += "R0                    = \t{:02d}\n".format(self.R0)
             str_output += "Variant               = \t{:02d}\n".format(self.variant)
             str_output += "Cell size             = \t{:02d}\n".format(self.cell_size)
-            str_output += "data_complexity[0]    = \t{:0.02f}\n".format(self.result["data_complexity"][0])
-            str_output += "data_complexity[1]    = \t{:0.02f}\n".format(self.result["data_complexity"][1])
-            str_output += "data_complexity[2]    = \t{:0.02f}\n".format(self.result["data_complexity"][2])
-            str_output += "data_complexity[3]    = \t{:0.02f}\n".format(self.result["data_complexity"][3])
-            str_output += "g                     = \t{:03d}\n".format(self.result["g"])
-            str_output += "log2(g) - 0.53        = \t{:0.02f}\n".format(self.result["log_2_minus_053_of_g"])
-            str_output += "t_complexity[0]       = \t{:0.02f}\n".format(self.result["t_complexity"][0])
-            str_output += "t_complexity[1]       = \t{:0.02f}\n".format(self.result["t_complexity"][1])
-            str_output += "t_complexity[2]       = \t{:0.02f}\n".format(self.result["t_complexity"][2])
-            str_output += "t_complexity[3]       = \t{:0.02f}\n".format(self.result["t_complexity"][3])
+            str_output += "data_complexity[0]    = \t{:0.02f}\n".format(result["data_complexity"][0])
+            str_output += "data_complexity[1]    = \t{:0.02f}\n".format(result["data_complexity"][1])
+            str_output += "data_complexity[2]    = \t{:0.02f}\n".format(result["data_complexity"][2])
+            str_output += "data_complexity[3]    = \t{:0.02f}\n".format(result["data_complexity"][3])
+            str_output += "g                     = \t{:03d}\n".format(result["g"])
+            str_output += "log2(g) - 0.53        = \t{:0.02f}\n".format(result["log_2_minus_053_of_g"])
+            str_output += "t_complexity[0]       = \t{:0.02f}\n".format(result["t_complexity"][0])
+            str_output += "t_complexity[1]       = \t{:0.02f}\n".format(result["t_complexity"][1])
+            str_output += "t_complexity[2]       = \t{:0.02f}\n".format(result["t_complexity"][2])
+            str_output += "t_complexity[3]       = \t{:0.02f}\n".format(result["t_complexity"][3])
             str_output += line_separator + "\n"
-            str_output += "#involved key cells   = \t{:02d}\n".format(self.result["KS"])
-            str_output += "CB                    = \t{:02d}\n".format(self.result["CB_tot"])
-            str_output += "CF                    = \t{:02d}\n".format(self.result["CF_tot"])
-            str_output += "WB                    = \t{:02d}\n".format(self.result["WB"])
-            str_output += "WF                    = \t{:02d}\n".format(self.result["WF"])
-            str_output += "time complexity       = \t{:0.02f}\n".format(self.result["max_term"])
+            str_output += "#involved key cells   = \t{:02d}\n".format(result["KS"])
+            str_output += "CB                    = \t{:02d}\n".format(result["CB_tot"])
+            str_output += "CF                    = \t{:02d}\n".format(result["CF_tot"])
+            str_output += "WB                    = \t{:02d}\n".format(result["WB"])
+            str_output += "WF                    = \t{:02d}\n".format(result["WF"])
+            str_output += "time complexity       = \t{:0.02f}\n".format(result["max_term"])
             if self.is_related_tweakey:
-                str_output += "data_complexity       = \t{:0.02f}\n".format(self.result["t_complexity"][0] - 1)
+                str_output += "data_complexity       = \t{:0.02f}\n".format(result["t_complexity"][0] - 1)
             else:
-                str_output += "data_complexity       = \t{:0.02f}\n".format(self.result["t_complexity"][0])
-            str_output += "memory complexity     = \t{:0.02f}\n".format(self.result["memory_complexity"])          
+                str_output += "data_complexity       = \t{:0.02f}\n".format(result["t_complexity"][0])
+            str_output += "memory complexity     = \t{:0.02f}\n".format(result["memory_complexity"])          
             str_output += line_separator + "\n"
         else:
-            contradict1, contradict2, contradict3, contradict4 = self.result["contradict1"], self.result["contradict2"], self.result["contradict3"], self.result["contradict4"]
+            contradict1, contradict2, contradict3, contradict4 = result["contradict1"], result["contradict2"], result["contradict3"], result["contradict4"]
             contradiction_locations = [x for x in range(self.RD) if contradict1[x] or contradict2[x] or contradict3[x] or contradict4[x]]
             str_output = line_separator + "\n"
             str_output = "Distinguisher parameters:\n"
@@ -285,6 +483,30 @@ class ID:
     #############################################################################################################################################
     #############################################################################################################################################
     #############################################################################################################################################
+
+    def solution_record(self, result=None):
+        """
+        The parameters of the attack found and the quantities its complexities depend on (see complexity.py)
+        """
+
+        if result is None:
+            result = self.result
+        record = {"variant" : self.variant,
+                  "cell_size" : self.cell_size,
+                  "NPT" : self.NPT,
+                  "RB" : self.RB,
+                  "RD" : self.RD,
+                  "RF" : self.RF,
+                  "Ri" : self.Ri,
+                  "R0" : self.R0,
+                  "is_related_tweakey" : int(self.is_related_tweakey),
+                  "output_file_name" : self.output_file_name}
+        for name in ["CB_tot", "CF_tot", "WB", "WF", "KS", "g", "max_term", "memory_complexity"]:
+            record[name] = result[name]
+        return record
+    #############################################################################################################################################
+    #############################################################################################################################################
+    #############################################################################################################################################
     #   ____                      _     _    _             _   _                    _                           __   ____   _       _    _                       _       _                      
     #  / ___| ___   _   _  _ __  | |_  | |_ | |__    ___  | \ | | _   _  _ __ ___  | |__    ___  _ __    ___   / _| |  _ \ (_) ___ | |_ (_) _ __    __ _  _   _ (_) ___ | |__    ___  _ __  ___ 
     # | |    / _ \ | | | || '_ \ | __| | __|| '_ \  / _ \ |  \| || | | || '_ ` _ \ | '_ \  / _ \| '__|  / _ \ | |_  | | | || |/ __|| __|| || '_ \  / _` || | | || |/ __|| '_ \  / _ \| '__|/ __|
@@ -293,23 +515,19 @@ class ID:
     #                                                                                                                                              |___/                                        
     # Count thenumber of distinguishers
         
-    def count_no_of_distinguishers(self):
+    def tweakey_difference_pattern(self):
         """
-        Count the number of distinguishers
+        The activeness and differences of the tweakey in the attack found, as a picklable dictionary
         """
 
-        if self.time_limit != -1:
-            time_limit = datetime.timedelta(seconds=self.time_limit)
-        else:
-            time_limit = None
-    
-        start_time = time.time()
-        ####################################################################################################
-        ####################################################################################################
-        cp_model = minizinc.Model()
-        cp_solver = minizinc.Solver.lookup('ortools')
-        with open(self.tksch_mzn_file_name, "r") as cpfile:
-            cp_constraints = cpfile.read() + "\n"
+        return {name : self.result[name] for name in ["ASTK", "DSTK", "ASTK1", "DSTK1", "ASTK2", "DSTK2", "ASTK3", "DSTK3"]}
+
+    def distinguisher_constraints(self):
+        """
+        Constraints fixing the tweakey differences of tweakeyschedule.mzn to those of the attack found
+        """
+
+        cp_constraints = ""
         for r in range(self.RT + self.R0):
             for i in range(16):
                 cp_constraints += "constraint ASTK[{:0d}, {:0d}] = {:0d};\n".format(r, i, self.result["ASTK"][r][i])                
@@ -332,11 +550,34 @@ class ID:
                     cp_constraints += "constraint ASTK3[{:0d}] = {:0d};\n".format(i, self.result["ASTK3"][i])
                     if self.result["DSTK3"][0][i] == 0:
                         cp_constraints += "constraint DSTK3[0, {:0d}] = {:0d};\n".format(i, self.result["DSTK3"][0][i])        
-        random_uuid = uuid.uuid4()
-        random_filename = str(random_uuid) + ".mzn"
-        with open(random_filename, "w") as cpfile:
-            cpfile.write(cp_constraints)
-        cp_model.add_file(random_filename)        
+        return cp_constraints
+
+    def split_cells(self):
+        """
+        The tweakey difference cells of round 0 left free by the attack found, on which the enumeration is split
+        """
+
+        cells = ["DSTK1[{:0d}]".format(i) for i in range(16) if self.result["DSTK1"][i] != 0]
+        if self.NPT >= 2:
+            cells += ["DSTK2[0, {:0d}]".format(i) for i in range(16) if self.result["DSTK2"][0][i] != 0]
+        if self.NPT >= 3:
+            cells += ["DSTK3[0, {:0d}]".format(i) for i in range(16) if self.result["DSTK3"][0][i] != 0]
+        return cells
+
+    def count_cube(self, cube, time_limit=None):
+        """
+        Enumerate the distinguishers in which the cells of cube ({cell : difference}) take the given differences,
+        and return the status of the enumeration and the number of distinguishers found
+        """
+
+        cp_model = minizinc.Model()
+        cp_solver = minizinc.Solver.lookup('ortools')
+        with open(self.tksch_mzn_file_name, "r") as cpfile:
+            cp_constraints = cpfile.read() + "\n"
+        cp_constraints += self.distinguisher_constraints()
+        for cell, difference in cube.items():
+            cp_constraints += "constraint {} = {:0d};\n".format(cell, difference)
+        cp_model.add_string(cp_constraints)
         cp_inst = minizinc.Instance(solver=cp_solver, model=cp_model)        
         cp_inst["RB"] = self.RB
         cp_inst["RD"] = self.RD
@@ -347,27 +588,87 @@ class ID:
         cp_inst["cell_size"] = self.cell_size
         cp_inst["variant"] = self.variant
         cp_inst["NPT"] = self.NPT
+        cp_inst["tkperm_at_round"] = self.tkperm_at_round
+        cp_inst["inv_tkp"] = self.inv_tkp
+        # OR-Tools enumerates all solutions sequentially, hence a single thread per cube
         result = cp_inst.solve(timeout=time_limit, 
-                                processes=self.num_of_threads, 
-                                #verbose=True,                                                                       
+                                processes=1, 
                                 optimisation_level=2,
                                 all_solutions=True)
-        os.remove(random_filename)
-        ####################################################################################################
-        ####################################################################################################
+        number_of_solutions = len(result) if result.solution is not None else 0
+        return result.status.name, number_of_solutions
+
+    def count_no_of_distinguishers(self, num_of_processes=1, num_of_split_cells=None):
+        """
+        Count the number of distinguishers of the attack found by enumerating the solutions of tweakeyschedule.mzn.
+        The search space is split into disjoint cubes by fixing the differences of the first free tweakey cells
+        of round 0, and the cubes are enumerated in parallel processes. By default, the number of split cells is
+        the smallest one giving at least 8 cubes per process
+        """
+
+        cells = self.split_cells()
+        if num_of_split_cells is None:
+            num_of_split_cells = 0
+            while num_of_processes > 1 and num_of_split_cells < len(cells) and 2**(self.cell_size*num_of_split_cells) < 8*num_of_processes:
+                num_of_split_cells += 1
+        cells = cells[:num_of_split_cells]
+        cubes = [dict(zip(cells, differences)) for differences in itertools.product(range(2**self.cell_size), repeat=len(cells))]
+        if self.time_limit != -1 and self.time_limit is not None:
+            deadline = time.time() + self.time_limit
+        else:
+            deadline = None
+        start_time = time.time()
+        number_of_distinguishers = 0
+        statuses = []
+        if num_of_processes == 1:
+            for cube in cubes:
+                status, number_of_solutions = self.count_cube(cube, remaining_time(deadline))
+                statuses.append(status)
+                number_of_distinguishers += number_of_solutions
+        else:
+            pattern = self.tweakey_difference_pattern()
+            with ProcessPoolExecutor(max_workers=num_of_processes) as pool:
+                futures = [pool.submit(count_cube, self.params, pattern, cube, deadline) for cube in cubes]
+                for future in as_completed(futures):
+                    status, number_of_solutions = future.result()
+                    statuses.append(status)
+                    number_of_distinguishers += number_of_solutions
         elapsed_time = time.time() - start_time
         print("Elapsed time to find number of distinguishers: {:0.02f} seconds".format(elapsed_time))
-        if result.status == minizinc.Status.OPTIMAL_SOLUTION or result.status == minizinc.Status.SATISFIED or \
-                            result.status == minizinc.Status.ALL_SOLUTIONS:            
-            print(result)
-        elif result.status == minizinc.Status.UNSATISFIABLE:
-            print("Model is unsatisfiable")
+        print("Split cells:     {}".format(", ".join(cells) if cells else "-"))
+        print("No. of cubes:    {}".format(len(cubes)))
+        complete = all(status in ["ALL_SOLUTIONS", "UNSATISFIABLE"] for status in statuses)
+        if complete:
+            print("Number of distinguishers: {}".format(number_of_distinguishers))
         else:
-            print("Solving process was interrupted")
+            print("Solving process was interrupted, number of distinguishers found: {} (lower bound)".format(number_of_distinguishers))
+        return number_of_distinguishers, complete
     #############################################################################################################################################
     #############################################################################################################################################
     #############################################################################################################################################
 
+def remaining_time(deadline):
+    if deadline is None:
+        return None
+    return datetime.timedelta(seconds=max(1, deadline - time.time()))
+
+def count_cube(params, pattern, cube, deadline):
+    """
+    Enumerate the distinguishers of one cube of ID.count_no_of_distinguishers in a worker process
+    """
+
+    id_attack = ID(params)
+    id_attack.result = pattern
+    return id_attack.count_cube(cube, remaining_time(deadline))
+
+def solve_with_bounds(params, data_bound, memory_bound, time_lower_bound, time_upper_bound, num_of_threads):
+    """
+    Solve one epsilon-constraint sub-problem of ID.pareto_front in a worker process
+    """
+
+    return ID(params).solve_with_bounds(data_bound, memory_bound, time_lower_bound, time_upper_bound, num_of_threads)
+
+
 #############################################################################################################################################
 #############################################################################################################################################
 #############################################################################################################################################
@@ -395,7 +696,14 @@ def loadparameters(args):
               "cp_solver_name" : "ortools",
               "num_of_threads" : 8,
               "time_limit" : None,
-              "output_file_name" : "output.tex"}
+              "counter" : None,
+              "output_file_name" : "output.tex",
+              "solutions_file" : None,
+              "pareto" : False,
+              "data_bounds" : None,
+              "memory_bounds" : None,
+              "num_of_processes" : 1,
+              "enumerate" : False}
     # Overwrite parameters if they are set on command line
     if args.variant is not None:
         params["variant"] = args.variant
@@ -421,8 +729,22 @@ def loadparameters(args):
         params["num_of_threads"] = args.p
     if args.tl is not None:
         params["time_limit"] = args.tl
+    if args.counter is not None:
+        params["counter"] = args.counter
     if args.o is not None:
         params["output_file_name"] = args.o
+    if args.sf is not None:
+        params["solutions_file"] = args.sf
+    if args.pareto is not None:
+        params["pareto"] = args.pareto
+    if args.db is not None:
+        params["data_bounds"] = args.db
+    if args.mb is not None:
+        params["memory_bounds"] = args.mb
+    if args.pp is not None:
+        params["num_of_processes"] = args.pp
+    if args.enumerate is not None:
+        params["enumerate"] = args.enumerate
     return params
 
 def main():
@@ -461,7 +783,14 @@ def main():
                         help="Choose a CP solver") 
     parser.add_argument("-p", default=8, type=int, help="number of threads for solvers supporting multi-threading\n")    
     parser.add_argument("-tl", default=4000, type=int, help="set a time limit for the solver in seconds\n")
-    parser.add_argument("-o", default="output.tex", type=str, help="output file including the Tikz code to generate the shape of the attack\n")
+    parser.add_argument("-counter", default=None, type=str, choices=["gurobi", "cnf"], help="backend counting the distinguishers (by default Gurobi if gurobipy is installed)\n")
+    parser.add_argument("-o", default="output.tex", type=str, help="output file including the Tikz code to generate the shape of the attack (an SVG image if it ends with .svg)\n")
+    parser.add_argument("-sf", default=None, type=str, help="file to which the attacks found are appended, to re-score them with complexity.py (by default, they are not stored)\n")
+    parser.add_argument("-pareto", action="store_true", help="Use this flag to compute the Pareto front of the (time, data, memory) complexities\n")
+    parser.add_argument("-db", nargs="+", default=None, type=int, help="upper bounds on the data complexity for the Pareto front (by default from the block size down to half of it)\n")
+    parser.add_argument("-mb", nargs="+", default=None, type=int, help="upper bounds on the memory complexity for the Pareto front (by default unbounded)\n")
+    parser.add_argument("-pp", default=1, type=int, help="number of sub-problems of the Pareto front (each with p/pp threads), or of cubes of the enumeration, solved in parallel\n")
+    parser.add_argument("-enumerate", action="store_true", help="Use this flag to count the distinguishers of the attack found by enumerating tweakeyschedule.mzn in pp processes\n")
 
     # Parse command line arguments and construct parameter list
     args = parser.parse_args()
@@ -482,7 +811,15 @@ def main():
     print("No. of threads:  {}".format(params["num_of_threads"]))
     print("Time limit:      {}".format(params["time_limit"]))
     print(line_separator)
-    id_attack.search()
+    if params["pareto"]:
+        block_size = 16*params["cell_size"]
+        data_bounds = params["data_bounds"] if params["data_bounds"] is not None else list(range(block_size, block_size//2 - 1, -2*params["cell_size"]))
+        memory_bounds = params["memory_bounds"] if params["memory_bounds"] is not None else [384]
+        id_attack.pareto_front(data_bounds, memory_bounds, params["num_of_processes"])
+    else:
+        id_attack.search()
+        if params["enumerate"] and id_attack.result is not None:
+            id_attack.count_no_of_distinguishers(params["num_of_processes"])
     
 #############################################################################################################################################
 #############################################################################################################################################
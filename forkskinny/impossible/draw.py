@@ -25,7 +25,12 @@ Email: hsn.hadipour@gmail.com
 """
 
 
+import itertools
 import sys
+from pathlib import Path
+# the modules shared by the tools of several ciphers are in the folder shared of the repository
+sys.path.append(str(Path(__file__).resolve().parents[2] / "shared"))
+from drawsvg import SkinnySVG, Cells
 
 def trim(docstring):
     if not docstring:
@@ -57,8 +62,8 @@ class Draw():
     Draw the shape of ID attack
     """
 
-    def __init__(self, id_object, output_file_name="output.tex", attack_summary=""):
-        self.result = id_object.result
+    def __init__(self, id_object, output_file_name="output.tex", attack_summary="", result=None):
+        self.result = id_object.result if result is None else result
         self.RB = id_object.RB
         self.RD = id_object.RD
         self.RF = id_object.RF
@@ -67,11 +72,11 @@ class Draw():
         self.R0 = id_object.R0
         self.attack_summary = attack_summary
         if self.RB + self.RF > 0:
-            self.num_of_involved_key_cells = id_object.result["KS"]
-            self.CB_tot = id_object.result["CB_tot"]
-            self.CF_tot = id_object.result["CF_tot"]
-            self.WB = id_object.result["WB"]
-            self.WF = id_object.result["WF"]
+            self.num_of_involved_key_cells = self.result["KS"]
+            self.CB_tot = self.result["CB_tot"]
+            self.CF_tot = self.result["CF_tot"]
+            self.WB = self.result["WB"]
+            self.WF = self.result["WF"]
         self.variant = id_object.variant
         self.inv_permutation = [0, 1, 2, 3, 5, 6, 7, 4, 10, 11, 8, 9, 15, 12, 13, 14]
         self.tweakey_permutation = [9, 15, 8, 13, 10, 14, 12, 11, 0, 1, 2, 3, 4, 5, 6, 7]
@@ -83,11 +88,9 @@ class Draw():
         Generate the round tweakey labels
         """
         if round_number == 0 and (self.RB + self.RF > 0):
-            text = \
-                r"""\Cell{ss00}{\texttt{0}}\Cell{ss01}{\texttt{1}}\Cell{ss02}{\texttt{2}}\Cell{ss03}{\texttt{3}}""" + \
-                r"""\Cell{ss10}{\texttt{0}}\Cell{ss11}{\texttt{1}}\Cell{ss12}{\texttt{2}}\Cell{ss13}{\texttt{3}}""" + \
-                r"""\Cell{ss20}{\texttt{7}}\Cell{ss21}{\texttt{4}}\Cell{ss22}{\texttt{5}}\Cell{ss23}{\texttt{6}}""" + \
-                r"""\Cell{ss30}{\texttt{0}}\Cell{ss31}{\texttt{1}}\Cell{ss32}{\texttt{2}}\Cell{ss33}{\texttt{3}}"""
+            text = Cells()
+            for i, j in itertools.product(range(4), range(4)):
+                text.text((i, j), str([0, 1, 2, 3, 0, 1, 2, 3, 7, 4, 5, 6, 0, 1, 2, 3][4*i + j]))
             return text
         round_tweakey_state = list(range(16))
         if round_number < self.Ri:
@@ -96,9 +99,9 @@ class Draw():
             offset = self.R0
         for r in range(round_number + offset):
             round_tweakey_state = [self.tweakey_permutation[i] for i in round_tweakey_state]
-        text = ""
+        text = Cells()
         for i in range(8):
-            text += "\Cell{{s{0}}}{{\\texttt{{{1}}}}}".format(i, hex(round_tweakey_state[i])[2:])
+            text.text(i, hex(round_tweakey_state[i])[2:])
         return text
 
     def draw_1st_round_eb(self):
@@ -107,48 +110,48 @@ class Draw():
         """
 
         output = dict()    
-        output["before_sb"] = ""              
-        output["after_sb"] = ""
-        output["after_addtk"] = ""
-        output["after_sr"] = ""
-        output["subtweakey"] = ""
-        output["after_mix_columns"] = ""
+        output["before_sb"] = Cells()              
+        output["after_sb"] = Cells()
+        output["after_addtk"] = Cells()
+        output["after_sr"] = Cells()
+        output["subtweakey"] = Cells()
+        output["after_mix_columns"] = Cells()
         if self.result["ASTK"][0][0] == 1:
-            output["subtweakey"] += "\Fill[nonzerofixed]{{s{0}}}".format(0)
-            output["subtweakey"] += "\Fill[nonzerofixed]{{s{0}}}".format(4)
-            output["subtweakey"] += "\Fill[nonzerofixed]{{s{0}}}".format(12)
+            output["subtweakey"].fill(0, "nonzerofixed")
+            output["subtweakey"].fill(4, "nonzerofixed")
+            output["subtweakey"].fill(12, "nonzerofixed")
         if self.result["ASTK"][0][1] == 1:
-            output["subtweakey"] += "\Fill[nonzerofixed]{{s{0}}}".format(1)
-            output["subtweakey"] += "\Fill[nonzerofixed]{{s{0}}}".format(5)
-            output["subtweakey"] += "\Fill[nonzerofixed]{{s{0}}}".format(13)
+            output["subtweakey"].fill(1, "nonzerofixed")
+            output["subtweakey"].fill(5, "nonzerofixed")
+            output["subtweakey"].fill(13, "nonzerofixed")
         if self.result["ASTK"][0][2] == 1:
-            output["subtweakey"] += "\Fill[nonzerofixed]{{s{0}}}".format(2)
-            output["subtweakey"] += "\Fill[nonzerofixed]{{s{0}}}".format(6)
-            output["subtweakey"] += "\Fill[nonzerofixed]{{s{0}}}".format(14)
+            output["subtweakey"].fill(2, "nonzerofixed")
+            output["subtweakey"].fill(6, "nonzerofixed")
+            output["subtweakey"].fill(14, "nonzerofixed")
         if self.result["ASTK"][0][3] == 1:
-            output["subtweakey"] += "\Fill[nonzerofixed]{{s{0}}}".format(3)
-            output["subtweakey"] += "\Fill[nonzerofixed]{{s{0}}}".format(7)
-            output["subtweakey"] += "\Fill[nonzerofixed]{{s{0}}}".format(15)
+            output["subtweakey"].fill(3, "nonzerofixed")
+            output["subtweakey"].fill(7, "nonzerofixed")
+            output["subtweakey"].fill(15, "nonzerofixed")
         if self.result["ASTK"][0][4] == 1:
-            output["subtweakey"] += "\Fill[nonzerofixed]{{s{0}}}".format(9)                
+            output["subtweakey"].fill(9, "nonzerofixed")
         if self.result["ASTK"][0][5] == 1:
-            output["subtweakey"] += "\Fill[nonzerofixed]{{s{0}}}".format(10)
+            output["subtweakey"].fill(10, "nonzerofixed")
         if self.result["ASTK"][0][6] == 1:
-            output["subtweakey"] += "\Fill[nonzerofixed]{{s{0}}}".format(11)
+            output["subtweakey"].fill(11, "nonzerofixed")
         if self.result["ASTK"][0][7] == 1:
-            output["subtweakey"] += "\Fill[nonzerofixed]{{s{0}}}".format(8)
+            output["subtweakey"].fill(8, "nonzerofixed")
         for i in range(16):
             if self.result["AXB"][1][i] == 1:
-                output["after_mix_columns"] += "\Fill[active]{{s{0}}}".format(i)
+                output["after_mix_columns"].fill(i, "active")
             if self.result["KDXB"][1][i] == 1:
-                output["after_mix_columns"] += "\PattCell[black]{{s{0}}}".format(i)                
+                output["after_mix_columns"].pattern(i, "black")
             if self.result["KXB"][1][i] == 1:
-                output["after_mix_columns"] += "\MarkCellN{{s{0}}}".format(i)
-                output["subtweakey"] += "\MarkCellN{{s{0}}}".format(i)
+                output["after_mix_columns"].mark(i)
+                output["subtweakey"].mark(i)
         for i in range(16):
             if self.result["GXB"][1][i] == 1:
-                output["after_mix_columns"] += "\MarkCellN{{s{0}}}".format(i)
-                output["subtweakey"] += "\MarkCellN{{s{0}}}".format(i)
+                output["after_mix_columns"].mark(i)
+                output["subtweakey"].mark(i)
         return output
 
     def draw_eb(self, r):
@@ -159,78 +162,78 @@ class Draw():
         if r == 0:
             return self.draw_1st_round_eb()
         output = dict()    
-        output["before_sb"] = ""              
-        output["after_sb"] = ""
-        output["after_addtk"] = ""
-        output["after_sr"] = ""
-        output["subtweakey"] = ""
-        output["after_mix_columns"] = ""
+        output["before_sb"] = Cells()              
+        output["after_sb"] = Cells()
+        output["after_addtk"] = Cells()
+        output["after_sr"] = Cells()
+        output["subtweakey"] = Cells()
+        output["after_mix_columns"] = Cells()
         for i in range(16):
             if self.result["AXB"][r][i] == 1:
-                output["before_sb"] += "\Fill[active]{{s{0}}}".format(i)
+                output["before_sb"].fill(i, "active")
                 if self.result["IsFixedDZB"][r][i] == 1:
-                    output["after_sb"] += "\Fill[nonzerofixed]{{s{0}}}".format(i)
+                    output["after_sb"].fill(i, "nonzerofixed")
                 else:
-                    output["after_sb"] += "\Fill[active]{{s{0}}}".format(i)
+                    output["after_sb"].fill(i, "active")
             if self.result["AZB"][r][i] == 1:
                 if self.result["IsFixedDZB"][r][i] == 1:                    
-                    output["after_addtk"] += "\Fill[nonzerofixed]{{s{0}}}".format(i)
-                    output["after_sr"] += "\Fill[nonzerofixed]{{s{0}}}".format(self.inv_permutation[i])
+                    output["after_addtk"].fill(i, "nonzerofixed")
+                    output["after_sr"].fill(self.inv_permutation[i], "nonzerofixed")
                 else:
-                    output["after_addtk"] += "\Fill[active]{{s{0}}}".format(i)
-                    output["after_sr"] += "\Fill[active]{{s{0}}}".format(self.inv_permutation[i])
+                    output["after_addtk"].fill(i, "active")
+                    output["after_sr"].fill(self.inv_permutation[i], "active")
             if self.result["AXB"][r + 1][i] == 1:
                 if self.result["IsFixedDXB"][r + 1][i] == 1:
-                    output["after_mix_columns"] += "\Fill[nonzerofixed]{{s{0}}}".format(i)
+                    output["after_mix_columns"].fill(i, "nonzerofixed")
                 else:
-                    output["after_mix_columns"] += "\Fill[active]{{s{0}}}".format(i)
+                    output["after_mix_columns"].fill(i, "active")
             if r < self.Ri:
                 offset = 0
             else:
                 offset = self.R0
             if self.result["ASTK"][r + offset][i] == 1 and i <= 7:
-                output["subtweakey"] += "\Fill[nonzerofixed]{{s{0}}}".format(i)
+                output["subtweakey"].fill(i, "nonzerofixed")
         for i in range(16):
             if self.result["KDXB"][r][i] == 1:
-                output["before_sb"] += "\PattCell[black]{{s{0}}}".format(i)
+                output["before_sb"].pattern(i, "black")
             if self.result["KDXB"][r + 1][i] == 1:
-                output["after_mix_columns"] += "\PattCell[black]{{s{0}}}".format(i)
+                output["after_mix_columns"].pattern(i, "black")
             if self.result["KDZB"][r][i] == 1:
-                output["after_sb"] += "\PattCell[black]{{s{0}}}".format(i)
-                output["after_addtk"] += "\PattCell[black]{{s{0}}}".format(i)
-                output["after_sr"] += "\PattCell[black]{{s{0}}}".format(self.inv_permutation[i])
+                output["after_sb"].pattern(i, "black")
+                output["after_addtk"].pattern(i, "black")
+                output["after_sr"].pattern(self.inv_permutation[i], "black")
             else:
                 if self.result["FilterZB"][r][i] == 1 and self.result["AXB"][r][i] == 1:
-                    output["after_sb"] += "\PattCell[black]{{s{0}}}".format(i)
+                    output["after_sb"].pattern(i, "black")
         for i in range(16):
             if self.result["KXB"][r][i] == 1:
-                output["before_sb"] += "\MarkCellN{{s{0}}}".format(i)
+                output["before_sb"].mark(i)
             if self.result["KXB"][r + 1][i] == 1:
-                output["after_mix_columns"] += "\MarkCellN{{s{0}}}".format(i)
+                output["after_mix_columns"].mark(i)
             if self.result["KZB"][r][i] == 1:
-                output["after_sb"] += "\MarkCellN{{s{0}}}".format(i)
+                output["after_sb"].mark(i)
                 if i <= 7:
-                    output["subtweakey"] += "\MarkCellN{{s{0}}}".format(i)
-                output["after_addtk"] += "\MarkCellN{{s{0}}}".format(i)
-                output["after_sr"] += "\MarkCellN{{s{0}}}".format(self.inv_permutation[i])
+                    output["subtweakey"].mark(i)
+                output["after_addtk"].mark(i)
+                output["after_sr"].mark(self.inv_permutation[i])
         for i in range(16):
             if self.result["GXB"][r][i] == 1:
-                output["before_sb"] += "\MarkCellN{{s{0}}}".format(i)
+                output["before_sb"].mark(i)
             if self.result["GXB"][r + 1][i] == 1:
-                output["after_mix_columns"] += "\MarkCellN{{s{0}}}".format(i)
+                output["after_mix_columns"].mark(i)
             if self.result["GZB"][r][i] == 1:
-                output["after_sb"] += "\MarkCellN{{s{0}}}".format(i)
+                output["after_sb"].mark(i)
                 if i <= 7:
-                    output["subtweakey"] += "\MarkCellN{{s{0}}}".format(i)
-                output["after_addtk"] += "\MarkCellN{{s{0}}}".format(i)
-                output["after_sr"] += "\MarkCellN{{s{0}}}".format(self.inv_permutation[i])
+                    output["subtweakey"].mark(i)
+                output["after_addtk"].mark(i)
+                output["after_sr"].mark(self.inv_permutation[i])
         for i in range(16):
             if self.result["FilterZB"][r][i] == 1:
-                output["after_sb"] += "\FrameCell[filter]{{s{0}}}".format(i)
+                output["after_sb"].frame(i, "filter")
             if self.result["FilterXB"][r + 1][i] == 1:
-                output["after_mix_columns"] += "\FrameCell[filter]{{s{0}}}".format(i)                   
+                output["after_mix_columns"].frame(i, "filter")
             if self.result["FilterXB"][r][i] == 1 and r >= 2:
-                output["before_sb"] += "\FrameCell[filter]{{s{0}}}".format(i)
+                output["before_sb"].frame(i, "filter")
 
         return output
     
@@ -240,73 +243,73 @@ class Draw():
         """
 
         output = dict()    
-        output["before_sb"] = ""              
-        output["after_sb"] = ""
-        output["after_addtk"] = ""
-        output["after_sr"] = ""
-        output["subtweakey"] = ""
-        output["after_mix_columns"] = ""
+        output["before_sb"] = Cells()              
+        output["after_sb"] = Cells()
+        output["after_addtk"] = Cells()
+        output["after_sr"] = Cells()
+        output["subtweakey"] = Cells()
+        output["after_mix_columns"] = Cells()
         for i in range(16):
             if self.result["AXF"][r][i] == 1:
                 if self.result["IsFixedDXF"][r][i] == 1:
-                    output["before_sb"] += "\Fill[nonzerofixed]{{s{0}}}".format(i)
+                    output["before_sb"].fill(i, "nonzerofixed")
                 else:
-                    output["before_sb"] += "\Fill[active]{{s{0}}}".format(i)
-                output["after_sb"] += "\Fill[active]{{s{0}}}".format(i)
+                    output["before_sb"].fill(i, "active")
+                output["after_sb"].fill(i, "active")
             if self.result["AZF"][r][i] == 1:
                 if self.result["IsFixedDZF"][r][i] == 1:
-                    output["after_addtk"] += "\Fill[nonzerofixed]{{s{0}}}".format(i)                
-                    output["after_sr"] += "\Fill[nonzerofixed]{{s{0}}}".format(self.inv_permutation[i])
+                    output["after_addtk"].fill(i, "nonzerofixed")
+                    output["after_sr"].fill(self.inv_permutation[i], "nonzerofixed")
                 else:
-                    output["after_addtk"] += "\Fill[active]{{s{0}}}".format(i)                
-                    output["after_sr"] += "\Fill[active]{{s{0}}}".format(self.inv_permutation[i])
+                    output["after_addtk"].fill(i, "active")
+                    output["after_sr"].fill(self.inv_permutation[i], "active")
             if self.result["AXF"][r + 1][i] == 1:
                 if self.result["IsFixedDXF"][r + 1][i] == 1:
-                    output["after_mix_columns"] += "\Fill[nonzerofixed]{{s{0}}}".format(i)
+                    output["after_mix_columns"].fill(i, "nonzerofixed")
                 else:
-                    output["after_mix_columns"] += "\Fill[active]{{s{0}}}".format(i)
+                    output["after_mix_columns"].fill(i, "active")
             if r + self.RB + self.RD < self.Ri:
                 offset = 0
             else:
                 offset = self.R0
             if self.result["ASTK"][offset + r + self.RB + self.RD][i] == 1 and i <= 7:
-                output["subtweakey"] += "\Fill[nonzerofixed]{{s{0}}}".format(i)
+                output["subtweakey"].fill(i, "nonzerofixed")
         for i in range(16):
             if self.result["KDXF"][r][i] == 1:
-                output["before_sb"] += "\PattCell[black]{{s{0}}}".format(i)
+                output["before_sb"].pattern(i, "black")
             if self.result["KDXF"][r + 1][i] == 1:
-                output["after_mix_columns"] += "\PattCell[black]{{s{0}}}".format(i)
+                output["after_mix_columns"].pattern(i, "black")
             if self.result["KDZF"][r][i] == 1:
-                output["after_sb"] += "\PattCell[black]{{s{0}}}".format(i)
-                output["after_addtk"] += "\PattCell[black]{{s{0}}}".format(i)
-                output["after_sr"] += "\PattCell[black]{{s{0}}}".format(self.inv_permutation[i])
+                output["after_sb"].pattern(i, "black")
+                output["after_addtk"].pattern(i, "black")
+                output["after_sr"].pattern(self.inv_permutation[i], "black")
         for i in range(16):
             if self.result["KXF"][r][i] == 1:
-                output["before_sb"] += "\MarkCellN{{s{0}}}".format(i)
+                output["before_sb"].mark(i)
             if self.result["KXF"][r + 1][i] == 1:
-                output["after_mix_columns"] += "\MarkCellN{{s{0}}}".format(i)
+                output["after_mix_columns"].mark(i)
             if self.result["KZF"][r][i] == 1:
-                output["after_sb"] += "\MarkCellN{{s{0}}}".format(i)
+                output["after_sb"].mark(i)
                 if i <= 7:
-                    output["subtweakey"] += "\MarkCellN{{s{0}}}".format(i)
-                output["after_addtk"] += "\MarkCellN{{s{0}}}".format(i)
-                output["after_sr"] += "\MarkCellN{{s{0}}}".format(self.inv_permutation[i])
+                    output["subtweakey"].mark(i)
+                output["after_addtk"].mark(i)
+                output["after_sr"].mark(self.inv_permutation[i])
         for i in range(16):
             if self.result["GXF"][r][i] == 1:
-                output["before_sb"] += "\MarkCellN{{s{0}}}".format(i)
+                output["before_sb"].mark(i)
             if self.result["GXF"][r + 1][i] == 1:
-                output["after_mix_columns"] += "\MarkCellN{{s{0}}}".format(i)
+                output["after_mix_columns"].mark(i)
             if self.result["GZF"][r][i] == 1:
-                output["after_sb"] += "\MarkCellN{{s{0}}}".format(i)
+                output["after_sb"].mark(i)
                 if i <= 7:
-                    output["subtweakey"] += "\MarkCellN{{s{0}}}".format(i)
-                output["after_addtk"] += "\MarkCellN{{s{0}}}".format(i)
-                output["after_sr"] += "\MarkCellN{{s{0}}}".format(self.inv_permutation[i])
+                    output["subtweakey"].mark(i)
+                output["after_addtk"].mark(i)
+                output["after_sr"].mark(self.inv_permutation[i])
         for i in range(16):
             if self.result["FilterZF"][r][i] == 1 and r <= self.RF - 2:
-                output["after_sr"] += "\FrameCell[filter]{{s{0}}}".format(self.inv_permutation[i])
+                output["after_sr"].frame(self.inv_permutation[i], "filter")
             if self.result["FilterXF"][r][i] == 1:
-                output["before_sb"] += "\FrameCell[filter]{{s{0}}}".format(i)
+                output["before_sb"].frame(i, "filter")
         return output
 
     def draw_ed(self, r):
@@ -315,67 +318,67 @@ class Draw():
         """
         
         output = dict()
-        output["before_sb"] = ""              
-        output["after_sb"] = ""
-        output["after_addtk"] = ""
-        output["after_sr"] = ""
-        output["subtweakey"] = ""
-        output["after_mix_columns"] = ""
+        output["before_sb"] = Cells()              
+        output["after_sb"] = Cells()
+        output["after_addtk"] = Cells()
+        output["after_sr"] = Cells()
+        output["subtweakey"] = Cells()
+        output["after_mix_columns"] = Cells()
         if r + self.RB < self.Ri:
             offset = 0
         else:
             offset = self.R0
         for i in range(16):
             if r != 0:
-                output["before_sb"] += "\TFill[{0}]{{s{1}}}".format(self.fillcolor[self.result["AXU"][r][i]], i)
-            output["after_sb"] += "\TFill[{0}]{{s{1}}}".format(self.fillcolor[self.result["AYU"][r][i]], i)
-            output["after_addtk"] += "\TFill[{0}]{{s{1}}}".format(self.fillcolor[self.result["AZU"][r][i]], i)                
-            output["after_sr"] += "\TFill[{0}]{{s{1}}}".format(self.fillcolor[self.result["AZU"][r][i]], self.inv_permutation[i])
-            output["after_mix_columns"] += "\TFill[{0}]{{s{1}}}".format(self.fillcolor[self.result["AXU"][r + 1][i]], i)
+                output["before_sb"].tfill(i, self.fillcolor[self.result["AXU"][r][i]])
+            output["after_sb"].tfill(i, self.fillcolor[self.result["AYU"][r][i]])
+            output["after_addtk"].tfill(i, self.fillcolor[self.result["AZU"][r][i]])
+            output["after_sr"].tfill(self.inv_permutation[i], self.fillcolor[self.result["AZU"][r][i]])
+            output["after_mix_columns"].tfill(i, self.fillcolor[self.result["AXU"][r + 1][i]])
             if i <= 7:
-                output["subtweakey"] += "\TFill[{0}]{{s{1}}}".format(self.fillcolor[self.result["ASTK"][offset + self.RB + r][i]], i)
+                output["subtweakey"].tfill(i, self.fillcolor[self.result["ASTK"][offset + self.RB + r][i]])
         for i in range(16):
             if r != 0:
-                output["before_sb"] += "\BFill[{0}]{{s{1}}}".format(self.fillcolor[self.result["AXL"][r][i]], i)
-            output["after_sb"] += "\BFill[{0}]{{s{1}}}".format(self.fillcolor[self.result["AYL"][r][i]], i)
-            output["after_addtk"] += "\BFill[{0}]{{s{1}}}".format(self.fillcolor[self.result["AZL"][r][i]], i)
-            output["after_sr"] += "\BFill[{0}]{{s{1}}}".format(self.fillcolor[self.result["AZL"][r][i]], self.inv_permutation[i])
-            output["after_mix_columns"] += "\BFill[{0}]{{s{1}}}".format(self.fillcolor[self.result["AXL"][r + 1][i]], i)
+                output["before_sb"].bfill(i, self.fillcolor[self.result["AXL"][r][i]])
+            output["after_sb"].bfill(i, self.fillcolor[self.result["AYL"][r][i]])
+            output["after_addtk"].bfill(i, self.fillcolor[self.result["AZL"][r][i]])
+            output["after_sr"].bfill(self.inv_permutation[i], self.fillcolor[self.result["AZL"][r][i]])
+            output["after_mix_columns"].bfill(i, self.fillcolor[self.result["AXL"][r + 1][i]])
             if i <= 7:
-                output["subtweakey"] += "\BFill[{0}]{{s{1}}}".format(self.fillcolor[self.result["ASTK"][offset + self.RB + r][i]], i)
+                output["subtweakey"].bfill(i, self.fillcolor[self.result["ASTK"][offset + self.RB + r][i]])
         if r == 0 and (self.RB + self.RF > 0):
             for i in range(16):
                 if self.result["AXB"][self.RB][i] == 1:
-                    output["before_sb"] += "\Fill[active]{{s{0}}}".format(i)
+                    output["before_sb"].fill(i, "active")
                 if self.result["KDXB"][self.RB][i] == 1:
-                    output["before_sb"] += "\PattCell[black]{{s{0}}}".format(i)
+                    output["before_sb"].pattern(i, "black")
                 if self.result["KXB"][self.RB][i] == 1:
-                    output["before_sb"] += "\MarkCellN{{s{0}}}".format(i)
+                    output["before_sb"].mark(i)
             for i in range(16):
                 if self.result["FilterXB"][self.RB][i] == 1:
-                    output["before_sb"] += "\FrameCell[filter]{{s{0}}}".format(i)
+                    output["before_sb"].frame(i, "filter")
             for i in range(8):
                 if self.result["CB"][i + 12] == 1:
-                    output["after_addtk"] += "\FrameCell[filter]{{s{0}}}".format(i)
+                    output["after_addtk"].frame(i, "filter")
         if r == 1 and (self.RB + self.RF > 0):
             for i in range(4):
                 if self.result["CB"][i] == 1:
-                    output["before_sb"] += "\FrameCell[filter]{{s{0}}}".format(i + 8)
+                    output["before_sb"].frame(i + 8, "filter")
                 if self.result["CB"][i + 4] == 1:
-                    output["before_sb"] += "\FrameCell[filter]{{s{0}}}".format(i + 12)
+                    output["before_sb"].frame(i + 12, "filter")
                 if self.result["CB"][i + 8] == 1:
-                    output["before_sb"] += "\FrameCell[filter]{{s{0}}}".format(i)
+                    output["before_sb"].frame(i, "filter")
         if r == (self.RD - 1) and (self.RB + self.RF > 0):
             for i in range(8):
                 if self.result["CF"][i] == 1:
-                    output["after_sb"] += "\FrameCell[filter]{{s{0}}}".format(i)
+                    output["after_sb"].frame(i, "filter")
             for i in range(4):
                 if self.result["CF"][i + 8] == 1:
-                    output["after_sr"] += "\FrameCell[filter]{{s{0}}}".format(i + 4)
+                    output["after_sr"].frame(i + 4, "filter")
                 if self.result["CF"][i + 12] == 1:
-                    output["after_sr"] += "\FrameCell[filter]{{s{0}}}".format(i + 8)
+                    output["after_sr"].frame(i + 8, "filter")
                 if self.result["CF"][i + 16] == 1:
-                    output["after_sr"] += "\FrameCell[filter]{{s{0}}}".format(i + 12)
+                    output["after_sr"].frame(i + 12, "filter")
              
         return output
 
@@ -402,26 +405,26 @@ class Draw():
             if r == 0:                
                 contents += trim(r"""
                 \SkinnyRoundEK[0]
-                            {""" + state["before_sb"] + r"""} % state (input)
-                            {""" + state["subtweakey"] + r"""} % etk[1] (xored AFTER mixcolumns)
+                            {""" + state["before_sb"].tikz() + r"""} % state (input)
+                            {""" + state["subtweakey"].tikz() + r"""} % etk[1] (xored AFTER mixcolumns)
                             {} % tk[2] (ignored)
                             {} % tk[3] (ignored)
-                            {""" + state["after_sb"] + r"""} % state (after subcells)
-                            {""" + state["after_sr"] + r"""} % state (after shiftrows)
-                            {""" + state["after_mix_columns"] + r"""} % state (after mixcolumns)
+                            {""" + state["after_sb"].tikz() + r"""} % state (after subcells)
+                            {""" + state["after_sr"].tikz() + r"""} % state (after shiftrows)
+                            {""" + state["after_mix_columns"].tikz() + r"""} % state (after mixcolumns)
                 """) + "\n\n"  
             else:
                 contents += trim(r"""
                 \SkinnyRoundTK[""" + str(r) + """]
-                            {""" + state["before_sb"] + r"""} % state (input)
-                            {""" + state["subtweakey"] + r"""} % tk[1]
+                            {""" + state["before_sb"].tikz() + r"""} % state (input)
+                            {""" + state["subtweakey"].tikz() + r"""} % tk[1]
                             {""" + r"""} % tk[2]
                             {""" + r"""} % tk[3]
-                            {""" + state["after_sb"] + """} % state (after subcells)
-                            {""" + state["after_addtk"] + r"""} % state (after addtweakey)
-                            {""" + state["after_sr"] + r"""} % state (after shiftrows)""") + "\n\n"
+                            {""" + state["after_sb"].tikz() + """} % state (after subcells)
+                            {""" + state["after_addtk"].tikz() + r"""} % state (after addtweakey)
+                            {""" + state["after_sr"].tikz() + r"""} % state (after shiftrows)""") + "\n\n"
             if r % 2 == 1:
-                contents += trim(r"""\SkinnyNewLine[""" + str(r + 1) + r"""]{""") + state["after_mix_columns"] + r"""} % state (after mixcols)""" + "\n"
+                contents += trim(r"""\SkinnyNewLine[""" + str(r + 1) + r"""]{""") + state["after_mix_columns"].tikz() + r"""} % state (after mixcols)""" + "\n"
 
         # draw ED
         for r in range(0, self.RD):
@@ -429,17 +432,17 @@ class Draw():
             state["subtweakey"] += self.gen_round_tweakey_labels(r + self.RB)
             contents += trim(r"""
             \SkinnyRoundTK[""" + str(r + self.RB) + """]
-                          {""" + state["before_sb"] + r"""} % state (input)
-                          {""" + state["subtweakey"] + r"""} % tk[1]
+                          {""" + state["before_sb"].tikz() + r"""} % state (input)
+                          {""" + state["subtweakey"].tikz() + r"""} % tk[1]
                           {""" + r"""} % tk[2]
                           {""" + r"""} % tk[3]
-                          {""" + state["after_sb"] + """} % state (after subcells)
-                          {""" + state["after_addtk"] + r"""} % state (after addtweakey)
-                          {""" + state["after_sr"] + r"""} % state (after shiftrows)""") + "\n\n"
+                          {""" + state["after_sb"].tikz() + """} % state (after subcells)
+                          {""" + state["after_addtk"].tikz() + r"""} % state (after addtweakey)
+                          {""" + state["after_sr"].tikz() + r"""} % state (after shiftrows)""") + "\n\n"
             if r == self.RD - 1 and self.RF == 0:
-                contents += trim(r"""\SkinnyFin[""" + str(r + self.RB + 1) + r"""]{""") + state["after_mix_columns"] + r"""} % state (after mixcols)""" + "\n"
+                contents += trim(r"""\SkinnyFin[""" + str(r + self.RB + 1) + r"""]{""") + state["after_mix_columns"].tikz() + r"""} % state (after mixcols)""" + "\n"
             elif (r + self.RB) % 2 == 1:
-                contents += trim(r"""\SkinnyNewLine[""" + str(r + self.RB + 1) + r"""]{""") + state["after_mix_columns"] + r"""} % state (after mixcols)""" + "\n"
+                contents += trim(r"""\SkinnyNewLine[""" + str(r + self.RB + 1) + r"""]{""") + state["after_mix_columns"].tikz() + r"""} % state (after mixcols)""" + "\n"
             
         # draw EF
         for r in range(self.RF):
@@ -447,17 +450,17 @@ class Draw():
             state["subtweakey"] += self.gen_round_tweakey_labels(r + self.RB + self.RD)
             contents += trim(r"""            
             \SkinnyRoundTK[""" + str(r + self.RB + self.RD) + """]
-                          {""" + state["before_sb"] + r"""} % state (input)
-                          {""" + state["subtweakey"] + r"""} % tk[1]
+                          {""" + state["before_sb"].tikz() + r"""} % state (input)
+                          {""" + state["subtweakey"].tikz() + r"""} % tk[1]
                           {""" + r"""} % tk[2]
                           {""" + r"""} % tk[3]
-                          {""" + state["after_sb"] + """} % state (after subcells)
-                          {""" + state["after_addtk"] + r"""} % state (after addtweakey)
-                          {""" + state["after_sr"] + r"""} % state (after shiftrows)""") + "\n\n"
+                          {""" + state["after_sb"].tikz() + """} % state (after subcells)
+                          {""" + state["after_addtk"].tikz() + r"""} % state (after addtweakey)
+                          {""" + state["after_sr"].tikz() + r"""} % state (after shiftrows)""") + "\n\n"
             if r == self.RF - 1:
-                contents += trim(r"""\SkinnyFin[""" + str(r + self.RB + self.RD + 1) + r"""]{""") + state["after_mix_columns"] + r"""} % state (after mixcols)""" + "\n"
+                contents += trim(r"""\SkinnyFin[""" + str(r + self.RB + self.RD + 1) + r"""]{""") + state["after_mix_columns"].tikz() + r"""} % state (after mixcols)""" + "\n"
             elif (r + self.RB + self.RD) % 2 == 1:
-                contents += trim(r"""\SkinnyNewLine[""" + str(r + self.RB + self.RD + 1) + r"""]{""") + state["after_mix_columns"] + r"""} % state (after mixcols)""" + "\n"
+                contents += trim(r"""\SkinnyNewLine[""" + str(r + self.RB + self.RD + 1) + r"""]{""") + state["after_mix_columns"].tikz() + r"""} % state (after mixcols)""" + "\n"
         if self.RB + self.RF > 0:
             contents += r"""\ZeroIDLegend""" + "\n"
         else:
@@ -481,3 +484,44 @@ class Draw():
         contents += trim(r"""\end{document}""")
         with open(self.output_file_name, "w") as output_file:
             output_file.write(contents)
+
+    def generate_attack_shape_svg(self):
+        """
+        Draw the figure of the attack into an SVG file, without LaTeX
+        """
+
+        if self.RB + self.RF > 0:
+            title = "ID attack on {} rounds of ForkSKINNY-TK{}".format(self.RT, self.variant)
+        else:
+            title = "ID distinguisher for {} rounds of ForkSKINNY-TK{}".format(self.RD, self.variant)
+        figure = SkinnySVG(title=title)
+        # draw EB
+        for r in range(self.RB):
+            state = self.draw_eb(r)
+            state["subtweakey"] += self.gen_round_tweakey_labels(r)
+            if r == 0:
+                figure.round_ek(0, state["before_sb"], state["subtweakey"], state["after_sb"], state["after_sr"], state["after_mix_columns"])
+            else:
+                figure.round_tk(r, state["before_sb"], state["subtweakey"], state["after_sb"], state["after_addtk"], state["after_sr"])
+            if r % 2 == 1:
+                figure.new_line(r + 1, state["after_mix_columns"])
+        # draw ED
+        for r in range(0, self.RD):
+            state = self.draw_ed(r)
+            state["subtweakey"] += self.gen_round_tweakey_labels(r + self.RB)
+            figure.round_tk(r + self.RB, state["before_sb"], state["subtweakey"], state["after_sb"], state["after_addtk"], state["after_sr"])
+            if r == self.RD - 1 and self.RF == 0:
+                figure.fin(r + self.RB + 1, state["after_mix_columns"])
+            elif (r + self.RB) % 2 == 1:
+                figure.new_line(r + self.RB + 1, state["after_mix_columns"])
+        # draw EF
+        for r in range(self.RF):
+            state = self.draw_ef(r)
+            state["subtweakey"] += self.gen_round_tweakey_labels(r + self.RB + self.RD)
+            figure.round_tk(r + self.RB + self.RD, state["before_sb"], state["subtweakey"], state["after_sb"], state["after_addtk"], state["after_sr"])
+            if r == self.RF - 1:
+                figure.fin(r + self.RB + self.RD + 1, state["after_mix_columns"])
+            elif (r + self.RB + self.RD) % 2 == 1:
+                figure.new_line(r + self.RB + self.RD + 1, state["after_mix_columns"])
+        figure.legend("ZeroIDLegend" if self.RB + self.RF > 0 else "ZeroIDDistinguisherLegend")
+        figure.save(self.output_file_name)
@@ -29,8 +29,17 @@ email: hsn.hadipour@gmail.com
 
 from argparse import ArgumentParser, RawTextHelpFormatter
 import time
-from gurobipy import read
-from gurobipy import GRB
+import sys
+from pathlib import Path
+try:
+    from gurobipy import read
+    from gurobipy import GRB
+    gurobi_available = True
+except ImportError:
+    gurobi_available = False
+# the modules shared by the tools of several ciphers are in the folder shared of the repository
+sys.path.append(str(Path(__file__).resolve().parents[2] / "shared"))
+from modelcounter import lp_to_cnf, ModelCounter
 import uuid
 import os
 
@@ -98,6 +107,10 @@ class SKINNYTKSCH:
         self.total_no_of_rounds = self.RT + self.R0
         self.time_limit = param['timelimit']
         self.fixed_variables = param['fixedVariables']        
+        # counting backend: 'gurobi' (solution pool) or 'cnf' (built-in model counter, see modelcounter.py)
+        self.counter = param.get('counter')
+        if self.counter is None:
+            self.counter = 'gurobi' if gurobi_available else 'cnf'
         self.used_variables = [] # All of the variables used in the MILP model are stored in this list
         self.tk_permutation = [0x9, 0xf, 0x8, 0xd, 0xa, 0xe, 0xc, 0xb, 0x0, 0x1, 0x2, 0x3, 0x4, 0x5, 0x6, 0x7]
         self.model_filename = str(uuid.uuid4()) + '.lp'     
@@ -407,18 +420,26 @@ class SKINNYTKSCH:
         #         lp_contents += " + ".join([tk4[0][cell][bit_number] for bit_number in range(self.cell_size)]) + " >= 1\n"
         return lp_contents
 
-    def make_model(self):
+    def generate_model(self):
         '''
-        Generate the MILP model for tweakey schedule of SKINNY and ForkSKINNY
+        Generate the content of the MILP model (LP format) for tweakey schedule of SKINNY and ForkSKINNY
         '''
-        
+
         lp_contents = ""
-        print('Generating the MILP model ...')
         lp_contents += "\nsubject to\n"        
         lp_contents += self.tweakey_schedule()
         lp_contents += self.exclude_zero_solutions()
         lp_contents += self.declare_fixed_variables()
         lp_contents += self.declare_variables_type() 
+        return lp_contents
+
+    def make_model(self):
+        '''
+        Generate the MILP model for tweakey schedule of SKINNY and ForkSKINNY
+        '''
+        
+        print('Generating the MILP model ...')
+        lp_contents = self.generate_model()
         if os.path.exists(self.model_filename):
             os.remove(self.model_filename)
         with open(self.model_filename, 'w') as fileobj:
@@ -446,6 +467,9 @@ class SKINNYTKSCH:
         INFEASIBLE	3	Model was proven to be infeasible.
         '''
         
+        if self.counter == 'cnf':
+            return self.count_no_of_solutions_cnf()
+        assert gurobi_available, "gurobipy is not installed, use the counter 'cnf' instead"
         self.make_model()        
         self.model = read(self.model_filename)
         if self.time_limit != -1:
@@ -467,6 +491,30 @@ class SKINNYTKSCH:
             print('Unknown Error!')
         os.remove(self.model_filename)
         return num_of_solutions
+
+    def count_no_of_solutions_cnf(self):
+        '''
+        Compute the number of solutions exactly without Gurobi
+
+        Each constraint of the MILP model is translated into CNF and the clauses are counted by a DPLL-style
+        model counter with component decomposition and component caching (see modelcounter.py).
+        There is no time limit, and the count is not bounded by the size of a solution pool.
+        '''
+
+        print('Generating the CNF model ...')
+        clauses, num_of_variables, _ = lp_to_cnf(self.generate_model())
+        print(f"CNF with {num_of_variables} variables and {len(clauses)} clauses\n")
+        time_start = time.time()
+        counter = ModelCounter()
+        num_of_solutions = counter.count(clauses, num_of_variables)
+        time_end = time.time()
+        print('Elapsed time: {:.2f} seconds'.format(time_end - time_start))
+        print('Number of decisions: {}'.format(counter.decisions))
+        if num_of_solutions != 0:
+            print('Number of solutions: {}'.format(num_of_solutions))
+        else:
+            print('The model is infeasible!')
+        return num_of_solutions
     
 
 
@@ -486,6 +534,7 @@ def loadparameters(args):
             "R0" : 4,
             "nonzero_tweakey_cells": dict(),
             "timelimit" : -1,
+            "counter" : None,
             "fixedVariables" : {}}
 
     # Check if there is an input file specified
@@ -519,6 +568,8 @@ def loadparameters(args):
         params["nonzero_tweakey_cells"] = args.nonzero_tweakey_cells
     if args.tl is not None:
         params["time_limit"] = args.tl
+    if args.counter is not None:
+        params["counter"] = args.counter
     return params
 
 def main():
@@ -543,6 +594,9 @@ def main():
     parser.add_argument("-R0", default=0, type=int, help="Number of rounds in C0-branch")    
     parser.add_argument("-nonzero_tweakey_cells", default={}, type=dict, help="The cells of the tweakey that are not zero\n")
     parser.add_argument("-tl", default=4000, type=int, help="set a time limit for the solver in seconds\n")     
+    parser.add_argument("-counter", default=None, type=str, choices=["gurobi", "cnf"],
+                        help="counting backend: Gurobi's solution pool or the built-in CNF model counter\n"
+                             "(by default Gurobi if gurobipy is installed)\n")
 
     # Parse command line arguments and construct parameter list
     args = parser.parse_args()
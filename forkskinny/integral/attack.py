@@ -31,10 +31,26 @@ import itertools
 import time
 import minizinc
 import datetime
+import asyncio
+from functools import lru_cache
+from dataclasses import dataclass, field
 from argparse import ArgumentParser, RawTextHelpFormatter
 from pathlib import Path
 from drawattack import *
 line_separator = "#"*55
+tweakey_permutation = (9, 15, 8, 13, 10, 14, 12, 11, 0, 1, 2, 3, 4, 5, 6, 7)
+
+@lru_cache(maxsize=None)
+def permutation_at_rounds(permutation, number_of_rounds):
+    """
+    Return the table whose row r is the r-th power of the given tweakey permutation, for r = 0, ..., number_of_rounds - 1
+    """
+
+    table = [tuple(range(16))]
+    for _ in range(1, number_of_rounds):
+        table.append(tuple(permutation[cell] for cell in table[-1]))
+    return tuple(table)
+
 # Check if "OR Tools" appears in the output of "minizinc --solvers" command 
 import subprocess
 try:
@@ -48,13 +64,26 @@ try:
 except FileNotFoundError:
     ortools_available = False
 
-class IntegralAttack:
-    Integral_counter = 0
+@dataclass
+class SearchResult:
+    """
+    Result of a search, without printing or drawing: the solver status, the elapsed time, the summary printed
+    by search(), the quantities of the attack and the MiniZinc result
+    """
 
+    status: minizinc.Status
+    elapsed_time: float
+    summary: str = ""
+    values: dict = field(default_factory=dict)
+    solution: minizinc.Result = None
+
+    @property
+    def has_solution(self):
+        return self.status.has_solution()
+
+class IntegralAttack:
     def __init__(self, params) -> None:
-        IntegralAttack.Integral_counter += 1
-        self.id = IntegralAttack.Integral_counter
-        self.name = "IntegralAttack" + str(self.id)
+        self.name = "IntegralAttack_v{}_RB{}_RD{}_RF{}_Ri{}_R0{}".format(params["variant"], params["RB"], params["RD"], params["RF"], params["Ri"], params["R0"])
         self.type = "IntegralAttack"
 
         self.variant = params["variant"]
@@ -73,6 +102,7 @@ class IntegralAttack:
         assert(self.cp_solver_name in self.supported_cp_solvers)       
         self.cp_solver = minizinc.Solver.lookup(self.cp_solver_name)
         self.mzn_file_name = "attack.mzn"
+        self.tkpermutation_at_round = permutation_at_rounds(tweakey_permutation, self.RT + self.R0)
 
         # SKINNY-n-n   (n-bit tweakey): 1
         # SKINNY-n-2n (2n-bit tweakey): 2
@@ -89,9 +119,9 @@ class IntegralAttack:
         else:
             raise Exception("Invalid variant")
     
-    def search(self):
+    async def solve_async(self, debug_output=None):
         """
-        Search for an integral distinguisher optimized for key recovery
+        Search for the attack and return it as a SearchResult, without printing or drawing it
         """
 
         if self.time_limit != -1:
@@ -100,57 +130,83 @@ class IntegralAttack:
             time_limit = None
     
         start_time = time.time()
-        ####################################################################################################
-        ####################################################################################################
-        self.cp_model = minizinc.Model()
-        self.cp_model.add_file(self.mzn_file_name)
-        self.cp_inst = minizinc.Instance(solver=self.cp_solver, model=self.cp_model)
-        self.cp_inst["RB"] = self.RB
-        self.cp_inst["RD"] = self.RD
-        self.cp_inst["RF"] = self.RF        
-        self.cp_inst["Ri"] = self.Ri
-        self.cp_inst["R0"] = self.R0
-        self.cp_inst["skip_first_sbox_layer"] = self.skip_first_sbox_layer
-        self.cp_inst["variant"] = self.variant
-        self.cp_inst["NPT"] = self.NPT
-        self.result = self.cp_inst.solve(timeout=time_limit, 
-                                         processes=self.num_of_threads, 
-                                         #verbose=True, 
-                                         debug_output=Path("./debug_output.txt", intermediate_solutions=True),                                         
-                                         optimisation_level=2)
-        ####################################################################################################
-        ####################################################################################################
-        elapsed_time = time.time() - start_time
-        print("Elapsed time: {:0.02f} seconds".format(elapsed_time))
-
-
-        if self.result.status == minizinc.Status.OPTIMAL_SOLUTION or self.result.status == minizinc.Status.SATISFIED or \
-                            self.result.status == minizinc.Status.ALL_SOLUTIONS:
-            attack_summary = self.print_attack_parameters()
-            attack_summary += line_separator + "\n"
-            print(attack_summary)
-            draw = Draw(self, output_file_name=self.output_file_name, attack_summary=attack_summary)         
-            draw.generate_attack_shape()  
-        elif self.result.status == minizinc.Status.UNSATISFIABLE:
+        cp_model = minizinc.Model()
+        cp_model.add_file(self.mzn_file_name)
+        cp_inst = minizinc.Instance(solver=self.cp_solver, model=cp_model)
+        cp_inst["RB"] = self.RB
+        cp_inst["RD"] = self.RD
+        cp_inst["RF"] = self.RF
+        cp_inst["Ri"] = self.Ri
+        cp_inst["R0"] = self.R0
+        cp_inst["skip_first_sbox_layer"] = self.skip_first_sbox_layer
+        cp_inst["variant"] = self.variant
+        cp_inst["NPT"] = self.NPT
+        cp_inst["tkpermutation_at_round"] = self.tkpermutation_at_round
+        result = await cp_inst.solve_async(timeout=time_limit, 
+                                           processes=self.num_of_threads, 
+                                           debug_output=debug_output, 
+                                           optimisation_level=2)
+        search_result = SearchResult(status=result.status, elapsed_time=time.time() - start_time, solution=result)
+        if search_result.has_solution:
+            search_result.summary = self.print_attack_parameters(result) + line_separator + "\n"
+            search_result.values["lazy_tweak_cells"] = [i for i in range(16) if result["contradict"][i] == 1]
+            search_result.values["balanced_positions"] = [k for k in range(16) if not all(x == 0 for x in result["AXF"][k][0])]
+            search_result.values["max_key_entropy_sum"] = result["max_key_entropy_sum"]
+        return search_result
+
+    def solve(self, debug_output=None):
+        """
+        Blocking variant of solve_async
+        """
+
+        return asyncio.run(self.solve_async(debug_output))
+
+    def draw(self, search_result, output_file_name=None):
+        """
+        Write the shape of the attack of a SearchResult into a Tikz file, or into an SVG file if its name ends with .svg
+        """
+
+        draw = Draw(self, output_file_name=self.output_file_name if output_file_name is None else output_file_name, 
+                    attack_summary=search_result.summary, result=search_result.solution)
+        if draw.output_file_name.endswith(".svg"):
+            draw.generate_attack_shape_svg()
+        else:
+            draw.generate_attack_shape()
+
+    def search(self):
+        """
+        Search for the attack, print its parameters and draw its shape
+        """
+
+        search_result = self.solve(debug_output=Path("./debug_output.txt"))
+        self.result = search_result.solution
+        print("Elapsed time: {:0.02f} seconds".format(search_result.elapsed_time))
+        print(f"Solver status: {search_result.status}")
+        if search_result.has_solution:
+            print(search_result.summary)
+            self.draw(search_result)
+        elif search_result.status == minizinc.Status.UNSATISFIABLE:
             print("Model is unsatisfiable")
         else:
             print("Solving process was interrupted")
-        
-    def print_attack_parameters(self):
+
+    def print_attack_parameters(self, result=None):
         """
         Print attack parameters
-        """                   
+        """
 
+        if result is None:
+            result = self.result
         str_output = line_separator + "\n"
         str_output += "Distinguisher parameters:\n"
         str_output += "Length of distinguisher: {:02d}\n".format(self.RD)
         str_output += "Variant:                 {:02d}\n".format(self.variant)
         str_output += "Ri:                   {0:2d}\n".format(self.Ri)
         str_output += "R0:                    {0:2d}\n".format(self.R0)
-        lazy_tweak_cells_numeric = [i for i in range(16) if self.result["contradict"][i] == 1]
+        lazy_tweak_cells_numeric = [i for i in range(16) if result["contradict"][i] == 1]
         lazy_tweak_cells = ["TK[{:02d}] ".format(i) for i in lazy_tweak_cells_numeric]
         str_output += "Tweakey cells that are active at most {:02d} times:\n".format(self.NPT) + ", ".join(lazy_tweak_cells) + "\n"
-        str_output += "Max number of involved tweakey cells in key recovery: {:02d}".format(self.result["max_key_entropy_sum"]) + "\n"
+        str_output += "Max number of involved tweakey cells in key recovery: {:02d}".format(result["max_key_entropy_sum"]) + "\n"
         str_output += line_separator + "\n"
         return str_output
     
@@ -159,20 +215,20 @@ class IntegralAttack:
         Paint Eb
         """
 
-        before_sb = ""
-        after_sb = ""
-        after_addtk = ""
-        after_sr = ""
-        subtweakey = ""
+        before_sb = Cells()
+        after_sb = Cells()
+        after_addtk = Cells()
+        after_sr = Cells()
+        subtweakey = Cells()
                             
         for i, j in itertools.product(range(0, 4), range(0, 4)):
             if state[i][j] == 1:
-                before_sb += "\Fill[active]{{ss{0}{1}}}".format(i, j)
-                after_sr += "\Fill[active]{{ss{0}{1}}}".format(i, (j + i)%4)
+                before_sb.fill((i, j), "active")
+                after_sr.fill((i, (j + i)%4), "active")
                 if i <= 1:
-                    subtweakey += "\Fill[active]{{ss{0}{1}}}".format(i, j)
+                    subtweakey.fill((i, j), "active")
                     if permutation_r[4*i + j] in self.lazy_tweak_cells_numeric:
-                        subtweakey += "\Fill[lazy, opacity=0.70]{{ss{0}{1}}}".format(i, j)
+                        subtweakey.fill((i, j), "lazy, opacity=0.70")
         after_sb = before_sb
         after_addtk = after_sb
         return before_sb, after_sb, after_addtk, after_sr, subtweakey
@@ -182,38 +238,38 @@ class IntegralAttack:
         Paint Ef
         """
 
-        before_sb = ""
-        after_sb = ""
-        after_addtk = ""
-        after_sr = ""
-        subtweakey = ""
+        before_sb = Cells()
+        after_sb = Cells()
+        after_addtk = Cells()
+        after_sr = Cells()
+        subtweakey = Cells()
         
         if len(state) == 2:
             for i, j in itertools.product(range(0, 4), range(0, 4)):
                 if state[0][i][j] == 1:
-                    before_sb += "\TFill{{ss{0}{1}}}".format(i, j)
-                    after_sr += "\TFill{{ss{0}{1}}}".format(i, (j + i)%4)
+                    before_sb.tfill((i, j))
+                    after_sr.tfill((i, (j + i)%4))
                     if i <= 1:
-                        subtweakey += "\TFill{{ss{0}{1}}}".format(i, j)
+                        subtweakey.tfill((i, j))
                         if permutation_r[4*i + j] in self.lazy_tweak_cells_numeric:
-                            subtweakey += "\Fill[lazy, opacity=0.70]{{ss{0}{1}}}".format(i, j)                        
+                            subtweakey.fill((i, j), "lazy, opacity=0.70")
             for i, j in itertools.product(range(0, 4), range(0, 4)):
                 if state[1][i][j] == 1:
-                    before_sb += "\BFill{{ss{0}{1}}}".format(i, j)
-                    after_sr += "\BFill{{ss{0}{1}}}".format(i, (j + i)%4)
+                    before_sb.bfill((i, j))
+                    after_sr.bfill((i, (j + i)%4))
                     if i <= 1:
-                        subtweakey += "\BFill{{ss{0}{1}}}".format(i, j)
+                        subtweakey.bfill((i, j))
                         if permutation_r[4*i + j] in self.lazy_tweak_cells_numeric:
-                            subtweakey += "\Fill[lazy, opacity=0.70]{{ss{0}{1}}}".format(i, j)
+                            subtweakey.fill((i, j), "lazy, opacity=0.70")
         else:
             for i, j in itertools.product(range(0, 4), range(0, 4)):
                 if state[0][i][j] == 1:
-                    before_sb += "\Fill[blue!55]{{ss{0}{1}}}".format(i, j)
-                    after_sr += "\Fill[blue!55]{{ss{0}{1}}}".format(i, (j + i)%4)
+                    before_sb.fill((i, j), "blue!55")
+                    after_sr.fill((i, (j + i)%4), "blue!55")
                     if i <= 1:
-                        subtweakey += "\Fill[blue!55]{{ss{0}{1}}}".format(i, j)
+                        subtweakey.fill((i, j), "blue!55")
                         if permutation_r[4*i + j] in self.lazy_tweak_cells_numeric:
-                            subtweakey += "\Fill[lazy, opacity=0.70]{{ss{0}{1}}}".format(i, j)
+                            subtweakey.fill((i, j), "lazy, opacity=0.70")
                         
         after_sb = before_sb
         after_addtk = after_sb
@@ -225,9 +281,9 @@ class IntegralAttack:
         Generate the text content of subtweakey
         """
         
-        text = ""
+        text = Cells()
         for i, j in itertools.product(range(2), range(4)):
-            text += "\Cell{{ss{0}{1}}}{{\\texttt{{{2}}}}}".format(i, j, hex(permutation_r[4*i + j])[2:])
+            text.text((i, j), hex(permutation_r[4*i + j])[2:])
         return text
 
     @staticmethod
@@ -236,31 +292,31 @@ class IntegralAttack:
         Paint E1
         """
 
-        before_sb = ""
-        after_sb = ""
-        after_addtk = ""
-        after_sr = ""
-        subtweakey = ""
+        before_sb = Cells()
+        after_sb = Cells()
+        after_addtk = Cells()
+        after_sr = Cells()
+        subtweakey = Cells()
 
         for i in range(4):
             for j in range(4):
                 ######## paint before sb ########
                 if state_before_sb[i][j] == 1:
-                    before_sb += "\Fill[nonzerofixed]{{ss{0}{1}}}".format(i, j)
+                    before_sb.fill((i, j), "nonzerofixed")
                 elif state_before_sb[i][j] == 2:
-                    before_sb += "\Fill[nonzeroany]{{ss{0}{1}}}".format(i, j)
+                    before_sb.fill((i, j), "nonzeroany")
                 elif state_before_sb[i][j] == 3:
-                    before_sb += "\Fill[unknown]{{ss{0}{1}}}".format(i, j)
+                    before_sb.fill((i, j), "unknown")
                 ######## paint after sb ########
                 if state_after_sb[i][j] == 1:
-                    after_sb += "\Fill[nonzerofixed]{{ss{0}{1}}}".format(i, j)
-                    after_sr += "\Fill[nonzerofixed]{{ss{0}{1}}}".format(i, (j + i)%4)
+                    after_sb.fill((i, j), "nonzerofixed")
+                    after_sr.fill((i, (j + i)%4), "nonzerofixed")
                 elif state_after_sb[i][j] == 2:
-                    after_sb += "\Fill[nonzeroany]{{ss{0}{1}}}".format(i, j)
-                    after_sr += "\Fill[nonzeroany]{{ss{0}{1}}}".format(i, (j + i)%4)
+                    after_sb.fill((i, j), "nonzeroany")
+                    after_sr.fill((i, (j + i)%4), "nonzeroany")
                 elif state_after_sb[i][j] == 3:
-                    after_sb += "\Fill[unknown]{{ss{0}{1}}}".format(i, j)
-                    after_sr += "\Fill[unknown]{{ss{0}{1}}}".format(i, (j + i)%4)
+                    after_sb.fill((i, j), "unknown")
+                    after_sr.fill((i, (j + i)%4), "unknown")
             if i <= 1:
                 subtweakey += after_sb   
         after_addtk = after_sb
@@ -282,6 +338,10 @@ class IntegralAttack:
 
                     \newcommand{\TFill}[2][blue!55]{\fill[#1] (#2) ++(-.5,.5) -- +(0,-1) -- +(1,0) -- cycle;}
                     \newcommand{\BFill}[2][green!60]{\fill[#1] (#2) ++(.5,-.5) -- +(0,1) -- +(-1,0) -- cycle;}
+                    % one path for a list of cells, see Cells.tikz in shared/drawsvg.py
+                    \newcommand{\Fills}[2][fillopts]{\fill[#1] \foreach \cellname in {#2} {(\cellname) ++(-.5,.5) rectangle +(1,-1)};}
+                    \newcommand{\TFills}[2][blue!55]{\fill[#1] \foreach \cellname in {#2} {(\cellname) ++(-.5,.5) -- +(0,-1) -- +(1,0) -- cycle};}
+                    \newcommand{\BFills}[2][green!60]{\fill[#1] \foreach \cellname in {#2} {(\cellname) ++(.5,-.5) -- +(0,1) -- +(-1,0) -- cycle};}
 
                     \begin{document}
 
@@ -307,15 +367,15 @@ class IntegralAttack:
             after_mixcol, _, _, _, _ = self.paint_eb(next_state, subtweak_state)
             contents += trim(r"""
             \SkinnyRoundTK[""" + str(r) + r"""]
-                          {""" + before_sb + r"""} % state (input)
-                          {""" + subtweakey + r"""} % tk[1]
+                          {""" + before_sb.tikz() + r"""} % state (input)
+                          {""" + subtweakey.tikz() + r"""} % tk[1]
                           {""" + r"""} % tk[2]
                           {""" + r"""} % tk[3]
-                          {""" + after_sb + """} % state (after subcells)
-                          {""" + after_addtk + r"""} % state (after addtweakey)
-                          {""" + after_sr + r"""} % state (after shiftrows)""") + "\n\n"
+                          {""" + after_sb.tikz() + """} % state (after subcells)
+                          {""" + after_addtk.tikz() + r"""} % state (after addtweakey)
+                          {""" + after_sr.tikz() + r"""} % state (after shiftrows)""") + "\n\n"
             if r % 2 == 1:
-                contents += r"""\SkinnyNewLine[""" + str(r + 1) + r"""]{""" + after_mixcol + r"""} % state (after mixcols)""" + "\n"                
+                contents += r"""\SkinnyNewLine[""" + str(r + 1) + r"""]{""" + after_mixcol.tikz() + r"""} % state (after mixcols)""" + "\n"                
         # draw E1
         for r in range(self.RU):
             state_before_sb = self.result["forward_mask_x"][r]
@@ -331,17 +391,17 @@ class IntegralAttack:
             after_mixcol, _, _, _, _ = self.paint_e1_e2(next_state_before_sb, next_state_after_sb)
             contents += trim(r"""
             \SkinnyRoundTK[""" + str(self.RB + r) + r"""]
-                          {""" + before_sb + r"""} % state (input)
-                          {""" + subtweakey + r"""} % tk[1]
+                          {""" + before_sb.tikz() + r"""} % state (input)
+                          {""" + subtweakey.tikz() + r"""} % tk[1]
                           {""" + r"""} % tk[2]
                           {""" + r"""} % tk[3]
-                          {""" + after_sb + """} % state (after subcells)
-                          {""" + after_addtk + r"""} % state (after addtweakey)
-                          {""" + after_sr + r"""} % state (after shiftrows)""") + "\n\n"
+                          {""" + after_sb.tikz() + """} % state (after subcells)
+                          {""" + after_addtk.tikz() + r"""} % state (after addtweakey)
+                          {""" + after_sr.tikz() + r"""} % state (after shiftrows)""") + "\n\n"
             if r == self.RU - 1:
-                contents += r"""\SkinnyFin[""" + str(self.RB + r + 1) + r"""]{""" + after_mixcol + r"""} % state (after mixcols)""" + "\n\n"                
+                contents += r"""\SkinnyFin[""" + str(self.RB + r + 1) + r"""]{""" + after_mixcol.tikz() + r"""} % state (after mixcols)""" + "\n\n"                
             elif (r + self.RB) % 2 == 1:
-                contents += trim(r"""\SkinnyNewLine[""" + str(self.RB + r + 1) + r"""]{""") + after_mixcol + r"""} % state (after mixcols)""" + "\n"                
+                contents += trim(r"""\SkinnyNewLine[""" + str(self.RB + r + 1) + r"""]{""") + after_mixcol.tikz() + r"""} % state (after mixcols)""" + "\n"                
         
         contents += r"""\end{tikzpicture}""" + "\n" + r"""\bigskip""" + "\n\n" + r"""\begin{tikzpicture}""" + "\n\n"
         contents += r"""\SkinnyInit{}{}{}{}""" + "\n\n"
@@ -360,18 +420,18 @@ class IntegralAttack:
             after_mixcol, _, _, _, _ = self.paint_e1_e2(next_state_before_sb, next_state_after_sb)
             contents += trim(r"""
             \SkinnyRoundTK[""" + str(self.RB + self.RU + r) + r"""]
-                          {""" + before_sb + r"""} % state (input)
-                          {""" + subtweakey + r"""} % tk[1]
+                          {""" + before_sb.tikz() + r"""} % state (input)
+                          {""" + subtweakey.tikz() + r"""} % tk[1]
                           {""" + r"""} % tk[2]
                           {""" + r"""} % tk[3]
-                          {""" + after_sb + """} % state (after subcells)
-                          {""" + after_addtk + r"""} % state (after addtweakey)
-                          {""" + after_sr + r"""} % state (after shiftrows)""") + "\n\n"
+                          {""" + after_sb.tikz() + """} % state (after subcells)
+                          {""" + after_addtk.tikz() + r"""} % state (after addtweakey)
+                          {""" + after_sr.tikz() + r"""} % state (after shiftrows)""") + "\n\n"
             if (r + self.RB + self.RU) % 2 == 1:                
                 if r == self.RL - 1 and self.RB + self.RF == 0:
-                        contents += trim(r"""\SkinnyFin[""" + str(self.RB + self.RU + r + 1) + r"""]{""") + after_mixcol + r"""} % state (after mixcols)""" + "\n\n"
+                        contents += trim(r"""\SkinnyFin[""" + str(self.RB + self.RU + r + 1) + r"""]{""") + after_mixcol.tikz() + r"""} % state (after mixcols)""" + "\n\n"
                 else:
-                    contents += trim(r"""\SkinnyNewLine[""" + str(self.RB + self.RU + r + 1) + r"""]{""") + after_mixcol + r"""} % state (after mixcols)""" + "\n"                
+                    contents += trim(r"""\SkinnyNewLine[""" + str(self.RB + self.RU + r + 1) + r"""]{""") + after_mixcol.tikz() + r"""} % state (after mixcols)""" + "\n"                
         # draw Ef
         # detect the balanced positions
         # check if all elements of a two dimensional array are zero
@@ -389,20 +449,20 @@ class IntegralAttack:
             after_mixcol, _, _, _, _ = self.paint_ef(next_state, subtweak_state)
             contents += trim(r"""
             \SkinnyRoundTK[""" + str(self.RB + self.RU + self.RL + r) + r"""]
-                          {""" + before_sb + r"""} % state (input)
-                          {""" + subtweakey + r"""} % tk[1]
+                          {""" + before_sb.tikz() + r"""} % state (input)
+                          {""" + subtweakey.tikz() + r"""} % tk[1]
                           {""" + r"""} % tk[2]
                           {""" + r"""} % tk[3]
-                          {""" + after_sb + """} % state (after subcells)
-                          {""" + after_addtk + r"""} % state (after addtweakey)
-                          {""" + after_sr + r"""} % state (after shiftrows)""") + "\n\n"
+                          {""" + after_sb.tikz() + """} % state (after subcells)
+                          {""" + after_addtk.tikz() + r"""} % state (after addtweakey)
+                          {""" + after_sr.tikz() + r"""} % state (after shiftrows)""") + "\n\n"
             if (r + self.RB + self.RU + self.RL) % 2 == 1:                
                 if r != self.RF - 1:
-                    contents += r"""\SkinnyNewLine["""+ str(self.RB + self.RU + self.RL + r + 1) + r"""]{""" + after_mixcol + r"""} % state (after mixcols)""" + "\n"
+                    contents += r"""\SkinnyNewLine["""+ str(self.RB + self.RU + self.RL + r + 1) + r"""]{""" + after_mixcol.tikz() + r"""} % state (after mixcols)""" + "\n"
                 else:
-                    contents += r"""\SkinnyFin["""+ str(self.RB + self.RU + self.RL + r + 1) + r"""]{""" + after_mixcol + r"""} % state (after mixcols)""" + "\n\n"
+                    contents += r"""\SkinnyFin["""+ str(self.RB + self.RU + self.RL + r + 1) + r"""]{""" + after_mixcol.tikz() + r"""} % state (after mixcols)""" + "\n\n"
             else:
-              contents += trim(r"""\SkinnyFin[""" + str(self.RB + self.RU + self.RL + r + 1) + r"""]{""") + after_mixcol + r"""} % state (after mixcols)""" + "\n\n"         
+              contents += trim(r"""\SkinnyFin[""" + str(self.RB + self.RU + self.RL + r + 1) + r"""]{""") + after_mixcol.tikz() + r"""} % state (after mixcols)""" + "\n\n"         
         # end lines
         contents += r"""\end{tikzpicture}""" + "\n"
         contents += r"""%\caption{IntegralAttack/Integral attack on """ +  str(self.num_of_attacked_rounds) +\
@@ -487,7 +547,7 @@ def main():
                         help="Choose a CP solver") 
     parser.add_argument("-p", "--processes", default=8, type=int, help="number of threads for solvers supporting multi-threading\n")
     parser.add_argument("-tl", "--timelimit", default=3600, type=int, help="set a time limit for the solver in seconds\n")
-    parser.add_argument("-o", "--outputfile", default="output.tex", type=str, help="output file including the Tikz code to generate the figure of the attack\n")
+    parser.add_argument("-o", "--outputfile", default="output.tex", type=str, help="output file including the Tikz code to generate the figure of the attack (an SVG image if it ends with .svg)\n")
     
     # Parse command line arguments and construct parameter list
     args = parser.parse_args()
@@ -28,22 +28,53 @@ email: hsn.hadipour@gmail.com
 """
 
 import time
+import json
 import minizinc
 import datetime
+import asyncio
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from functools import lru_cache
+from dataclasses import dataclass, field
 from argparse import ArgumentParser, RawTextHelpFormatter
 from drawdistinguisher import *
 from pathlib import Path
 line_separator = "#"*55
+tweakey_permutation = (9, 15, 8, 13, 10, 14, 12, 11, 0, 1, 2, 3, 4, 5, 6, 7)
 
-class IntegralDistinguisher:
-    ID_counter = 0
+@lru_cache(maxsize=None)
+def permutation_at_rounds(permutation, number_of_rounds):
+    """
+    Return the table whose row r is the r-th power of the given tweakey permutation, for r = 0, ..., number_of_rounds - 1
+    """
+
+    table = [tuple(range(16))]
+    for _ in range(1, number_of_rounds):
+        table.append(tuple(permutation[cell] for cell in table[-1]))
+    return tuple(table)
+
+@dataclass
+class SearchResult:
+    """
+    Result of a search, without printing or drawing: the solver status, the elapsed time, the summary printed
+    by search(), the quantities of the distinguisher and the MiniZinc result
+    """
+
+    status: minizinc.Status
+    elapsed_time: float
+    summary: str = ""
+    values: dict = field(default_factory=dict)
+    solution: minizinc.Result = None
 
+    @property
+    def has_solution(self):
+        return self.status.has_solution()
+
+class IntegralDistinguisher:
     def __init__(self, params) -> None:
-        IntegralDistinguisher.ID_counter += 1
-        self.id = IntegralDistinguisher.ID_counter
-        self.name = "IntegralDistinguisher" + str(self.id)
+        self.name = "IntegralDistinguisher_v{}_RD{}_Ri{}_R0{}".format(params["variant"], params["RD"], params["Ri"], params["R0"])
         self.type = "IntegralDistinguisher"
 
+        self.params = params
         self.variant = params["variant"]
         self.RD = params["RD"]
         self.Ri = params["Ri"]
@@ -57,6 +88,7 @@ class IntegralDistinguisher:
         assert(self.cp_solver_name in self.supported_cp_solvers)      
         self.cp_solver = minizinc.Solver.lookup(self.cp_solver_name)
         self.mzn_file_name = "distinguisher.mzn"              
+        self.tkpermutation_at_round = permutation_at_rounds(tweakey_permutation, self.RD + self.R0)
 
         # SKINNY-n-n   (n-bit tweakey): 1
         # SKINNY-n-2n (2n-bit tweakey): 2
@@ -115,9 +147,32 @@ class IntegralDistinguisher:
     #  ___) || (_) || | \ V /|  __/ | |_ | | | ||  __/ | |  | || (_) || (_| ||  __/| |
     # |____/  \___/ |_|  \_/  \___|  \__||_| |_| \___| |_|  |_| \___/  \__,_| \___||_|
         
-    def search(self):
+    def create_instance(self, constraints=[]):
+        """
+        Create the CP instance of the search, with additional constraints given as MiniZinc strings
+        """
+
+        cp_model = minizinc.Model()
+        cp_model.add_file(self.mzn_file_name)
+        for constraint in constraints:
+            cp_model.add_string(constraint)
+        cp_inst = minizinc.Instance(solver=self.cp_solver, model=cp_model)
+        cp_inst["RD"] = self.RD
+        cp_inst["Ri"] = self.Ri
+        cp_inst["R0"] = self.R0
+        cp_inst["skip_first_sbox_layer"] = self.skip_first_sbox_layer
+        cp_inst["variant"] = self.variant
+        cp_inst["NPT"] = self.NPT
+        cp_inst["tkpermutation_at_round"] = self.tkpermutation_at_round
+        return cp_inst
+
+    #############################################################################################################################################
+    #############################################################################################################################################
+    #############################################################################################################################################
+
+    async def solve_async(self, debug_output=None):
         """
-        Search for a zero-correlation distinguisher optimized for key recovery
+        Search for the distinguisher and return it as a SearchResult, without printing or drawing it
         """
 
         if self.time_limit != -1:
@@ -126,35 +181,52 @@ class IntegralDistinguisher:
             time_limit = None
     
         start_time = time.time()
-        ####################################################################################################
-        ####################################################################################################
-        self.cp_model = minizinc.Model()
-        self.cp_model.add_file(self.mzn_file_name)
-        self.cp_inst = minizinc.Instance(solver=self.cp_solver, model=self.cp_model)
-        self.cp_inst["RD"] = self.RD
-        self.cp_inst["Ri"] = self.Ri
-        self.cp_inst["R0"] = self.R0
-        self.cp_inst["skip_first_sbox_layer"] = self.skip_first_sbox_layer
-        self.cp_inst["variant"] = self.variant
-        self.cp_inst["NPT"] = self.NPT
-        self.result = self.cp_inst.solve(timeout=time_limit, 
-                                         processes=self.num_of_threads, 
-                                         #verbose=True, 
-                                         debug_output=Path("./debug_output.txt", intermediate_solutions=True),                                         
-                                         optimisation_level=2)
-        ####################################################################################################
-        ####################################################################################################
-        elapsed_time = time.time() - start_time
-        print("Elapsed time: {:0.02f} seconds".format(elapsed_time))
-
-        if self.result.status == minizinc.Status.OPTIMAL_SOLUTION or self.result.status == minizinc.Status.SATISFIED or \
-                            self.result.status == minizinc.Status.ALL_SOLUTIONS:           
-            attack_summary = self.print_attack_parameters()
-            attack_summary += line_separator + "\n"
-            print(attack_summary)
-            draw = Draw(self, output_file_name=self.output_file_name, attack_summary=attack_summary)
-            draw.generate_attack_shape()            
-        elif self.result.status == minizinc.Status.UNSATISFIABLE:
+        cp_inst = self.create_instance()
+        result = await cp_inst.solve_async(timeout=time_limit, 
+                                           processes=self.num_of_threads, 
+                                           debug_output=debug_output, 
+                                           optimisation_level=2)
+        search_result = SearchResult(status=result.status, elapsed_time=time.time() - start_time, solution=result)
+        if search_result.has_solution:
+            search_result.summary = self.print_attack_parameters(result) + line_separator + "\n"
+            search_result.values["lazy_tweak_cells"] = [i for i in range(16) if result["contradict"][i] == 1]
+            search_result.values["input_mask_distinguisher"] = result["input_mask_distinguisher"]
+            search_result.values["input_mask"] = result["AXU"][0]
+            search_result.values["output_mask"] = result["AXL"][self.RD]
+        return search_result
+
+    def solve(self, debug_output=None):
+        """
+        Blocking variant of solve_async
+        """
+
+        return asyncio.run(self.solve_async(debug_output))
+
+    def draw(self, search_result, output_file_name=None):
+        """
+        Write the shape of the distinguisher of a SearchResult into a Tikz file, or into an SVG file if its name ends with .svg
+        """
+
+        draw = Draw(self, output_file_name=self.output_file_name if output_file_name is None else output_file_name, 
+                    attack_summary=search_result.summary, result=search_result.solution)
+        if draw.output_file_name.endswith(".svg"):
+            draw.generate_attack_shape_svg()
+        else:
+            draw.generate_attack_shape()
+
+    def search(self):
+        """
+        Search for the distinguisher, print its parameters and draw its shape
+        """
+
+        search_result = self.solve(debug_output=Path("./debug_output.txt"))
+        self.result = search_result.solution
+        print("Elapsed time: {:0.02f} seconds".format(search_result.elapsed_time))
+        print(f"Solver status: {search_result.status}")
+        if search_result.has_solution:
+            print(search_result.summary)
+            self.draw(search_result)
+        elif search_result.status == minizinc.Status.UNSATISFIABLE:
             print("Model is unsatisfiable")
         else:
             print("Solving process was interrupted")
@@ -162,22 +234,106 @@ class IntegralDistinguisher:
     #############################################################################################################################################
     #############################################################################################################################################
 
-    def print_attack_parameters(self):
+    def search_catalogue_entry(self, lazy_cell, output_cell, num_of_threads=None):
+        """
+        Search for the distinguisher with the largest input mask in which the tweakey cell lazy_cell is
+        active at most NPT times (contradict[lazy_cell] = 1) and only the output cell output_cell is balanced
+        """
+
+        if self.time_limit != -1:
+            time_limit = datetime.timedelta(seconds=self.time_limit)
+        else:
+            time_limit = None
+        constraints = ["constraint contradict[{}] = 1;".format(lazy_cell),
+                       "constraint AXL[RD, {}] != 0;".format(output_cell),
+                       "constraint forall(i in 0..15 where i != {})(AXL[RD, i] = 0);".format(output_cell)]
+        start_time = time.time()
+        cp_inst = self.create_instance(constraints)
+        result = cp_inst.solve(timeout=time_limit, 
+                               processes=num_of_threads if num_of_threads is not None else self.num_of_threads, 
+                               optimisation_level=2)
+        entry = {"lazy_cell" : lazy_cell,
+                 "output_cell" : output_cell,
+                 "status" : result.status.name,
+                 "optimal" : result.status == minizinc.Status.OPTIMAL_SOLUTION,
+                 "elapsed_time" : time.time() - start_time}
+        if result.solution is not None:
+            entry["input_mask_distinguisher"] = result["input_mask_distinguisher"]
+            entry["input_mask"] = result["AXU"][0]
+            entry["output_mask"] = result["AXL"][self.RD]
+            entry["lazy_cells"] = [i for i in range(16) if result["contradict"][i] == 1]
+        return entry
+
+    def search_catalogue(self, num_of_processes=1, catalogue_file_name="catalogue.json"):
+        """
+        Search for the best distinguisher for every pair (lazy tweakey cell, balanced output cell) by solving the
+        16x16 sub-instances in a process pool, where the time limit applies to each sub-instance, and store
+        them as a catalogue from which the attacks can pick a distinguisher without solving the model again
+        """
+
+        num_of_threads = max(1, self.num_of_threads // num_of_processes)
+        start_time = time.time()
+        catalogue = [[None for _ in range(16)] for _ in range(16)]
+        with ProcessPoolExecutor(max_workers=num_of_processes) as pool:
+            futures = [pool.submit(search_catalogue_entry, self.params, lazy_cell, output_cell, num_of_threads) \
+                       for lazy_cell in range(16) for output_cell in range(16)]
+            for future in as_completed(futures):
+                entry = future.result()
+                catalogue[entry["lazy_cell"]][entry["output_cell"]] = entry
+                print("TK[{:02d}], output cell {:02d}: {:>20s} {}".format(entry["lazy_cell"], entry["output_cell"], entry["status"],
+                      entry.get("input_mask_distinguisher", "")))
+        elapsed_time = time.time() - start_time
+        with open(catalogue_file_name, "w") as jsonfile:
+            json.dump({"variant" : self.variant, "RD" : self.RD, "Ri" : self.Ri, "R0" : self.R0,
+                       "skip_first_sbox_layer" : self.skip_first_sbox_layer, "catalogue" : catalogue}, jsonfile)
+        str_output = line_separator + "\n"
+        str_output += "Largest input mask for each lazy tweakey cell (rows) and balanced output cell (columns),\n"
+        str_output += "'*' marks the sub-instances that were not solved to optimality, '-' those without a distinguisher:\n"
+        str_output += "       " + "".join("{:>5d}".format(output_cell) for output_cell in range(16)) + "\n"
+        for lazy_cell in range(16):
+            row = ""
+            for entry in catalogue[lazy_cell]:
+                if "input_mask_distinguisher" in entry:
+                    row += "{:>4d}{}".format(entry["input_mask_distinguisher"], " " if entry["optimal"] else "*")
+                else:
+                    row += "{:>4s}{}".format("-", " " if entry["status"] == "UNSATISFIABLE" else "*")
+            str_output += "TK[{:02d}]".format(lazy_cell) + row + "\n"
+        str_output += "Catalogue written into {}\n".format(catalogue_file_name)
+        str_output += "Elapsed time: {:0.02f} seconds\n".format(elapsed_time)
+        str_output += line_separator + "\n"
+        print(str_output)
+        return catalogue
+
+    #############################################################################################################################################
+    #############################################################################################################################################
+    #############################################################################################################################################
+
+    def print_attack_parameters(self, result=None):
         """
         Print attack parameters
-        """                   
+        """
+
+        if result is None:
+            result = self.result
         str_output = line_separator + "\n"
         str_output += "Distinguisher parameters:\n"
         str_output += "Length of distinguisher: {:02d}\n".format(self.RD)
         str_output += "Variant:                 {:02d}\n".format(self.variant)
         str_output += "Ri:                      {0:2d}\n".format(self.Ri)
         str_output += "R0:                      {0:2d}\n".format(self.R0)
-        lazy_tweak_cells_numeric = [i for i in range(16) if self.result["contradict"][i] == 1]             
+        lazy_tweak_cells_numeric = [i for i in range(16) if result["contradict"][i] == 1]             
         lazy_tweak_cells = ["TK[{:02d}] ".format(i) for i in lazy_tweak_cells_numeric]
         str_output += "Tweakey cells that are active at most {:02d} times:\n".format(self.NPT) + ", ".join(lazy_tweak_cells) + "\n"
         str_output += line_separator + "\n"
         return str_output
 
+def search_catalogue_entry(params, lazy_cell, output_cell, num_of_threads):
+    """
+    Solve one sub-instance of IntegralDistinguisher.search_catalogue in a worker process
+    """
+
+    return IntegralDistinguisher(params).search_catalogue_entry(lazy_cell, output_cell, num_of_threads)
+
 #############################################################################################################################################
 #############################################################################################################################################
 #############################################################################################################################################
@@ -201,7 +357,10 @@ def loadparameters(args):
               "cp_solver_name" : "ortools",
               "num_of_threads" : 8,
               "time_limit" : None,
-              "output_file_name" : "output.tex"}
+              "output_file_name" : "output.tex",
+              "catalogue" : False,
+              "catalogue_file_name" : "catalogue.json",
+              "num_of_processes" : 1}
     # Overwrite parameters if they are set on command line
     if args.variant is not None:
         params["variant"] = args.variant
@@ -221,6 +380,12 @@ def loadparameters(args):
         params["time_limit"] = args.tl
     if args.o is not None:
         params["output_file_name"] = args.o
+    if args.catalogue is not None:
+        params["catalogue"] = args.catalogue
+    if args.cf is not None:
+        params["catalogue_file_name"] = args.cf
+    if args.pp is not None:
+        params["num_of_processes"] = args.pp
     return params
 
 def main():
@@ -254,7 +419,11 @@ def main():
                         help="Choose a CP solver") 
     parser.add_argument("-p", default=8, type=int, help="number of threads for solvers supporting multi-threading\n")    
     parser.add_argument("-tl", default=4000, type=int, help="set a time limit for the solver in seconds\n")
-    parser.add_argument("-o", default="output.tex", type=str, help="output file including the Tikz code to generate the shape of the attack\n")
+    parser.add_argument("-o", default="output.tex", type=str, help="output file including the Tikz code to generate the shape of the attack (an SVG image if it ends with .svg)\n")
+    parser.add_argument("-catalogue", action="store_true", help="Use this flag to find the best distinguisher for every lazy tweakey cell and balanced output cell\n"
+                                                                "(the time limit applies to each of the 16x16 sub-instances)\n")
+    parser.add_argument("-cf", default="catalogue.json", type=str, help="file into which the catalogue of distinguishers is written\n")
+    parser.add_argument("-pp", default=1, type=int, help="number of sub-instances of the catalogue solved in parallel (each with p/pp threads)\n")
 
     # Parse command line arguments and construct parameter list
     args = parser.parse_args()
@@ -271,7 +440,10 @@ def main():
     print("No. of threads:  {}".format(params["num_of_threads"]))
     print("Time limit:      {}".format(params["time_limit"]))
     print(line_separator)
-    integral__distinguisher.search()
+    if params["catalogue"]:
+        integral__distinguisher.search_catalogue(params["num_of_processes"], params["catalogue_file_name"])
+    else:
+        integral__distinguisher.search()
     
 #############################################################################################################################################
 #############################################################################################################################################
@@ -25,7 +25,12 @@ Email: hsn.hadipour@gmail.com
 """
 
 
+import itertools
 import sys
+from pathlib import Path
+# the modules shared by the tools of several ciphers are in the folder shared of the repository
+sys.path.append(str(Path(__file__).resolve().parents[2] / "shared"))
+from drawsvg import SkinnySVG, Cells
 
 def trim(docstring):
     if not docstring:
@@ -57,8 +62,9 @@ class Draw():
     Draw the shape of ID attack
     """
 
-    def __init__(self, integral_object, output_file_name="output.tex", attack_summary=""):
-        self.result = integral_object.result
+    def __init__(self, integral_object, output_file_name="output.tex", attack_summary="", result=None):
+        self.result = integral_object.result if result is None else result
+        self.tkpermutation_at_round = integral_object.tkpermutation_at_round
         self.RB = integral_object.RB
         self.RD = integral_object.RD
         self.RF = integral_object.RF
@@ -81,11 +87,9 @@ class Draw():
         Generate the round tweakey labels
         """
         if round_number == 0:
-            text = \
-                r"""\Cell{ss00}{\texttt{0}}\Cell{ss01}{\texttt{1}}\Cell{ss02}{\texttt{2}}\Cell{ss03}{\texttt{3}}""" + \
-                r"""\Cell{ss10}{\texttt{0}}\Cell{ss11}{\texttt{1}}\Cell{ss12}{\texttt{2}}\Cell{ss13}{\texttt{3}}""" + \
-                r"""\Cell{ss20}{\texttt{7}}\Cell{ss21}{\texttt{4}}\Cell{ss22}{\texttt{5}}\Cell{ss23}{\texttt{6}}""" + \
-                r"""\Cell{ss30}{\texttt{0}}\Cell{ss31}{\texttt{1}}\Cell{ss32}{\texttt{2}}\Cell{ss33}{\texttt{3}}"""
+            text = Cells()
+            for i, j in itertools.product(range(4), range(4)):
+                text.text((i, j), str([0, 1, 2, 3, 0, 1, 2, 3, 7, 4, 5, 6, 0, 1, 2, 3][4*i + j]))
             return text
         round_tweakey_state = list(range(16))
         if round_number < self.Ri:
@@ -94,9 +98,9 @@ class Draw():
             offset = self.R0
         for r in range(round_number + offset):
             round_tweakey_state = [self.tweakey_permutation[i] for i in round_tweakey_state]
-        text = ""
+        text = Cells()
         for i in range(8):
-            text += "\Cell{{s{0}}}{{\\texttt{{{1}}}}}".format(i, hex(round_tweakey_state[i])[2:])
+            text.text(i, hex(round_tweakey_state[i])[2:])
         return text
     
     def draw_1st_round_eb(self):
@@ -105,48 +109,48 @@ class Draw():
         """
 
         output = dict()    
-        output["before_sb"] = ""              
-        output["after_sb"] = ""
-        output["after_addtk"] = ""
-        output["after_sr"] = ""
-        output["subtweakey"] = ""
-        output["after_mix_columns"] = ""
-        tkpermutation_at_round = self.result["tkpermutation_at_round"][0]
+        output["before_sb"] = Cells()              
+        output["after_sb"] = Cells()
+        output["after_addtk"] = Cells()
+        output["after_sr"] = Cells()
+        output["subtweakey"] = Cells()
+        output["after_mix_columns"] = Cells()
+        tkpermutation_at_round = self.tkpermutation_at_round[0]
         for i in range(8):
             if tkpermutation_at_round[i] in self.lazy_tweak_cells_numeric:
-                    output["subtweakey"] += "\FrameCell[filter]{{s{0}}}".format(i)
+                    output["subtweakey"].frame(i, "filter")
         # color = self.fillcolor_distinguisher[self.result["AXU"][0][0]]
-        # output["subtweakey"] += "\Fill[{0}]{{s{1}}}".format(color, 0)
-        # output["subtweakey"] += "\Fill[{0}]{{s{1}}}".format(color, 4)
-        # output["subtweakey"] += "\Fill[{0}]{{s{1}}}".format(color, 12)
+        # output["subtweakey"].fill(0, color)
+        # output["subtweakey"].fill(4, color)
+        # output["subtweakey"].fill(12, color)
         # color = self.fillcolor_distinguisher[self.result["AXU"][0][1]]
-        # output["subtweakey"] += "\Fill[{0}]{{s{1}}}".format(color, 1)
-        # output["subtweakey"] += "\Fill[{0}]{{s{1}}}".format(color, 5)
-        # output["subtweakey"] += "\Fill[{0}]{{s{1}}}".format(color, 13)
+        # output["subtweakey"].fill(1, color)
+        # output["subtweakey"].fill(5, color)
+        # output["subtweakey"].fill(13, color)
         # color = self.fillcolor_distinguisher[self.result["AXU"][0][2]]
-        # output["subtweakey"] += "\Fill[{0}]{{s{1}}}".format(color, 2)
-        # output["subtweakey"] += "\Fill[{0}]{{s{1}}}".format(color, 6)
-        # output["subtweakey"] += "\Fill[{0}]{{s{1}}}".format(color, 14)            
+        # output["subtweakey"].fill(2, color)
+        # output["subtweakey"].fill(6, color)
+        # output["subtweakey"].fill(14, color)
         # color = self.fillcolor_distinguisher[self.result["AXU"][0][3]]
-        # output["subtweakey"] += "\Fill[{0}]{{s{1}}}".format(color, 3)
-        # output["subtweakey"] += "\Fill[{0}]{{s{1}}}".format(color, 7)
-        # output["subtweakey"] += "\Fill[{0}]{{s{1}}}".format(color, 15)
+        # output["subtweakey"].fill(3, color)
+        # output["subtweakey"].fill(7, color)
+        # output["subtweakey"].fill(15, color)
         # color = self.fillcolor_distinguisher[self.result["AXU"][0][4]]
-        # output["subtweakey"] += "\Fill[{0}]{{s{1}}}".format(color, 9)            
+        # output["subtweakey"].fill(9, color)
         # color = self.fillcolor_distinguisher[self.result["AXU"][0][5]]
-        # output["subtweakey"] += "\Fill[{0}]{{s{1}}}".format(color, 10)            
+        # output["subtweakey"].fill(10, color)
         # color = self.fillcolor_distinguisher[self.result["AXU"][0][6]]
-        # output["subtweakey"] += "\Fill[{0}]{{s{1}}}".format(color, 11)        
+        # output["subtweakey"].fill(11, color)
         # color = self.fillcolor_distinguisher[self.result["AXU"][0][7]]
-        # output["subtweakey"] += "\Fill[{0}]{{s{1}}}".format(color, 8)            
+        # output["subtweakey"].fill(8, color)
         for i in range(16):
             if self.result["AXB"][0][i] == 1:
-                output["before_sb"] += "\Fill[active]{{s{0}}}".format(i)
-                output["after_sb"] += "\Fill[active]{{s{0}}}".format(i)
-                output["after_addtk"] += "\Fill[active]{{s{0}}}".format(i)
-                output["after_sr"] += "\Fill[active]{{s{0}}}".format(self.inv_permutation[i])
+                output["before_sb"].fill(i, "active")
+                output["after_sb"].fill(i, "active")
+                output["after_addtk"].fill(i, "active")
+                output["after_sr"].fill(self.inv_permutation[i], "active")
             if self.result["AXB"][1][i] == 1:
-                output["after_mix_columns"] += "\Fill[active]{{s{0}}}".format(i)
+                output["after_mix_columns"].fill(i, "active")
         return output
             
     def draw_ed(self, r):
@@ -155,33 +159,33 @@ class Draw():
         """
         
         output = dict()
-        output["before_sb"] = ""              
-        output["after_sb"] = ""
-        output["after_addtk"] = ""
-        output["after_sr"] = ""
-        output["subtweakey"] = ""
-        output["after_mix_columns"] = ""
+        output["before_sb"] = Cells()              
+        output["after_sb"] = Cells()
+        output["after_addtk"] = Cells()
+        output["after_sr"] = Cells()
+        output["subtweakey"] = Cells()
+        output["after_mix_columns"] = Cells()
         if self.RB + r < self.Ri:
-            tkpermutation_at_round = self.result["tkpermutation_at_round"][self.RB + r]
+            tkpermutation_at_round = self.tkpermutation_at_round[self.RB + r]
         else:
-            tkpermutation_at_round = self.result["tkpermutation_at_round"][self.RB + self.R0 + r]        
+            tkpermutation_at_round = self.tkpermutation_at_round[self.RB + self.R0 + r]        
         for i in range(16):
-            output["before_sb"] += "\TFill[{0}]{{s{1}}}".format(self.fillcolor_distinguisher[self.result["AXU"][r][i]], i)
-            output["after_sb"] += "\TFill[{0}]{{s{1}}}".format(self.fillcolor_distinguisher[self.result["AYU"][r][i]], i)
-            output["after_addtk"] += "\TFill[{0}]{{s{1}}}".format(self.fillcolor_distinguisher[self.result["AYU"][r][i]], i)                
-            output["after_sr"] += "\TFill[{0}]{{s{1}}}".format(self.fillcolor_distinguisher[self.result["AYU"][r][i]], self.inv_permutation[i])
-            output["after_mix_columns"] += "\TFill[{0}]{{s{1}}}".format(self.fillcolor_distinguisher[self.result["AXU"][r + 1][i]], i)        
+            output["before_sb"].tfill(i, self.fillcolor_distinguisher[self.result["AXU"][r][i]])
+            output["after_sb"].tfill(i, self.fillcolor_distinguisher[self.result["AYU"][r][i]])
+            output["after_addtk"].tfill(i, self.fillcolor_distinguisher[self.result["AYU"][r][i]])
+            output["after_sr"].tfill(self.inv_permutation[i], self.fillcolor_distinguisher[self.result["AYU"][r][i]])
+            output["after_mix_columns"].tfill(i, self.fillcolor_distinguisher[self.result["AXU"][r + 1][i]])
         for i in range(16):
-            output["before_sb"] += "\BFill[{0}]{{s{1}}}".format(self.fillcolor_distinguisher[self.result["AXL"][r][i]], i)
-            output["after_sb"] += "\BFill[{0}]{{s{1}}}".format(self.fillcolor_distinguisher[self.result["AYL"][r][i]], i)
-            output["after_addtk"] += "\BFill[{0}]{{s{1}}}".format(self.fillcolor_distinguisher[self.result["AYL"][r][i]], i)
-            output["after_sr"] += "\BFill[{0}]{{s{1}}}".format(self.fillcolor_distinguisher[self.result["AYL"][r][i]], self.inv_permutation[i])
-            output["after_mix_columns"] += "\BFill[{0}]{{s{1}}}".format(self.fillcolor_distinguisher[self.result["AXL"][r + 1][i]], i)
+            output["before_sb"].bfill(i, self.fillcolor_distinguisher[self.result["AXL"][r][i]])
+            output["after_sb"].bfill(i, self.fillcolor_distinguisher[self.result["AYL"][r][i]])
+            output["after_addtk"].bfill(i, self.fillcolor_distinguisher[self.result["AYL"][r][i]])
+            output["after_sr"].bfill(self.inv_permutation[i], self.fillcolor_distinguisher[self.result["AYL"][r][i]])
+            output["after_mix_columns"].bfill(i, self.fillcolor_distinguisher[self.result["AXL"][r + 1][i]])
         for i in range(8):                        
-            output["subtweakey"] += "\Fill[{0}]{{s{1}}}".format(self.fillcolor_distinguisher[min(self.result["AYU"][r][i], self.result["AYL"][r][i])], i)
+            output["subtweakey"].fill(i, self.fillcolor_distinguisher[min(self.result["AYU"][r][i], self.result["AYL"][r][i])])
         for i in range(8):
             if tkpermutation_at_round[i] in self.lazy_tweak_cells_numeric:
-                output["subtweakey"] += "\FrameCell[filter]{{s{0}}}".format(i)
+                output["subtweakey"].frame(i, "filter")
         return output
 
     def draw_ef(self, r):
@@ -190,58 +194,58 @@ class Draw():
         """
 
         output = dict()
-        output["before_sb"] = ""              
-        output["after_sb"] = ""
-        output["after_addtk"] = ""
-        output["after_sr"] = ""
-        output["subtweakey"] = ""
-        output["after_mix_columns"] = ""
+        output["before_sb"] = Cells()              
+        output["after_sb"] = Cells()
+        output["after_addtk"] = Cells()
+        output["after_sr"] = Cells()
+        output["subtweakey"] = Cells()
+        output["after_mix_columns"] = Cells()
         
         if self.RB + self.RD + r < self.Ri:
-            tkpermutation_at_round = self.result["tkpermutation_at_round"][self.RB + self.RD + r]
+            tkpermutation_at_round = self.tkpermutation_at_round[self.RB + self.RD + r]
         else:
-            tkpermutation_at_round = self.result["tkpermutation_at_round"][self.RB + self.RD + r + self.R0]
+            tkpermutation_at_round = self.tkpermutation_at_round[self.RB + self.RD + r + self.R0]
         state = [self.result["AXF"][k][r] for k in self.balanced_positions]
         next_state = [self.result["AXF"][k][r + 1] for k in self.balanced_positions]       
         if len(state) == 2:
             for i in range(16):
                 if state[0][i] == 1:
-                    output["before_sb"] += "\TFill{{s{0}}}".format(i)
-                    output["after_sb"] += "\TFill{{s{0}}}".format(i)
-                    output["after_sr"] += "\TFill{{s{0}}}".format(self.inv_permutation[i])
+                    output["before_sb"].tfill(i)
+                    output["after_sb"].tfill(i)
+                    output["after_sr"].tfill(self.inv_permutation[i])
                     if i <= 7:
-                        output["subtweakey"] += "\TFill{{s{0}}}".format(i)
+                        output["subtweakey"].tfill(i)
                 if i <= 7:
                     if tkpermutation_at_round[i] in self.lazy_tweak_cells_numeric:
-                        output["subtweakey"] += "\FrameCell[filter]{{s{0}}}".format(i)
+                        output["subtweakey"].frame(i, "filter")
                 if next_state[0][i] == 1:
-                    output["after_mix_columns"] += "\TFill{{s{0}}}".format(i)
+                    output["after_mix_columns"].tfill(i)
             for i in range(16):
                 if state[1][i] == 1:
-                    output["before_sb"] += "\BFill{{s{0}}}".format(i)
-                    output["after_sb"] += "\BFill{{s{0}}}".format(i)
-                    output["after_sr"] += "\BFill{{s{0}}}".format(self.inv_permutation[i])
+                    output["before_sb"].bfill(i)
+                    output["after_sb"].bfill(i)
+                    output["after_sr"].bfill(self.inv_permutation[i])
                     if i <= 7:
-                        output["subtweakey"] += "\BFill{{s{0}}}".format(i)
+                        output["subtweakey"].bfill(i)
                 if i <= 7:
                     if tkpermutation_at_round[i] in self.lazy_tweak_cells_numeric:
-                        output["subtweakey"] += "\FrameCell[filter]{{s{0}}}".format(i)
+                        output["subtweakey"].frame(i, "filter")
                 if next_state[1][i] == 1:
-                    output["after_mix_columns"] += "\BFill{{s{0}}}".format(i)               
+                    output["after_mix_columns"].bfill(i)
         if len(state) == 1:
             for i in range(16):
                 if state[0][i] == 1:
                     if r >= 1:
-                        output["before_sb"] += "\Fill[active]{{s{0}}}".format(i)
-                    output["after_sb"] += "\TFill{{s{0}}}".format(i)
-                    output["after_sr"] += "\Fill[active]{{s{0}}}".format(self.inv_permutation[i])
+                        output["before_sb"].fill(i, "active")
+                    output["after_sb"].tfill(i)
+                    output["after_sr"].fill(self.inv_permutation[i], "active")
                     if i <= 7:
-                        output["subtweakey"] += "\Fill[active]{{s{0}}}".format(i)
+                        output["subtweakey"].fill(i, "active")
                 if i <= 7:
                     if tkpermutation_at_round[i] in self.lazy_tweak_cells_numeric:
-                        output["subtweakey"] += "\FrameCell[filter]{{s{0}}}".format(i)
+                        output["subtweakey"].frame(i, "filter")
                 if next_state[1][i] == 1:
-                    output["after_mix_columns"] += "\Fill[active]{{s{0}}}".format(i)
+                    output["after_mix_columns"].fill(i, "active")
         
         output["after_addtk"] = output["after_sb"]
         return output
@@ -267,13 +271,13 @@ class Draw():
         state["subtweakey"] += self.gen_round_tweakey_labels(0)            
         contents += trim(r"""
         \SkinnyRoundEK[0]
-                    {""" + state["before_sb"] + r"""} % state (input)
-                    {""" + state["subtweakey"] + r"""} % etk[1] (xored AFTER mixcolumns)
+                    {""" + state["before_sb"].tikz() + r"""} % state (input)
+                    {""" + state["subtweakey"].tikz() + r"""} % etk[1] (xored AFTER mixcolumns)
                     {} % tk[2] (ignored)
                     {} % tk[3] (ignored)
-                    {""" + state["after_sb"] + r"""} % state (after subcells)
-                    {""" + state["after_sr"] + r"""} % state (after shiftrows)
-                    {""" + state["after_mix_columns"] + r"""} % state (after mixcolumns)
+                    {""" + state["after_sb"].tikz() + r"""} % state (after subcells)
+                    {""" + state["after_sr"].tikz() + r"""} % state (after shiftrows)
+                    {""" + state["after_mix_columns"].tikz() + r"""} % state (after mixcolumns)
         """) + "\n\n"  
         # draw ED
         for r in range(self.RD):
@@ -281,32 +285,32 @@ class Draw():
             state["subtweakey"] += self.gen_round_tweakey_labels(self.RB + r)
             contents += trim(r"""
             \SkinnyRoundTK[""" + str(self.RB + r) + """]
-                          {""" + state["before_sb"] + r"""} % state (input)
-                          {""" + state["subtweakey"] + r"""} % tk[1]
+                          {""" + state["before_sb"].tikz() + r"""} % state (input)
+                          {""" + state["subtweakey"].tikz() + r"""} % tk[1]
                           {""" + r"""} % tk[2]
                           {""" + r"""} % tk[3]
-                          {""" + state["after_sb"] + """} % state (after subcells)
-                          {""" + state["after_addtk"] + r"""} % state (after addtweakey)
-                          {""" + state["after_sr"] + r"""} % state (after shiftrows)""") + "\n\n"           
+                          {""" + state["after_sb"].tikz() + """} % state (after subcells)
+                          {""" + state["after_addtk"].tikz() + r"""} % state (after addtweakey)
+                          {""" + state["after_sr"].tikz() + r"""} % state (after shiftrows)""") + "\n\n"           
             if (r + self.RB) % 2 == 1:
-                contents += trim(r"""\SkinnyNewLine[""" + str(self.RB + r + 1) + r"""]{""") + state["after_mix_columns"] + r"""} % state (after mixcols)""" + "\n"
+                contents += trim(r"""\SkinnyNewLine[""" + str(self.RB + r + 1) + r"""]{""") + state["after_mix_columns"].tikz() + r"""} % state (after mixcols)""" + "\n"
         # draw EF
         for r in range(self.RF):
             state = self.draw_ef(r)
             state["subtweakey"] += self.gen_round_tweakey_labels(self.RB + self.RD + r)
             contents += trim(r"""
             \SkinnyRoundTK[""" + str(self.RB + self.RD + r) + """]
-                          {""" + state["before_sb"] + r"""} % state (input)
-                          {""" + state["subtweakey"] + r"""} % tk[1]
+                          {""" + state["before_sb"].tikz() + r"""} % state (input)
+                          {""" + state["subtweakey"].tikz() + r"""} % tk[1]
                           {""" + r"""} % tk[2]
                           {""" + r"""} % tk[3]
-                          {""" + state["after_sb"] + """} % state (after subcells)
-                          {""" + state["after_addtk"] + r"""} % state (after addtweakey)
-                          {""" + state["after_sr"] + r"""} % state (after shiftrows)""") + "\n\n"
+                          {""" + state["after_sb"].tikz() + """} % state (after subcells)
+                          {""" + state["after_addtk"].tikz() + r"""} % state (after addtweakey)
+                          {""" + state["after_sr"].tikz() + r"""} % state (after shiftrows)""") + "\n\n"
             if r == self.RF - 1:
-                contents += trim(r"""\SkinnyFin[""" + str(self.RB + self.RD + r + 1) + r"""]{""") + state["after_mix_columns"] + r"""} % state (after mixcols)""" + "\n"
+                contents += trim(r"""\SkinnyFin[""" + str(self.RB + self.RD + r + 1) + r"""]{""") + state["after_mix_columns"].tikz() + r"""} % state (after mixcols)""" + "\n"
             elif (self.RB + self.RD + r) % 2 == 1:
-                contents += trim(r"""\SkinnyNewLine[""" + str(self.RB + self.RD + r + 1) + r"""]{""") + state["after_mix_columns"] + r"""} % state (after mixcols)""" + "\n"
+                contents += trim(r"""\SkinnyNewLine[""" + str(self.RB + self.RD + r + 1) + r"""]{""") + state["after_mix_columns"].tikz() + r"""} % state (after mixcols)""" + "\n"
 
         contents += r"""\ZeroZILegend""" + "\n"
         contents += r"""\end{tikzpicture}""" + "\n"
@@ -319,3 +323,32 @@ class Draw():
         contents += trim(r"""\end{document}""")
         with open(self.output_file_name, "w") as output_file:
             output_file.write(contents)
+
+    def generate_attack_shape_svg(self):
+        """
+        Draw the figure of the integral attack into an SVG file, without LaTeX
+        """
+
+        figure = SkinnySVG(title="Integral attack on {} rounds of SKINNY (ForkSKINNY-TK{})".format(self.RT, self.variant))
+        # draw EB
+        state = self.draw_1st_round_eb()
+        state["subtweakey"] += self.gen_round_tweakey_labels(0)
+        figure.round_ek(0, state["before_sb"], state["subtweakey"], state["after_sb"], state["after_sr"], state["after_mix_columns"])
+        # draw ED
+        for r in range(self.RD):
+            state = self.draw_ed(r)
+            state["subtweakey"] += self.gen_round_tweakey_labels(self.RB + r)
+            figure.round_tk(self.RB + r, state["before_sb"], state["subtweakey"], state["after_sb"], state["after_addtk"], state["after_sr"])
+            if (r + self.RB) % 2 == 1:
+                figure.new_line(self.RB + r + 1, state["after_mix_columns"])
+        # draw EF
+        for r in range(self.RF):
+            state = self.draw_ef(r)
+            state["subtweakey"] += self.gen_round_tweakey_labels(self.RB + self.RD + r)
+            figure.round_tk(self.RB + self.RD + r, state["before_sb"], state["subtweakey"], state["after_sb"], state["after_addtk"], state["after_sr"])
+            if r == self.RF - 1:
+                figure.fin(self.RB + self.RD + r + 1, state["after_mix_columns"])
+            elif (self.RB + self.RD + r) % 2 == 1:
+                figure.new_line(self.RB + self.RD + r + 1, state["after_mix_columns"])
+        figure.legend("ZeroZILegend")
+        figure.save(self.output_file_name)
@@ -26,6 +26,10 @@ Email: hsn.hadipour@gmail.com
 
 
 import sys
+from pathlib import Path
+# the modules shared by the tools of several ciphers are in the folder shared of the repository
+sys.path.append(str(Path(__file__).resolve().parents[2] / "shared"))
+from drawsvg import SkinnySVG, Cells
 
 def trim(docstring):
     if not docstring:
@@ -57,8 +61,9 @@ class Draw():
     Draw the shape of ID attack
     """
 
-    def __init__(self, integral_object, output_file_name="output.tex", attack_summary=""):
-        self.result = integral_object.result
+    def __init__(self, integral_object, output_file_name="output.tex", attack_summary="", result=None):
+        self.result = integral_object.result if result is None else result
+        self.tkpermutation_at_round = integral_object.tkpermutation_at_round
         self.RD = integral_object.RD
         self.Ri = integral_object.Ri
         self.R0 = integral_object.R0
@@ -82,9 +87,9 @@ class Draw():
             offset = self.R0
         for r in range(round_number + offset):
             round_tweakey_state = [self.tweakey_permutation[i] for i in round_tweakey_state]
-        text = ""
+        text = Cells()
         for i in range(8):
-            text += "\Cell{{s{0}}}{{\\texttt{{{1}}}}}".format(i, hex(round_tweakey_state[i])[2:])
+            text.text(i, hex(round_tweakey_state[i])[2:])
         return text
     
     def draw_ed(self, r):
@@ -93,33 +98,33 @@ class Draw():
         """
         
         output = dict()
-        output["before_sb"] = ""              
-        output["after_sb"] = ""
-        output["after_addtk"] = ""
-        output["after_sr"] = ""
-        output["subtweakey"] = ""
-        output["after_mix_columns"] = ""
+        output["before_sb"] = Cells()              
+        output["after_sb"] = Cells()
+        output["after_addtk"] = Cells()
+        output["after_sr"] = Cells()
+        output["subtweakey"] = Cells()
+        output["after_mix_columns"] = Cells()
         if r < self.Ri:
-            tkpermutation_at_round = self.result["tkpermutation_at_round"][r]
+            tkpermutation_at_round = self.tkpermutation_at_round[r]
         else:
-            tkpermutation_at_round = self.result["tkpermutation_at_round"][self.R0 + r]                
+            tkpermutation_at_round = self.tkpermutation_at_round[self.R0 + r]                
         for i in range(16):
-            output["before_sb"] += "\TFill[{0}]{{s{1}}}".format(self.fillcolor[self.result["AXU"][r][i]], i)
-            output["after_sb"] += "\TFill[{0}]{{s{1}}}".format(self.fillcolor[self.result["AYU"][r][i]], i)
-            output["after_addtk"] += "\TFill[{0}]{{s{1}}}".format(self.fillcolor[self.result["AYU"][r][i]], i)                
-            output["after_sr"] += "\TFill[{0}]{{s{1}}}".format(self.fillcolor[self.result["AYU"][r][i]], self.inv_permutation[i])
-            output["after_mix_columns"] += "\TFill[{0}]{{s{1}}}".format(self.fillcolor[self.result["AXU"][r + 1][i]], i)        
+            output["before_sb"].tfill(i, self.fillcolor[self.result["AXU"][r][i]])
+            output["after_sb"].tfill(i, self.fillcolor[self.result["AYU"][r][i]])
+            output["after_addtk"].tfill(i, self.fillcolor[self.result["AYU"][r][i]])
+            output["after_sr"].tfill(self.inv_permutation[i], self.fillcolor[self.result["AYU"][r][i]])
+            output["after_mix_columns"].tfill(i, self.fillcolor[self.result["AXU"][r + 1][i]])
         for i in range(16):
-            output["before_sb"] += "\BFill[{0}]{{s{1}}}".format(self.fillcolor[self.result["AXL"][r][i]], i)
-            output["after_sb"] += "\BFill[{0}]{{s{1}}}".format(self.fillcolor[self.result["AYL"][r][i]], i)
-            output["after_addtk"] += "\BFill[{0}]{{s{1}}}".format(self.fillcolor[self.result["AYL"][r][i]], i)
-            output["after_sr"] += "\BFill[{0}]{{s{1}}}".format(self.fillcolor[self.result["AYL"][r][i]], self.inv_permutation[i])
-            output["after_mix_columns"] += "\BFill[{0}]{{s{1}}}".format(self.fillcolor[self.result["AXL"][r + 1][i]], i)
+            output["before_sb"].bfill(i, self.fillcolor[self.result["AXL"][r][i]])
+            output["after_sb"].bfill(i, self.fillcolor[self.result["AYL"][r][i]])
+            output["after_addtk"].bfill(i, self.fillcolor[self.result["AYL"][r][i]])
+            output["after_sr"].bfill(self.inv_permutation[i], self.fillcolor[self.result["AYL"][r][i]])
+            output["after_mix_columns"].bfill(i, self.fillcolor[self.result["AXL"][r + 1][i]])
         for i in range(8):                        
-            output["subtweakey"] += "\Fill[{0}]{{s{1}}}".format(self.fillcolor[min(self.result["AYU"][r][i], self.result["AYL"][r][i])], i)
+            output["subtweakey"].fill(i, self.fillcolor[min(self.result["AYU"][r][i], self.result["AYL"][r][i])])
         for i in range(8):
             if tkpermutation_at_round[i] in self.lazy_tweak_cells_numeric:
-                output["subtweakey"] += "\FrameCell[filter]{{s{0}}}".format(i)
+                output["subtweakey"].frame(i, "filter")
         return output
 
     def generate_attack_shape(self):
@@ -144,17 +149,17 @@ class Draw():
             state["subtweakey"] += self.gen_round_tweakey_labels(r)
             contents += trim(r"""
             \SkinnyRoundTK[""" + str(r) + """]
-                          {""" + state["before_sb"] + r"""} % state (input)
-                          {""" + state["subtweakey"] + r"""} % tk[1]
+                          {""" + state["before_sb"].tikz() + r"""} % state (input)
+                          {""" + state["subtweakey"].tikz() + r"""} % tk[1]
                           {""" + r"""} % tk[2]
                           {""" + r"""} % tk[3]
-                          {""" + state["after_sb"] + """} % state (after subcells)
-                          {""" + state["after_addtk"] + r"""} % state (after addtweakey)
-                          {""" + state["after_sr"] + r"""} % state (after shiftrows)""") + "\n\n"
+                          {""" + state["after_sb"].tikz() + """} % state (after subcells)
+                          {""" + state["after_addtk"].tikz() + r"""} % state (after addtweakey)
+                          {""" + state["after_sr"].tikz() + r"""} % state (after shiftrows)""") + "\n\n"
             if r == self.RD - 1:
-                contents += trim(r"""\SkinnyFin[""" + str(r + 1) + r"""]{""") + state["after_mix_columns"] + r"""} % state (after mixcols)""" + "\n"
+                contents += trim(r"""\SkinnyFin[""" + str(r + 1) + r"""]{""") + state["after_mix_columns"].tikz() + r"""} % state (after mixcols)""" + "\n"
             elif (r) % 2 == 1:
-                contents += trim(r"""\SkinnyNewLine[""" + str(r + 1) + r"""]{""") + state["after_mix_columns"] + r"""} % state (after mixcols)""" + "\n"
+                contents += trim(r"""\SkinnyNewLine[""" + str(r + 1) + r"""]{""") + state["after_mix_columns"].tikz() + r"""} % state (after mixcols)""" + "\n"
             
         contents += r"""\IntegralDistinguisherLegend""" + "\n"
         contents += r"""\end{tikzpicture}""" + "\n"
@@ -167,3 +172,21 @@ class Draw():
         contents += trim(r"""\end{document}""")
         with open(self.output_file_name, "w") as output_file:
             output_file.write(contents)
+
+    def generate_attack_shape_svg(self):
+        """
+        Draw the figure of the distinguisher into an SVG file, without LaTeX
+        """
+
+        figure = SkinnySVG(title="Integral distinguisher for {} rounds of ForkSKINNY-TK{}".format(self.RD, self.variant))
+        # draw ED
+        for r in range(0, self.RD):
+            state = self.draw_ed(r)
+            state["subtweakey"] += self.gen_round_tweakey_labels(r)
+            figure.round_tk(r, state["before_sb"], state["subtweakey"], state["after_sb"], state["after_addtk"], state["after_sr"])
+            if r == self.RD - 1:
+                figure.fin(r + 1, state["after_mix_columns"])
+            elif (r) % 2 == 1:
+                figure.new_line(r + 1, state["after_mix_columns"])
+        figure.legend("IntegralDistinguisherLegend")
+        figure.save(self.output_file_name)
@@ -0,0 +1,354 @@
+#!/usr/bin/env python3
+
+"""
+Partial sum optimization for Skinny.
+Copyright (C) 2023
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""
+
+# Execute a partial sum guessing order (output of pso.py) on reduced-round Skinny-64
+# and measure the time and memory of every step
+import argparse
+import itertools
+import json
+import math
+import time
+import tracemalloc
+import numpy as np
+
+import psvisu
+from psvisu import State_name
+
+SBOX = np.array([0xc, 0x6, 0x9, 0x0, 0x1, 0xa, 0x2, 0xb, 0x3, 0x8, 0x5, 0xd, 0x4, 0xe, 0x7, 0xf], dtype=np.uint8)
+SBOX_INV = np.argsort(SBOX).astype(np.uint8)
+SHIFT_ROWS = [0, 1, 2, 3, 7, 4, 5, 6, 10, 11, 8, 9, 13, 14, 15, 12]
+SHIFT_ROWS_INV = [SHIFT_ROWS.index(i) for i in range(16)]
+TWEAKEY_PERMUTATION = [9, 15, 8, 13, 10, 14, 12, 11, 0, 1, 2, 3, 4, 5, 6, 7]
+BRANCH_CONSTANT = np.array([0x1, 0x2, 0x4, 0x9, 0x3, 0x6, 0xd, 0xa, 0x5, 0xb, 0x7, 0xf, 0xe, 0xc, 0x8, 0x1], dtype=np.uint8)
+TWEAK = 'T'
+
+### SKINNY-64 ##########################################################
+
+def lfsr(cell, lane):
+    if lane == 1:
+        return ((cell << 1) & 0xe) | (((cell >> 3) ^ (cell >> 2)) & 0x1)
+    if lane == 2:
+        return (cell >> 1) | (((cell << 3) ^ cell) & 0x8)
+    return cell
+
+def round_tweakeys(tweakey, rounds):
+    tweakey = [[int(c) for c in lane] for lane in tweakey]
+    stk = []
+    for _ in range(rounds):
+        stk.append([0 for _ in range(8)])
+        for lane in tweakey:
+            stk[-1] = [s ^ c for s, c in zip(stk[-1], lane[:8])]
+        tweakey = [[lane[p] for p in TWEAKEY_PERMUTATION] for lane in tweakey]
+        tweakey = [[lfsr(c, l) if i < 8 else c for i, c in enumerate(lane)] for l, lane in enumerate(tweakey)]
+    return np.array(stk, dtype=np.uint8)
+
+def round_constants(rounds, bits=6):
+    rc = 0
+    constants = np.zeros((rounds, 16), dtype=np.uint8)
+    for r in range(rounds):
+        rc = ((rc << 1) & (2**bits - 1)) | (((rc >> (bits - 1)) ^ (rc >> (bits - 2)) ^ 1) & 0x1)
+        constants[r][0] = rc & 0xf
+        constants[r][4] = rc >> 4
+        constants[r][8] = 0x2
+    return constants
+
+def tweakey_labels(rounds):
+    RT = [[c for c in range(16)]]
+    permute = lambda X : [X[p] for p in TWEAKEY_PERMUTATION]
+    for r in range(rounds - 1):
+        RT.append(permute(RT[-1]))
+    return RT
+
+def mix_columns(state):
+    r0, r1, r2, r3 = state[:, 0:4], state[:, 4:8], state[:, 8:12], state[:, 12:16]
+    return np.concatenate((r0 ^ r2 ^ r3, r0, r1 ^ r2, r0 ^ r2), axis=1)
+
+def inv_mix_columns(state):
+    r0, r1, r2, r3 = state[:, 0:4], state[:, 4:8], state[:, 8:12], state[:, 12:16]
+    return np.concatenate((r1, r1 ^ r2 ^ r3, r1 ^ r3, r0 ^ r3), axis=1)
+
+class Skinny64:
+    """
+    Skinny-64 with one tweakey cell of TK1 controlled by the attacker.
+    With R0 > 0 this is the C1 branch of ForkSkinny-64: the state is forked after Ri rounds,
+    the branch constant is added and the rounds use the tweakeys and constants after the R0 rounds of C0.
+    """
+
+    def __init__(self, tweakey, tweakey_cell, rounds, Ri=0, R0=0):
+        self.rounds = rounds
+        schedule = [r if r < Ri else r + R0 for r in range(rounds)]
+        self.stk = round_tweakeys(tweakey, rounds + R0)[schedule]
+        self.constants = round_constants(rounds + R0, 7 if R0 > 0 else 6)[schedule]
+        self.masks = np.array([[int(c == tweakey_cell) for c in RT[:8]] for RT in tweakey_labels(rounds + R0)], dtype=np.uint8)[schedule]
+        self.bc = np.zeros((rounds + 1, 16), dtype=np.uint8)
+        if R0 > 0:
+            self.bc[Ri] = BRANCH_CONSTANT
+
+    def round_tweakey(self, r, tweaks):
+        return self.stk[r] ^ (self.masks[r] * tweaks[:, None])
+
+    def encrypt(self, plaintexts, tweaks):
+        state = plaintexts
+        for r in range(self.rounds):
+            state = SBOX[state ^ self.bc[r]] ^ self.constants[r]
+            state[:, :8] ^= self.round_tweakey(r, tweaks)
+            state = mix_columns(state[:, SHIFT_ROWS])
+        return state
+
+    def decrypt(self, ciphertexts, tweaks, final_round=0):
+        state = ciphertexts
+        for r in range(self.rounds - 1, final_round - 1, -1):
+            state = inv_mix_columns(state ^ self.bc[r+1])[:, SHIFT_ROWS_INV]
+            state[:, :8] ^= self.round_tweakey(r, tweaks)
+            state = SBOX_INV[state ^ self.constants[r]]
+        return state
+
+### PARTIAL SUMS #######################################################
+
+class CounterTable:
+    """
+    Parity of the number of texts for every value of the stored cells
+    """
+
+    def __init__(self, width, table_bits):
+        self.width = width
+        self.dense = 4*width <= table_bits
+        if self.dense:
+            self.weights = 16**np.arange(width, dtype=np.int64)
+            self.parity = np.zeros(16**width, dtype=np.uint8)
+        else:
+            self.rows = np.zeros((0, width), dtype=np.uint8)
+
+    def add(self, rows):
+        if self.dense:
+            index, counts = np.unique(rows.astype(np.int64) @ self.weights, return_counts=True)
+            self.parity[index[counts & 1 == 1]] ^= 1
+        else:
+            rows, counts = np.unique(np.concatenate((self.rows, rows)), axis=0, return_counts=True)
+            self.rows = rows[counts & 1 == 1]
+
+    def entries(self, chunk):
+        if self.dense:
+            index = np.flatnonzero(self.parity)
+            for i in range(0, len(index), chunk):
+                yield ((index[i:i+chunk, None] >> (4*np.arange(self.width))) & 0xf).astype(np.uint8)
+        else:
+            for i in range(0, len(self.rows), chunk):
+                yield self.rows[i:i+chunk]
+
+    def __len__(self):
+        return int(np.count_nonzero(self.parity)) if self.dense else len(self.rows)
+
+    @property
+    def nbytes(self):
+        return self.parity.nbytes if self.dense else self.rows.nbytes
+
+
+def node_value(node, values, cipher, guesses):
+    # Round i: Xi -> STKi -> Zi -(SR)-> Wi -(MC)-> Xi+1, evaluated from the stored cells towards Xi
+    if node in values:
+        return values[node]
+    name, r, i = node
+    if r >= cipher.rounds:
+        raise ValueError(f'{name}_{r}_{i} is not covered by the stored cells')
+    if name == State_name.X.value:
+        if i < 8:
+            value = SBOX_INV[node_value((State_name.STK.value, r, i), values, cipher, guesses)]
+        else:
+            value = SBOX_INV[node_value((State_name.Z.value, r, i), values, cipher, guesses) ^ cipher.constants[r][i]]
+    elif name == State_name.STK.value:
+        value = node_value((State_name.Z.value, r, i), values, cipher, guesses) ^ cipher.constants[r][i] ^ guesses.get((r, i), cipher.stk[r][i])
+        if cipher.masks[r][i]:
+            value = value ^ values[(TWEAK, r, i)]
+    elif name == State_name.Z.value:
+        value = node_value((State_name.W.value, r, SHIFT_ROWS_INV[i]), values, cipher, guesses)
+    else:
+        x = lambda row: node_value((State_name.X.value, r+1, 4*row + i%4), values, cipher, guesses) ^ cipher.bc[r+1][4*row + i%4]
+        row = i // 4
+        if row == 0:
+            value = x(1)
+        elif row == 1:
+            value = x(1) ^ x(2) ^ x(3)
+        elif row == 2:
+            value = x(1) ^ x(3)
+        else:
+            value = x(0) ^ x(3)
+    values[node] = value
+    return value
+
+def stored_cells(state, tweakey_nodes):
+    state = sorted(state, key=lambda x: (-x.round, psvisu.SORT_ORDER[x.state_name], x.index))
+    return [(n.state_name.value, n.round, n.index) for n in state] + [(TWEAK, n.round, n.index) for n in tweakey_nodes]
+
+def plan_partial_sum(keys, tweakey_setting, final_round, start_round, tweakey_cell, balanced_cells, Ri=0, R0=0):
+    # same propagation as psvisu.find_partial_sum_skinny, without the tex output
+    psvisu.sbox_use = [0]
+    tweakey_usage = {i : tweakey_setting for i in range(16)}
+    dependency_graph, tweakey_nodes = psvisu.build_dependency_graph_skinny(start_round, final_round, balanced_cells, tweakey_cell, Ri, R0)
+    visualization_info = {}
+    for node in dependency_graph:
+        psvisu.add_visualization_info(visualization_info, node, 0, 0, start=True)
+
+    state, key_candidates, tweakey_nodes = psvisu.propagate_state(dependency_graph, set(), tweakey_nodes, tweakey_usage, visualization_info, 0, 0)
+    path = [([], state, tweakey_nodes.copy())]
+    for step, step_keys in enumerate(keys):
+        key_guess = [k_c for k in step_keys for k_c in key_candidates if k_c.round == k['r'] and k_c.index == k['c']]
+        if len(step_keys) != len(key_guess):
+            raise ValueError(f'error in input file: step {step + 1} guesses a key that is not needed yet')
+        psvisu.sbox_use.append(0)
+        state, key_candidates, tweakey_nodes = psvisu.propagate_state(state, key_guess, tweakey_nodes, tweakey_usage, visualization_info, len(path), step + 1)
+        path.append((key_guess, state, tweakey_nodes.copy()))
+        for k in key_guess:
+            tweakey_usage[k.key] -= 1
+    if key_candidates:
+        raise ValueError('error in input file: the guessing order does not reach the balanced cells')
+    return path, psvisu.sbox_use
+
+def sample_guesses(size, max_guesses, correct, rng):
+    if 16**size <= max_guesses:
+        return list(itertools.product(range(16), repeat=size))
+    guesses = {correct}
+    while len(guesses) < max_guesses:
+        guesses.add(tuple(int(k) for k in rng.integers(0, 16, size)))
+    return [correct] + sorted(guesses - {correct})
+
+def transition(table, cells, new_cells, cipher, guesses, chunk, table_bits):
+    new_table = CounterTable(len(new_cells), table_bits)
+    for rows in table.entries(chunk):
+        values = {node: rows[:, j] for j, node in enumerate(cells)}
+        new_table.add(np.stack([node_value(node, values, cipher, guesses) for node in new_cells], axis=1))
+    return new_table
+
+def execute_partial_sum(parameter, log_data=16, log_chunk=16, max_guesses=16, table_bits=24, seed=None):
+    rng = np.random.default_rng(seed)
+    rounds = parameter['final_round'] + 1
+    chunk = 2**log_chunk
+    balanced_cells = parameter['balanced_cell'] if isinstance(parameter['balanced_cell'], list) else [parameter['balanced_cell']]
+    Ri, R0 = parameter.get('Ri', 0), parameter.get('R0', 0)
+    path, sbox_use = plan_partial_sum(parameter['keys'], parameter['tweakey_setting'], parameter['final_round'], parameter['start_round'], parameter['tweakey_cell'], balanced_cells, Ri, R0)
+    data_inital = 4*(16 - parameter['input_active'] + parameter['tweakey_setting'])
+
+    tweakey = rng.integers(0, 16, (parameter['tweakey_setting'], 16), dtype=np.uint8)
+    tweakey[0][parameter['tweakey_cell']] = 0
+    cipher = Skinny64(tweakey, parameter['tweakey_cell'], rounds, Ri, R0)
+    tweak_cells = [(TWEAK, r, i) for r in range(parameter['start_round'], rounds) for i in range(8) if cipher.masks[r][i]]
+
+    tracemalloc.start()
+    measurements = []
+
+    # Step 0: stream the texts into the first counter table
+    _, state, tweakey_nodes = path[0]
+    cells = stored_cells(state, tweakey_nodes)
+    data = min(data_inital, 4*len(cells))
+    tracemalloc.reset_peak()
+    base = tracemalloc.get_traced_memory()[0]
+    start_time = time.perf_counter()
+    table = CounterTable(len(cells), table_bits)
+    expected_sums = [0 for _ in balanced_cells]
+    for offset in range(0, 2**log_data, chunk):
+        n = min(chunk, 2**log_data - offset)
+        tweaks = rng.integers(0, 16, n, dtype=np.uint8)
+        ciphertexts = cipher.encrypt(rng.integers(0, 16, (n, 16), dtype=np.uint8), tweaks)
+        values = {(State_name.X.value, rounds, i): ciphertexts[:, i] for i in range(16)}
+        values.update({node: tweaks for node in tweak_cells})
+        table.add(np.stack([node_value(node, values, cipher, {}) for node in cells], axis=1))
+        state = cipher.decrypt(ciphertexts, tweaks, parameter['start_round'])
+        expected_sums = [s ^ int(np.bitwise_xor.reduce(state[:, b])) for s, b in zip(expected_sums, balanced_cells)]
+    elapsed_time = time.perf_counter() - start_time
+    measurements.append({'step': 0, 'keys': [], 'cells': len(cells),
+                         'data': data, 'memo': data, 'time': data, 'unit': math.log2(sbox_use[0]/(16*rounds)) if sbox_use[0] else None,
+                         'entries': len(table), 'bytes': table.nbytes, 'dense': table.dense, 'guesses': 1,
+                         'seconds': elapsed_time, 'peak_bytes': tracemalloc.get_traced_memory()[1] - base,
+                         'log2_total_seconds': math.log2(elapsed_time)})
+
+    # Step i: guess the subtweakey cells of the step and sum over the stored cells
+    known = {}
+    key_bits = 0
+    for step, (key_guess, state, tweakey_nodes) in enumerate(path[1:], start=1):
+        new_cells = stored_cells(state, tweakey_nodes)
+        guessed = [(k.round, k.index) for k in key_guess]
+        correct = tuple(int(cipher.stk[r][i]) for r, i in guessed)
+        seconds, peaks = [], []
+        for guess in sample_guesses(len(guessed), max_guesses, correct, rng):
+            tracemalloc.reset_peak()
+            base = tracemalloc.get_traced_memory()[0]
+            start_time = time.perf_counter()
+            new_table = transition(table, cells, new_cells, cipher, {**known, **dict(zip(guessed, guess))}, chunk, table_bits)
+            seconds.append(time.perf_counter() - start_time)
+            peaks.append(tracemalloc.get_traced_memory()[1] - base)
+            if guess == correct:
+                right_key_table = new_table
+        known.update(zip(guessed, correct))
+        key_bits += 4*len(guessed)
+        data_n = min(data_inital, 4*len(new_cells))
+        average = sum(seconds)/len(seconds)
+        measurements.append({'step': step, 'keys': [{'r': r, 'c': c} for r, c in guessed], 'cells': len(new_cells),
+                             'data': data_n, 'memo': key_bits + data_n, 'time': key_bits + data, 'unit': math.log2(sbox_use[step]/(16*rounds)) if sbox_use[step] else None,
+                             'entries': len(right_key_table), 'bytes': right_key_table.nbytes, 'dense': right_key_table.dense, 'guesses': len(seconds),
+                             'seconds': average, 'peak_bytes': max(peaks),
+                             'log2_total_seconds': math.log2(average) + key_bits if average > 0 else None})
+        table, cells, data = right_key_table, new_cells, data_n
+
+    tracemalloc.stop()
+
+    balanced = [cells.index((State_name.X.value, parameter['start_round'], b)) for b in balanced_cells]
+    partial_sums = [0 for _ in balanced_cells]
+    for rows in table.entries(chunk):
+        partial_sums = [s ^ int(np.bitwise_xor.reduce(rows[:, j])) for s, j in zip(partial_sums, balanced)]
+    return measurements, partial_sums, expected_sums
+
+def print_measurements(measurements):
+    print(" | ".join(["Step", "Keys", "Cells", "Data", "Memo", "Time", "Unit", "Entries", "Table", "Peak", "Guesses", "Sec/guess", "Total"]))
+    for m in measurements:
+        keys = ", ".join(f"{k['r']}:{k['c']}" for k in m['keys']) if m['keys'] else "--"
+        unit = f"2^{m['unit']:.1f}" if m['unit'] is not None else "--"
+        total = f"2^{m['log2_total_seconds']:.1f}s" if m['log2_total_seconds'] is not None else "--"
+        print(" | ".join([str(m['step']), keys, str(m['cells']),
+                          f"2^{m['data']}", f"2^{m['memo']}", f"2^{m['time']}", unit,
+                          str(m['entries']), f"{m['bytes']/2**20:.2f}MiB" + ("" if m['dense'] else "*"), f"{m['peak_bytes']/2**20:.2f}MiB",
+                          str(m['guesses']), f"{m['seconds']:.4f}", total]))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Execute the partial sum recovery steps on reduced-round Skinny-64 and ForkSkinny-64")
+    parser.add_argument("-d", "--data", type=int, default=16, help="log2 of the number of texts")
+    parser.add_argument("-c", "--chunk", type=int, default=16, help="log2 of the number of texts or table entries processed at once")
+    parser.add_argument("-g", "--guesses", type=int, default=16, help="Maximum number of key guesses executed per step")
+    parser.add_argument("-t", "--table-bits", type=int, default=24, help="Largest counter table (log2 of entries) kept as a dense array")
+    parser.add_argument("-r", "--seed", type=int, default=None, help="Seed for the random key and texts")
+    parser.add_argument("-o", "--output", nargs='?', help="Store the measurements in a json file")
+    parser.add_argument('input', action='store', help="input json file (output of pso.py)")
+    args = parser.parse_args()
+
+    with open(args.input, "r") as f:
+        parameter = json.load(f)
+
+    measurements, partial_sums, expected_sums = execute_partial_sum(parameter, args.data, args.chunk, args.guesses, args.table_bits, args.seed)
+    print_measurements(measurements)
+    for b, partial_sum, expected_sum in zip(parameter['balanced_cell'] if isinstance(parameter['balanced_cell'], list) else [parameter['balanced_cell']], partial_sums, expected_sums):
+        print(f'Balanced cell {b}: partial sum for the right key: {partial_sum:x}, direct sum: {expected_sum:x}', '(ok)' if partial_sum == expected_sum else '(mismatch)')
+
+    if args.output:
+        parameter['measurements'] = measurements
+        try:
+            with open(args.output, 'w') as file:
+                json.dump(parameter, file)
+        except IOError as e:
+            print(e)
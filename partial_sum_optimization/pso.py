@@ -21,12 +21,26 @@ along with this program.  If not, see <https://www.gnu.org/licenses/>.
 import minizinc
 import json
 import argparse
+import asyncio
+import time
 from datetime import timedelta
+from functools import lru_cache
 import math
 
-def propagate_dependency(start_round, final_round, balanced_cell):
+tweakey_permutation = (9, 15, 8, 13, 10, 14, 12, 11, 0, 1, 2, 3, 4, 5, 6, 7)
+
+@lru_cache(maxsize=None)
+def tweakey_at_rounds(final_round, Ri=0, R0=0):
+    # Round tweakey r uses the cell tweakey_at_rounds(...)[r][i] of the master tweakey at position i
+    RT = [tuple(range(16))]
+    for r in range(final_round + R0):
+        RT.append(tuple(RT[-1][c] for c in tweakey_permutation))
+    # ForkSkinny: the rounds of the C1 branch use the round tweakeys after the R0 rounds of the C0 branch
+    return tuple(RT[r] if r < Ri else RT[r + R0] for r in range(final_round + 1))
+
+def propagate_dependency(start_round, final_round, balanced_cells, Ri=0, R0=0):
     # Round i: Zi-1 -(ARK)-> Xi -(SR)-> Yi -(MC)-> Zi
-    X = [[True if c == balanced_cell else False for c in range(16)]]
+    X = [[True if c in balanced_cells else False for c in range(16)]]
     W = []
     or3 = lambda x, y, z: [xi or yi or zi for xi, yi, zi in zip(x, y, z)]
     shiftrows = lambda X : X[0:4] + X[7:8] + X[4:7] + X[10:12] + X[8:10] + X[13:16] + X[12:13]
@@ -35,12 +49,8 @@ def propagate_dependency(start_round, final_round, balanced_cell):
         W.append(shiftrows(X[-1]))
         X.append(mixcolumn(W[-1]))
     # Tweakey schedule
-    #RT = [[hex(c)[2:] for c in range(16)]]
-    RT = [[c for c in range(16)]] # rounds are 1-indexed
-    permute = lambda X : [X[9], X[15], X[8], X[13], X[10], X[14], X[12], X[11]] + X[:8]
-    for r in range(final_round):
-        RT.append(permute(RT[-1]))
-    return X, W, [r[:8] for r in RT[start_round:]]
+    RT = tweakey_at_rounds(final_round, Ri, R0)
+    return X, W, [list(r[:8]) for r in RT[start_round:]]
 
 def build_key_guess(RT, X, tweakey_cell, tweakey_setting):
     steps = 0
@@ -80,7 +90,7 @@ def optimize_ps(parameter):
     gecode = minizinc.Solver.lookup("com.google.ortools.sat")
     inst = minizinc.Instance(gecode, model)
 
-    X, _, RT = propagate_dependency(parameter['start_round'], parameter['final_round'], parameter['balanced_cell'])
+    X, _, RT = propagate_dependency(parameter['start_round'], parameter['final_round'], parameter['balanced_cell'], parameter['Ri'], parameter['R0'])
     _, _, steps = build_key_guess(RT, X, parameter['tweakey_cell'], parameter['tweakey_setting'])
     print(f'Max steps: {steps}')
 
@@ -88,7 +98,8 @@ def optimize_ps(parameter):
     inst["start_round"] = parameter['start_round']
     inst["final_round"] = parameter['final_round']
     inst["tweakey_cell"] = parameter['tweakey_cell']
-    inst["balanced_cell"] = parameter['balanced_cell']
+    inst["balanced_cells"] = set(parameter['balanced_cell'])
+    inst["tweakey"] = [list(r) for r in tweakey_at_rounds(parameter['final_round'], parameter['Ri'], parameter['R0'])]
     inst["input_active"] = parameter['input_active']
     if parameter['steps']:
         inst["steps"] = parameter['steps']
@@ -96,42 +107,85 @@ def optimize_ps(parameter):
         inst["steps"] = steps
     inst["scale"] = parameter['scale']
 
-    # Solve the instance
-    result = inst.solve() # processes=4, timeout=timedelta(minutes=30))
-
-    file_name = f"{parameter['tweakey_setting']}_{parameter['final_round']}_{parameter['start_round']}_{parameter['tweakey_cell']}_{parameter['balanced_cell']}_{parameter['input_active']}.json"
-
-    log2cost = math.log2(result['total_time_cost']/(16*(parameter['final_round']+1)))+parameter['scale']
-    print(f'Cost: 2^{log2cost}')
-    parameter['cost'] = result['total_time_cost']/(16*(parameter['final_round']+1)) * 2**parameter['scale']
-
-    parameter['status'] = result.status.name
-
-    try:
-        with open(file_name,"r") as f:
-            old_parameter = json.load(f)
-            if parameter['cost'] >= int(old_parameter['cost']):
-                print("There already exists a partial sum order file with a better cost! - Not writing to file")
-                return
-    except IOError as e:
-        pass
-
-    parameter['keys'] = [[] for _ in range(max(map(max, result['stk'])))]
+    balanced_cells = "-".join(map(str, parameter['balanced_cell']))
+    file_name = f"{parameter['tweakey_setting']}_{parameter['final_round']}_{parameter['start_round']}_{parameter['tweakey_cell']}_{balanced_cells}_{parameter['input_active']}"
+    if parameter['R0'] > 0:
+        file_name += f"_{parameter['Ri']}_{parameter['R0']}"
 
-    for i, round in enumerate(result['stk']):
+    # Solve the instance, every improving order is streamed to file_name.progress.jsonl
+    # and the best one so far is kept in file_name.json, so that nothing is lost if the search is killed
+    if parameter['timelimit'] is not None:
+        timeout = timedelta(seconds=parameter['timelimit'])
+    else:
+        timeout = None
+    status, written = asyncio.run(stream_ps(inst, parameter, file_name, timeout))
+
+    parameter['status'] = status.name
+    parameter['optimal'] = status == minizinc.Status.OPTIMAL_SOLUTION
+    if 'cost' not in parameter:
+        print(f'No partial sum order found - Solver status: {status.name}')
+        return
+    if parameter['optimal']:
+        print(f'Optimal cost: 2^{parameter["log2cost"]}')
+    else:
+        print(f'Best found cost: 2^{parameter["log2cost"]} (not proven optimal, solver status: {status.name})')
+    if written:
+        save_order(parameter, file_name + ".json", check_existing=False)
+
+async def stream_ps(inst, parameter, file_name, timeout):
+    start_time = time.time()
+    status = minizinc.Status.UNKNOWN
+    written = False
+    with open(file_name + ".progress.jsonl", "a") as progress_file:
+        async for result in inst.solutions(timeout=timeout, processes=parameter['processes'], intermediate_solutions=True):
+            status = result.status
+            if result.solution is None:
+                continue
+
+            log2cost = math.log2(result['total_time_cost']/(16*(parameter['final_round']+1)))+parameter['scale']
+            parameter['log2cost'] = log2cost
+            parameter['cost'] = result['total_time_cost']/(16*(parameter['final_round']+1)) * 2**parameter['scale']
+            parameter['status'] = status.name
+            parameter['optimal'] = False
+            parameter['keys'] = keys_from_solution(result['stk'], parameter['start_round'])
+
+            elapsed_time = time.time() - start_time
+            print(f'[{elapsed_time:0.2f}s] Cost: 2^{log2cost}')
+            progress_file.write(json.dumps({'time': elapsed_time, 'log2cost': log2cost, 'cost': parameter['cost'], 'keys': parameter['keys']}) + "\n")
+            progress_file.flush()
+            written = save_order(parameter, file_name + ".json", check_existing=not written) or written
+    return status, written
+
+def keys_from_solution(stk, start_round):
+    keys = [[] for _ in range(max(map(max, stk)))]
+
+    for i, round in enumerate(stk):
         for j, cell in enumerate(round):
             if cell != -1:
                 k = {}
-                k['r'] = i + parameter["start_round"]
+                k['r'] = i + start_round
                 k['c'] = j
-                parameter['keys'][cell-1].append(k)
-
+                keys[cell-1].append(k)
+    return keys
+
+def save_order(parameter, file_name, check_existing=True):
+    if check_existing:
+        try:
+            with open(file_name,"r") as f:
+                old_parameter = json.load(f)
+                if parameter['cost'] >= int(old_parameter['cost']):
+                    print("There already exists a partial sum order file with a better cost! - Not writing to file")
+                    return False
+        except IOError as e:
+            pass
 
     try:
         with open(file_name, 'w') as file:
             json.dump(parameter, file)
     except IOError as e:
         print(e)
+        return False
+    return True
 
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(description="Find partial sum recovery steps")
@@ -139,10 +193,14 @@ if __name__ == "__main__":
     parser.add_argument('final_round', action='store', type=int, help="Final round of the key recovery")
     parser.add_argument('start_round', action='store', type=int, help="Start round of the key recovery")
     parser.add_argument('tweakey_cell', action='store', type=int, help="Specify which tweakey cell is controlled by the attacker")
-    parser.add_argument('balanced_cell', action='store', type=int, help="Specify the balanced cell from the output of the distinguisher")
+    parser.add_argument('balanced_cell', action='store', type=int, nargs='+', help="Specify the balanced cells from the output of the distinguisher, the partial sums are shared between them")
     parser.add_argument('input_active', action='store', type=int, help="Specify how many cell are active at the input of the distinguisher")
     parser.add_argument('scale', action='store', type=int, help="Scale the time complexity, must be used since many solver only support limited data types")
     parser.add_argument('-s', '--steps', nargs='?', type=int, help="Specify the maximum number of steps, default are the involved subtweakey cells")
+    parser.add_argument('-Ri', '--Ri', type=int, default=0, help="ForkSkinny: number of rounds before the fork")
+    parser.add_argument('-R0', '--R0', type=int, default=0, help="ForkSkinny: number of rounds in the C0 branch, the key recovery runs on the C1 branch")
+    parser.add_argument('-t', '--timelimit', type=int, default=None, help="Time limit in seconds, the best order found so far is kept")
+    parser.add_argument('-p', '--processes', type=int, default=None, help="Number of threads used by the solver")
     parameter = parser.parse_args()
 
     optimize_ps(vars(parameter))
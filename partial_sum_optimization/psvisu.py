@@ -25,11 +25,18 @@ import json
 import os
 import contextlib
 import argparse
+import colorsys
+import sys
+from pathlib import Path
+# the modules shared by the tools of several ciphers are in the folder shared of the repository
+sys.path.append(str(Path(__file__).resolve().parents[1] / "shared"))
+from drawsvg import SkinnySVG, Cells
 
 data_inital = 0
 args = None
 rounds = 0
 sbox_use = []
+svg_page = 0
 
 class State_name(Enum):
     X = 'X'
@@ -141,55 +148,86 @@ def tex_skinny_start():
   \SkinnyInit{}{}{}{}""")
 
 def tex_skinny_state(state):
+    cells = Cells()
     if not state:
-        return ""
-    if args.color:
-        if args.memory:
-            fill = "".join([r"\Fill[" + v[0] + ("!50" if v[1] else "") + "]{ss" + k + r"}" for k, v in state.items()])
-        else:
-            fill = "".join([r"\Fill[" + v[0] + "]{ss" + k + r"}" for k, v in state.items()])
-    else:
-        if args.memory:
-            fill = "".join([r"\Fill[blue" + ("!80" if v[1] else "!50") + "]{ss" + k + r"}" for k, v in state.items()])
+        return cells
+    for k, v in state.items():
+        cell = (int(k[0]), int(k[1]))
+        if args.color:
+            cells.fill(cell, (v[0] + ("!50" if v[1] else "")) if args.memory else v[0])
         else:
-            fill = "".join([r"\Fill{ss" + k + r"}" for k, _ in state.items()])
-    
+            cells.fill(cell, ("blue" + ("!80" if v[1] else "!50")) if args.memory else None)
     if args.step_number:
-        return fill + "".join([r"\Cell{ss" + k + r"}{\ttfamily " + str(v[2]) + r"}" for k, v in state.items()])
-    else:
-        return fill
+        for k, v in state.items():
+            cells.text((int(k[0]), int(k[1])), str(v[2]))
+    return cells
 
 
 def tex_skinny_stkey(state):
+    cells = Cells()
     if not state:
-        return ""
-    if args.color:
-        fill = "".join([r"\Fill[" + (v[1] + "!75" if v[2] else v[1]) + "]{ss" + k + r"}" for k, v in state.items()])
-    else:
-        fill = "".join([r"\Fill" + ("" if v[2] else "[key]") + "{ss" + k + r"}" for k, v in state.items()])
-    return fill + "".join([r"\Cell{ss" + k + r"}{\ttfamily " + hex(v[0])[2:] + r"}" for k, v in state.items()])
+        return cells
+    for k, v in state.items():
+        cell = (int(k[0]), int(k[1]))
+        if args.color:
+            cells.fill(cell, v[1] + "!75" if v[2] else v[1])
+        else:
+            cells.fill(cell, None if v[2] else "key")
+    for k, v in state.items():
+        cells.text((int(k[0]), int(k[1])), hex(v[0])[2:])
+    return cells
 
 def tex_skinny_round(r, X_, W, Z, STK, X, final=False):
     print(r"""
   \SkinnyRoundTK[""" + str(r) + r"""] % round number should be 0-indexed
-                {""" + tex_skinny_state(X) + r"""} % state (input)
-                {""" + tex_skinny_stkey(STK) + r"""}{}{} % tk[1,2,3]
-                {""" + tex_skinny_state(X) + r"""} % state (after subcells)
-                {""" + tex_skinny_state(Z) + r"""} % state (after addtweakey)
-                {""" + tex_skinny_state(W) + r"""} % state (after shiftrows)""")
+                {""" + tex_skinny_state(X).tikz() + r"""} % state (input)
+                {""" + tex_skinny_stkey(STK).tikz() + r"""}{}{} % tk[1,2,3]
+                {""" + tex_skinny_state(X).tikz() + r"""} % state (after subcells)
+                {""" + tex_skinny_state(Z).tikz() + r"""} % state (after addtweakey)
+                {""" + tex_skinny_state(W).tikz() + r"""} % state (after shiftrows)""")
     if final:
         print(r"""
   \SkinnyFin[""" + str(r+1) + r"""]
-                {""" + tex_skinny_state(X_) + r"""}""")
+                {""" + tex_skinny_state(X_).tikz() + r"""}""")
     else:
         print(r"""
   \SkinnyNewLine[""" + str(r+1) + r"""]
-                {""" + tex_skinny_state(X_) + r"""} % state (after mixcolumns)""")
+                {""" + tex_skinny_state(X_).tikz() + r"""} % state (after mixcolumns)""")
 
 def tex_skinny_final():
     print(r"""\end{tikzpicture}""")
 
+### SVG OUTPUT #########################################################
+
+def svg_colors():
+    # same colours as tex_doc_start
+    c = len(parameter['keys']) + 1
+    colors = {"key" : "tuggreen"}
+    for i in range(c):
+        rgb = colorsys.hsv_to_rgb((i//3)/max(c//3, 1), 0.75-((i/3)%1)*.75, 0.5)
+        colors[f"c{i}"] = "#" + "".join("{:02X}".format(round(255*v)) for v in rgb)
+    return colors
+
+def svg_skinny_figure(visualization_info):
+    global svg_page
+    figure = SkinnySVG(colors=svg_colors(), title="Partial sum key recovery")
+    for i in range(parameter['start_round'], parameter['final_round'] + 1):
+        X = visualization_info['X', i] if ('X', i) in visualization_info else None
+        X_ = visualization_info['X', i+1] if ('X', i+1) in visualization_info else None
+        W = visualization_info['W', i] if ('W', i) in visualization_info else None
+        Z = visualization_info['Z', i] if ('Z', i) in visualization_info else None
+        STK = visualization_info['STK', i] if ('STK', i) in visualization_info else None
+        figure.round_tk(i, tex_skinny_state(X), tex_skinny_stkey(STK), tex_skinny_state(X), tex_skinny_state(Z), tex_skinny_state(W))
+        if i == parameter['final_round']:
+            figure.fin(i+1, tex_skinny_state(X_))
+        else:
+            figure.new_line(i+1, tex_skinny_state(X_))
+    figure.save(arg.split('.')[0] + (f"_{svg_page}" if args.steps else "") + ".svg")
+    svg_page += 1
+
 def save_state_to_file(path, visualization_info, total_cost, last_page=True):
+    if args.svg:
+        svg_skinny_figure(visualization_info)
     with open(arg.split('.')[0] + ".tex", "a") as texfile:
         with contextlib.redirect_stdout(texfile):
             print(r"\begin{page}")
@@ -234,20 +272,22 @@ def add_previous_node(current_nodes, round, state_name, index, previous_node, ke
         else:
             current_nodes[index].add_previous(previous_node)
 
-def build_dependency_graph_skinny(start_round, final_round, balanced_cell, tweakey_cell):
+def build_dependency_graph_skinny(start_round, final_round, balanced_cells, tweakey_cell, Ri=0, R0=0):
     # Round i: Xi -> STKi -> Zi -(SR)-> Wi -(MC)-> Xi+1
 
     shift_rows_i = [0, 1, 2, 3, 7, 4, 5, 6, 10, 11, 8, 9, 13, 14, 15, 12]
 
-    current_nodes = [Node(None, start_round, State_name.X, c) if c == balanced_cell else None for c in range(16)]
+    current_nodes = [Node(None, start_round, State_name.X, c) if c in balanced_cells else None for c in range(16)]
 
     tweakey_nodes = []
 
     # Tweakey schedule
     RT = [[], [c for c in range(16)]] # rounds are 1-indexed
     permute = lambda X : [X[9], X[15], X[8], X[13], X[10], X[14], X[12], X[11]] + X[:8]
-    for r in range(final_round):
+    for r in range(final_round + R0):
         RT.append(permute(RT[-1]))
+    # ForkSkinny: the rounds of the C1 branch use the round tweakeys after the R0 rounds of the C0 branch
+    RT = [[]] + [RT[r+1] if r < Ri else RT[r+R0+1] for r in range(final_round + 1)]
 
 
     for r in range(start_round, final_round+1):
@@ -331,6 +371,9 @@ def propagate_state(state, key_guess, tweakey_nodes, tweakey_usage, visualizatio
 
         new_state = set()
         for node in state:
+            # balanced cells are kept until the end, they are shared by all partial sums
+            if not node.previous_nodes:
+                new_state.add(node)
             for previous_node in reversed(node.previous_nodes):
                 previous_node.incoming_count -= 1
                 if previous_node.incoming_count == 0:
@@ -411,7 +454,7 @@ def find_partial_sum(state, key_candidates, tweakey_nodes, tweakey_usage, total_
     find_partial_sum(state, key_candidates, tweakey_nodes, tweakey_usage, cost, total_number_keys + len(key_guess) * 4, path, keys[1:], visualization_info, current_step+1)
 
 
-def find_partial_sum_skinny(keys, tweakey_setting, final_round, start_round, tweakey_cell, balanced_cell, input_active=1):
+def find_partial_sum_skinny(keys, tweakey_setting, final_round, start_round, tweakey_cell, balanced_cells, input_active=1, Ri=0, R0=0):
     global data_inital, sbox_use
 
     current_step = 0
@@ -420,7 +463,7 @@ def find_partial_sum_skinny(keys, tweakey_setting, final_round, start_round, twe
 
     data_inital = 4*(16 - input_active + tweakey_setting)
 
-    dependency_graph, tweakey_nodes = build_dependency_graph_skinny(start_round, final_round, balanced_cell, tweakey_cell)
+    dependency_graph, tweakey_nodes = build_dependency_graph_skinny(start_round, final_round, balanced_cells, tweakey_cell, Ri, R0)
     
     sbox_use.append(0)
     visualization_info = {}
@@ -441,6 +484,7 @@ if __name__ == "__main__":
     parser.add_argument("-n", "--step-number", action="store_true", help="Put the step number in each cell except the stk")
     parser.add_argument("-m", "--memory", action="store_true", help="Mark which states have to be stored in memory")
     parser.add_argument("-p", "--pdf", action="store_true", help="Run latexmk and output pdf")
+    parser.add_argument("-g", "--svg", action="store_true", help="Also draw the rounds into an svg file (one per step with -s), without LaTeX")
     parser.add_argument('input', action='store', nargs="+", help="input json file")
     args = parser.parse_args()
 
@@ -450,8 +494,10 @@ if __name__ == "__main__":
                 parameter = json.load(f)
 
             tex_doc_start()
+            svg_page = 0
             rounds = parameter['final_round']+1
-            find_partial_sum_skinny(parameter['keys'], parameter['tweakey_setting'], parameter['final_round'], parameter['start_round'], parameter['tweakey_cell'], parameter['balanced_cell'], parameter['input_active'])
+            balanced_cells = parameter['balanced_cell'] if isinstance(parameter['balanced_cell'], list) else [parameter['balanced_cell']]
+            find_partial_sum_skinny(parameter['keys'], parameter['tweakey_setting'], parameter['final_round'], parameter['start_round'], parameter['tweakey_cell'], balanced_cells, parameter['input_active'], parameter.get('Ri', 0), parameter.get('R0', 0))
             tex_doc_final()
 
             if args.pdf:
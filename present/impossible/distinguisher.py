@@ -27,14 +27,21 @@ SOFTWARE.
 
 import logging
 from pathlib import Path
-from random import randint
+from random import randint, sample
 logging.basicConfig(filename="minizinc-python.log", level=logging.DEBUG)
 import time
+import asyncio
 import minizinc
 import datetime
+from dataclasses import dataclass, field, replace
 from argparse import ArgumentParser, RawTextHelpFormatter
 from drawdistinguisher import DrawDL
-import itertools
+import screening
+import numpy as np
+import os
+import struct
+import csv
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
 
 # Check if "OR Tools" appears in the output of "minizinc --solvers" command 
 import subprocess
@@ -49,14 +56,34 @@ try:
 except FileNotFoundError:
     ortools_available = False
 
+# -1 indexes the last entry, so unknown bits are printed as '?'
+TERNARY_DIGITS = np.array(["0", "1", "?"])
 
-class ID:
-    DL_counter = 0
 
+@dataclass
+class SearchResult:
+    """
+    Result of a search, without printing or drawing: the solver status, the elapsed time, the summary printed
+    by search(), the decoded trails of the distinguisher and the MiniZinc result. If restricted is set, only the
+    screened candidates were searched, so an optimum or a proof of unsatisfiability among them is reported as
+    SATISFIED or UNKNOWN
+    """
+
+    status: minizinc.Status
+    elapsed_time: float
+    summary: str = ""
+    values: dict = field(default_factory=dict)
+    solution: minizinc.Result = None
+    restricted: bool = False
+
+    @property
+    def has_solution(self):
+        return self.status.has_solution()
+
+class ID:
     def __init__(self, param) -> None:
-        ID.DL_counter += 1
-        self.id = ID.DL_counter
-        self.name = "ID" + str(self.id)
+        self.param = param
+        self.name = "ID_RD{}".format(param["RD"])
         self.type = "ID"
         self.RD = param["RD"]
         self.cp_solver_name = param["solver"]
@@ -65,6 +92,11 @@ class ID:
         self.time_limit = param["timelimit"]
         self.mzn_file_name = None
         self.output_file_name = param["output"]
+        self.screen_input_weight = param["screen_input_weight"]
+        self.screen_output_weight = param["screen_output_weight"]
+        self.screen_keep = param["screen_keep"]
+        self.num_of_seeds = param["seeds"]
+        self.luby_unit = param["luby_unit"]
         self.mzn_file_name = "distinguisher.mzn"
     
     #############################################################################################################################################
@@ -77,9 +109,10 @@ class ID:
     #                                                                                                  |___/                                   
     # Search for a distinguisher using MiniZinc
 
-    def search(self):
+    async def solve_async(self, verbose=False, debug_output=None):
         """
-        Search for a distinguisher
+        Search for a distinguisher (after screening, and with the portfolio if it is enabled) and return it as a
+        SearchResult, without drawing it. The progress messages are only printed if verbose is set
         """
 
         if self.time_limit != -1:
@@ -89,36 +122,345 @@ class ID:
     
         start_time = time.time()
         #############################################################################################################################################
-        print(f"Searching for a distinguisher for {self.RD} rounds of PRESENT ...")
+        # Screen low-weight distinguishers with the bit-vector propagation and pass only the best ones to the CP model
+        candidates = [(set(), set())]
+        if self.screen_input_weight > 0 and self.screen_output_weight > 0:
+            if verbose:
+                print(f"Screening low-weight distinguishers for {self.RD} rounds of PRESENT ...")
+            pairs = screening.screen(self.RD, self.screen_input_weight, self.screen_output_weight, self.screen_keep, processes=self.num_of_threads)
+            if verbose:
+                print("Time used to screen the distinguishers: {:0.02f} seconds".format(time.time() - start_time))
+            if len(pairs) > 0:
+                if verbose:
+                    print(f"Number of candidates passed to the CP model: {len(pairs)}")
+                candidates = [(screening.active_bits(input_diff), screening.active_bits(output_diff)) for input_diff, output_diff in pairs]
+            elif verbose:
+                print("No candidate was found by screening, the CP model is solved without restriction")
+        if verbose:
+            print(f"Searching for a distinguisher for {self.RD} rounds of PRESENT ...")
         self.cp_model = minizinc.Model()
         self.cp_model.add_file(self.mzn_file_name)
-        self.cp_inst = minizinc.Instance(solver=self.cp_solver, model=self.cp_model)
-        self.cp_inst["RD"] = self.RD        
-        self.cp_inst["offset"] = 0
-        self.result = self.cp_inst.solve(timeout=time_limit, 
-                                         processes=self.num_of_threads, 
-                                         verbose=False, 
-                                         debug_output=Path("./debug_output.txt",
-                                         intermediate_solutions=True),
-                                         random_seed=randint(0, 100),
-                                         optimisation_level=2)
+        result = minizinc.Result(minizinc.Status.UNKNOWN, None, {})
+        for index, (input_active, output_active) in enumerate(candidates):
+            candidate_time_limit = time_limit
+            if time_limit is not None:
+                # the candidates share one time budget, each of them gets an equal part of what is left
+                remaining = start_time + time_limit.total_seconds() - time.time()
+                if remaining <= 0:
+                    break
+                candidate_time_limit = datetime.timedelta(seconds=remaining / (len(candidates) - index))
+            if self.num_of_seeds > 1 or self.luby_unit > 0:
+                candidate = await self.solve_portfolio(input_active, output_active, candidate_time_limit, verbose)
+            else:
+                cp_inst = self.create_instance(input_active, output_active)
+                candidate = await cp_inst.solve_async(timeout=candidate_time_limit, 
+                                                      processes=self.num_of_threads, 
+                                                      debug_output=debug_output,
+                                                      random_seed=randint(0, 100),
+                                                      optimisation_level=2)
+            if index == 0 or (minizinc.Status.has_solution(candidate.status) and
+                              (not minizinc.Status.has_solution(result.status) or candidate.objective < result.objective)):
+                result = candidate
         #############################################################################################################################################
-        elapsed_time = time.time() - start_time
-        print("Time used to find a distinguisher: {:0.02f} seconds".format(elapsed_time))
-        print(f"Solver status: {self.result.status}")
-        if minizinc.Status.has_solution(self.result.status) or self.result.status == minizinc.Status.ERROR:
-            self.attack_summary, self.upper_trail, self.lower_trail = self.parse_solution()
-            print(self.attack_summary)
-            self.attack_summary += "Time used to find a distinguisher: {:0.2f} seconds\n".format(elapsed_time)
-            draw = DrawDL(self, output_file_name=self.output_file_name)
-            draw.generate_distinguisher_shape()  
-        elif self.result.status == minizinc.Status.UNSATISFIABLE:
+        restricted = candidates != [(set(), set())]
+        status = result.status
+        if restricted:
+            status = {minizinc.Status.OPTIMAL_SOLUTION: minizinc.Status.SATISFIED,
+                      minizinc.Status.UNSATISFIABLE: minizinc.Status.UNKNOWN}.get(status, status)
+        search_result = SearchResult(status=status, elapsed_time=time.time() - start_time, solution=result, restricted=restricted)
+        if search_result.has_solution or result.status == minizinc.Status.ERROR:
+            try:
+                summary, upper_trail, lower_trail, contradiction_locations = self.parse_solution(result)
+                search_result.values = {"upper_trail" : upper_trail, "lower_trail" : lower_trail, "contradiction_locations" : contradiction_locations}
+                search_result.summary = summary + "Time used to find a distinguisher: {:0.2f} seconds\n".format(search_result.elapsed_time)
+                if restricted:
+                    search_result.summary += "Only the screened candidates were searched, the distinguisher is the best among them\n"
+            except (KeyError, TypeError):
+                # an error status may come without a solution to parse
+                pass
+        return search_result
+
+    def solve(self, verbose=False, debug_output=None):
+        """
+        Blocking variant of solve_async
+        """
+
+        return asyncio.run(self.solve_async(verbose, debug_output))
+
+    def draw(self, search_result, output_file_name=None):
+        """
+        Write the shape of the distinguisher of a SearchResult into a Tikz file, or into an SVG file if its name ends with .svg
+        """
+
+        self.result = search_result.solution
+        self.attack_summary = search_result.summary
+        self.upper_trail = search_result.values["upper_trail"]
+        self.lower_trail = search_result.values["lower_trail"]
+        self.contradiction_locations = search_result.values["contradiction_locations"]
+        draw = DrawDL(self, output_file_name=self.output_file_name if output_file_name is None else output_file_name)
+        if draw.output_file_name.endswith(".svg"):
+            draw.generate_distinguisher_shape_svg()
+        else:
+            draw.generate_distinguisher_shape()
+
+    def search(self):
+        """
+        Search for a distinguisher, print its specifications and draw its shape
+        """
+
+        search_result = self.solve(verbose=True, debug_output=Path("./debug_output.txt"))
+        self.result = search_result.solution
+        print("Time used to find a distinguisher: {:0.02f} seconds".format(search_result.elapsed_time))
+        print(f"Solver status: {search_result.status}")
+        if "upper_trail" in search_result.values:
+            print(search_result.summary)
+            self.draw(search_result)
+        elif search_result.restricted and search_result.status == minizinc.Status.UNKNOWN:
+            print("No distinguisher was found among the screened candidates")
+        elif search_result.status == minizinc.Status.UNSATISFIABLE:
             print("Model is unsatisfiable") 
-        elif self.result.status == minizinc.Status.UNKNOWN:
+        elif search_result.status == minizinc.Status.UNKNOWN:
             print("Unknown error!")
         else:
             print("Solving process was interrupted")
 
+    def create_instance(self, input_active, output_active, objective_bound=128):
+        """
+        Create an instance of the CP model
+        """
+
+        cp_inst = minizinc.Instance(solver=self.cp_solver, model=self.cp_model)
+        cp_inst["RD"] = self.RD
+        cp_inst["offset"] = 0
+        cp_inst["input_active"] = input_active
+        cp_inst["output_active"] = output_active
+        cp_inst["objective_bound"] = objective_bound
+        return cp_inst
+
+    async def solve_portfolio(self, input_active, output_active, time_limit, verbose=True):
+        """
+        Run num_of_seeds solvers with different random seeds in parallel. Every solution is shared as soon as it
+        is found: the other solvers are restarted with the objective bounded by the new incumbent. If
+        luby_unit > 0, each solver is also restarted on a Luby schedule (in units of luby_unit seconds). Stop as
+        soon as one of them proves optimality, in which case the incumbent has the status OPTIMAL_SOLUTION if
+        the search is not restricted to a screened candidate
+        """
+
+        if time_limit is not None:
+            deadline = time.time() + time_limit.total_seconds()
+        else:
+            deadline = None
+        processes = max(1, self.num_of_threads // self.num_of_seeds)
+        seeds = sample(range(0, 100000, 1000), self.num_of_seeds)
+        incumbent = {"result": None, "proof": None}
+        improved = {seed: asyncio.Event() for seed in seeds}
+
+        async def run(seed, cp_inst, timeout, random_seed):
+            final = None
+            async for result in cp_inst.solutions(timeout=None if timeout is None else datetime.timedelta(seconds=timeout),
+                                                  processes=processes,
+                                                  random_seed=random_seed,
+                                                  intermediate_solutions=True,
+                                                  optimisation_level=2):
+                final = result
+                if result.solution is not None:
+                    best = incumbent["result"]
+                    if best is None or result.objective < best.objective:
+                        incumbent["result"] = result
+                        for other in seeds:
+                            if other != seed:
+                                improved[other].set()
+            return final
+
+        async def worker(seed):
+            restart = 1
+            while True:
+                timeout = None
+                if self.luby_unit > 0:
+                    timeout = luby(restart) * self.luby_unit
+                if deadline is not None:
+                    remaining = deadline - time.time()
+                    if remaining <= 0:
+                        return False
+                    timeout = remaining if timeout is None else min(timeout, remaining)
+                best = incumbent["result"]
+                objective_bound = 128 if best is None else best.objective - 1
+                cp_inst = self.create_instance(input_active, output_active, objective_bound)
+                improved[seed].clear()
+                solving = asyncio.create_task(run(seed, cp_inst, timeout, seed + restart))
+                waiting = asyncio.create_task(improved[seed].wait())
+                await asyncio.wait([solving, waiting], return_when=asyncio.FIRST_COMPLETED)
+                waiting.cancel()
+                restart += 1
+                if not solving.done():
+                    # another solver found a better incumbent, restart with the tighter bound
+                    solving.cancel()
+                    await asyncio.gather(solving, return_exceptions=True)
+                    continue
+                result = solving.result()
+                if result is not None and result.status in [minizinc.Status.OPTIMAL_SOLUTION, minizinc.Status.UNSATISFIABLE]:
+                    # nothing better than the incumbent exists (or the model is unsatisfiable)
+                    incumbent["proof"] = result
+                    return True
+                if self.luby_unit == 0:
+                    return False
+
+        tasks = [asyncio.create_task(worker(seed)) for seed in seeds]
+        proved = False
+        for finished in asyncio.as_completed(tasks):
+            if await finished:
+                proved = True
+                break
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        if proved and verbose:
+            print("Optimality was proved by one of the parallel solvers")
+        restricted = len(input_active) > 0 or len(output_active) > 0
+        if incumbent["result"] is not None:
+            if proved and not restricted:
+                return replace(incumbent["result"], status=minizinc.Status.OPTIMAL_SOLUTION)
+            return replace(incumbent["result"], status=minizinc.Status.SATISFIED)
+        if proved:
+            return incumbent["proof"]
+        return minizinc.Result(minizinc.Status.UNKNOWN, None, {})
+
+    def enumerate_distinguishers(self, output_file_name, workers=1):
+        """
+        Enumerate all optimal distinguishers up to the symmetries given by screening.symmetries, and write them
+        into a binary file. Each distinguisher is stored in its canonical (smallest) form as four little-endian
+        64-bit words: the input bits fixed to 1, the unknown input bits, the output bits fixed to 1 and the
+        unknown output bits (bit i is position i of the state)
+        """
+
+        if self.time_limit != -1:
+            time_limit = datetime.timedelta(seconds=self.time_limit)
+        else:
+            time_limit = None
+        start_time = time.time()
+        print(f"Searching for the optimal objective for {self.RD} rounds of PRESENT ...")
+        self.cp_model = minizinc.Model()
+        self.cp_model.add_file(self.mzn_file_name)
+        result = self.create_instance(set(), set()).solve(timeout=time_limit,
+                                                          processes=self.num_of_threads,
+                                                          random_seed=randint(0, 100),
+                                                          optimisation_level=2)
+        if result.status != minizinc.Status.OPTIMAL_SOLUTION:
+            print(f"The optimal objective was not found (solver status: {result.status})")
+            return []
+        print(f"Optimal objective: {result.objective}")
+        # Split the input nibbles among the workers: a distinguisher belongs to the partition of the
+        # first nibble of its input that is not zero
+        partitions = [list(range(worker, 16, workers)) for worker in range(workers)]
+        part_file_names = [f"{output_file_name}.part{worker}" for worker in range(workers)]
+        tasks = [(self.param, result.objective, nibbles, part_file_name) for nibbles, part_file_name in zip(partitions, part_file_names)]
+        if workers == 1:
+            list(map(enumerate_partition, tasks))
+        else:
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                list(pool.map(enumerate_partition, tasks))
+        # Merge the partitions (the same orbit can be found in several partitions)
+        distinguishers = set()
+        for part_file_name in part_file_names:
+            with open(part_file_name, "rb") as part_file:
+                data = part_file.read()
+            distinguishers.update(struct.iter_unpack("<QQQQ", data))
+            os.remove(part_file_name)
+        distinguishers = sorted(distinguishers)
+        with open(output_file_name, "wb") as output_file:
+            for words in distinguishers:
+                output_file.write(struct.pack("<QQQQ", *words))
+        print(f"Number of optimal distinguishers up to symmetry: {len(distinguishers)}")
+        print(f"Distinguishers were written into {output_file_name}")
+        print("Time used to enumerate the distinguishers: {:0.02f} seconds".format(time.time() - start_time))
+        return read_distinguishers(output_file_name)
+
+    def satisfaction_model(self):
+        """
+        Return the model as a satisfaction problem whose only output is the ternary input/output pattern, so
+        that all solutions of the solver are distinct distinguishers (the objective is fixed by objective_bound)
+        """
+
+        model = Path(self.mzn_file_name).read_text()
+        objective = "solve minimize sum(i in 0..63)(xu[0, i] + xl[RD, i]);"
+        if objective not in model:
+            raise ValueError(f"The objective of {self.mzn_file_name} was not found")
+        return model.replace(objective,
+                             "array[0..63] of var -1..1: input_pattern ::add_to_output = array1d(0..63, [xu[0, i] | i in 0..63]);\n"
+                             "array[0..63] of var -1..1: output_pattern ::add_to_output = array1d(0..63, [xl[RD, i] | i in 0..63]);\n"
+                             "solve satisfy;")
+
+    def enumerate_nibbles(self, objective, nibbles, part_file_name):
+        """
+        Enumerate the distinguishers with the given objective whose first nonzero input nibble is in nibbles,
+        in a single all-solutions run of the solver. The canonical form of every new orbit is streamed to
+        part_file_name
+        """
+
+        if self.time_limit != -1:
+            time_limit = datetime.timedelta(seconds=self.time_limit)
+        else:
+            time_limit = None
+        group = screening.symmetries(self.RD)
+        partition = "constraint exists(n in {" + ", ".join(map(str, nibbles)) + "})" + \
+                    "(exists(i in 4*n..4*n + 3)(xu[0, i] != 0) /\\ forall(i in 0..4*n - 1)(xu[0, i] = 0));\n"
+        self.cp_model = minizinc.Model()
+        self.cp_model.add_string(self.satisfaction_model() + partition)
+        cp_inst = self.create_instance(set(), set(), objective)
+        canonical_forms = set()
+
+        async def stream(part_file):
+            status = minizinc.Status.UNKNOWN
+            async for result in cp_inst.solutions(timeout=time_limit,
+                                                  processes=self.num_of_threads,
+                                                  random_seed=randint(0, 100),
+                                                  all_solutions=True,
+                                                  optimisation_level=2):
+                status = result.status
+                if result.solution is None:
+                    continue
+                input_state = to_state(np.array(result["input_pattern"], dtype=np.int8))
+                output_state = to_state(np.array(result["output_pattern"], dtype=np.int8))
+                canonical = min(screening.orbit(input_state, output_state, group))
+                if canonical not in canonical_forms:
+                    canonical_forms.add(canonical)
+                    part_file.write(struct.pack("<QQQQ", *canonical[0], *canonical[1]))
+                    part_file.flush()
+            return status
+
+        with open(part_file_name, "wb") as part_file:
+            status = asyncio.run(stream(part_file))
+        if status not in [minizinc.Status.ALL_SOLUTIONS, minizinc.Status.UNSATISFIABLE]:
+            print(f"Enumeration of nibbles {nibbles} is incomplete (solver status: {status})")
+        return len(canonical_forms)
+
+    def solve_configuration(self):
+        """
+        Solve the model once (without drawing) and summarize the result as a row of the sweep table
+        """
+
+        if self.time_limit != -1:
+            time_limit = datetime.timedelta(seconds=self.time_limit)
+        else:
+            time_limit = None
+        start_time = time.time()
+        self.cp_model = minizinc.Model()
+        self.cp_model.add_file(self.mzn_file_name)
+        result = self.create_instance(set(), set()).solve(timeout=time_limit,
+                                                          processes=self.num_of_threads,
+                                                          random_seed=randint(0, 100),
+                                                          optimisation_level=2)
+        row = {"RD": self.RD, "status": result.status.name, "objective": None,
+               "non_fixed_input_bits": None, "non_fixed_output_bits": None, "input": None, "output": None}
+        if minizinc.Status.has_solution(result.status):
+            row["objective"] = result.objective
+            row["non_fixed_input_bits"] = result["num_non_fixed_input_bits"]
+            row["non_fixed_output_bits"] = result["num_non_fixed_output_bits"]
+            row["input"] = to_string(np.array(result["xu"][0], dtype=np.int8))
+            row["output"] = to_string(np.array(result["xl"][self.RD], dtype=np.int8))
+        row["time"] = round(time.time() - start_time, 2)
+        return row
+
     #############################################################################################################################################
     #############################################################################################################################################
     #  ____                           _    _             ____          _         _    _               
@@ -128,36 +470,28 @@ class ID:
     # |_|    \__,_||_|   |___/ \___|  \__||_| |_| \___| |____/  \___/ |_| \__,_| \__||_| \___/ |_| |_|
     # Parse the solution and print the distinguisher's specifications
 
-    def parse_solution(self):
+    def parse_solution(self, result=None):
         """
         Parse the solution and print the distinguisher's specifications
         """
+
+        if result is None:
+            result = self.result
+        upper_trail = {"x": np.array(result["xu"], dtype=np.int8).reshape(self.RD + 1, 64),
+                       "y": np.array(result["yu"], dtype=np.int8).reshape(self.RD, 64)}
+        lower_trail = {"x": np.array(result["xl"], dtype=np.int8).reshape(self.RD + 1, 64),
+                       "y": np.array(result["yl"], dtype=np.int8).reshape(self.RD, 64)}
+        input_diff = to_string(upper_trail["x"][0]) + ";\n"
+        output_mask = to_string(lower_trail["x"][self.RD]) + ";\n"
         
-        upper_trail = {"x": [[0 for _ in range(64)] for _ in range(self.RD + 1)],
-                       "y": [[0 for _ in range(64)] for _ in range(self.RD)]}
-        for r in range(self.RD + 1):
-            upper_trail["x"][r] = self.result["xu"][r]
-            if r < self.RD:
-                upper_trail["y"][r] = self.result["yu"][r]
-        lower_trail = {"x": [[0 for _ in range(64)] for _ in range(self.RD + 1)],
-                       "y": [[0 for _ in range(64)] for _ in range(self.RD)]}
-        for r in range(self.RD + 1):
-            lower_trail["x"][r] = self.result["xl"][r]
-            if r < self.RD:
-                lower_trail["y"][r] = self.result["yl"][r]
-        input_diff = ""
-        input_diff += "".join(list(map(str, self.result["xu"][0]))).replace("-1", "?") + ";\n"
-        output_mask = ""
-        output_mask += "".join(list(map(str, self.result["xl"][self.RD]))).replace("-1", "?") + ";\n"
-        
-        num_non_fixed_input_bits = self.result["num_non_fixed_input_bits"]
-        num_non_fixed_output_bits = self.result["num_non_fixed_output_bits"]
-        self.contradiction_locations = [(r, i) for r, i in itertools.product(range(self.RD), range(64)) if self.result["contradictx"][r][i] == 1]
+        num_non_fixed_input_bits = result["num_non_fixed_input_bits"]
+        num_non_fixed_output_bits = result["num_non_fixed_output_bits"]
+        contradiction_locations = list(map(tuple, np.argwhere(np.array(result["contradictx"], dtype=np.int8) == 1).tolist()))
 
         attack_summary = f"Attack summary:\n"
         attack_summary += f"Setting: RD: {self.RD}\n"
         attack_summary += "#"*80 + "\n"
-        attack_summary += f"Contradiction locations: {self.contradiction_locations}\n"
+        attack_summary += f"Contradiction locations: {contradiction_locations}\n"
         attack_summary += "#"*80 + "\n"
         attack_summary += f"input: \n{input_diff}"
         attack_summary += "#"*80 + "\n"
@@ -165,7 +499,107 @@ class ID:
         attack_summary += "#"*80 + "\n"
         attack_summary += f"Number of non-fixed input bits: {num_non_fixed_input_bits}\n"
         attack_summary += f"Number of non-fixed output bits: {num_non_fixed_output_bits}\n"        
-        return attack_summary, upper_trail, lower_trail
+        return attack_summary, upper_trail, lower_trail, contradiction_locations
+
+def solve_configuration(args):
+    """
+    Solve one configuration of the sweep in a worker process
+    """
+
+    param, RD = args
+    param = dict(param, RD=RD)
+    return ID(param).solve_configuration()
+
+def sweep(param, rounds, workers=1):
+    """
+    Solve the model for every RD in rounds on a bounded pool of worker processes, and return the table
+    of results. As soon as no distinguisher exists for RD rounds, the configurations with more rounds
+    are dominated (a longer distinguisher contains a shorter one) and are pruned
+    """
+
+    # the threads are shared among the workers
+    param = dict(param, threads=max(1, param["threads"] // workers))
+    pending = sorted(set(rounds))
+    rows = dict()
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        running = set()
+        while pending or running:
+            # at most one configuration per worker is submitted, so that dominated ones are never started
+            while pending and len(running) < workers:
+                running.add(pool.submit(solve_configuration, (param, pending.pop(0))))
+            done, running = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                row = future.result()
+                rows[row["RD"]] = row
+                if row["status"] == "UNSATISFIABLE":
+                    for RD in [RD for RD in pending if RD > row["RD"]]:
+                        pending.remove(RD)
+                        rows[RD] = {"RD": RD, "status": "PRUNED"}
+    return [rows[RD] for RD in sorted(rows)]
+
+def print_table(table, csv_file_name=None):
+    """
+    Print the sweep table and optionally write it into a CSV file
+    """
+
+    columns = ["RD", "status", "objective", "non_fixed_input_bits", "non_fixed_output_bits", "time", "input", "output"]
+    print("#"*80)
+    print(" | ".join(columns[:6]))
+    for row in table:
+        print(" | ".join(str(row.get(column, "")) for column in columns[:6]))
+    print("#"*80)
+    if csv_file_name is not None:
+        with open(csv_file_name, "w", newline="") as csv_file:
+            writer = csv.DictWriter(csv_file, fieldnames=columns)
+            writer.writeheader()
+            for row in table:
+                writer.writerow(row)
+        print(f"Sweep table was written into {csv_file_name}")
+
+def to_string(trail):
+    """
+    Convert a ternary trail (int8 array with -1 for unknown) into a string of 0/1/?
+    """
+
+    return "".join(TERNARY_DIGITS[trail])
+
+def to_state(trail):
+    """
+    Pack a 64-bit ternary trail into the (value, unknown) words of screening.py (bit i at position i)
+    """
+
+    value = int.from_bytes(np.packbits(trail == 1, bitorder="little").tobytes(), "little")
+    unknown = int.from_bytes(np.packbits(trail == -1, bitorder="little").tobytes(), "little")
+    return value, unknown
+
+def luby(i):
+    """
+    Return the i-th term (starting from 1) of the Luby sequence 1, 1, 2, 1, 1, 2, 4, 1, ...
+    """
+
+    k = 1
+    while (1 << k) - 1 < i:
+        k += 1
+    if i == (1 << k) - 1:
+        return 1 << (k - 1)
+    return luby(i - (1 << (k - 1)) + 1)
+
+def enumerate_partition(args):
+    """
+    Enumerate one partition of the distinguishers in a worker process
+    """
+
+    param, objective, nibbles, part_file_name = args
+    return ID(param).enumerate_nibbles(objective, nibbles, part_file_name)
+
+def read_distinguishers(file_name):
+    """
+    Read a binary file written by enumerate_distinguishers
+    """
+
+    with open(file_name, "rb") as binary_file:
+        return [((input_value, input_unknown), (output_value, output_unknown))
+                for input_value, input_unknown, output_value, output_unknown in struct.iter_unpack("<QQQQ", binary_file.read())]
 
 #############################################################################################################################################
 #############################################################################################################################################
@@ -186,7 +620,15 @@ def loadparameters(args):
               "tl"  : -1,
               "solver"  : "ortools",
               "num_of_threads" : 8,
-              "output"  : "output.tex"}
+              "output"  : "output.tex",
+              "screen_input_weight" : 0,
+              "screen_output_weight" : 0,
+              "screen_keep" : 1,
+              "seeds" : 1,
+              "luby_unit" : 0,
+              "sweep" : None,
+              "enumerate" : None,
+              "workers" : 1}
 
     # Override parameters if they are set on command line
     if args.RD is not None:
@@ -199,6 +641,22 @@ def loadparameters(args):
         params["threads"] = args.p
     if args.output is not None:
         params["output"] = args.output
+    if args.screen_input_weight is not None:
+        params["screen_input_weight"] = args.screen_input_weight
+    if args.screen_output_weight is not None:
+        params["screen_output_weight"] = args.screen_output_weight
+    if args.screen_keep is not None:
+        params["screen_keep"] = args.screen_keep
+    if args.seeds is not None:
+        params["seeds"] = args.seeds
+    if args.luby_unit is not None:
+        params["luby_unit"] = args.luby_unit
+    if args.sweep is not None:
+        params["sweep"] = args.sweep
+    if args.enumerate is not None:
+        params["enumerate"] = args.enumerate
+    if args.workers is not None:
+        params["workers"] = args.workers
 
     return params
 
@@ -219,13 +677,36 @@ def main():
                         choices=available_solvers,
                         help="Choose a CP solver") 
     parser.add_argument("-p", default=8, type=int, help="number of threads for solvers supporting multi-threading\n")    
-    parser.add_argument("-o", "--output", default="output.tex", type=str, help="Output file name")
+    parser.add_argument("-o", "--output", default="output.tex", type=str, help="Output file name (Tikz code, or an SVG image if it ends with .svg)")
+    parser.add_argument("-swi", "--screen_input_weight", default=0, type=int,
+                        help="Screen all inputs with at most this number of active bits before running the CP model (0: no screening)")
+    parser.add_argument("-swo", "--screen_output_weight", default=0, type=int,
+                        help="Screen all outputs with at most this number of active bits before running the CP model (0: no screening)")
+    parser.add_argument("-sk", "--screen_keep", default=1, type=int,
+                        help="Number of screened candidates passed to the CP model")
+    parser.add_argument("-ns", "--seeds", default=1, type=int,
+                        help="Number of solvers with different random seeds that run in parallel (the threads are shared among them)")
+    parser.add_argument("-lu", "--luby_unit", default=0, type=float,
+                        help="Restart the parallel solvers on a Luby schedule with this unit in seconds (0: no restarts)")
+    parser.add_argument("-sw", "--sweep", default=None, type=int, nargs=2, metavar=("RD_MIN", "RD_MAX"),
+                        help="Solve every RD in [RD_MIN, RD_MAX] and print a table of the results")
+    parser.add_argument("-en", "--enumerate", default=None, type=str,
+                        help="Enumerate all optimal distinguishers up to symmetry and write them into this binary file")
+    parser.add_argument("-w", "--workers", default=1, type=int,
+                        help="Number of worker processes for the enumeration (the input nibbles are split among them) and the sweep (the threads are shared among them)")
 
     # Parse command line arguments and construct parameter list
     args = parser.parse_args()
     params = loadparameters(args)
+    if params["sweep"] is not None:
+        table = sweep(params, range(params["sweep"][0], params["sweep"][1] + 1), params["workers"])
+        print_table(table, f"sweep_{params['sweep'][0]}_{params['sweep'][1]}.csv")
+        return
     dld = ID(params)
-    dld.search()
+    if params["enumerate"] is not None:
+        dld.enumerate_distinguishers(params["enumerate"], params["workers"])
+    else:
+        dld.search()
 
 if __name__ == "__main__":
     main()
@@ -24,6 +24,9 @@ SOFTWARE.
 
 
 import sys
+import numpy as np
+# colours one, upperunknown and lowerunknown of the TikZ figures, see tugcolors.sty
+svg_colors = {"one" : "#F70146", "upperunknown" : "#285F82", "lowerunknown" : "#54CA50"}
 
 def trim(docstring):
     if not docstring:
@@ -166,23 +169,19 @@ class DrawDL():
                     }""")
         contents += "\n\n"       
         # draw EU
-        for i in range(64):
-            if self.upper_trail["x"][0][i] == 1:
-                contents += r"""\activeInputUpper{""" + str(i) + r"""}{one}""" + "\n"
-            elif self.upper_trail["x"][0][i] == -1:
-                contents += r"""\activeInputUpper{""" + str(i) + r"""}{upperunknown}""" + "\n"
-        for r in range(self.meeting_point):
-            for i in range(64):
-                if self.upper_trail["y"][r][i] == 1:
-                    contents += r"""\activeLinearUpper{""" + str(r + 1) + r"""}{""" + str(i) + r"""}{one}""" + "\n"
-                elif self.upper_trail["y"][r][i] == -1:
-                    contents += r"""\activeLinearUpper{""" + str(r + 1) + r"""}{""" + str(i) + r"""}{upperunknown}""" + "\n"
-        for r in range(self.meeting_point - 1, self.RD):
-            for i in range(64):
-                if self.lower_trail["y"][r][i] == 1:
-                    contents += r"""\activeLinearLower{""" + str(r + 1) + r"""}{""" + str(i) + r"""}{one}""" + "\n"
-                elif self.lower_trail["y"][r][i] == -1:
-                    contents += r"""\activeLinearLower{""" + str(r + 1) + r"""}{""" + str(i) + r"""}{lowerunknown}""" + "\n"
+        x0 = self.upper_trail["x"][0]
+        colors = np.where(x0 == 1, "one", "upperunknown")
+        for i in np.flatnonzero(x0).tolist():
+            contents += r"""\activeInputUpper{""" + str(i) + r"""}{""" + colors[i] + r"""}""" + "\n"
+        y = self.upper_trail["y"]
+        colors = np.where(y == 1, "one", "upperunknown")
+        for r, i in np.argwhere(y[:self.meeting_point] != 0).tolist():
+            contents += r"""\activeLinearUpper{""" + str(r + 1) + r"""}{""" + str(i) + r"""}{""" + colors[r, i] + r"""}""" + "\n"
+        y = self.lower_trail["y"]
+        colors = np.where(y == 1, "one", "lowerunknown")
+        for r, i in np.argwhere(y[max(self.meeting_point - 1, 0):] != 0).tolist():
+            r += max(self.meeting_point - 1, 0)
+            contents += r"""\activeLinearLower{""" + str(r + 1) + r"""}{""" + str(i) + r"""}{""" + colors[r, i] + r"""}""" + "\n"
         # for i in range(64):
         #     if self.lower_trail["x"][0][i] == 1:
         #         contents += r"""\activeInputLower{""" + str(i) + r"""}{one}""" + "\n"
@@ -198,3 +197,50 @@ class DrawDL():
         contents += trim(r"""\end{document}""")
         with open(self.output_file_name, "w") as output_file:
             output_file.write(contents)
+
+    @staticmethod
+    def svg_state(upper, lower, x, y):
+        """
+        SVG elements of a 1x64 state whose top left corner is (x, y): upper triangles for EU and lower triangles for EL
+        """
+
+        elements = ""
+        upper, lower = np.reshape(upper, (1, 64)), np.reshape(lower, (1, 64))
+        for state, triangle, corner, unknown in [(upper, "M{} {}v1l1-1Z", 0, "upperunknown"), (lower, "M{} {}v-1l-1 1Z", 1, "lowerunknown")]:
+            for color, cells in [("one", state == 1), (unknown, (state != 0) & (state != 1))]:
+                path = "".join(triangle.format(x + column + corner, y + row + corner) for row, column in np.argwhere(cells).tolist())
+                if path != "":
+                    elements += '<path d="{}" fill="{}"/>\n'.format(path, svg_colors[color])
+        grid = "".join("M{} {}h{}".format(x, y + row, 64) for row in range(1, 1)) + "".join("M{} {}v{}".format(x + column, y, 1) for column in range(1, 64))
+        elements += '<path d="{}" stroke="black" stroke-width=".04"/>\n'.format(grid)
+        # boundaries of the S-boxes
+        elements += '<path d="{}" stroke="black" stroke-width=".12"/>\n'.format("".join("M{} {}v1".format(x + column, y) for column in range(4, 64, 4)))
+        elements += '<rect x="{}" y="{}" width="64" height="1" fill="none" stroke="black" stroke-width=".12"/>\n'.format(x, y)
+        return elements
+
+    def generate_distinguisher_svg(self):
+        """
+        Draw the figure of the distinguisher into an SVG file, without LaTeX
+        """
+
+        # both trails are drawn on the same states: upper triangles for EU and lower triangles for EL
+        states = []
+        for r in range(self.RD + 1):
+            states.append((self.upper_trail["x"][r], self.lower_trail["x"][r], "P" if r > 0 else None))
+            if r < self.RD:
+                states.append((self.upper_trail["y"][r], self.lower_trail["y"][r], "S"))
+        gap = 2
+        width, height = 64 + 4, len(states)*(1 + gap) - gap + 2
+        contents = '<svg xmlns="http://www.w3.org/2000/svg" width="{}" height="{}" viewBox="-1 -1 {} {}">\n'.format(
+            width*16, height*16, width, height)
+        contents += '<defs><marker id="arrow" viewBox="0 0 10 10" refX="9" refY="5" markerWidth="3" markerHeight="3" orient="auto"><path d="M0 0L10 5L0 10Z"/></marker></defs>\n'
+        contents += '<rect x="-1" y="-1" width="{}" height="{}" fill="white"/>\n'.format(width, height)
+        for i, (upper, lower, operation) in enumerate(states):
+            y = i*(1 + gap)
+            if operation is not None:
+                contents += '<line x1="{0}" y1="{1}" x2="{0}" y2="{2}" stroke="black" stroke-width=".3" marker-end="url(#arrow)"/>\n'.format(64/2, y - gap + .2, y - .1)
+                contents += '<text x="{}" y="{}" font-size="1.2" font-family="serif" font-style="italic" dominant-baseline="central">{}</text>\n'.format(64/2 + .8, y - gap/2, operation)
+            contents += self.svg_state(upper, lower, 0, y)
+        contents += "</svg>\n"
+        with open(self.output_file_name, "w") as output_file:
+            output_file.write(contents)
@@ -0,0 +1,308 @@
+#!/usr/env/bin python3
+#-*- coding: UTF-8 -*-
+
+"""
+MIT License
+
+Copyright (c) 2023 Hosein Hadipour
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+
+
+"""
+Bit-vector propagation of deterministic differences through PRESENT, following exactly
+the propagation rules of distinguisher.mzn. It is used to screen many low-weight input/output
+differences quickly, so that only the promising pairs are passed to the CP model.
+
+A state is a pair (value, unknown) of 64-bit integers: bit i of unknown is set if bit i of
+the state is unknown (-1 in the CP model), otherwise bit i of value is the difference bit.
+"""
+
+import itertools
+import time
+from concurrent.futures import ProcessPoolExecutor
+from argparse import ArgumentParser, RawTextHelpFormatter
+
+MASK = (1 << 64) - 1
+
+round_permutation = [0, 16, 32, 48, 1, 17, 33, 49, 2, 18, 34, 50, 3, 19, 35, 51, 4, 20, 36, 52, 5, 21, 37, 53, 6, 22, 38, 54, 7, 23, 39, 55,
+                     8, 24, 40, 56, 9, 25, 41, 57, 10, 26, 42, 58, 11, 27, 43, 59, 12, 28, 44, 60, 13, 29, 45, 61, 14, 30, 46, 62, 15, 31, 47, 63]
+
+# Deterministic rules of the predicates sbox and sbox_inv in distinguisher.mzn: the bits are given in the
+# order of the state (xu[4*i], ..., xu[4*i + 3]) and '?' stands for an unknown bit. Any other nonzero
+# input leads to an unknown output
+sbox_rules = {"0001": "???1", "1000": "???1", "1001": "???0"}
+sbox_inv_rules = {"0001": "???1", "0100": "???1", "0101": "???0"}
+
+def ternary_table(rules, width=4):
+    """
+    Build a lookup table mapping (unknown << width) | value to the (value, unknown) pair of the output
+    """
+
+    table = [(0, (1 << width) - 1)] * (1 << (2 * width))
+    for value, unknown in itertools.product(range(1 << width), repeat=2):
+        if value & unknown:
+            continue
+        pattern = "".join("?" if (unknown >> k) & 1 else str((value >> k) & 1) for k in range(width))
+        if unknown == 0 and value == 0:
+            output = "0" * width
+        else:
+            output = rules.get(pattern, "?" * width)
+        table[(unknown << width) | value] = (sum(int(b == "1") << k for k, b in enumerate(output)),
+                                             sum(int(b == "?") << k for k, b in enumerate(output)))
+    return table
+
+def permutation_table(permutation):
+    """
+    Precompute the image of each nibble value at each nibble position under a bit permutation
+    (bit i is moved to bit permutation[i])
+    """
+
+    table = [[0] * 16 for _ in range(16)]
+    for nibble, value in itertools.product(range(16), range(16)):
+        for k in range(4):
+            if (value >> k) & 1:
+                table[nibble][value] |= 1 << permutation[4 * nibble + k]
+    return table
+
+SBOX = ternary_table(sbox_rules)
+SBOX_INV = ternary_table(sbox_inv_rules)
+PERM = permutation_table(round_permutation)
+PERM_INV = permutation_table([round_permutation.index(i) for i in range(64)])
+
+def apply_sbox(state, table):
+    value, unknown = state
+    new_value, new_unknown = 0, 0
+    active = value | unknown
+    for nibble in range(16):
+        if (active >> (4 * nibble)) & 0xf:
+            v, u = table[(((unknown >> (4 * nibble)) & 0xf) << 4) | ((value >> (4 * nibble)) & 0xf)]
+            new_value |= v << (4 * nibble)
+            new_unknown |= u << (4 * nibble)
+    return new_value, new_unknown
+
+def apply_permutation(state, table):
+    permuted = []
+    for word in state:
+        image = 0
+        for nibble in range(16):
+            if (word >> (4 * nibble)) & 0xf:
+                image |= table[nibble][(word >> (4 * nibble)) & 0xf]
+        permuted.append(image)
+    return tuple(permuted)
+
+def propagate_forward(input_diff, RD):
+    """
+    Propagate a (value, unknown) input difference through RD rounds (xu, yu in distinguisher.mzn)
+    """
+
+    x = [input_diff]
+    y = []
+    for _ in range(RD):
+        y.append(apply_sbox(x[-1], SBOX))
+        x.append(apply_permutation(y[-1], PERM))
+    return x, y
+
+def propagate_backward(output_diff, RD):
+    """
+    Propagate a (value, unknown) output difference backward through RD rounds (xl, yl in distinguisher.mzn)
+    """
+
+    x = [output_diff]
+    y = []
+    for _ in range(RD):
+        y.insert(0, apply_permutation(x[0], PERM_INV))
+        x.insert(0, apply_sbox(y[0], SBOX_INV))
+    return x, y
+
+def signature(trail):
+    """
+    Pack all rounds of a trail into one (known, value) pair for x and one for y
+    """
+
+    x, y = trail
+    packed = []
+    for states in (x, y):
+        known, value = 0, 0
+        for r, (v, u) in enumerate(states):
+            known |= (~u & MASK) << (64 * r)
+            value |= v << (64 * r)
+        packed.append((known, value))
+    return tuple(packed)
+
+def contradicts(upper, lower):
+    """
+    Check the meeting-point constraints of distinguisher.mzn: there must be a bit that is fixed to
+    different values in the upper and lower trails, both in the x and in the y states
+    """
+
+    return all(upper[k][0] & lower[k][0] & (upper[k][1] ^ lower[k][1]) for k in range(2))
+
+def low_weight_words(weight):
+    """
+    All 64-bit words with 1 to weight active bits
+    """
+
+    for w in range(1, weight + 1):
+        for bits in itertools.combinations(range(64), w):
+            yield sum(1 << b for b in bits)
+
+def upper_signature(args):
+    word, RD = args
+    return signature(propagate_forward((word, 0), RD))
+
+def lower_signature(args):
+    word, RD = args
+    return signature(propagate_backward((word, 0), RD))
+
+_lower = None
+
+def _init_lower(lower):
+    global _lower
+    _lower = lower
+
+def check_chunk(chunk):
+    """
+    Return the pairs (input, output) of a chunk of inputs that lead to a contradiction
+    """
+
+    pairs = []
+    for word, upper in chunk:
+        for output_word, lower in _lower:
+            if contradicts(upper, lower):
+                pairs.append((word, output_word))
+    return pairs
+
+def screen(RD, input_weight=1, output_weight=1, keep=1, processes=None, chunk_size=64):
+    """
+    Screen all pairs of input/output differences with at most input_weight/output_weight active bits
+    on a process pool, and return the keep pairs with the lowest total weight (the objective of the CP model)
+    """
+
+    inputs = list(low_weight_words(input_weight))
+    outputs = list(low_weight_words(output_weight))
+    with ProcessPoolExecutor(max_workers=processes) as pool:
+        upper = list(pool.map(upper_signature, ((w, RD) for w in inputs), chunksize=chunk_size))
+        lower = list(pool.map(lower_signature, ((w, RD) for w in outputs), chunksize=chunk_size))
+    uppers = list(zip(inputs, upper))
+    chunks = [uppers[i:i + chunk_size] for i in range(0, len(uppers), chunk_size)]
+    pairs = []
+    with ProcessPoolExecutor(max_workers=processes, initializer=_init_lower, initargs=(list(zip(outputs, lower)),)) as pool:
+        for chunk_pairs in pool.map(check_chunk, chunks):
+            pairs.extend(chunk_pairs)
+            pairs.sort(key=lambda pair: bin(pair[0]).count("1") + bin(pair[1]).count("1"))
+            del pairs[keep:]
+    return pairs
+
+def active_bits(word):
+    return {i for i in range(64) if (word >> i) & 1}
+
+def to_string(word):
+    return "".join(str((word >> i) & 1) for i in range(64))
+
+def permute_word(word, permutation):
+    image = 0
+    for i in range(64):
+        if (word >> i) & 1:
+            image |= 1 << permutation[i]
+    return image
+
+def sbox_symmetries():
+    """
+    Return the pairs (alpha, beta) of bit permutations of a nibble such that applying alpha to the input
+    of sbox (or beta to the input of sbox_inv) applies beta (or alpha) to its output, for all patterns
+    """
+
+    pairs = []
+    for alpha, beta in itertools.product(itertools.permutations(range(4)), repeat=2):
+        symmetric = True
+        for value, unknown in itertools.product(range(16), repeat=2):
+            if value & unknown:
+                continue
+            for table, p_in, p_out in [(SBOX, alpha, beta), (SBOX_INV, beta, alpha)]:
+                v, u = table[(unknown << 4) | value]
+                pv, pu = permute_word(value, p_in), permute_word(unknown, p_in)
+                if table[(pu << 4) | pv] != (permute_word(v, p_out), permute_word(u, p_out)):
+                    symmetric = False
+        if symmetric:
+            pairs.append((alpha, beta))
+    return pairs
+
+def digit_permutation(digits):
+    """
+    Bit permutation that applies a permutation to each base-4 digit of the bit positions 16*h + 4*m + b
+    """
+
+    return [16 * digits[0][i >> 4] + 4 * digits[1][(i >> 2) & 3] + digits[2][i & 3] for i in range(64)]
+
+def symmetries(RD):
+    """
+    Return the pairs (input permutation, output permutation) of bit permutations that map distinguishers
+    for RD rounds to distinguishers. Every round, the permutation of the bit digit b must be a symmetry of the
+    S-box tables, and the pLayer rotates the digits: bit 16*h + 4*m + b of y moves to bit 16*b + 4*h + m of x
+    """
+
+    pairs = sbox_symmetries()
+    alphas = {alpha for alpha, _ in pairs}
+    group = set()
+    def extend(r, input_digits, digits):
+        if r == RD:
+            group.add((input_digits, digits))
+            return
+        h, m, b = digits
+        for alpha, beta in pairs:
+            if alpha == b:
+                extend(r + 1, input_digits, (beta, h, m))
+    for digits in itertools.product(itertools.permutations(range(4)), repeat=3):
+        if RD == 0 or digits[2] in alphas:
+            extend(0, digits, digits)
+    return [(digit_permutation(input_digits), digit_permutation(output_digits)) for input_digits, output_digits in group]
+
+def permute_state(state, permutation):
+    return tuple(permute_word(word, permutation) for word in state)
+
+def orbit(input_state, output_state, group):
+    return {(permute_state(input_state, p_in), permute_state(output_state, p_out)) for p_in, p_out in group}
+
+def main():
+    '''
+    Screen low-weight input/output differences of PRESENT for impossible-differential distinguishers
+    '''
+
+    parser = ArgumentParser(description="This tool screens low-weight impossible-differential distinguishers of PRESENT",
+                            formatter_class=RawTextHelpFormatter)
+    parser.add_argument("-RD", type=int, default=5, help="Number of rounds for distinguisher")
+    parser.add_argument("-wi", "--input_weight", type=int, default=1, help="Maximum number of active bits in the input difference")
+    parser.add_argument("-wo", "--output_weight", type=int, default=1, help="Maximum number of active bits in the output difference")
+    parser.add_argument("-k", "--keep", type=int, default=10, help="Number of distinguishers to report")
+    parser.add_argument("-p", default=None, type=int, help="Number of processes")
+    args = parser.parse_args()
+
+    start_time = time.time()
+    pairs = screen(args.RD, args.input_weight, args.output_weight, args.keep, args.p)
+    print("Time used to screen the distinguishers: {:0.02f} seconds".format(time.time() - start_time))
+    print(f"Number of distinguishers reported: {len(pairs)}")
+    for input_diff, output_diff in pairs:
+        print("#"*80)
+        print(f"input: \n{to_string(input_diff)};")
+        print(f"output: \n{to_string(output_diff)};")
+
+if __name__ == "__main__":
+    main()
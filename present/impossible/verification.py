@@ -0,0 +1,134 @@
+"""
+MIT License
+
+Copyright (c) 2023 Hosein Hadipour
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+
+
+"""
+Experimental verification of impossible-differential distinguishers on small-scale variants of PRESENT.
+
+The variant of width n (a multiple of 4) applies n/4 copies of the PRESENT S-box and moves bit i to bit
+(n/4)*(i mod 4) + (i div 4), which is the pLayer of PRESENT for n = 64. Independent random round keys are
+added before every round and after the last one. Bits are indexed as in distinguisher.mzn: bit 4*i is
+the most significant input bit of the i-th S-box.
+
+The distinguishers of the variant are derived with the propagation rules of distinguisher.mzn (see screening.py)
+and then checked experimentally: for every key, no input difference matching the input pattern may lead to
+an output difference matching the output pattern. For small widths all plaintexts are encrypted; otherwise
+random plaintexts are sampled, so that a reported pair is always a genuine counterexample.
+"""
+
+import sys
+import itertools
+import time
+from pathlib import Path
+from concurrent.futures import ProcessPoolExecutor
+from argparse import ArgumentParser, RawTextHelpFormatter
+import numpy as np
+import screening
+# the modules shared by the tools of several ciphers are in the folder shared of the repository
+sys.path.append(str(Path(__file__).resolve().parents[2] / "shared"))
+from smallpresent import SmallPresent, sbox, parse_pattern, completions, to_string
+import verifier
+
+def check_task(args):
+    """
+    For each (input differences, output pattern) of a chunk, count the pairs (plaintext, input difference)
+    leading to an output difference that matches the output pattern under the key derived from seed
+    """
+
+    width, RD, seed, samples, chunk = args
+    cipher = SmallPresent(width, RD)
+    round_keys = cipher.round_keys(seed)
+    if samples is None:
+        plaintexts = np.arange(1 << width, dtype=np.uint64)
+    else:
+        plaintexts = np.random.default_rng(seed + 1).integers(0, 1 << width, size=samples, dtype=np.uint64)
+    ciphertexts = cipher.encrypt(plaintexts, round_keys)
+    counts = []
+    for differences, output_pattern in chunk:
+        value, fixed = (np.uint64(w) for w in parse_pattern(output_pattern))
+        counterexamples = 0
+        for difference in differences:
+            if samples is None:
+                output_differences = ciphertexts ^ ciphertexts[plaintexts ^ difference]
+            else:
+                output_differences = ciphertexts ^ cipher.encrypt(plaintexts ^ difference, round_keys)
+            counterexamples += int(np.count_nonzero(((output_differences & fixed) == value) & (output_differences != 0)))
+        counts.append(counterexamples)
+    return counts
+
+def verify(width, RD, pairs, keys=4, processes=None, exhaustive_width=20, samples=1 << 16, limit=1 << 10, chunk_size=64):
+    """
+    Check impossible differentials (input pattern, output pattern) of the variant for several keys on
+    a process pool, and return the number of counterexamples of each of them (0 for a genuine one)
+    """
+
+    rng = np.random.default_rng(width)
+    patterns = [(completions(input_pattern, width, limit, rng), output_pattern) for input_pattern, output_pattern in pairs]
+    chunks = [patterns[i:i + chunk_size] for i in range(0, len(patterns), chunk_size)]
+    tasks = [(width, RD, seed, None if width <= exhaustive_width else samples, chunk) for seed in range(keys) for chunk in chunks]
+    counterexamples = [0] * len(pairs)
+    with ProcessPoolExecutor(max_workers=processes) as pool:
+        for (seed, k), counts in zip(itertools.product(range(keys), range(len(chunks))), pool.map(check_task, tasks)):
+            for i, count in enumerate(counts):
+                counterexamples[k * chunk_size + i] += count
+    return counterexamples
+
+def main():
+    '''
+    Verify impossible-differential distinguishers of small-scale PRESENT experimentally
+    '''
+
+    parser = ArgumentParser(description="This tool verifies impossible-differential distinguishers of small-scale PRESENT experimentally",
+                            formatter_class=RawTextHelpFormatter)
+    parser.add_argument("-RD", type=int, default=3, help="Number of rounds for distinguisher")
+    parser.add_argument("-n", "--width", type=int, default=16, help="Block size of the PRESENT-like variant (a multiple of 4)")
+    parser.add_argument("-i", "--input", type=str, default=None, help="Input difference to verify, as a string of 0/1/? (character i is bit i)\n"
+                                                                          "If not given, the distinguishers of the variant are derived with the rules of distinguisher.mzn")
+    parser.add_argument("-o", "--output", type=str, default=None, help="Output difference to verify, as a string of 0/1/?")
+    parser.add_argument("-wi", "--input_weight", type=int, default=1, help="Maximum number of active bits in the derived input differences")
+    parser.add_argument("-wo", "--output_weight", type=int, default=1, help="Maximum number of active bits in the derived output differences")
+    parser.add_argument("-k", "--keys", type=int, default=4, help="Number of random keys")
+    parser.add_argument("-ew", "--exhaustive_width", type=int, default=20, help="Maximum width for which all plaintexts are encrypted")
+    parser.add_argument("-s", "--samples", type=int, default=1 << 16, help="Number of random plaintexts per key above the exhaustive width")
+    parser.add_argument("-l", "--limit", type=int, default=1 << 10, help="Maximum number of input differences per pattern (sampled beyond)")
+    parser.add_argument("-p", default=None, type=int, help="Number of processes")
+    args = parser.parse_args()
+
+    start_time = time.time()
+    rules_hold = verifier.ddt_rules_hold(sbox, screening.sbox_rules, screening.sbox_inv_rules)
+    print(f"Rules of distinguisher.mzn agree with the DDT of the S-box: {rules_hold}")
+    if args.input is not None and args.output is not None:
+        assert len(args.input) == args.width and len(args.output) == args.width, "The patterns must have one character per bit"
+        pairs = [(args.input, args.output)]
+    else:
+        cipher = SmallPresent(args.width, args.RD, screening)
+        pairs = [(to_string(i, args.width), to_string(o, args.width)) for i, o in cipher.distinguishers(args.input_weight, args.output_weight)]
+        print(f"Number of distinguishers derived for {args.RD} rounds of {args.width}-bit PRESENT: {len(pairs)}")
+    counts = verify(args.width, args.RD, pairs, args.keys, args.p, args.exhaustive_width, args.samples, args.limit)
+    status = verifier.report(rules_hold, pairs, counts, "Number of counterexamples")
+    print("Time used to verify the distinguishers: {:0.02f} seconds".format(time.time() - start_time))
+    sys.exit(status)
+
+if __name__ == "__main__":
+    main()
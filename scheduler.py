@@ -0,0 +1,571 @@
+#!/usr/env/bin python3
+#-*- coding: UTF-8 -*-
+
+"""
+MIT License
+
+Copyright (c) 2023 Hosein Hadipour
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+
+email: hsn.hadipour@gmail.com
+"""
+
+"""
+Batch scheduler running a sweep of searches on a fixed number of cores with a short makespan.
+
+The jobs are read from a JSON-lines file, one job per line in the format of the requests of server.py, e.g.,
+
+    {"cipher": "skinny", "mode": "impossible", "script": "attack.py",
+     "parameters": {"v": 2, "RB": 3, "RD": 11, "RF": 5}, "time_limit": 600}
+
+The running time of every job is predicted by a least-squares fit of the logarithm of the running times of the
+previous jobs (stored in a history file) on the tool, the variant, the numbers of rounds, the size of the model
+and the number of threads. A job of a tool without history is predicted as without any history, i.e., one second
+per state bit and round, at most its time limit. The running time of a job stopped by its time limit (as reported
+by the solver status that the tool prints) is only a lower bound, and it is fitted as twice its elapsed time. The size of the model is the number of state bits times the number of rounds,
+unless the job gives it explicitly as "model_size" (e.g., the number of constraints of the flattened model).
+
+The threads are allotted as for moldable jobs: the longest job gets more threads as long as it is longer than
+the average load of the cores. The jobs are then started longest-processing-time first, and a job that does not
+fit into the free cores lets shorter ones start before it. Whenever a job finishes, its running time is added to
+the history, the predictor is fitted again and the remaining jobs are reordered. A job fixing "p" in its
+parameters keeps its number of threads.
+
+On Linux, the resident memory of every search (the driver, MiniZinc and the solver processes it starts) is read
+from /proc at every poll while it runs, and its high-water mark is stored in the history with the configuration of
+the search (runs that are too short to be sampled while solving are not used).
+The memory of a new search is projected from the high-water marks of the same configuration (or variant), and
+the search is started only while the projected memory of all running searches fits into the memory budget,
+otherwise with fewer threads, or later. If the memory is nevertheless short, the search started last is killed
+and queued again with its observed memory.
+"""
+
+import os
+import sys
+import json
+import math
+import time
+import signal
+import threading
+import subprocess
+from pathlib import Path
+from argparse import ArgumentParser, RawTextHelpFormatter
+import numpy as np
+from server import available_tools, to_argv, time_limit_switch, repository_folder
+line_separator = "#"*55
+
+round_switches = ["RB", "RD", "RF", "Ri", "R0", "Rzero", "Rone"]
+block_sizes = {"ascon" : 320, "present" : 64}
+# speedup exponent of the threads (time ~ threads^-speedup) until the history says otherwise
+default_speedup = 0.5
+# regularization of the least-squares fit
+ridge = 1.0
+# a run stopped by its time limit only gives a lower bound on its running time, which is inflated by this factor
+timeout_inflation = 2.0
+# fraction of the memory of the machine that is kept free
+memory_reserve = 0.05
+# a run whose memory was sampled fewer times (i.e., shorter than this many poll intervals) says nothing about its memory
+min_memory_samples = 2
+
+def job_tool(job):
+    return "{}/{}/{}".format(job["cipher"], job["mode"], job["script"])
+
+def job_variant(job):
+    parameters = job.get("parameters", dict())
+    return "{}/v{}".format(job_tool(job), parameters.get("v", parameters.get("variant", "")))
+
+def job_rounds(job):
+    parameters = job.get("parameters", dict())
+    return sum(int(parameters.get(switch, 0)) for switch in round_switches)
+
+def job_model_size(job):
+    """
+    Size of the model of a job: given by the job, or the number of state bits times the number of rounds
+    """
+
+    if job.get("model_size") is not None:
+        return float(job["model_size"])
+    parameters = job.get("parameters", dict())
+    if job["cipher"] in block_sizes:
+        state_size = block_sizes[job["cipher"]]
+    else:
+        variant = int(parameters.get("v", parameters.get("variant", 1)))
+        state_size = 16*int(parameters.get("cs", 8 if variant >= 5 else 4))
+    return float(state_size*max(job_rounds(job), 1))
+
+class RuntimePredictor:
+    """
+    Least-squares fit of log(running time) on the features of the jobs, with one intercept per tool and per
+    variant (the variants without history share the intercept of their tool). The jobs of a tool without history
+    are not predicted from the other tools
+    """
+
+    def __init__(self, history=None):
+        self.history = list(history) if history is not None else []
+        self.fit()
+
+    def features(self, job, threads):
+        parameters = job.get("parameters", dict())
+        vector = [1.0,
+                  float(parameters.get("RD", 0)),
+                  float(job_rounds(job) - int(parameters.get("RD", 0))),
+                  math.log(job_model_size(job)),
+                  math.log(max(threads, 1))]
+        vector += [1.0 if job_tool(job) == tool else 0.0 for tool in self.tools]
+        vector += [1.0 if job_variant(job) == variant else 0.0 for variant in self.variants]
+        return vector
+
+    def fit(self):
+        records = [record for record in self.history if record.get("exit_code", 0) == 0 and record["elapsed_time"] > 0]
+        self.tools = sorted({job_tool(record) for record in records})
+        self.variants = sorted({job_variant(record) for record in records})
+        self.coefficients = None
+        if len(records) == 0:
+            return
+        x = np.array([self.features(record, record["threads"]) for record in records])
+        y = np.array([math.log(record["elapsed_time"]*(timeout_inflation if record.get("timed_out", False) else 1.0)) for record in records])
+        penalty = ridge*np.eye(x.shape[1])
+        penalty[0, 0] = 0
+        self.coefficients = np.linalg.solve(x.T @ x + penalty, x.T @ y)
+        # the speedup of the threads can only be learned from runs with different numbers of threads
+        if len({record["threads"] for record in records}) < 2:
+            self.coefficients[4] = -default_speedup
+        self.coefficients[4] = min(max(self.coefficients[4], -1.0), 0.0)
+
+    def add(self, record):
+        self.history.append(record)
+        self.fit()
+
+    def predict(self, job, threads):
+        """
+        Predicted running time of a job in seconds, at most its time limit
+        """
+
+        if self.coefficients is None or job_tool(job) not in self.tools:
+            # rough estimate without history: one second per state bit and round
+            estimate = job_model_size(job)*max(threads, 1)**(-default_speedup)
+        else:
+            estimate = math.exp(float(np.dot(self.features(job, threads), self.coefficients)))
+        if job.get("time_limit") is not None:
+            estimate = min(estimate, float(job["time_limit"]))
+        return max(estimate, 1.0)
+
+def allot_threads(jobs, predictor, cores, max_threads):
+    """
+    Number of threads of each job: the longest job gets twice as many threads while it is longer than the average
+    load of the cores. The threads fixed by the jobs are kept
+    """
+
+    threads = [min(int(job["parameters"]["p"]), cores) if "p" in job.get("parameters", dict()) else 1 for job in jobs]
+    fixed = ["p" in job.get("parameters", dict()) for job in jobs]
+    times = [predictor.predict(job, p) for job, p in zip(jobs, threads)]
+    while len(jobs) > 0:
+        load = sum(t*p for t, p in zip(times, threads))/cores
+        candidates = [i for i in range(len(jobs)) if not fixed[i] and 2*threads[i] <= min(max_threads, cores)]
+        if len(candidates) == 0:
+            break
+        longest = max(candidates, key=lambda i: times[i])
+        if times[longest] <= load:
+            break
+        threads[longest] *= 2
+        times[longest] = predictor.predict(jobs[longest], threads[longest])
+    return threads, times
+
+def simulate(times, threads, cores, order=None):
+    """
+    Makespan of starting the jobs in the given order whenever enough cores are free (a job that does not fit
+    lets the next ones start before it)
+    """
+
+    order = list(range(len(times))) if order is None else list(order)
+    free = cores
+    now = 0.0
+    running = []
+    while order or running:
+        for i in list(order):
+            if threads[i] <= free:
+                order.remove(i)
+                free -= threads[i]
+                running.append((now + times[i], i))
+        running.sort()
+        now, i = running.pop(0)
+        free += threads[i]
+    return now
+
+def read_jsonl(file_name):
+    if not os.path.exists(file_name):
+        return []
+    with open(file_name, "r") as jsonfile:
+        return [json.loads(line) for line in jsonfile if line.strip() != ""]
+
+def read_meminfo():
+    """
+    Total and available memory of the machine in MB, or None without /proc
+    """
+
+    try:
+        with open("/proc/meminfo", "r") as meminfo:
+            fields = dict(line.split(":", 1) for line in meminfo)
+    except OSError:
+        return None
+    return {key : int(fields[key].split()[0])/1024 for key in ["MemTotal", "MemAvailable"]}
+
+def process_tree(pid):
+    """
+    The process pid and all its descendants
+    """
+
+    children = dict()
+    for entry in os.listdir("/proc"):
+        if not entry.isdigit():
+            continue
+        try:
+            with open("/proc/{}/stat".format(entry), "r") as statfile:
+                # the name of the process is in parentheses and may contain spaces
+                ppid = int(statfile.read().rsplit(")", 1)[1].split()[1])
+        except (OSError, IndexError, ValueError):
+            continue
+        children.setdefault(ppid, []).append(int(entry))
+    tree = [pid]
+    for process in tree:
+        tree += children.get(process, [])
+    return tree
+
+def process_rss(pid):
+    """
+    Resident memory of a process in MB (0 if it does not exist anymore)
+    """
+
+    try:
+        with open("/proc/{}/status".format(pid), "r") as statusfile:
+            for line in statusfile:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1])/1024
+    except OSError:
+        pass
+    return 0.0
+
+def tree_rss(pid):
+    return sum(process_rss(process) for process in process_tree(pid))
+
+def reported_status(log_name):
+    """
+    Last solver status printed by a search into its log ("Solver status: ..."), or None
+    """
+
+    status = None
+    try:
+        with open(log_name, "r") as logfile:
+            for line in logfile:
+                if line.startswith("Solver status:"):
+                    status = line.split(":", 1)[1].strip()
+    except OSError:
+        pass
+    return status
+
+def job_configuration(job):
+    parameters = {switch : value for switch, value in job.get("parameters", dict()).items() if switch not in ["p", "tl"]}
+    return json.dumps([job_tool(job), job.get("arguments", []), parameters], sort_keys=True)
+
+class MemoryPlanner:
+    """
+    High-water marks of the memory of the previous runs, per configuration, to project the memory of new runs.
+    Every thread of a solver is assumed to hold its own copy of the search state, besides the model, i.e., the
+    memory of t threads is (t + 1)/(t' + 1) times the memory observed with t' threads
+    """
+
+    def __init__(self, history=None, default_memory=2048):
+        self.default_memory = default_memory
+        self.peaks = dict()
+        self.variant_peaks = dict()
+        for record in history if history is not None else []:
+            self.add(record)
+
+    def add(self, record):
+        # the runs that failed, and the runs that were too short to be sampled while solving, say nothing about the memory
+        if record.get("memory_samples", 0) < min_memory_samples or not record.get("max_rss"):
+            return
+        if record["exit_code"] != 0 and not record.get("preempted", False):
+            return
+        peak = (record["max_rss"], record["threads"], job_model_size(record))
+        configuration = job_configuration(record)
+        if configuration not in self.peaks or self.peaks[configuration][0] < peak[0]:
+            self.peaks[configuration] = peak
+        self.variant_peaks.setdefault(job_variant(record), []).append(peak)
+
+    def project(self, job, threads):
+        """
+        Projected high-water mark of the memory of a job in MB
+        """
+
+        configuration = job_configuration(job)
+        if configuration in self.peaks:
+            memory, recorded_threads, _ = self.peaks[configuration]
+        elif job_variant(job) in self.variant_peaks:
+            # the largest memory per unit of model size of the same variant
+            memory, recorded_threads, model_size = max(self.variant_peaks[job_variant(job)], key=lambda peak: peak[0]/peak[2])
+            memory *= job_model_size(job)/model_size
+        else:
+            memory, recorded_threads = self.default_memory, 1
+        return memory*(threads + 1)/(recorded_threads + 1)
+
+class Scheduler:
+    """
+    Run a list of jobs on a number of cores, longest predicted job first, updating the predictor on the fly
+    """
+
+    def __init__(self, jobs, cores, max_threads=8, history_file="scheduler_history.jsonl", log_folder="scheduler_logs",
+                 memory_budget=None, default_memory=2048):
+        tools = available_tools()
+        for job in jobs:
+            job.setdefault("parameters", dict())
+            scripts = tools.get((job["cipher"], job["mode"]), dict())
+            job.setdefault("script", "attack.py" if "attack.py" in scripts else "distinguisher.py")
+            assert job["script"] in scripts, "Unknown tool {}".format(job_tool(job))
+        # the time limit is passed with the switch of each script
+        self.time_limit_switches = [time_limit_switch(tools[(job["cipher"], job["mode"])][job["script"]])
+                                    if job.get("time_limit") is not None else None for job in jobs]
+        self.jobs = jobs
+        self.cores = cores
+        self.max_threads = max_threads
+        self.history_file = history_file
+        self.log_folder = log_folder
+        history = read_jsonl(history_file)
+        self.predictor = RuntimePredictor(history)
+        self.memory_planner = MemoryPlanner(history, default_memory)
+        # the memory is only controlled if /proc is available
+        self.meminfo = read_meminfo()
+        if self.meminfo is None:
+            self.memory_budget = None
+        elif memory_budget is None:
+            self.memory_budget = (1 - memory_reserve)*self.meminfo["MemAvailable"]
+        else:
+            self.memory_budget = memory_budget
+
+    def plan(self, pending):
+        """
+        Threads and predicted running times of the pending jobs, and the pending jobs in LPT order
+        """
+
+        threads, times = allot_threads([self.jobs[i] for i in pending], self.predictor, self.cores, self.max_threads)
+        threads = dict(zip(pending, threads))
+        times = dict(zip(pending, times))
+        return threads, times, sorted(pending, key=lambda i: times[i], reverse=True)
+
+    def predicted_makespan(self):
+        pending = list(range(len(self.jobs)))
+        threads, times, order = self.plan(pending)
+        threads, times = [threads[i] for i in pending], [times[i] for i in pending]
+        return simulate(times, threads, self.cores, order), simulate(times, threads, self.cores)
+
+    def start(self, index, threads):
+        job = self.jobs[index]
+        parameters = dict(job["parameters"])
+        parameters["p"] = threads
+        if job.get("time_limit") is not None:
+            parameters[self.time_limit_switches[index]] = job["time_limit"]
+        argv = [str(argument) for argument in job.get("arguments", [])] + to_argv(parameters)
+        os.makedirs(self.log_folder, exist_ok=True)
+        log_name = os.path.join(self.log_folder, "{}_{}_{}_{}.log".format(index, job["cipher"], job["mode"], Path(job["script"]).stem))
+        logfile = open(log_name, "w")
+        # a session of its own, to kill the solver processes with the search if the memory is short
+        process = subprocess.Popen([sys.executable, job["script"]] + argv, cwd=repository_folder / job["cipher"] / job["mode"],
+                                   stdout=logfile, stderr=subprocess.STDOUT, start_new_session=True)
+        run = {"index" : index, "threads" : threads, "process" : process, "logfile" : logfile, "log_name" : log_name,
+               "start_time" : time.time(), "end_time" : None,
+               "projected_memory" : self.memory_planner.project(job, threads), "rss" : 0.0, "max_rss" : 0.0,
+               "memory_samples" : 0}
+        # the end of the search is taken when it exits, not when it is polled
+        threading.Thread(target=self.wait, args=(run,), daemon=True).start()
+        # the memory is first sampled at the next poll, not while Python is still starting
+        return run
+
+    def wait(self, run):
+        run["process"].wait()
+        run["end_time"] = time.time()
+
+    def sample(self, run):
+        if self.memory_budget is not None:
+            run["rss"] = tree_rss(run["process"].pid)
+            run["max_rss"] = max(run["max_rss"], run["rss"])
+            if run["rss"] > 0:
+                run["memory_samples"] += 1
+
+    def admit(self, index, threads, running):
+        """
+        Number of threads with which a job fits into the memory budget next to the running jobs (fewer than the
+        allotted threads if needed), or 0 if it does not fit. A job fits if nothing else is running
+        """
+
+        if self.memory_budget is None:
+            return threads
+        job = self.jobs[index]
+        committed = sum(max(run["projected_memory"], run["max_rss"]) for run in running)
+        while committed + self.memory_planner.project(job, threads) > self.memory_budget:
+            if len(running) == 0:
+                return threads
+            if threads == 1 or "p" in job["parameters"]:
+                return 0
+            threads //= 2
+        return threads
+
+    def monitor(self, running):
+        """
+        Update the memory of the running jobs, and return the job started last if the memory is short
+        """
+
+        if self.memory_budget is None:
+            return None
+        for run in running:
+            self.sample(run)
+        meminfo = read_meminfo()
+        short = sum(run["rss"] for run in running) > self.memory_budget or \
+                meminfo["MemAvailable"] < memory_reserve*meminfo["MemTotal"]
+        if not short or len(running) < 2:
+            return None
+        return max(running, key=lambda run: run["start_time"])
+
+    def preempt(self, run):
+        """
+        Kill a job and its solver processes, and record its memory
+        """
+
+        try:
+            os.killpg(run["process"].pid, signal.SIGKILL)
+        except ProcessLookupError:
+            pass
+        run["process"].wait()
+        return self.finish(run, run["predicted_time"], preempted=True)
+
+    def finish(self, run, predicted_time, preempted=False):
+        run["logfile"].close()
+        job = self.jobs[run["index"]]
+        end_time = run["end_time"] if run["end_time"] is not None else time.time()
+        status = reported_status(run["log_name"])
+        record = {key : job[key] for key in ["cipher", "mode", "script", "arguments", "parameters", "time_limit", "model_size"] if key in job}
+        record.update({"threads" : run["threads"],
+                       "elapsed_time" : end_time - run["start_time"],
+                       "predicted_time" : predicted_time,
+                       "exit_code" : run["process"].returncode,
+                       "status" : status,
+                       # the elapsed time includes starting Python, flattening the model and drawing, hence the
+                       # time limit is only taken as reached if the solver says so
+                       "timed_out" : job.get("time_limit") is not None and status in ["SATISFIED", "UNKNOWN"]})
+        if self.memory_budget is not None:
+            record["max_rss"] = run["max_rss"]
+            record["memory_samples"] = run["memory_samples"]
+        if preempted:
+            record["preempted"] = True
+        with open(self.history_file, "a") as jsonfile:
+            jsonfile.write(json.dumps(record) + "\n")
+        # a preempted run only adds its memory, as it was killed
+        self.predictor.add(record)
+        self.memory_planner.add(record)
+        return record
+
+    def run(self, poll_interval=1.0):
+        """
+        Run all jobs and return their records in the order in which they finished
+        """
+
+        pending = list(range(len(self.jobs)))
+        running = []
+        records = []
+        free = self.cores
+        threads, times, order = self.plan(pending)
+        while pending or running:
+            for index in list(order):
+                if threads[index] > free:
+                    continue
+                admitted_threads = self.admit(index, threads[index], running)
+                if admitted_threads == 0:
+                    continue
+                if admitted_threads < threads[index]:
+                    times[index] = self.predictor.predict(self.jobs[index], admitted_threads)
+                run = self.start(index, admitted_threads)
+                run["predicted_time"] = times[index]
+                running.append(run)
+                pending.remove(index)
+                order.remove(index)
+                free -= admitted_threads
+                print("Started  {:<40} threads: {:<3} predicted: {:0.02f} seconds, {:0.0f} MB".format(
+                      job_variant(self.jobs[index]), admitted_threads, times[index], run["projected_memory"]))
+            time.sleep(poll_interval)
+            preempted = self.monitor(running)
+            if preempted is not None:
+                running.remove(preempted)
+                free += preempted["threads"]
+                pending.append(preempted["index"])
+                record = self.preempt(preempted)
+                print("Requeued {:<40} threads: {:<3} memory:    {:0.0f} MB".format(job_variant(record), record["threads"], record["max_rss"]))
+            finished = [run for run in running if run["process"].poll() is not None]
+            for run in finished:
+                running.remove(run)
+                free += run["threads"]
+                record = self.finish(run, run["predicted_time"])
+                records.append(record)
+                print("Finished {:<40} threads: {:<3} elapsed:   {:0.02f} seconds (exit code {}), {:0.0f} MB".format(
+                      job_variant(record), record["threads"], record["elapsed_time"], record["exit_code"], record.get("max_rss", 0)))
+            if (finished or preempted is not None) and pending:
+                threads, times, order = self.plan(pending)
+        return records
+
+def main():
+    '''
+    Run a sweep of searches
+    '''
+
+    parser = ArgumentParser(description="This tool runs a list of searches on a number of cores, longest predicted search first",
+                            formatter_class=RawTextHelpFormatter)
+    parser.add_argument("jobs", type=str, help="JSON-lines file with one search per line (in the format of the requests of server.py)\n")
+    parser.add_argument("-c", default=os.cpu_count(), type=int, help="number of cores\n")
+    parser.add_argument("-mt", default=8, type=int, help="maximum number of threads of a search\n")
+    parser.add_argument("-hf", default="scheduler_history.jsonl", type=str, help="history of the running times, updated by every run\n")
+    parser.add_argument("-lf", default="scheduler_logs", type=str, help="folder for the output of the searches\n")
+    parser.add_argument("-mem", default=None, type=float, help="memory budget of the searches in MB (by default 95%% of the available memory)\n")
+    parser.add_argument("-dm", default=2048, type=float, help="projected memory in MB of a search with one thread and no history\n")
+    parser.add_argument("-dry", action="store_true", help="Use this flag to print the schedule without running it\n")
+    args = parser.parse_args()
+
+    scheduler = Scheduler(read_jsonl(args.jobs), args.c, args.mt, args.hf, args.lf, args.mem, args.dm)
+    lpt_makespan, fifo_makespan = scheduler.predicted_makespan()
+    print(line_separator)
+    print("Scheduling {} searches on {} cores".format(len(scheduler.jobs), args.c))
+    print("History:                  {} runs".format(len(scheduler.predictor.history)))
+    print("Predicted makespan (LPT): {:0.02f} seconds".format(lpt_makespan))
+    print("Predicted makespan (FIFO):{:0.02f} seconds".format(fifo_makespan))
+    if scheduler.memory_budget is not None:
+        print("Memory budget:            {:0.0f} MB".format(scheduler.memory_budget))
+    print(line_separator)
+    if args.dry:
+        threads, times, order = scheduler.plan(list(range(len(scheduler.jobs))))
+        for index in order:
+            print("{:<40} threads: {:<3} predicted: {:0.02f} seconds, {:0.0f} MB".format(job_variant(scheduler.jobs[index]), threads[index], times[index],
+                  scheduler.memory_planner.project(scheduler.jobs[index], threads[index])))
+        return
+    start_time = time.time()
+    records = scheduler.run()
+    print(line_separator)
+    print("Makespan: {:0.02f} seconds".format(time.time() - start_time))
+    print("Failed searches: {}".format(sum(record["exit_code"] != 0 for record in records)))
+    print(line_separator)
+
+if __name__ == "__main__":
+    main()
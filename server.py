@@ -0,0 +1,385 @@
+#!/usr/env/bin python3
+#-*- coding: UTF-8 -*-
+
+"""
+MIT License
+
+Copyright (c) 2023 Hosein Hadipour
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+
+email: hsn.hadipour@gmail.com
+"""
+
+"""
+Local search server that keeps the tools of this repository loaded between searches.
+
+Every tool is a script <cipher>/<mode>/<script>.py, or <folder>/<script>.py for the tools of the top-level folders
+such as partial_sum_optimization, which is normally started as a new Python process. The server instead keeps a
+bounded number of worker processes, each bound to one tool folder: the worker changes into the folder once,
+imports the script once and then runs main() for every request it is given, so that the imports, the list of
+MiniZinc solvers, the lru_caches and the lookup tables of the tool stay warm. A script without a main() function
+is run as __main__ in the worker, so that only the modules it imports stay loaded. The flattening of the model
+is still done by MiniZinc for every request, as it depends on the parameters. The folder shared only holds
+modules and is not a tool.
+
+A request is a JSON object posted to http://127.0.0.1:<port>/search, for example
+
+    {"cipher": "skinny", "mode": "impossible", "script": "attack.py",
+     "parameters": {"v": 2, "RB": 3, "RD": 11, "RF": 5, "p": 4}, "time_limit": 600}
+
+where the parameters are the command-line switches of the script without the leading "-" (a switch set to true
+is passed without a value, and a list is passed as several values), and the optional list "arguments" holds the
+positional arguments of the script. The mode is left out for the tools of a top-level folder. The time limit is
+passed as -tl, or as --timelimit if the script has no -tl switch, and a request with a time limit for a script
+without either switch is rejected. The answer is streamed as one JSON object per line: the events "queued",
+"started", "output" (one per line printed by the tool or by the processes it starts, also on stderr) and finally
+"finished" or "failed".
+"""
+
+import os
+import re
+import sys
+import json
+import time
+import runpy
+import select
+import threading
+import importlib
+import traceback
+import multiprocessing
+from pathlib import Path
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from argparse import ArgumentParser, RawTextHelpFormatter
+line_separator = "#"*55
+repository_folder = Path(__file__).resolve().parent
+# folders of modules used by the tools, which are no tools themselves
+module_folders = ["shared"]
+switch_pattern = re.compile(r"""add_argument\(((?:\s*["']-[\w-]+["']\s*,)+)""")
+
+def available_tools():
+    """
+    The tools of the repository as a dictionary {(cipher, mode): {script: its command-line switches}}, where the
+    mode is None for the tools of a top-level folder. A tool is a script with a main() function or a __main__ block
+    """
+
+    tools = dict()
+    for script in sorted(repository_folder.glob("*/*.py")) + sorted(repository_folder.glob("*/*/*.py")):
+        folder = script.parent.relative_to(repository_folder)
+        if folder.parts[0] in module_folders:
+            continue
+        with open(script, "r") as pyfile:
+            source = pyfile.read()
+        if "\ndef main(" not in source and "\nif __name__ == \"__main__\":" not in source:
+            continue
+        switches = {switch for arguments in switch_pattern.findall(source) for switch in re.findall(r"-[\w-]+", arguments)}
+        key = (folder.parts[0], folder.parts[1] if len(folder.parts) > 1 else None)
+        tools.setdefault(key, dict())[script.name] = switches
+    return tools
+
+def tool_folder(cipher, mode):
+    return repository_folder / cipher if mode is None else repository_folder / cipher / mode
+
+def time_limit_switch(switches):
+    """
+    Switch of the time limit of a script, given its command-line switches, without the leading "-"
+    """
+
+    for switch in ["-tl", "--timelimit"]:
+        if switch in switches:
+            return switch[1:]
+    raise ValueError("The script has no time limit switch (-tl or --timelimit)")
+
+def to_argv(parameters):
+    """
+    Convert a dictionary of command-line switches into the argument list of a script
+    """
+
+    argv = []
+    for switch, value in parameters.items():
+        flag = switch if switch.startswith("-") else "-" + switch
+        if value is True:
+            argv.append(flag)
+        elif value is False or value is None:
+            continue
+        elif isinstance(value, (list, tuple)):
+            argv += [flag] + [str(v) for v in value]
+        else:
+            argv += [flag, str(value)]
+    return argv
+
+class OutputRelay:
+    """
+    Redirect the file descriptors 1 and 2 of the worker into an OS-level pipe, and send every line written into it
+    through a connection. The processes started by a tool inherit the pipe, so that their output is relayed as well
+    instead of being written into the connection at the same time as the worker
+    """
+
+    def __init__(self, connection):
+        self.connection = connection
+
+    def __enter__(self):
+        sys.stdout.flush()
+        sys.stderr.flush()
+        self.saved = [os.dup(1), os.dup(2)]
+        self.read_end, write_end = os.pipe()
+        os.dup2(write_end, 1)
+        os.dup2(write_end, 2)
+        os.close(write_end)
+        self.done = threading.Event()
+        self.thread = threading.Thread(target=self.relay)
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exception):
+        sys.stdout.flush()
+        sys.stderr.flush()
+        for fd, saved in zip([1, 2], self.saved):
+            os.dup2(saved, fd)
+            os.close(saved)
+        # a process left behind by the tool may still hold the pipe, hence the relay stops once it is quiet
+        self.done.set()
+        self.thread.join()
+        os.close(self.read_end)
+
+    def relay(self):
+        buffer = b""
+        while True:
+            ready, _, _ = select.select([self.read_end], [], [], 0.1)
+            if not ready:
+                if self.done.is_set():
+                    break
+                continue
+            data = os.read(self.read_end, 65536)
+            if data == b"":
+                break
+            *lines, buffer = (buffer + data).split(b"\n")
+            for line in lines:
+                self.connection.send(("output", line.decode(errors="replace")))
+        if buffer != b"":
+            self.connection.send(("output", buffer.decode(errors="replace")))
+
+def serve_folder(folder, connection):
+    """
+    Main loop of a worker process: run the scripts of one tool folder for the requests received through connection
+    """
+
+    os.chdir(folder)
+    sys.path.insert(0, str(folder))
+    # the output is relayed line by line while the tool runs
+    sys.stdout.reconfigure(line_buffering=True)
+    sys.stderr.reconfigure(line_buffering=True)
+    while True:
+        job = connection.recv()
+        if job is None:
+            break
+        script, argv = job
+        start_time = time.time()
+        summary = {"exit_code" : 0}
+        with OutputRelay(connection):
+            try:
+                sys.argv = [script] + argv
+                with open(script, "r") as pyfile:
+                    has_main = "\ndef main(" in pyfile.read()
+                if has_main:
+                    importlib.import_module(Path(script).stem).main()
+                else:
+                    runpy.run_path(script, run_name="__main__")
+            except SystemExit as e:
+                # argparse exits on invalid arguments, and some scripts exit explicitly
+                summary["exit_code"] = e.code if isinstance(e.code, int) else 1
+            except Exception:
+                summary["exit_code"] = 1
+                summary["error"] = traceback.format_exc()
+        summary["elapsed_time"] = time.time() - start_time
+        connection.send(("finished" if summary["exit_code"] == 0 else "failed", summary))
+
+class Worker:
+    def __init__(self, folder):
+        self.folder = folder
+        self.connection, child_connection = multiprocessing.Pipe()
+        # the tools start process pools of their own, hence the workers are not daemonic
+        self.process = multiprocessing.Process(target=serve_folder, args=(folder, child_connection), daemon=False)
+        self.process.start()
+        child_connection.close()
+        self.jobs = 0
+
+    def run(self, script, argv):
+        """
+        Run a script in the worker and yield the events (kind, content) it sends back
+        """
+
+        self.jobs += 1
+        self.connection.send((script, argv))
+        while True:
+            try:
+                kind, content = self.connection.recv()
+            except EOFError:
+                yield "failed", {"exit_code" : self.process.exitcode, "error" : "The worker process terminated"}
+                return
+            yield kind, content
+            if kind != "output":
+                return
+
+    def stop(self):
+        if self.process.is_alive():
+            try:
+                self.connection.send(None)
+            except (BrokenPipeError, OSError):
+                pass
+            self.process.join(timeout=5)
+            if self.process.is_alive():
+                self.process.terminate()
+
+class WorkerPool:
+    """
+    At most max_workers worker processes. A request waits for an idle worker bound to its folder, or for a free
+    slot, in which case the idle worker used least recently is replaced if all slots are taken
+    """
+
+    def __init__(self, max_workers):
+        self.max_workers = max_workers
+        self.idle = []
+        self.number_of_workers = 0
+        self.condition = threading.Condition()
+
+    def acquire(self, folder):
+        with self.condition:
+            while True:
+                for worker in self.idle:
+                    if worker.folder == folder:
+                        self.idle.remove(worker)
+                        return worker
+                if self.number_of_workers < self.max_workers:
+                    self.number_of_workers += 1
+                    break
+                if self.idle:
+                    self.idle.pop(0).stop()
+                    break
+                self.condition.wait()
+        return Worker(folder)
+
+    def release(self, worker):
+        with self.condition:
+            if worker.process.is_alive():
+                self.idle.append(worker)
+            else:
+                self.number_of_workers -= 1
+            self.condition.notify_all()
+
+    def shutdown(self):
+        with self.condition:
+            for worker in self.idle:
+                worker.stop()
+            self.idle = []
+
+class RequestHandler(BaseHTTPRequestHandler):
+    pool = None
+    tools = dict()
+
+    def send_json(self, code, content):
+        self.send_response(code)
+        self.send_header("Content-Type", "application/json")
+        self.end_headers()
+        self.wfile.write((json.dumps(content) + "\n").encode())
+
+    def send_event(self, event, **content):
+        content["event"] = event
+        self.wfile.write((json.dumps(content) + "\n").encode())
+        self.wfile.flush()
+
+    def do_GET(self):
+        if self.path == "/tools":
+            self.send_json(200, [{"cipher" : cipher, "mode" : mode, "scripts" : sorted(scripts)} for (cipher, mode), scripts in self.tools.items()])
+        else:
+            self.send_json(404, {"error" : "Unknown path {}".format(self.path)})
+
+    def do_POST(self):
+        if self.path != "/search":
+            self.send_json(404, {"error" : "Unknown path {}".format(self.path)})
+            return
+        try:
+            request = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))))
+            mode = request.get("mode")
+            scripts = self.tools[(request["cipher"], mode)]
+            script = request.get("script", "attack.py" if "attack.py" in scripts else "distinguisher.py")
+            assert script in scripts, "Unknown script {}".format(script)
+            parameters = dict(request.get("parameters", dict()))
+            if request.get("time_limit") is not None:
+                parameters[time_limit_switch(scripts[script])] = request["time_limit"]
+            argv = [str(argument) for argument in request.get("arguments", [])] + to_argv(parameters)
+        except (ValueError, KeyError, AssertionError) as e:
+            self.send_json(400, {"error" : "Invalid request: {}".format(e)})
+            return
+        folder = tool_folder(request["cipher"], mode)
+        self.send_response(200)
+        self.send_header("Content-Type", "application/x-ndjson")
+        self.end_headers()
+        self.send_event("queued", script=str((folder / script).relative_to(repository_folder)), argv=argv)
+        worker = self.pool.acquire(folder)
+        connected = True
+        try:
+            self.send_event("started", warm=worker.jobs > 0)
+        except (BrokenPipeError, ConnectionResetError):
+            connected = False
+        # if the client leaves, the events of the job are still consumed before the worker is reused
+        for kind, content in worker.run(script, argv):
+            if not connected:
+                continue
+            try:
+                if kind == "output":
+                    self.send_event(kind, line=content)
+                else:
+                    self.send_event(kind, **content)
+            except (BrokenPipeError, ConnectionResetError):
+                connected = False
+        self.pool.release(worker)
+
+    def log_message(self, format, *args):
+        print("{} {}".format(self.address_string(), format % args))
+
+def main():
+    '''
+    Start the search server
+    '''
+
+    parser = ArgumentParser(description="This tool keeps the search tools of this repository loaded and runs JSON search requests",
+                            formatter_class=RawTextHelpFormatter)
+    parser.add_argument("-port", default=8765, type=int, help="port of the server (on 127.0.0.1)\n")
+    parser.add_argument("-w", default=2, type=int, help="maximum number of worker processes (searches running at the same time)\n")
+    args = parser.parse_args()
+
+    RequestHandler.pool = WorkerPool(args.w)
+    RequestHandler.tools = available_tools()
+    server = ThreadingHTTPServer(("127.0.0.1", args.port), RequestHandler)
+    print(line_separator)
+    print("Search server listening on http://127.0.0.1:{}".format(args.port))
+    print("Max. no. of workers: {}".format(args.w))
+    print("Tools:               {}".format(", ".join(cipher if mode is None else "{}/{}".format(cipher, mode) for cipher, mode in RequestHandler.tools)))
+    print(line_separator)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        RequestHandler.pool.shutdown()
+
+if __name__ == "__main__":
+    main()
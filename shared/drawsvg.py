@@ -0,0 +1,373 @@
+#!/usr/env/bin python3
+#-*- coding: UTF-8 -*-
+
+"""
+MIT License
+
+Copyright (c) 2023 Hosein Hadipour
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+
+email: hsn.hadipour@gmail.com
+"""
+
+r"""
+SVG rendering of the SKINNY figures without LaTeX.
+
+The drawers describe every state by a Cells object, i.e., the list of the cell macros of skinnyzero.sty (\Fill,
+\TFill, \BFill, \PattCell, \MarkCellN, \FrameCell and \Cell) with their colours and cells. Cells.tikz returns the
+TikZ code of a state, and SkinnySVG draws the same cells and lays the states out like \SkinnyRoundTK,
+\SkinnyRoundEK, \SkinnyNewLine and \SkinnyFin, with the colours of tugcolors.sty and skinnyzero.sty, so that the
+same drawers can write an SVG file instead of TikZ code.
+"""
+
+from html import escape
+
+# colours of xcolor, tugcolors.sty, skinny.sty and skinnyzero.sty (an entry is either #RRGGBB or a colour expression)
+named_colors = {"white" : "#FFFFFF", "black" : "#000000", "gray" : "#808080", "red" : "#FF0000", "green" : "#00FF00",
+                "blue" : "#0000FF", "cyan" : "#00FFFF", "yellow" : "#FFFF00", "orange" : "#FF8000", "purple" : "#BF0040",
+                "tug" : "#F70146", "chem" : "#5E60A8", "colD" : "#285F82", "colE" : "#78B473", "colF" : "#E59352", "head" : "#245B78",
+                "tugred" : "tug", "tuggreen" : "colE", "tugblue" : "colD", "tugyellow" : "colF", "tugviolet" : "chem",
+                "diff" : "blue!50", "fillopts" : "diff", "marc" : "tugred",
+                "nonzerofixed" : "tugyellow", "nonzeroany" : "tugred", "unknown" : "tugblue", "active" : "cyan", "lazy" : "gray",
+                "filter" : "yellow!80!red", "fastfilter" : "tugred", "marcn" : "tugred", "marcf" : "tugred",
+                "upperactive" : "tugred", "loweractive" : "tugblue", "zero" : "white", "one" : "tugred",
+                "upperunknown" : "tugblue", "lowerunknown" : "tuggreen!70!green", "key" : "tug", "cond" : "head"}
+# shapes of the cell macros as polygons in a unit cell whose top left corner is (0, 0)
+cell_shapes = {"Fill" : [(0, 0), (1, 0), (1, 1), (0, 1)],
+               "TFill" : [(0, 0), (0, 1), (1, 0)],
+               "BFill" : [(1, 1), (1, 0), (0, 1)],
+               "MarkCellN" : [(0, 0), (0, .3), (.7, 1), (1, 1), (1, .7), (.3, 0)]}
+default_colors = {"Fill" : "fillopts", "TFill" : "tugviolet", "BFill" : "tuggreen!70!green",
+                  "MarkCellN" : "marcn", "PattCell" : "black", "FrameCell" : "fillopts"}
+# parts of a cell painted by each fill macro
+fill_parts = {"Fill": ("upper", "lower"), "TFill": ("upper",), "BFill": ("lower",)}
+
+def cell_name(cell):
+    """
+    TikZ coordinate of a cell: s<i> for the index i of a 4x4 state, or ss<row><column> for a pair (row, column)
+    """
+
+    if isinstance(cell, tuple):
+        return "ss{}{}".format(*cell)
+    return "s{}".format(cell)
+
+def cell_position(cell):
+    """
+    Row and column of a cell given by its index or by a pair (row, column)
+    """
+
+    if isinstance(cell, tuple):
+        return cell
+    return divmod(cell, 4)
+
+class Cells():
+    r"""
+    The cell macros of a state as a list of (macro, colour, cell, text), where the colour None stands for the
+    default colour of the macro, and the text is only used by \Cell
+    """
+
+    def __init__(self):
+        self.commands = []
+
+    def add(self, macro, cell, color=None, text=None):
+        self.commands.append((macro, color, cell, text))
+        return self
+
+    def fill(self, cell, color=None):
+        return self.add("Fill", cell, color)
+
+    def tfill(self, cell, color=None):
+        return self.add("TFill", cell, color)
+
+    def bfill(self, cell, color=None):
+        return self.add("BFill", cell, color)
+
+    def pattern(self, cell, color=None):
+        return self.add("PattCell", cell, color)
+
+    def mark(self, cell):
+        return self.add("MarkCellN", cell)
+
+    def frame(self, cell, color=None):
+        return self.add("FrameCell", cell, color)
+
+    def text(self, cell, text):
+        return self.add("Cell", cell, text=text)
+
+    def __iadd__(self, other):
+        self.commands.extend(other.commands)
+        return self
+
+    def tikz(self):
+        r"""
+        TikZ code of the state. The \Fill, \TFill and \BFill commands are merged into one \Fills, \TFills or \BFills
+        path per colour. The other commands are kept in place, and the fills are only merged as long as no cell is
+        painted twice, so that the drawing order of overlapping commands is preserved
+        """
+
+        output = ""
+        groups = dict()
+        painted = dict()
+        def flush():
+            nonlocal output
+            for (macro, color), cells in groups.items():
+                output += "\\" + macro + "s" + ("" if color is None else "[" + color + "]") + "{" + ",".join(cells) + "}"
+            groups.clear()
+            painted.clear()
+        for macro, color, cell, text in self.commands:
+            name = cell_name(cell)
+            if macro not in fill_parts:
+                flush()
+                if macro == "Cell":
+                    output += "\\Cell{" + name + "}{\\texttt{" + text + "}}"
+                else:
+                    output += "\\" + macro + ("" if color is None else "[" + color + "]") + "{" + name + "}"
+                continue
+            key = (macro, color)
+            if any(painted.get((name, part), key) != key for part in fill_parts[macro]):
+                flush()
+            for part in fill_parts[macro]:
+                painted[(name, part)] = key
+            cells = groups.setdefault(key, [])
+            if name not in cells:
+                cells.append(name)
+        flush()
+        return output
+
+legends = {"ZeroIDDistinguisherLegend" : [(Cells().fill(0, "nonzerofixed"), "fixed"), (Cells().fill(0, "nonzeroany"), "nonzero"),
+                                          (Cells().fill(0, "unknown"), "any")],
+           "ZeroIDLegend" : [(Cells().fill(0, "nonzerofixed"), "fixed"), (Cells().fill(0, "nonzeroany"), "nonzero"),
+                             (Cells().fill(0, "unknown"), "any"), (Cells().fill(0, "active"), "involved in key-recovery"),
+                             (Cells().pattern(0), "diff. is needed"), (Cells().mark(0), "value is needed"),
+                             (Cells().frame(0, "filter"), "filter")],
+           "IntegralDistinguisherLegend" : [(Cells().fill(0, "nonzerofixed"), "fixed"), (Cells().fill(0, "nonzeroany"), "nonzero"),
+                                            (Cells().fill(0, "unknown"), "any"), (Cells().frame(0, "filter"), "active tweak")],
+           "ZeroZILegend" : [(Cells().fill(0, "active"), "initial round"), (Cells().fill(0, "unknown"), "any"),
+                             (Cells().fill(0, "nonzeroany"), "nonzero"), (Cells().fill(0, "nonzerofixed"), "integral"),
+                             (Cells().tfill(0), "key branch 1"), (Cells().bfill(0), "key branch 2")]}
+line_height = 12
+
+class SkinnySVG():
+    """
+    Draw SKINNY states and rounds into an SVG image
+    """
+
+    def __init__(self, colors=None, scale=12, title=""):
+        self.colors = dict(named_colors)
+        if colors is not None:
+            self.colors.update(colors)
+        self.scale = scale
+        self.title = title
+        self.elements = []
+        self.patterns = dict()
+        self.x = 0
+        self.y = 1
+        self.width = 0
+        self.height = 0
+
+    def rgb(self, expression):
+        """
+        RGB values of an xcolor expression such as tuggreen!70!green or blue!55
+        """
+
+        tokens = expression.strip().split("!")
+        color = self.colors.get(tokens[0], "#000000")
+        if color.startswith("#"):
+            rgb = [int(color[i:i + 2], 16) for i in (1, 3, 5)]
+        else:
+            rgb = self.rgb(color)
+        for i in range(1, len(tokens), 2):
+            percent = float(tokens[i])/100
+            other = self.rgb(tokens[i + 1]) if i + 1 < len(tokens) else [255, 255, 255]
+            rgb = [percent*a + (1 - percent)*b for a, b in zip(rgb, other)]
+        return rgb
+
+    def color(self, options):
+        """
+        SVG colour and opacity of the options of a TikZ fill, e.g., "lazy, opacity=0.70"
+        """
+
+        options = [option.strip() for option in options.split(",")]
+        opacity = 1
+        for option in options[1:]:
+            if option.startswith("opacity="):
+                opacity = float(option.split("=")[1])
+        return "#" + "".join("{:02X}".format(round(value)) for value in self.rgb(options[0])), opacity
+
+    def hatch(self, color):
+        """
+        Id of a north east lines pattern of the given colour
+        """
+
+        if color not in self.patterns:
+            self.patterns[color] = "hatch{}".format(len(self.patterns))
+        return self.patterns[color]
+
+    def extend(self, x, y):
+        self.width = max(self.width, x)
+        self.height = max(self.height, y)
+
+    def state(self, cells, x, y, rows=4, columns=4, label=None):
+        """
+        Draw a state of the given size whose top left corner is (x, y), filled by the given Cells
+        """
+
+        for macro, color, cell, text in cells.commands:
+            color, opacity = self.color(color if color is not None else default_colors.get(macro, "black"))
+            row, column = cell_position(cell)
+            if macro == "Cell":
+                self.elements.append('<text x="{}" y="{}" font-size=".6" font-family="monospace" text-anchor="middle" dominant-baseline="central">{}</text>'.format(
+                    x + column + .5, y + row + .5, escape(text)))
+            elif macro == "FrameCell":
+                self.elements.append('<rect x="{}" y="{}" width=".84" height=".84" rx=".1" fill="none" stroke="{}" stroke-width=".16"/>'.format(
+                    x + column + .08, y + row + .08, color))
+            elif macro == "PattCell":
+                self.elements.append('<path d="M{} {}h1v1h-1Z" fill="url(#{})"/>'.format(x + column, y + row, self.hatch(color)))
+            else:
+                path = "M" + "L".join("{:g} {:g}".format(x + column + dx, y + row + dy) for dx, dy in cell_shapes[macro]) + "Z"
+                self.elements.append('<path d="{}" fill="{}"{}/>'.format(path, color, "" if opacity == 1 else ' fill-opacity="{}"'.format(opacity)))
+        raster = "".join("M{} {}h{}".format(x, y + i, columns) for i in range(1, rows)) + "".join("M{} {}v{}".format(x + i, y, rows) for i in range(1, columns))
+        if raster != "":
+            self.elements.append('<path d="{}" stroke="#A0A0A0" stroke-width=".04"/>'.format(raster))
+        self.elements.append('<rect x="{}" y="{}" width="{}" height="{}" fill="none" stroke="black" stroke-width=".08"/>'.format(x, y, columns, rows))
+        if label is not None:
+            self.label(label, x + columns/2, y - .3)
+        self.extend(x + columns, y + rows)
+
+    def label(self, text, x, y, size=.8, anchor="middle"):
+        self.elements.append('<text x="{}" y="{}" font-size="{}" font-family="serif" font-style="italic" text-anchor="{}">{}</text>'.format(
+            x, y, size, anchor, escape(text)))
+
+    def arrow(self, x1, y1, x2, y2):
+        self.elements.append('<line x1="{}" y1="{}" x2="{}" y2="{}" stroke="black" stroke-width=".06" marker-end="url(#arrow)"/>'.format(x1, y1, x2, y2))
+
+    def operation(self, text):
+        """
+        Draw an operation box with an arrow to the next state and move the cursor behind it
+        """
+
+        self.arrow(self.x, self.y + 2, self.x + .6, self.y + 2)
+        self.elements.append('<rect x="{}" y="{}" width=".8" height="2" fill="white" stroke="black" stroke-width=".06"/>'.format(self.x + .6, self.y + 1))
+        self.elements.append('<text x="{}" y="{}" font-size=".5" font-family="sans-serif" text-anchor="middle" dominant-baseline="central" transform="rotate(90 {} {})">{}</text>'.format(
+            self.x + 1, self.y + 2, self.x + 1, self.y + 2, escape(text)))
+        self.arrow(self.x + 1.4, self.y + 2, self.x + 2, self.y + 2)
+        self.x += 2
+
+    def add_tweakey(self, tweakey, label, rows):
+        """
+        Draw the XOR with a round tweakey state placed below it, and move the cursor behind it
+        """
+
+        cx, cy = self.x + 1.5, self.y + 2
+        self.arrow(self.x, cy, cx - .4, cy)
+        self.elements.append('<circle cx="{}" cy="{}" r=".4" fill="white" stroke="black" stroke-width=".06"/>'.format(cx, cy))
+        self.elements.append('<path d="M{} {}h.8M{} {}v.8" stroke="black" stroke-width=".06"/>'.format(cx - .4, cy, cx, cy - .4))
+        self.arrow(cx, self.y + 5, cx, cy + .4)
+        self.state(tweakey, cx - 2, self.y + 5, rows=rows)
+        self.label(label, cx + 2.2, self.y + 5.8, anchor="start")
+        self.arrow(cx + .4, cy, self.x + 3, cy)
+        self.x += 3
+
+    def round_tk(self, r, state, subtweakey, after_sb, after_addtk, after_sr):
+        r"""
+        Same as \SkinnyRoundTK
+        """
+
+        self.state(state, self.x, self.y, label="X{}".format(r))
+        self.x += 4
+        self.operation("SC AC")
+        self.state(after_sb, self.x, self.y, label="Y{}".format(r))
+        self.x += 4
+        self.add_tweakey(subtweakey, "STK{}".format(r), 2)
+        self.state(after_addtk, self.x, self.y, label="Z{}".format(r))
+        self.x += 4
+        self.operation("SR")
+        self.state(after_sr, self.x, self.y, label="W{}".format(r))
+        self.x += 4
+        self.operation("MC")
+
+    def round_ek(self, r, state, subtweakey, after_sb, after_sr, after_mix_columns):
+        r"""
+        Same as \SkinnyRoundEK: the round tweakey is added after MixColumns
+        """
+
+        self.state(state, self.x, self.y, label="X{}".format(r))
+        self.x += 4
+        self.operation("SC AC")
+        self.state(after_sb, self.x, self.y, label="Y{}".format(r))
+        self.x += 4
+        self.operation("SR")
+        self.state(after_sr, self.x, self.y, label="W{}".format(r))
+        self.x += 4
+        self.operation("MC")
+        self.state(after_mix_columns, self.x, self.y, label="W'{}".format(r))
+        self.x += 4
+        self.add_tweakey(subtweakey, "ETK{}".format(r), 4)
+
+    def new_line(self, r, state):
+        r"""
+        Same as \SkinnyNewLine: draw the state after MixColumns and continue on a new line
+        """
+
+        self.fin(r, state)
+        self.x = 0
+        self.y += line_height
+
+    def fin(self, r, state):
+        r"""
+        Same as \SkinnyFin
+        """
+
+        self.state(state, self.x, self.y, label="X{}".format(r))
+        self.x += 4
+
+    def legend(self, name):
+        """
+        Draw one of the legends of skinnyzero.sty below the figure
+        """
+
+        x, y = 0, self.height + 1.5
+        for cells, text in legends[name]:
+            self.state(cells, x, y, rows=1, columns=1)
+            self.label(text, x + 1.5, y + .8, size=.7, anchor="start")
+            x += 2 + .45*len(text)
+        self.extend(x, y + 1)
+
+    def render(self):
+        """
+        Return the SVG image
+        """
+
+        width, height = self.width + 1, self.height + 1
+        defs = '<marker id="arrow" viewBox="0 0 10 10" refX="9" refY="5" markerWidth="5" markerHeight="5" orient="auto"><path d="M0 0L10 5L0 10Z"/></marker>'
+        for color, identifier in self.patterns.items():
+            defs += '<pattern id="{}" width=".25" height=".25" patternUnits="userSpaceOnUse" patternTransform="rotate(45)"><path d="M0 0v.25" stroke="{}" stroke-width=".05"/></pattern>'.format(identifier, color)
+        contents = '<svg xmlns="http://www.w3.org/2000/svg" width="{}" height="{}" viewBox="-.5 -.5 {} {}">\n'.format(
+            round(width*self.scale), round(height*self.scale), width, height)
+        if self.title != "":
+            contents += "<title>{}</title>\n".format(escape(self.title))
+        contents += "<defs>" + defs + "</defs>\n"
+        contents += '<rect x="-.5" y="-.5" width="{}" height="{}" fill="white"/>\n'.format(width, height)
+        contents += "\n".join(self.elements) + "\n</svg>\n"
+        return contents
+
+    def save(self, file_name):
+        with open(file_name, "w") as svgfile:
+            svgfile.write(self.render())
@@ -0,0 +1,199 @@
+#!/usr/env/bin python3
+#-*- coding: UTF-8 -*-
+
+"""
+MIT License
+
+Copyright (c) 2023 Hosein Hadipour
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+
+email: hsn.hadipour@gmail.com
+"""
+
+"""
+Generate the lookup tables of the SKINNY and ForkSKINNY ID models (attack.mzn and tweakeyschedule.mzn) as
+MiniZinc data files.
+
+The tables are written once into the folder tables/ of the model and reused as long as the version in their
+first line matches VERSION. Increase VERSION whenever the content of a table changes.
+"""
+
+import os
+import math
+import tempfile
+import itertools
+from pathlib import Path
+from argparse import ArgumentParser, RawTextHelpFormatter
+
+VERSION = 1
+# binary matrix of the MixColumns of SKINNY
+mix_columns = [[1, 0, 1, 1],
+               [1, 0, 0, 0],
+               [0, 1, 1, 0],
+               [1, 0, 1, 0]]
+
+# the tapped bit of the LFSRs of TK2 and TK3 for each cell size, the other tap is x_{cell_size - 1} for TK2 and x_0 for TK3
+lfsr_tk2_tap = {4: 2, 8: 5}
+lfsr_tk3_tap = {4: 3, 8: 6}
+
+def lfsr_tk2(cell_size):
+    """
+    LFSR of the TK2 tweakey schedule: (x_{c-1}, ..., x_0) -> (x_{c-2}, ..., x_0, x_{c-1} ^ x_tap)
+    """
+
+    feedback = lfsr_tk2_tap[cell_size]
+    return [(x, ((x << 1) & ((1 << cell_size) - 1)) | (((x >> (cell_size - 1)) ^ (x >> feedback)) & 1)) for x in range(1 << cell_size)]
+
+def lfsr_tk3(cell_size):
+    """
+    LFSR of the TK3 tweakey schedule: (x_{c-1}, ..., x_0) -> (x_0 ^ x_tap, x_{c-1}, ..., x_1)
+    """
+
+    feedback = lfsr_tk3_tap[cell_size]
+    return [(x, (x >> 1) | (((x ^ (x >> feedback)) & 1) << (cell_size - 1))) for x in range(1 << cell_size)]
+
+def xor_nibbles():
+    """
+    XOR of two nibbles: rows (a, b, a ^ b). The differences of 8-bit cells are XORed nibble by nibble
+    """
+
+    return [(a, b, a ^ b) for a in range(16) for b in range(16)]
+
+def log2_minus_053_times_1000(size=384):
+    """
+    The function floor(1000*(log2(x) - 0.53)) for x = 1, ..., size
+    """
+
+    return [(x, math.floor(1000*(math.log2(x) - 0.53))) for x in range(1, size + 1)]
+
+def log2_minus_053(size=256):
+    """
+    The function ceil(log2(x) - 0.53) for x = 1, ..., size
+    """
+
+    return [(x, math.ceil(math.log2(x) - 0.53)) for x in range(1, size + 1)]
+
+def inverse_matrix(matrix):
+    """
+    Invert a binary matrix over GF(2)
+    """
+
+    n = len(matrix)
+    rows = [row[:] + [int(i == j) for j in range(n)] for i, row in enumerate(matrix)]
+    for column in range(n):
+        pivot = next(r for r in range(column, n) if rows[r][column] == 1)
+        rows[column], rows[pivot] = rows[pivot], rows[column]
+        for r in range(n):
+            if r != column and rows[r][column] == 1:
+                rows[r] = [a ^ b for a, b in zip(rows[r], rows[column])]
+    return [row[n:] for row in rows]
+
+def fixed_filter(matrix):
+    """
+    Filters of a column y = matrix*x in which the differences of the cells in a given set of x are fixed:
+    y[j] is fixed whenever all cells of x involved in it are fixed, and each fixed y[j] uses up one of the
+    fixed cells of x, chosen by the first matching between y and x within the nonzero entries of matrix.
+    The remaining fixed cells of x are filters. Row k of the table is the fixed pattern of x (the most
+    significant bit of k is x[0]) followed by its filters
+    """
+
+    n = len(matrix)
+    matching = next(p for p in itertools.permutations(range(n)) if all(matrix[j][p[j]] == 1 for j in range(n)))
+    table = []
+    for k in range(1 << n):
+        fixed = [(k >> (n - 1 - i)) & 1 for i in range(n)]
+        used = [matching[j] for j in range(n) if all(fixed[i] for i in range(n) if matrix[j][i] == 1)]
+        table.append(fixed + [int(fixed[i] == 1 and i not in used) for i in range(n)])
+    return table
+
+def lookup_tables():
+    """
+    The content of each data file as a dictionary {table name: (index sets, rows)}
+    """
+
+    return {"lfsr": {"lfsr_tk2_64": ("0..15, 1..2", lfsr_tk2(4)),
+                     "lfsr_tk3_64": ("0..15, 1..2", lfsr_tk3(4)),
+                     "lfsr_tk2_128": ("0..255, 1..2", lfsr_tk2(8)),
+                     "lfsr_tk3_128": ("0..255, 1..2", lfsr_tk3(8))},
+            "xor": {"xor_nibble_table": ("0..255, 1..3", xor_nibbles())},
+            "log2": {"log2_minus_053_times_1000_lookup_table": ("1..384, 1..2", log2_minus_053_times_1000(384)),
+                     "log2_minus_053_table": ("1..256, 1..2", log2_minus_053(256))},
+            # the backward table is used in EB, where the column of Z is derived from the column of X by the inverse of MixColumns
+            "filters": {"fixed_filter_backward": ("0..15, 1..8", fixed_filter(inverse_matrix(mix_columns))),
+                        "fixed_filter_forward": ("0..15, 1..8", fixed_filter(mix_columns))}}
+
+def header():
+    return "% generated by lookuptables.py, version {}\n".format(VERSION)
+
+def write_data_file(file_name, tables):
+    """
+    Write the data file into a temporary file first and move it into place, so that a process reading it
+    (or checking its header) never sees an incomplete file
+    """
+
+    descriptor, temporary_name = tempfile.mkstemp(dir=Path(file_name).parent, suffix=".tmp")
+    try:
+        with os.fdopen(descriptor, "w") as dznfile:
+            dznfile.write(header())
+            for name, (index_sets, rows) in tables.items():
+                entries = ", ".join(str(entry) for row in rows for entry in row)
+                dznfile.write("{} = array2d({}, [{}]);\n".format(name, index_sets, entries))
+        # mkstemp creates the file readable only by its owner
+        os.chmod(temporary_name, 0o644)
+        os.replace(temporary_name, file_name)
+    except BaseException:
+        os.remove(temporary_name)
+        raise
+
+def data_files(tables_folder, *names, force=False):
+    """
+    Return the paths of the data files with the given names in tables_folder, (re)generating the files that
+    are missing or that were written by another version of this module
+    """
+
+    tables_folder = Path(tables_folder)
+    tables_folder.mkdir(exist_ok=True)
+    paths = []
+    for name in names:
+        file_name = tables_folder / (name + ".dzn")
+        up_to_date = False
+        if not force and file_name.exists():
+            with open(file_name, "r") as dznfile:
+                up_to_date = dznfile.readline() == header()
+        if not up_to_date:
+            write_data_file(file_name, lookup_tables()[name])
+        paths.append(str(file_name))
+    return paths
+
+def main():
+    '''
+    Generate the data files of all lookup tables
+    '''
+
+    parser = ArgumentParser(description="This tool generates the lookup tables of attack.mzn and tweakeyschedule.mzn",
+                            formatter_class=RawTextHelpFormatter)
+    parser.add_argument("-o", "--output", default="tables", type=str, help="Folder of the data files (tables of the model in the current folder by default)")
+    parser.add_argument("-f", "--force", default=False, action="store_true", help="Rewrite the data files even if they are up to date")
+    args = parser.parse_args()
+    for file_name in data_files(args.output, *lookup_tables().keys(), force=args.force):
+        print("Lookup tables: {}".format(file_name))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,280 @@
+#!/usr/env/bin python3
+#-*- coding: UTF-8 -*-
+
+"""
+MIT License
+
+Copyright (c) 2023 Hosein Hadipour
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+
+email: hsn.hadipour@gmail.com
+"""
+
+"""
+Exact model counting of the MILP models of tweakeyschedule.py without Gurobi.
+
+All variables of these models are binary and every constraint involves a few of them, so each constraint is
+translated into CNF by excluding its infeasible assignments. The clauses are counted with a DPLL-style #SAT
+counter: unit propagation, decomposition of the remaining clauses into independent components (whose counts
+multiply) and a cache of the counts of the components already seen. Unlike the enumeration of the solution
+pool, the running time does not grow with the number of solutions on decomposable instances.
+"""
+
+import re
+import sys
+import itertools
+from argparse import ArgumentParser, RawTextHelpFormatter
+
+# largest number of variables of a single constraint translated by enumerating its assignments
+max_constraint_size = 16
+term_pattern = re.compile(r"([+-]?)\s*(\d+)?\s*([A-Za-z_][\w\.]*)?")
+
+def parse_linear_expression(expression):
+    """
+    Parse a linear expression of the LP format into a dictionary {variable: coefficient} and a constant
+    """
+
+    coefficients = dict()
+    constant = 0
+    for sign, number, variable in term_pattern.findall(expression.replace(" ", "")):
+        if number == "" and variable == "":
+            continue
+        value = (-1 if sign == "-" else 1) * (int(number) if number != "" else 1)
+        if variable == "":
+            constant += value
+        else:
+            coefficients[variable] = coefficients.get(variable, 0) + value
+    return coefficients, constant
+
+def lp_to_cnf(lp_contents):
+    """
+    Translate the constraints of an LP model over binary variables into CNF. Return the clauses (tuples of
+    DIMACS literals), the number of variables and the names of the variables (variable i + 1 is names[i]).
+    The variables declared in the binary section but not used in any constraint are counted as well. A constraint
+    whose variables all cancel out and which is violated by its constants gives the empty clause ()
+    """
+
+    names = []
+    index = dict()
+    def variable_index(name):
+        if name not in index:
+            names.append(name)
+            index[name] = len(names)
+        return index[name]
+    clauses = []
+    section = None
+    for line in lp_contents.split("\n"):
+        line = line.strip()
+        if line == "" or line.startswith("\\"):
+            continue
+        if line.lower() in ["subject to", "st", "s.t.", "binary", "binaries", "end"]:
+            section = line.lower()
+            continue
+        if section == "binary" or section == "binaries":
+            for name in line.split():
+                variable_index(name)
+            continue
+        if section not in ["subject to", "st", "s.t."]:
+            continue
+        match = re.search(r"(>=|<=|=)", line)
+        if match is None:
+            raise ValueError("Constraint without a comparison operator: {}".format(line))
+        operator = match.group(1)
+        lhs, rhs = line.split(operator)
+        coefficients, constant = parse_linear_expression(lhs)
+        rhs_coefficients, rhs_constant = parse_linear_expression(rhs)
+        for variable, coefficient in rhs_coefficients.items():
+            coefficients[variable] = coefficients.get(variable, 0) - coefficient
+        bound = rhs_constant - constant
+        variables = [variable for variable, coefficient in coefficients.items() if coefficient != 0]
+        if len(variables) > max_constraint_size:
+            raise ValueError("Constraint with {} variables, at most {} are supported (max_constraint_size): {}".format(
+                len(variables), max_constraint_size, line))
+        literals = [variable_index(variable) for variable in variables]
+        # exclude every infeasible assignment of the variables of the constraint
+        for assignment in itertools.product([0, 1], repeat=len(variables)):
+            value = sum(coefficients[variable]*bit for variable, bit in zip(variables, assignment))
+            if (operator == ">=" and value >= bound) or (operator == "<=" and value <= bound) or (operator == "=" and value == bound):
+                continue
+            clauses.append(tuple(-literal if bit else literal for literal, bit in zip(literals, assignment)))
+    return clauses, len(names), names
+
+def write_dimacs(file_name, clauses, num_of_variables):
+    """
+    Write the clauses in DIMACS format, e.g., to count them with an external #SAT solver. The empty clause is
+    written as a line holding only the terminating 0
+    """
+
+    with open(file_name, "w") as cnffile:
+        cnffile.write("p cnf {} {}\n".format(num_of_variables, len(clauses)))
+        for clause in clauses:
+            cnffile.write(" ".join(str(literal) for literal in clause) + " 0\n")
+
+def propagate(clauses, literals):
+    """
+    Assign the given literals and propagate the unit clauses. Return the remaining clauses and the set of
+    assigned variables, or None in case of a conflict
+    """
+
+    assigned = dict()
+    pending = list(literals)
+    while pending:
+        for literal in pending:
+            if assigned.get(abs(literal), literal > 0) != (literal > 0):
+                return None
+            assigned[abs(literal)] = literal > 0
+        pending = []
+        remaining = []
+        for clause in clauses:
+            reduced = []
+            satisfied = False
+            for literal in clause:
+                value = assigned.get(abs(literal))
+                if value is None:
+                    reduced.append(literal)
+                elif value == (literal > 0):
+                    satisfied = True
+                    break
+            if satisfied:
+                continue
+            if len(reduced) == 0:
+                return None
+            if len(reduced) == 1:
+                pending.append(reduced[0])
+            else:
+                remaining.append(tuple(reduced))
+        clauses = remaining
+    return clauses, set(assigned)
+
+def variables_of(clauses):
+    return {abs(literal) for clause in clauses for literal in clause}
+
+def components(clauses):
+    """
+    Split the clauses into groups that share no variable
+    """
+
+    parent = dict()
+    def find(x):
+        while parent[x] != x:
+            parent[x] = parent[parent[x]]
+            x = parent[x]
+        return x
+    for clause in clauses:
+        for literal in clause:
+            parent.setdefault(abs(literal), abs(literal))
+        for literal in clause[1:]:
+            a, b = find(abs(clause[0])), find(abs(literal))
+            if a != b:
+                parent[a] = b
+    groups = dict()
+    for clause in clauses:
+        groups.setdefault(find(abs(clause[0])), []).append(clause)
+    return list(groups.values())
+
+class ModelCounter:
+    """
+    DPLL-style exact model counter with component decomposition and component caching
+    """
+
+    def __init__(self):
+        self.cache = dict()
+        self.decisions = 0
+
+    def count_component(self, clauses):
+        """
+        Number of assignments of the variables of a connected set of clauses satisfying all of them
+        """
+
+        key = tuple(sorted(tuple(sorted(clause)) for clause in clauses))
+        if key in self.cache:
+            return self.cache[key]
+        variables = variables_of(clauses)
+        # branch on the variable occurring in most clauses
+        occurrences = dict()
+        for clause in clauses:
+            for literal in clause:
+                occurrences[abs(literal)] = occurrences.get(abs(literal), 0) + 1
+        variable = max(occurrences, key=occurrences.get)
+        total = 0
+        for literal in [variable, -variable]:
+            self.decisions += 1
+            propagated = propagate(clauses, [literal])
+            if propagated is None:
+                continue
+            remaining, assigned = propagated
+            free = len(variables) - len(assigned) - len(variables_of(remaining))
+            count = 2**free
+            for component in components(remaining):
+                count *= self.count_component(component)
+                if count == 0:
+                    break
+            total += count
+        self.cache[key] = total
+        return total
+
+    def count(self, clauses, num_of_variables):
+        """
+        Number of assignments of the variables 1, ..., num_of_variables satisfying all clauses
+        """
+
+        # an empty clause (a constraint that is always violated) cannot be satisfied
+        if any(len(clause) == 0 for clause in clauses):
+            return 0
+        recursion_limit = sys.getrecursionlimit()
+        sys.setrecursionlimit(max(recursion_limit, 10*num_of_variables + 1000))
+        try:
+            propagated = propagate([clause for clause in clauses if len(clause) > 1], [clause[0] for clause in clauses if len(clause) == 1])
+            if propagated is None:
+                return 0
+            remaining, assigned = propagated
+            count = 2**(num_of_variables - len(assigned) - len(variables_of(remaining)))
+            for component in components(remaining):
+                count *= self.count_component(component)
+                if count == 0:
+                    break
+            return count
+        finally:
+            sys.setrecursionlimit(recursion_limit)
+
+def count_models(clauses, num_of_variables):
+    return ModelCounter().count(clauses, num_of_variables)
+
+def main():
+    '''
+    Count the solutions of an LP model over binary variables, or write it in DIMACS format
+    '''
+
+    parser = ArgumentParser(description="This tool counts the solutions of an LP model over binary variables exactly",
+                            formatter_class=RawTextHelpFormatter)
+    parser.add_argument("file", type=str, help="LP model, e.g., written by tweakeyschedule.py")
+    parser.add_argument("-d", "--dimacs", default=None, type=str, help="Write the CNF into this file instead of counting")
+    args = parser.parse_args()
+
+    with open(args.file, "r") as lpfile:
+        clauses, num_of_variables, _ = lp_to_cnf(lpfile.read())
+    if args.dimacs is not None:
+        write_dimacs(args.dimacs, clauses, num_of_variables)
+        print("CNF with {} variables and {} clauses was written into {}".format(num_of_variables, len(clauses), args.dimacs))
+    else:
+        print("Number of solutions: {}".format(count_models(clauses, num_of_variables)))
+
+if __name__ == "__main__":
+    main()
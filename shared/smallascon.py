@@ -0,0 +1,210 @@
+"""
+MIT License
+
+Copyright (c) 2023 Hosein Hadipour
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+
+
+"""
+Small-scale variants of Ascon for the experimental verification of the ID/ZC distinguishers of Ascon.
+
+The variant with rows of w columns (a power of two) applies the Ascon S-box to the columns of the 5 x w state
+and XORs every row with two rotations of itself. The rotation amounts are those of Ascon reduced modulo w, unless
+given explicitly. As in distinguisher.mzn, an RD-round distinguisher covers RD S-box layers and the RD - 1 linear
+layers between them, and column j of a row depends on the columns j - d for the offsets d of the linear layer.
+The ternary propagation of distinguisher.mzn is done with the tables of the screening.py given to SmallAscon;
+with masks=True, it goes through the transposed linear layers, as the linear masks do.
+"""
+
+import itertools
+import numpy as np
+
+sbox = [0x4, 0xb, 0x1f, 0x14, 0x1a, 0x15, 0x9, 0x2, 0x1b, 0x5, 0x8, 0x12, 0x1d, 0x3, 0x6, 0x1c,
+        0x1e, 0x13, 0x7, 0xe, 0x0, 0xd, 0x11, 0x18, 0x10, 0xc, 0x1, 0x19, 0x16, 0xa, 0xf, 0x17]
+rotation_dictionary = [(19, 28), (61, 39), (1, 6), (10, 17), (7, 41)]
+
+def rotl(word, amount, width):
+    amount %= width
+    return ((word << amount) | (word >> (width - amount))) & ((1 << width) - 1)
+
+def cyclic_multiply(a, b, width):
+    product = 0
+    for d in range(width):
+        if (b >> d) & 1:
+            product ^= rotl(a, d, width)
+    return product
+
+def cyclic_inverse(a, width):
+    """
+    Invert a circulant linear map: for a power of two width, the units of GF(2)[z]/(z^width + 1) have an order dividing width
+    """
+
+    inverse = 1
+    for _ in range(width - 1):
+        inverse = cyclic_multiply(inverse, a, width)
+    return inverse
+
+def parse_pattern(pattern, width):
+    """
+    Convert a pattern of 5 rows of 0/1/? separated by '|' (character j is column j) into a pair (value, fixed)
+    of integers, where column j of row i is bit i*width + j
+    """
+
+    rows = pattern.split("|")
+    assert len(rows) == 5 and all(len(row) == width for row in rows), "A pattern must have 5 rows of one character per column"
+    bits = "".join(rows)
+    value = sum(1 << i for i, b in enumerate(bits) if b == "1")
+    fixed = sum(1 << i for i, b in enumerate(bits) if b != "?")
+    return value, fixed
+
+def completions(pattern, width, limit, rng):
+    """
+    The nonzero states (as 5 x k arrays of rows) matching a pattern, or limit random ones if there are more than limit of them
+    """
+
+    value, fixed = parse_pattern(pattern, width)
+    free = [i for i in range(5 * width) if not (fixed >> i) & 1]
+    if len(free) <= 24 and 1 << len(free) <= limit:
+        choices = [np.arange(1 << len(free), dtype=np.uint64)]
+    else:
+        choices = [rng.integers(0, 1 << min(len(free) - k, 64), size=limit, dtype=np.uint64) for k in range(0, len(free), 64)]
+    rows = np.array([np.full(len(choices[0]), (value >> (row * width)) & ((1 << width) - 1), dtype=np.uint64) for row in range(5)])
+    for k, i in enumerate(free):
+        rows[i // width] |= ((choices[k // 64] >> np.uint64(k % 64)) & np.uint64(1)) << np.uint64(i % width)
+    rows = np.unique(rows, axis=1)
+    return rows[:, rows.any(axis=0)]
+
+def to_string(state, width):
+    return "|".join("".join(str((value >> column) & 1) for column in range(width)) for value, _ in state)
+
+class SmallAscon:
+    """
+    Ascon-like permutation with rows of a given width, with a bitsliced NumPy evaluation of many states
+    at once and the ternary propagation of distinguisher.mzn
+    """
+
+    def __init__(self, width, RD, rotations=None, screening=None, masks=False):
+        assert width & (width - 1) == 0 and 2 <= width <= 64, "The width must be a power of two between 2 and 64"
+        self.width = width
+        self.RD = RD
+        self.mask = (1 << width) - 1
+        if rotations is None:
+            rotations = [(r0 % width, r1 % width) for r0, r1 in rotation_dictionary]
+        self.rotations = rotations
+        self.screening = screening
+        polynomials = [1 ^ (1 << (r0 % width)) ^ (1 << (r1 % width)) for r0, r1 in rotations]
+        offsets = lambda a: [d for d in range(width) if (a >> d) & 1]
+        self.linear_layer = [offsets(p) for p in polynomials]
+        if masks:
+            # masks propagate through the transpose of the inverse linear layer, and backward through its transpose
+            self.linear = [[(width - d) % width for d in offsets(cyclic_inverse(p, width))] for p in polynomials]
+            self.linear_inv = [[(width - d) % width for d in offsets(p)] for p in polynomials]
+        else:
+            self.linear = self.linear_layer
+            self.linear_inv = [offsets(cyclic_inverse(p, width)) for p in polynomials]
+
+    def rotate(self, rows, amount):
+        amount %= self.width
+        if amount == 0:
+            return rows
+        return ((rows << np.uint64(amount)) | (rows >> np.uint64(self.width - amount))) & np.uint64(self.mask)
+
+    def permute(self, state):
+        """
+        Apply the RD rounds to a 5 x k array of rows (row 0 is the most significant bit of the S-box input)
+        """
+
+        mask = np.uint64(self.mask)
+        x0, x1, x2, x3, x4 = state
+        for r in range(self.RD):
+            x0 = x0 ^ x4
+            x4 = x4 ^ x3
+            x2 = x2 ^ x1
+            t0, t1, t2, t3, t4 = (~x0 & x1), (~x1 & x2), (~x2 & x3), (~x3 & x4), (~x4 & x0)
+            x0, x1, x2, x3, x4 = x0 ^ t1, x1 ^ t2, x2 ^ t3, x3 ^ t4, x4 ^ t0
+            x1 = x1 ^ x0
+            x0 = x0 ^ x4
+            x3 = x3 ^ x2
+            x2 = ~x2 & mask
+            if r < self.RD - 1:
+                rows = [x0, x1, x2, x3, x4]
+                for row in range(5):
+                    image = np.zeros_like(rows[row])
+                    for d in self.linear_layer[row]:
+                        image ^= self.rotate(rows[row], d)
+                    rows[row] = image
+                x0, x1, x2, x3, x4 = rows
+        return np.array([x0, x1, x2, x3, x4])
+
+    def unpack(self, words):
+        return np.array([(words >> np.uint64(row * self.width)) & np.uint64(self.mask) for row in range(5)])
+
+    def pack(self, rows):
+        words = np.zeros(rows.shape[1], dtype=np.uint64)
+        for row in range(5):
+            words |= rows[row] << np.uint64(row * self.width)
+        return words
+
+    def apply_linear(self, state, linear):
+        new_state = []
+        for (value, unknown), row_offsets in zip(state, linear):
+            new_value, new_unknown = 0, 0
+            for d in row_offsets:
+                new_value ^= rotl(value, d, self.width)
+                new_unknown |= rotl(unknown, d, self.width)
+            new_state.append((new_value & ~new_unknown & self.mask, new_unknown))
+        return tuple(new_state)
+
+    def propagate_forward(self, input_state):
+        x = [input_state]
+        y = []
+        for _ in range(self.RD):
+            y.append(self.screening.apply_sbox(x[-1], self.screening.SBOX))
+            x.append(self.apply_linear(y[-1], self.linear))
+        return x, y
+
+    def propagate_backward(self, output_state):
+        x = [output_state]
+        y = []
+        for r in range(self.RD):
+            y.insert(0, x[0] if r == 0 else self.apply_linear(x[0], self.linear_inv))
+            x.insert(0, self.screening.apply_sbox(y[0], self.screening.SBOX_INV))
+        return x, y
+
+    def distinguishers(self, input_weight, output_weight):
+        """
+        All pairs of input/output states with at most input_weight/output_weight active bits
+        for which distinguisher.mzn detects a contradiction
+        """
+
+        def states(weight):
+            for w in range(1, weight + 1):
+                for bits in itertools.combinations(range(5 * self.width), w):
+                    rows = [0] * 5
+                    for b in bits:
+                        rows[b // self.width] |= 1 << (b % self.width)
+                    yield tuple((row, 0) for row in rows)
+        lower = [(state, self.screening.signature(self.propagate_backward(state))) for state in states(output_weight)]
+        pairs = []
+        for input_state in states(input_weight):
+            upper = self.screening.signature(self.propagate_forward(input_state))
+            pairs.extend((input_state, output_state) for output_state, signature in lower if self.screening.contradicts(upper, signature))
+        return pairs
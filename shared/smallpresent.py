@@ -0,0 +1,134 @@
+"""
+MIT License
+
+Copyright (c) 2023 Hosein Hadipour
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+
+
+"""
+Small-scale variants of PRESENT for the experimental verification of the ID/ZC distinguishers of PRESENT.
+
+The variant of width n (a multiple of 4) applies the PRESENT S-box to the n/4 nibbles and then moves bit i to bit
+(n/4)*(i mod 4) + i//4, as in the pLayer of PRESENT, with a random key XORed before each round and after the last one.
+The ternary propagation of distinguisher.mzn is done with the tables of the screening.py given to SmallPresent, so
+that the same class derives the impossible differentials and the zero-correlation distinguishers of the variant.
+"""
+
+import itertools
+import numpy as np
+
+sbox = [0xc, 0x5, 0x6, 0xb, 0x9, 0x0, 0xa, 0xd, 0x3, 0xe, 0xf, 0x8, 0x4, 0x7, 0x1, 0x2]
+
+def reverse_bits(value, width):
+    return sum(((value >> k) & 1) << (width - 1 - k) for k in range(width))
+
+def parse_pattern(pattern):
+    """
+    Convert a string of 0/1/? (character i is bit i) into a pair (value, fixed) of integers
+    """
+
+    value = sum(1 << i for i, b in enumerate(pattern) if b == "1")
+    fixed = sum(1 << i for i, b in enumerate(pattern) if b != "?")
+    return value, fixed
+
+def completions(pattern, width, limit, rng):
+    """
+    The nonzero words matching a pattern, or limit random ones if there are more than limit of them
+    """
+
+    value, fixed = parse_pattern(pattern)
+    free = [i for i in range(width) if not (fixed >> i) & 1]
+    if len(free) <= 24 and 1 << len(free) <= limit:
+        choices = np.arange(1 << len(free), dtype=np.uint64)
+    else:
+        choices = rng.integers(0, 1 << len(free), size=limit, dtype=np.uint64)
+    words = np.full(len(choices), value, dtype=np.uint64)
+    for k, i in enumerate(free):
+        words |= ((choices >> np.uint64(k)) & np.uint64(1)) << np.uint64(i)
+    return np.unique(words[words != 0])
+
+def to_string(word, width):
+    return "".join(str((word >> i) & 1) for i in range(width))
+
+class SmallPresent:
+    """
+    PRESENT-like SPN of a given width, with NumPy encryption of many plaintexts at once
+    and the ternary propagation of distinguisher.mzn
+    """
+
+    def __init__(self, width, RD, screening=None):
+        assert width % 4 == 0 and 4 <= width <= 64, "The width must be a multiple of 4 between 4 and 64"
+        self.width = width
+        self.RD = RD
+        self.screening = screening
+        self.permutation = [(width // 4) * (i % 4) + i // 4 for i in range(width)]
+        # the S-box on nibbles stored with the bit 4*i of the state at position 0 of the integer
+        self.sbox_table = np.array([reverse_bits(sbox[reverse_bits(v, 4)], 4) for v in range(16)], dtype=np.uint64)
+
+    def encrypt(self, plaintexts, round_keys):
+        state = plaintexts
+        for r in range(self.RD):
+            state = state ^ round_keys[r]
+            substituted = np.zeros_like(state)
+            for nibble in range(self.width // 4):
+                shift = np.uint64(4 * nibble)
+                substituted |= self.sbox_table[(state >> shift) & np.uint64(0xf)] << shift
+            state = np.zeros_like(substituted)
+            for i in range(self.width):
+                state |= ((substituted >> np.uint64(i)) & np.uint64(1)) << np.uint64(self.permutation[i])
+        return state ^ round_keys[self.RD]
+
+    def round_keys(self, seed):
+        return np.random.default_rng(seed).integers(0, 1 << self.width, size=self.RD + 1, dtype=np.uint64)
+
+    def propagate_forward(self, input_state):
+        x = [input_state]
+        y = []
+        for _ in range(self.RD):
+            y.append(self.screening.apply_sbox(x[-1], self.screening.SBOX))
+            x.append(tuple(self.screening.permute_word(word, self.permutation) for word in y[-1]))
+        return x, y
+
+    def propagate_backward(self, output_state):
+        inverse = [self.permutation.index(i) for i in range(self.width)]
+        x = [output_state]
+        y = []
+        for _ in range(self.RD):
+            y.insert(0, tuple(self.screening.permute_word(word, inverse) for word in x[0]))
+            x.insert(0, self.screening.apply_sbox(y[0], self.screening.SBOX_INV))
+        return x, y
+
+    def distinguishers(self, input_weight, output_weight):
+        """
+        All pairs of input/output words with at most input_weight/output_weight active bits
+        for which distinguisher.mzn detects a contradiction
+        """
+
+        def words(weight):
+            for w in range(1, weight + 1):
+                for bits in itertools.combinations(range(self.width), w):
+                    yield sum(1 << b for b in bits)
+        lower = [(word, self.screening.signature(self.propagate_backward((word, 0)))) for word in words(output_weight)]
+        pairs = []
+        for input_word in words(input_weight):
+            upper = self.screening.signature(self.propagate_forward((input_word, 0)))
+            pairs.extend((input_word, output_word) for output_word, signature in lower if self.screening.contradicts(upper, signature))
+        return pairs
@@ -0,0 +1,118 @@
+"""
+MIT License
+
+Copyright (c) 2023 Hosein Hadipour
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+
+
+"""
+Helpers shared by the experimental verification of the ID/ZC distinguishers (verification.py of PRESENT and Ascon).
+
+The deterministic S-box rules of a CP model are checked against the DDT or the LAT of the S-box, and the result of
+a verification is reported with an exit status that is nonzero unless the rules hold and at least one distinguisher
+was tested without being refuted, so that a run deriving no distinguisher cannot pass for a successful check.
+"""
+
+import itertools
+import numpy as np
+
+def pattern_values(pattern):
+    """
+    All integers whose binary representation (most significant bit first) matches a pattern of 0/1/?
+    """
+
+    free = [k for k, b in enumerate(pattern) if b == "?"]
+    for bits in itertools.product("01", repeat=len(free)):
+        completed = list(pattern)
+        for k, b in zip(free, bits):
+            completed[k] = b
+        yield int("".join(completed), 2)
+
+def matches(pattern, bits):
+    return all(b == "?" or b == d for b, d in zip(pattern, bits))
+
+def ddt_rules_hold(sbox, sbox_rules, sbox_inv_rules):
+    """
+    Check the deterministic rules {input pattern: output pattern} of an S-box and of its inverse against the DDT
+    """
+
+    size = len(sbox)
+    sbox_inv = [sbox.index(v) for v in range(size)]
+    for rules, table in [(sbox_rules, sbox), (sbox_inv_rules, sbox_inv)]:
+        for pattern, output in rules.items():
+            for difference in pattern_values(pattern):
+                for x in range(size):
+                    if not matches(output, format(table[x] ^ table[x ^ difference], f"0{len(pattern)}b")):
+                        return False
+    return True
+
+def lat_rules_hold(sbox, sbox_rules, sbox_inv_rules):
+    """
+    Check the deterministic rules {input pattern: output pattern} of an S-box and of its inverse against the LAT
+    """
+
+    size = len(sbox)
+    sbox_inv = [sbox.index(v) for v in range(size)]
+    for rules, table in [(sbox_rules, sbox), (sbox_inv_rules, sbox_inv)]:
+        for pattern, output in rules.items():
+            for input_mask in pattern_values(pattern):
+                for output_mask in range(size):
+                    correlation = sum((-1) ** (bin(input_mask & x).count("1") + bin(output_mask & table[x]).count("1")) for x in range(size))
+                    if correlation != 0 and not matches(output, format(output_mask, f"0{len(pattern)}b")):
+                        return False
+    return True
+
+def parity(words):
+    for shift in (32, 16, 8, 4, 2, 1):
+        words = words ^ (words >> np.uint64(shift))
+    return words & np.uint64(1)
+
+def walsh_hadamard(values):
+    """
+    Walsh-Hadamard transform of an array whose length is a power of two
+    """
+
+    spectrum = values
+    h = 1
+    while h < len(spectrum):
+        blocks = spectrum.reshape(-1, 2, h)
+        spectrum = np.stack((blocks[:, 0] + blocks[:, 1], blocks[:, 0] - blocks[:, 1]), axis=1).reshape(-1)
+        h *= 2
+    return spectrum
+
+def report(rules_hold, pairs, counts, label):
+    """
+    Print the refuted distinguishers (those with a nonzero count) and return the exit status of the verification
+    """
+
+    failed = 0
+    for (input_pattern, output_pattern), count in zip(pairs, counts):
+        if count != 0:
+            failed += 1
+            print("#"*80)
+            print(f"input: \n{input_pattern};")
+            print(f"output: \n{output_pattern};")
+            print(f"{label}: {count}")
+    print("#"*80)
+    print(f"Number of distinguishers refuted: {failed} out of {len(pairs)}")
+    if len(pairs) == 0:
+        print("No distinguisher was verified: decrease the number of rounds or increase the width or the weights")
+    return int(not rules_hold or len(pairs) == 0 or failed != 0)
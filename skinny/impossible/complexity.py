@@ -0,0 +1,166 @@
+#!/usr/env/bin python3
+#-*- coding: UTF-8 -*-
+
+"""
+MIT License
+
+Copyright (c) 2023 Hosein Hadipour
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+
+email: hsn.hadipour@gmail.com
+"""
+
+"""
+Re-score stored ID attacks without solving attack.mzn again.
+
+attack.py appends one JSON line per attack found to a solutions file, with the quantities
+the complexities depend on (CB_tot, CF_tot, WB, WF, KS, g, ...). The functions below evaluate the
+complexity formulas of attack.mzn on all stored attacks at once with NumPy, optionally with another
+g (or the best g for each attack), key size, tolerance or tweakey setting.
+"""
+
+import json
+import numpy as np
+from argparse import ArgumentParser, RawTextHelpFormatter
+
+# largest g covered by log2_minus_053_table in attack.mzn
+max_g = 256
+record_fields = ["variant", "cell_size", "NPT", "RB", "RD", "RF", "is_related_tweakey", "CB_tot", "CF_tot", "WB", "WF", "KS", "g"]
+
+def save_solution(file_name, record):
+    with open(file_name, "a") as jsonfile:
+        jsonfile.write(json.dumps(record) + "\n")
+
+def load_solutions(file_name):
+    with open(file_name, "r") as jsonfile:
+        return [json.loads(line) for line in jsonfile if line.strip() != ""]
+
+def to_arrays(solutions):
+    """
+    Convert a list of stored attacks into a dictionary of NumPy arrays, one entry per field
+    """
+
+    return {field: np.array([solution[field] for solution in solutions], dtype=np.int64) for field in record_fields}
+
+def div(a, b):
+    # MiniZinc's div rounds towards zero
+    return np.sign(a) * (np.abs(a) // b)
+
+def key_size_of_variant(variant, NPT, block_size):
+    return np.select([variant < 5, variant == 5, variant == 6, variant == 7, variant == 8],
+                     [NPT*block_size, 128, 192, 128, 288], 128)
+
+def log2_minus_053(g):
+    return np.ceil(np.log2(g) - 0.53).astype(np.int64)
+
+def complexities(s, g, key_size, tolerance, is_related_tweakey):
+    """
+    The complexity formulas of attack.mzn. All arguments broadcast against each other, so that the
+    same attacks can be evaluated for several values of g at once
+    """
+
+    cell_size = s["cell_size"]
+    block_size = 16*cell_size
+    log_2_minus_053_of_g = log2_minus_053(g)
+    filters = cell_size*s["CB_tot"] + cell_size*s["CF_tot"]
+    data_complexity_0 = div(filters + block_size + 1 - cell_size*s["WF"], 2) + div(log_2_minus_053_of_g, 2)
+    data_complexity_1 = div(filters + block_size + 1 - cell_size*s["WB"], 2) + div(log_2_minus_053_of_g, 2)
+    data_complexity_2 = np.minimum(data_complexity_0, data_complexity_1)
+    data_complexity_3 = filters + block_size + 1 - cell_size*s["WB"] - cell_size*s["WF"] + log_2_minus_053_of_g
+    t_complexity = np.broadcast_arrays(np.maximum(data_complexity_2, data_complexity_3),
+                                       filters + log_2_minus_053_of_g,
+                                       cell_size*s["KS"] + log_2_minus_053_of_g,
+                                       key_size - g)
+    memory_complexity = np.minimum(cell_size*s["KS"], t_complexity[1])
+    max_term = np.max(t_complexity, axis=0)
+    data = t_complexity[0] - is_related_tweakey
+    valid = (data <= block_size + tolerance) & (memory_complexity < key_size) & (max_term < key_size + tolerance) & (g <= max_g)
+    valid &= ((s["RB"] + s["RF"]) < 1) | ((g > 1) & (g <= cell_size*s["KS"]))
+    return {"g": np.broadcast_to(g, max_term.shape),
+            "log_2_minus_053_of_g": np.broadcast_to(log_2_minus_053_of_g, max_term.shape),
+            "data_complexity": np.stack(np.broadcast_arrays(data_complexity_0, data_complexity_1, data_complexity_2, data_complexity_3), axis=-1),
+            "t_complexity": np.stack(t_complexity, axis=-1),
+            "memory_complexity": memory_complexity,
+            "max_term": max_term,
+            "data": data,
+            "valid": valid}
+
+def evaluate(solutions, g=None, key_size=None, tolerance=0, is_related_tweakey=None):
+    """
+    Recompute the complexities of the stored attacks (a list of records or the output of to_arrays).
+    Each of g, key_size and is_related_tweakey replaces the stored value if given, and g = "optimal"
+    takes the g that minimizes the time complexity of each attack among the valid ones
+    """
+
+    s = to_arrays(solutions) if isinstance(solutions, list) else solutions
+    if key_size is None:
+        key_size = key_size_of_variant(s["variant"], s["NPT"], 16*s["cell_size"])
+    key_size = np.broadcast_to(key_size, s["g"].shape)
+    if is_related_tweakey is None:
+        is_related_tweakey = s["is_related_tweakey"]
+    is_related_tweakey = np.broadcast_to(np.asarray(is_related_tweakey, dtype=np.int64), s["g"].shape)
+    if g is None:
+        return complexities(s, s["g"], key_size, tolerance, is_related_tweakey)
+    if not isinstance(g, str):
+        return complexities(s, np.broadcast_to(g, s["g"].shape), key_size, tolerance, is_related_tweakey)
+    assert g == "optimal", "g must be an integer or 'optimal'"
+    # evaluate every g for every attack, one column per value of g
+    column = {field: values[:, np.newaxis] for field, values in s.items()}
+    candidates = np.arange(1, max_g + 1)[np.newaxis, :]
+    grid = complexities(column, candidates, key_size[:, np.newaxis], tolerance, is_related_tweakey[:, np.newaxis])
+    best = np.argmin(np.where(grid["valid"], grid["max_term"], np.iinfo(np.int64).max), axis=1)
+    rows = np.arange(len(best))
+    return {name: values[rows, best] for name, values in grid.items()}
+
+def rank(scores, key="max_term"):
+    """
+    Order of the attacks: valid ones first, then by the given complexity, the time, data and memory complexities
+    """
+
+    return np.lexsort((scores["memory_complexity"], scores["data"], scores["max_term"], scores[key], ~scores["valid"]))
+
+def main():
+    '''
+    Re-score and rank the attacks stored in a solutions file
+    '''
+
+    parser = ArgumentParser(description="This tool recomputes the complexities of stored ID attacks without solving the model again",
+                            formatter_class=RawTextHelpFormatter)
+    parser.add_argument("file", type=str, help="Solutions file written by attack.py (one JSON record per line)")
+    parser.add_argument("-g", default=None, type=str, help="Use this value of g for all attacks, or 'optimal' to take the best g of each attack")
+    parser.add_argument("-ks", "--key_size", default=None, type=int, help="Key size, by default derived from the variant")
+    parser.add_argument("-tol", "--tolerance", default=0, type=int, help="Tolerance from the valid domain in time or data complexity")
+    parser.add_argument("-rt", default=None, type=int, choices=[0, 1], help="Evaluate in the single-tweakey (0) or related-tweakey (1) setting")
+    parser.add_argument("-s", "--sort", default="max_term", choices=["max_term", "data", "memory_complexity"], help="Complexity used to rank the attacks")
+    parser.add_argument("-n", default=20, type=int, help="Number of attacks to print")
+    args = parser.parse_args()
+
+    solutions = load_solutions(args.file)
+    g = int(args.g) if args.g is not None and args.g != "optimal" else args.g
+    scores = evaluate(solutions, g=g, key_size=args.key_size, tolerance=args.tolerance, is_related_tweakey=args.rt)
+    print("{:>6s} {:>8s} {:>4s} {:>4s} {:>4s} {:>4s} {:>8s} {:>8s} {:>8s} {:>6s}".format("index", "variant", "RB", "RD", "RF", "g", "time", "data", "memory", "valid"))
+    for i in rank(scores, args.sort)[:args.n]:
+        print("{:>6d} {:>8d} {:>4d} {:>4d} {:>4d} {:>4d} {:>8d} {:>8d} {:>8d} {:>6s}".format(i, solutions[i]["variant"], solutions[i]["RB"], solutions[i]["RD"], solutions[i]["RF"],
+                                                                                          scores["g"][i], scores["max_term"][i], scores["data"][i],
+                                                                                          scores["memory_complexity"][i], str(bool(scores["valid"][i]))))
+    print("Number of valid attacks: {} out of {}".format(np.count_nonzero(scores["valid"]), len(solutions)))
+
+if __name__ == "__main__":
+    main()
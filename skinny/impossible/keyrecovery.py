@@ -0,0 +1,384 @@
+#!/usr/env/bin python3
+#-*- coding: UTF-8 -*-
+
+"""
+MIT License
+
+Copyright (c) 2023 Hosein Hadipour
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+
+email: hsn.hadipour@gmail.com
+"""
+
+"""
+Run the key recovery of an ID attack found by attack.py on round-reduced SKINNY-64 at toy scale.
+
+The plaintexts are encrypted under a random secret key in the single-tweakey setting. The plaintexts form
+structures in which the active cells of the input of EB take all values. The pairs of a structure are
+collected with a hash table on the ciphertext cells that are inactive at the output of EF. Each kept pair
+is then used to sieve the round-tweakey cells of EB and EF that the differences at the boundaries of the
+distinguisher depend on. These cells are found by a dependency analysis and are treated as independent
+unknowns, i.e., the tweakey schedule is not used to merge them. The EB cells are checked first, and the
+EF cells are only checked for a pair if some guess of the EB cells passes (early abort). Every guess for
+which the pair satisfies the input and output differences of the distinguisher is eliminated.
+
+The structures are processed in chunks on a process pool, one structure at a time. The measured numbers
+of pairs, the rate at which a pair eliminates wrong keys, the keys left, and the time and memory of each
+step are compared with the estimates of the model.
+"""
+
+import sys
+import math
+import time
+import tracemalloc
+import numpy as np
+from pathlib import Path
+from concurrent.futures import ProcessPoolExecutor, as_completed
+# the modules shared by the tools of several ciphers are in the folder shared of the repository
+sys.path.append(str(Path(__file__).resolve().parents[2] / "shared"))
+from lookuptables import mix_columns, inverse_matrix, lfsr_tk2, lfsr_tk3
+
+line_separator = "#"*55
+sbox = np.array([0xc, 0x6, 0x9, 0x0, 0x1, 0xa, 0x2, 0xb, 0x3, 0x8, 0x5, 0xd, 0x4, 0xe, 0x7, 0xf], dtype=np.uint8)
+inv_sbox = np.argsort(sbox).astype(np.uint8)
+round_permutation = [0, 1, 2, 3, 7, 4, 5, 6, 10, 11, 8, 9, 13, 14, 15, 12]
+inv_round_permutation = [round_permutation.index(i) for i in range(16)]
+tweakey_permutation = [9, 15, 8, 13, 10, 14, 12, 11, 0, 1, 2, 3, 4, 5, 6, 7]
+inv_mix_columns = inverse_matrix(mix_columns)
+# the cells of the state before ShiftRows that each cell after MixColumns depends on, and vice versa
+forward_sources = [[round_permutation[4*k + j % 4] for k in range(4) if mix_columns[j // 4][k] == 1] for j in range(16)]
+backward_sources = [[4*l + inv_round_permutation[m] % 4 for l in range(4) if inv_mix_columns[inv_round_permutation[m] // 4][l] == 1] for m in range(16)]
+# the largest number of key bits guessed by the toy engine (the eliminated keys are stored as a bitmap)
+max_key_bits = 24
+# the largest structure (in bits) of the toy engine
+max_structure_bits = 20
+# number of states per plaintext of a pair that are partially encrypted at once
+batch_size = 2**20
+
+def round_constants(number_of_rounds):
+    constants = np.zeros((number_of_rounds, 16), dtype=np.uint8)
+    rc = 0
+    for r in range(number_of_rounds):
+        rc = ((rc << 1) & 0x3f) | (((rc >> 5) ^ (rc >> 4) ^ 1) & 1)
+        constants[r, 0] = rc & 0xf
+        constants[r, 4] = rc >> 4
+        constants[r, 8] = 0x2
+    return constants
+
+def round_tweakeys(key, number_of_rounds):
+    """
+    The round tweakeys (first two rows) of SKINNY-64 for a tweakey given as NPT lines of 16 cells
+    """
+
+    lfsr = [None, dict(lfsr_tk2(4)), dict(lfsr_tk3(4))]
+    tk = [list(line) for line in key]
+    round_keys = np.zeros((number_of_rounds, 8), dtype=np.uint8)
+    for r in range(number_of_rounds):
+        for line in tk:
+            round_keys[r] ^= np.array(line[:8], dtype=np.uint8)
+        tk = [[line[tweakey_permutation[i]] for i in range(16)] for line in tk]
+        for l in range(1, len(tk)):
+            tk[l][:8] = [lfsr[l][x] for x in tk[l][:8]]
+    return round_keys
+
+def linear_layer(states, matrix, permutation, inverse=False):
+    if inverse:
+        states = np.concatenate([np.bitwise_xor.reduce([states[..., 4*l:4*l + 4] for l in range(4) if matrix[k][l] == 1], axis=0) for k in range(4)], axis=-1)
+        return states[..., permutation]
+    states = states[..., permutation]
+    return np.concatenate([np.bitwise_xor.reduce([states[..., 4*l:4*l + 4] for l in range(4) if matrix[k][l] == 1], axis=0) for k in range(4)], axis=-1)
+
+def encrypt_rounds(states, rounds, constants, round_keys):
+    """
+    Apply the given rounds to the states (arrays of 16 cells); round_keys[r] broadcasts against the first two rows
+    """
+
+    for r in rounds:
+        states = sbox[states] ^ constants[r]
+        states[..., :8] ^= round_keys[r]
+        states = linear_layer(states, mix_columns, round_permutation)
+    return states
+
+def decrypt_rounds(states, rounds, constants, round_keys):
+    for r in reversed(list(rounds)):
+        states = linear_layer(states, inv_mix_columns, inv_round_permutation, inverse=True)
+        states[..., :8] ^= round_keys[r]
+        states = inv_sbox[states ^ constants[r]]
+    return states
+
+def random_key(NPT, seed):
+    return np.random.default_rng(seed).integers(0, 16, (NPT, 16)).tolist()
+
+def to_cells(value, size=16):
+    return [(value >> (4*(size - 1 - i))) & 0xf for i in range(size)]
+
+def satisfies(differences, condition):
+    """
+    Whether the differences (arrays of 16 cells) satisfy the truncated differences (kind, value) of the 16 cells:
+    kind 0: zero, 1: equal to value, 2: nonzero, 3: any
+    """
+
+    ok = np.ones(differences.shape[:-1], dtype=bool)
+    for i, (kind, value) in enumerate(condition):
+        if kind == 0:
+            ok &= differences[..., i] == 0
+        elif kind == 1:
+            ok &= differences[..., i] == value
+        elif kind == 2:
+            ok &= differences[..., i] != 0
+    return ok
+
+def key_dependencies(RB, RD, RF, sks, plaintext_cells, ciphertext_cells, input_condition, output_condition):
+    """
+    The round-tweakey cells (round, cell) the checked differences at the input and output of the distinguisher
+    depend on, for pairs with differences only in plaintext_cells and ciphertext_cells
+    """
+
+    # EB: the values and the differences of the state as functions of the round tweakeys
+    values = [set() for _ in range(16)]
+    differences = [set() for _ in range(16)]
+    active = [i in plaintext_cells for i in range(16)]
+    for r in range(RB):
+        differences = [values[i] | differences[i] if active[i] else set() for i in range(16)]
+        values = [values[i] | {(r, i)} if i < 8 else values[i] for i in range(16)]
+        values = [set().union(*(values[s] for s in forward_sources[j])) for j in range(16)]
+        differences = [set().union(*(differences[s] for s in forward_sources[j])) for j in range(16)]
+        active = [any(active[s] for s in forward_sources[j]) for j in range(16)]
+    if sks:
+        # the first S-box layer of the distinguisher belongs to EB
+        differences = [values[i] | differences[i] if active[i] else set() for i in range(16)]
+    backward_keys = set().union(*(differences[i] for i in range(16) if active[i] and input_condition[i][0] != 3))
+    # EF: the same from the ciphertext backwards
+    values = [set() for _ in range(16)]
+    differences = [set() for _ in range(16)]
+    active = [i in ciphertext_cells for i in range(16)]
+    for r in reversed(range(RB + RD, RB + RD + RF)):
+        values = [set().union(*(values[s] for s in backward_sources[m])) for m in range(16)]
+        differences = [set().union(*(differences[s] for s in backward_sources[m])) for m in range(16)]
+        active = [any(active[s] for s in backward_sources[m]) for m in range(16)]
+        values = [values[i] | {(r, i)} if i < 8 else values[i] for i in range(16)]
+        differences = [values[i] | differences[i] if active[i] else set() for i in range(16)]
+    forward_keys = set().union(*(differences[i] for i in range(16) if active[i] and output_condition[i][0] != 3))
+    return sorted(backward_keys), sorted(forward_keys)
+
+def all_guesses(number_of_cells):
+    """
+    All values of the given number of cells, one row per value, the first cell being the most significant
+    """
+
+    guesses = np.arange(16**number_of_cells)
+    return np.array([(guesses >> (4*(number_of_cells - 1 - k))) & 0xf for k in range(number_of_cells)], dtype=np.uint8).reshape(number_of_cells, len(guesses)).T
+
+class KeyRecovery:
+    """
+    Toy-scale execution of the key recovery of an ID attack on SKINNY-64 (see the description of the module)
+    """
+
+    def __init__(self, configuration):
+        self.configuration = configuration
+        self.NPT = configuration["NPT"]
+        self.RB = configuration["RB"]
+        self.RD = configuration["RD"]
+        self.RF = configuration["RF"]
+        self.RT = self.RB + self.RD + self.RF
+        self.sks = configuration["sks"]
+        self.plaintext_cells = configuration["plaintext_cells"]
+        self.ciphertext_cells = configuration["ciphertext_cells"]
+        self.input_condition = configuration["input_condition"]
+        self.output_condition = configuration["output_condition"]
+        self.key = configuration["key"]
+        self.seed = configuration["seed"]
+        self.constants = round_constants(self.RT)
+        self.round_keys = round_tweakeys(self.key, self.RT)
+        self.backward_keys, self.forward_keys = key_dependencies(self.RB, self.RD, self.RF, self.sks, self.plaintext_cells, self.ciphertext_cells,
+                                                                 self.input_condition, self.output_condition)
+        self.key_bits = 4*(len(self.backward_keys) + len(self.forward_keys))
+        assert self.key_bits <= max_key_bits, "The key recovery guesses {} bits, which is more than {} bits".format(self.key_bits, max_key_bits)
+        assert 4*len(self.plaintext_cells) <= max_structure_bits, "The structures have 2^{} plaintexts, which is more than 2^{}".format(4*len(self.plaintext_cells), max_structure_bits)
+        self.number_of_forward_guesses = 16**len(self.forward_keys)
+        self.right_key = 0
+        for (r, i) in self.backward_keys + self.forward_keys:
+            self.right_key = 16*self.right_key + int(self.round_keys[r, i])
+
+    def guessed_round_keys(self, key_cells):
+        """
+        Round tweakeys with one row per guess of the key cells, the other cells being zero
+        """
+
+        guesses = all_guesses(len(key_cells))
+        round_keys = np.zeros((self.RT, len(guesses), 8), dtype=np.uint8)
+        for column, (r, i) in enumerate(key_cells):
+            round_keys[r, :, i] = guesses[:, column]
+        return round_keys
+
+    def structure(self, index):
+        """
+        The plaintexts of a structure and their ciphertexts under the secret key
+        """
+
+        rng = np.random.default_rng([self.seed, index])
+        plaintexts = np.tile(rng.integers(0, 16, 16, dtype=np.uint8), (16**len(self.plaintext_cells), 1))
+        plaintexts[:, self.plaintext_cells] = all_guesses(len(self.plaintext_cells))
+        ciphertexts = encrypt_rounds(plaintexts.copy(), range(self.RT), self.constants, self.round_keys)
+        return plaintexts, ciphertexts
+
+    def pairs(self, ciphertexts):
+        """
+        The pairs of a structure whose ciphertexts have zero differences in the inactive cells, via a hash table
+        """
+
+        inactive = [i for i in range(16) if i not in self.ciphertext_cells]
+        hashes = np.zeros(len(ciphertexts), dtype=np.uint64)
+        for i in inactive:
+            hashes = (hashes << np.uint64(4)) | ciphertexts[:, i].astype(np.uint64)
+        table = dict()
+        for index, value in enumerate(hashes.tolist()):
+            table.setdefault(value, []).append(index)
+        pairs = [(a, b) for indices in table.values() for k, a in enumerate(indices) for b in indices[k + 1:]]
+        return np.array(pairs, dtype=np.int64).reshape(-1, 2), len(table)
+
+    def sieve(self, first_structure, number_of_structures):
+        """
+        Process the structures first_structure, ..., first_structure + number_of_structures - 1 and return the
+        bitmap of the eliminated keys (packed) with the statistics of each step
+        """
+
+        tracemalloc.start()
+        statistics = {"structures" : number_of_structures, "pairs" : 0, "pairs_kept" : 0, "pairs_passing_EB" : 0,
+                      "eliminations" : 0, "buckets" : 0,
+                      "time" : {"structures" : 0.0, "pairs" : 0.0, "sieve_EB" : 0.0, "sieve_EF" : 0.0},
+                      "memory" : {"structures" : 0, "pairs" : 0, "sieve_EB" : 0, "sieve_EF" : 0}}
+        backward_round_keys = self.guessed_round_keys(self.backward_keys)
+        forward_round_keys = self.guessed_round_keys(self.forward_keys)
+        eliminated = np.zeros((16**len(self.backward_keys), self.number_of_forward_guesses), dtype=bool)
+        def step(name, start_time):
+            statistics["time"][name] += time.time() - start_time
+            statistics["memory"][name] = max(statistics["memory"][name], tracemalloc.get_traced_memory()[1])
+            tracemalloc.reset_peak()
+        for index in range(first_structure, first_structure + number_of_structures):
+            start_time = time.time()
+            plaintexts, ciphertexts = self.structure(index)
+            step("structures", start_time)
+            start_time = time.time()
+            pairs, buckets = self.pairs(ciphertexts)
+            statistics["pairs"] += len(plaintexts)*(len(plaintexts) - 1)//2
+            statistics["pairs_kept"] += len(pairs)
+            statistics["buckets"] += buckets
+            step("pairs", start_time)
+            # the pairs are sieved in batches of about batch_size states per plaintext
+            number_of_guesses = max(backward_round_keys.shape[1], forward_round_keys.shape[1])
+            for batch in np.array_split(pairs, max(1, len(pairs)*number_of_guesses//batch_size)):
+                start_time = time.time()
+                states = np.broadcast_to(plaintexts[batch.T][:, :, np.newaxis, :], (2, len(batch), backward_round_keys.shape[1], 16))
+                states = encrypt_rounds(states.copy(), range(self.RB), self.constants, backward_round_keys)
+                if self.sks:
+                    states = sbox[states]
+                passing_EB = satisfies(states[0] ^ states[1], self.input_condition)
+                del states
+                step("sieve_EB", start_time)
+                # early abort: EF is only checked for the pairs for which some guess of the EB cells passes
+                batch_passing = np.flatnonzero(passing_EB.any(axis=1))
+                statistics["pairs_passing_EB"] += len(batch_passing)
+                if len(batch_passing) == 0:
+                    continue
+                start_time = time.time()
+                states = np.broadcast_to(ciphertexts[batch[batch_passing].T][:, :, np.newaxis, :], (2, len(batch_passing), forward_round_keys.shape[1], 16))
+                states = decrypt_rounds(states.copy(), range(self.RB + self.RD, self.RT), self.constants, forward_round_keys)
+                passing_EF = satisfies(states[0] ^ states[1], self.output_condition)
+                del states
+                for k, pair in enumerate(batch_passing):
+                    eliminated[passing_EB[pair]] |= passing_EF[k]
+                statistics["eliminations"] += int(np.dot(np.count_nonzero(passing_EB[batch_passing], axis=1), np.count_nonzero(passing_EF, axis=1)))
+                step("sieve_EF", start_time)
+        tracemalloc.stop()
+        return np.packbits(eliminated.ravel()), statistics
+
+    def run(self, number_of_structures, num_of_processes=1, chunk_size=1):
+        """
+        Process the structures in chunks on a process pool and print the measured numbers next to the estimates
+        """
+
+        start_time = time.time()
+        eliminated = None
+        statistics = []
+        chunks = [(first, min(chunk_size, number_of_structures - first)) for first in range(0, number_of_structures, chunk_size)]
+        with ProcessPoolExecutor(max_workers=num_of_processes) as pool:
+            futures = [pool.submit(sieve_structures, self.configuration, first, count) for first, count in chunks]
+            for future in as_completed(futures):
+                packed, chunk_statistics = future.result()
+                eliminated = packed if eliminated is None else eliminated | packed
+                statistics.append(chunk_statistics)
+        elapsed_time = time.time() - start_time
+        number_of_keys = 2**self.key_bits
+        eliminated = np.unpackbits(eliminated)[:number_of_keys].astype(bool)
+        report = {"structures" : number_of_structures,
+                  "key_bits" : self.key_bits,
+                  "backward_keys" : self.backward_keys,
+                  "forward_keys" : self.forward_keys,
+                  "elapsed_time" : elapsed_time,
+                  "right_key_survived" : not eliminated[self.right_key],
+                  "remaining_keys" : number_of_keys - int(np.count_nonzero(eliminated))}
+        for name in ["pairs", "pairs_kept", "pairs_passing_EB", "eliminations", "buckets"]:
+            report[name] = sum(s[name] for s in statistics)
+        report["time"] = {name : sum(s["time"][name] for s in statistics) for name in statistics[0]["time"]}
+        report["memory"] = {name : max(s["memory"][name] for s in statistics) for name in statistics[0]["memory"]}
+        self.print_report(report)
+        return report
+
+    def print_report(self, report):
+        cell_size = 4
+        structure_size = 16**len(self.plaintext_cells)
+        expected_pairs_kept = report["pairs"]*2.0**(-cell_size*(16 - len(self.ciphertext_cells)))
+        str_output = line_separator + "\n"
+        str_output += "Toy execution of the key recovery ({} structures of 2^{} plaintexts)\n".format(report["structures"], cell_size*len(self.plaintext_cells))
+        str_output += "Guessed cells in EB:       {}\n".format(report["backward_keys"])
+        str_output += "Guessed cells in EF:       {}\n".format(report["forward_keys"])
+        str_output += "Guessed key bits:          {}\n".format(report["key_bits"])
+        str_output += "Pairs kept:                {} (expected {:.1f})\n".format(report["pairs_kept"], expected_pairs_kept)
+        str_output += "Pairs passing EB:          {}\n".format(report["pairs_passing_EB"])
+        if report["pairs_kept"] > 0 and report["eliminations"] > 0:
+            probability = report["eliminations"]/(report["pairs_kept"]*2.0**report["key_bits"])
+            str_output += "log2 P(key eliminated):    {:.2f}".format(math.log2(probability))
+            if "CB_tot" in self.configuration:
+                str_output += " (model: {})".format(-cell_size*(self.configuration["CB_tot"] + self.configuration["CF_tot"]))
+            str_output += "\n"
+            if "g" in self.configuration and probability < 1:
+                # pairs needed to leave 2^(key bits - g) wrong keys, and the data to obtain them
+                needed_pairs = self.configuration["g"]/-math.log2(1 - probability)
+                needed_structures = needed_pairs*report["structures"]/report["pairs_kept"]
+                str_output += "log2 data for g = {:3d}:    {:.2f} (model: {})\n".format(self.configuration["g"], math.log2(needed_structures*structure_size),
+                                                                                    self.configuration.get("data", "-"))
+        str_output += "Remaining keys:            2^{:.2f} out of 2^{}\n".format(math.log2(max(report["remaining_keys"], 1)), report["key_bits"])
+        str_output += "Right key survived:        {}\n".format(report["right_key_survived"])
+        str_output += "{:<26s} {:>10s} {:>14s}\n".format("Step", "time (s)", "memory (bytes)")
+        for name in report["time"]:
+            str_output += "{:<26s} {:>10.2f} {:>14d}\n".format(name, report["time"][name], report["memory"][name])
+        if "memory_complexity" in self.configuration:
+            str_output += "Memory complexity (model): 2^{} blocks\n".format(self.configuration["memory_complexity"])
+        str_output += "Elapsed time:              {:.2f} seconds\n".format(report["elapsed_time"])
+        str_output += line_separator
+        print(str_output)
+
+def sieve_structures(configuration, first_structure, number_of_structures):
+    """
+    Process a chunk of structures in a worker process
+    """
+
+    return KeyRecovery(configuration).sieve(first_structure, number_of_structures)
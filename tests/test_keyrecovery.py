@@ -0,0 +1,70 @@
+"""
+Regression tests of the toy-scale key-recovery engine skinny/impossible/keyrecovery.py
+"""
+
+import sys
+from pathlib import Path
+import numpy as np
+import pytest
+
+sys.path.append(str(Path(__file__).resolve().parents[1] / "skinny" / "impossible"))
+import keyrecovery
+
+# test vectors of SKINNY-64-64/128/192 given in the specification: (tweakey, plaintext, ciphertext, rounds)
+test_vectors = [("f5269826fc681238", "06034f957724d19d", "bb39dfb2429b8ac7", 32),
+                ("9eb93640d088da6376a39d1c8bea71e1", "cf16cfe8fd0f98aa", "6ceda1f43de92b9e", 36),
+                ("ed00c85b120d68618753e24bfd908f60b2dbb41b422dfcd0", "530c61d35e8663c3", "dd2cf1a8f330303c", 40)]
+
+def to_cells(hex_string):
+    return np.array([int(c, 16) for c in hex_string], dtype=np.uint8)
+
+def toy_configuration():
+    """
+    A 1-round impossible differential in the middle of 2 + 1 + 2 rounds: a nonzero difference in cell 0 at the
+    input of a round always gives a nonzero difference in cell 4 at its output
+    """
+
+    input_condition = [(2, 0)] + [(3, 0)]*15
+    output_condition = [(3, 0)]*16
+    output_condition[4] = (0, 0)
+    return {"NPT" : 1, "RB" : 2, "RD" : 1, "RF" : 2, "sks" : False,
+            "plaintext_cells" : [0, 10], "ciphertext_cells" : [i for i in range(16) if i not in [1, 2]],
+            "input_condition" : input_condition, "output_condition" : output_condition,
+            "key" : keyrecovery.random_key(1, 3), "seed" : 5}
+
+@pytest.mark.parametrize("tweakey, plaintext, ciphertext, rounds", test_vectors)
+def test_skinny64_test_vectors(tweakey, plaintext, ciphertext, rounds):
+    key = [to_cells(tweakey[i:i + 16]).tolist() for i in range(0, len(tweakey), 16)]
+    constants = keyrecovery.round_constants(rounds)
+    round_keys = keyrecovery.round_tweakeys(key, rounds)
+    states = keyrecovery.encrypt_rounds(to_cells(plaintext)[None], range(rounds), constants, round_keys)
+    assert np.array_equal(states[0], to_cells(ciphertext))
+    states = keyrecovery.decrypt_rounds(states, range(rounds), constants, round_keys)
+    assert np.array_equal(states[0], to_cells(plaintext))
+
+def test_satisfies():
+    differences = np.zeros((3, 16), dtype=np.uint8)
+    differences[1, 0] = 5
+    differences[2, 0] = 7
+    condition = [(1, 5)] + [(0, 0)]*15
+    assert keyrecovery.satisfies(differences, condition).tolist() == [False, True, False]
+    condition = [(2, 0)] + [(3, 0)]*15
+    assert keyrecovery.satisfies(differences, condition).tolist() == [False, True, True]
+
+def test_pairs_collide_on_the_inactive_cells():
+    recovery = keyrecovery.KeyRecovery(toy_configuration())
+    plaintexts, ciphertexts = recovery.structure(0)
+    assert len(np.unique(plaintexts, axis=0)) == 16**2
+    pairs, _ = recovery.pairs(ciphertexts)
+    assert len(pairs) > 0
+    differences = ciphertexts[pairs[:, 0]] ^ ciphertexts[pairs[:, 1]]
+    assert not differences[:, [1, 2]].any()
+
+def test_right_key_survives_and_wrong_keys_are_eliminated():
+    recovery = keyrecovery.KeyRecovery(toy_configuration())
+    assert recovery.backward_keys == [(0, 0)]
+    assert recovery.forward_keys == [(3, 4), (4, 5)]
+    report = recovery.run(2, num_of_processes=1)
+    assert report["right_key_survived"]
+    # every wrong guess of the EB cell is eliminated
+    assert report["remaining_keys"] == 16**2
@@ -0,0 +1,60 @@
+"""
+Regression tests of the exact model counter shared/modelcounter.py
+"""
+
+import sys
+import random
+import itertools
+from pathlib import Path
+import pytest
+
+sys.path.append(str(Path(__file__).resolve().parents[1] / "shared"))
+from modelcounter import lp_to_cnf, count_models
+
+def brute_force_count(clauses, num_of_variables):
+    return sum(all(any((literal > 0) == bits[abs(literal) - 1] for literal in clause) for clause in clauses)
+               for bits in itertools.product([False, True], repeat=num_of_variables))
+
+def random_model(rng, num_of_variables, num_of_constraints):
+    lines = ["subject to"]
+    for _ in range(num_of_constraints):
+        variables = rng.sample(range(num_of_variables), rng.randint(1, 4))
+        coefficients = [rng.choice([1, 1, 2, -1]) for _ in variables]
+        lhs = " + ".join("{} x{}".format(c, v) for c, v in zip(coefficients, variables)).replace("+ -", "- ")
+        # a bound between the smallest and the largest value of the left-hand side
+        bound = rng.randint(sum(min(c, 0) for c in coefficients), sum(max(c, 0) for c in coefficients))
+        lines.append("{} {} {}".format(lhs, rng.choice([">=", "<=", ">=", "<=", "="]), bound))
+    lines.append("binary")
+    lines.append(" ".join("x{}".format(v) for v in range(num_of_variables)))
+    lines.append("end")
+    return "\n".join(lines)
+
+@pytest.mark.parametrize("seed", range(20))
+def test_count_matches_brute_force(seed):
+    rng = random.Random(seed)
+    clauses, num_of_variables, _ = lp_to_cnf(random_model(rng, rng.randint(4, 12), rng.randint(1, 8)))
+    assert count_models(clauses, num_of_variables) == brute_force_count(clauses, num_of_variables)
+
+def test_unused_binary_variables_are_counted():
+    clauses, num_of_variables, names = lp_to_cnf("subject to\nx0 + x1 = 1\nbinary\nx0 x1 x2 x3\nend")
+    assert names == ["x0", "x1", "x2", "x3"]
+    assert count_models(clauses, num_of_variables) == 2*4
+
+def test_constant_false_constraint_is_unsatisfiable():
+    clauses, num_of_variables, _ = lp_to_cnf("subject to\nx0 - x0 >= 1\nx1 + x2 >= 1\nbinary\nx0 x1 x2\nend")
+    assert () in clauses
+    assert count_models(clauses, num_of_variables) == 0
+
+def test_constant_true_constraint_is_ignored():
+    clauses, num_of_variables, _ = lp_to_cnf("subject to\nx0 - x0 >= 0\nx1 + x2 >= 1\nbinary\nx0 x1 x2\nend")
+    assert count_models(clauses, num_of_variables) == 2*3
+
+def test_constraint_without_operator():
+    with pytest.raises(ValueError):
+        lp_to_cnf("subject to\nx0 + x1\nbinary\nx0 x1\nend")
+
+def test_decomposable_instance():
+    # 200 independent copies of x + y + z = 2 (3 solutions each), far beyond an enumeration of the solutions
+    constraints = "\n".join("x{0} + y{0} + z{0} = 2".format(i) for i in range(200))
+    clauses, num_of_variables, _ = lp_to_cnf("subject to\n" + constraints + "\nend")
+    assert count_models(clauses, num_of_variables) == 3**200
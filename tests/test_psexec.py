@@ -0,0 +1,54 @@
+"""
+Regression tests of the partial-sum engine partial_sum_optimization/psexec.py
+"""
+
+import sys
+import json
+from pathlib import Path
+import numpy as np
+import pytest
+
+folder = Path(__file__).resolve().parents[1] / "partial_sum_optimization"
+sys.path.append(str(folder))
+import psexec
+
+# test vectors of SKINNY-64-64/128/192 given in the specification: (tweakey, plaintext, ciphertext, rounds)
+test_vectors = [("f5269826fc681238", "06034f957724d19d", "bb39dfb2429b8ac7", 32),
+                ("9eb93640d088da6376a39d1c8bea71e1", "cf16cfe8fd0f98aa", "6ceda1f43de92b9e", 36),
+                ("ed00c85b120d68618753e24bfd908f60b2dbb41b422dfcd0", "530c61d35e8663c3", "dd2cf1a8f330303c", 40)]
+
+def to_cells(hex_string):
+    return np.array([int(c, 16) for c in hex_string], dtype=np.uint8)
+
+@pytest.mark.parametrize("tweakey, plaintext, ciphertext, rounds", test_vectors)
+def test_skinny64_test_vectors(tweakey, plaintext, ciphertext, rounds):
+    lanes = np.array([to_cells(tweakey[i:i + 16]) for i in range(0, len(tweakey), 16)])
+    cipher = psexec.Skinny64(lanes, 0, rounds)
+    tweaks = np.zeros(1, dtype=np.uint8)
+    assert np.array_equal(cipher.encrypt(to_cells(plaintext)[None], tweaks)[0], to_cells(ciphertext))
+    assert np.array_equal(cipher.decrypt(to_cells(ciphertext)[None], tweaks)[0], to_cells(plaintext))
+
+def test_forkskinny_decrypt_inverts_encrypt():
+    rng = np.random.default_rng(0)
+    cipher = psexec.Skinny64(rng.integers(0, 16, (2, 16), dtype=np.uint8), 15, 12, Ri=4, R0=6)
+    plaintexts = rng.integers(0, 16, (64, 16), dtype=np.uint8)
+    tweaks = rng.integers(0, 16, 64, dtype=np.uint8)
+    assert np.array_equal(cipher.decrypt(cipher.encrypt(plaintexts, tweaks), tweaks), plaintexts)
+
+@pytest.mark.parametrize("dense", [True, False])
+def test_counter_table_keeps_the_parity(dense):
+    table = psexec.CounterTable(2, 8 if dense else 0)
+    table.add(np.array([[1, 2], [3, 4], [1, 2]], dtype=np.uint8))
+    table.add(np.array([[3, 4], [5, 6]], dtype=np.uint8))
+    rows = np.concatenate(list(table.entries(16)))
+    assert table.dense == dense
+    assert rows.tolist() == [[5, 6]]
+    assert len(table) == 1
+
+@pytest.mark.parametrize("result_file", sorted((folder / "results").glob("*.json")), ids=lambda path: path.stem)
+def test_right_key_partial_sum_matches_decryption(result_file):
+    with open(result_file, "r") as f:
+        parameter = json.load(f)
+    measurements, partial_sums, expected_sums = psexec.execute_partial_sum(parameter, log_data=10, log_chunk=10, max_guesses=2, seed=1)
+    assert len(measurements) == len(parameter["keys"]) + 1
+    assert partial_sums == expected_sums
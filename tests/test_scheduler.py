@@ -0,0 +1,117 @@
+"""
+Regression tests of the runtime and memory predictors of the batch scheduler scheduler.py
+"""
+
+import sys
+import math
+from pathlib import Path
+import pytest
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+import scheduler
+
+def job(RD, cipher="present", mode="impossible", script="distinguisher.py", **fields):
+    return dict({"cipher" : cipher, "mode" : mode, "script" : script, "parameters" : {"RD" : RD}}, **fields)
+
+def record(RD, threads, elapsed_time, **fields):
+    return dict(job(RD), threads=threads, elapsed_time=elapsed_time, exit_code=0, **fields)
+
+def test_predict_without_history():
+    predictor = scheduler.RuntimePredictor()
+    # one second per state bit and round, divided by the square root of the threads
+    assert predictor.predict(job(5), 1) == pytest.approx(64*5)
+    assert predictor.predict(job(5), 4) == pytest.approx(64*5/2)
+    assert predictor.predict(job(5, time_limit=60), 1) == 60
+
+def test_predict_unseen_tool_without_history():
+    predictor = scheduler.RuntimePredictor([record(RD, 1, 10*RD) for RD in range(3, 8)])
+    unseen = job(5, cipher="ascon")
+    assert scheduler.job_tool(unseen) not in predictor.tools
+    assert predictor.predict(unseen, 1) == pytest.approx(320*5)
+
+def test_fit_learns_the_growth_and_the_speedup():
+    # running time 2^RD seconds with 1 thread and 2^RD/4 seconds with 16 threads
+    history = [record(RD, threads, 2**RD/threads**0.5) for RD in range(3, 10) for threads in [1, 16]]
+    predictor = scheduler.RuntimePredictor(history)
+    assert predictor.predict(job(10), 1) == pytest.approx(2**10, rel=0.2)
+    assert predictor.predict(job(10), 16) == pytest.approx(2**10/4, rel=0.2)
+
+def test_single_thread_count_keeps_the_default_speedup():
+    predictor = scheduler.RuntimePredictor([record(RD, 1, 2**RD) for RD in range(3, 10)])
+    assert predictor.coefficients[4] == -scheduler.default_speedup
+
+def test_failed_runs_are_not_fitted():
+    history = [record(RD, 1, 2**RD) for RD in range(3, 10)]
+    failed = [dict(record(RD, 1, 1000.0), exit_code=1) for RD in range(3, 10)]
+    assert scheduler.RuntimePredictor(history + failed).predict(job(6), 1) == \
+           pytest.approx(scheduler.RuntimePredictor(history).predict(job(6), 1))
+
+def test_timed_out_runs_are_lower_bounds():
+    history = [record(RD, 1, 2**RD) for RD in range(3, 10)]
+    timed_out = [record(RD, 1, 2**RD, timed_out=True) for RD in range(3, 10)]
+    ratio = scheduler.RuntimePredictor(timed_out).predict(job(6), 1)/scheduler.RuntimePredictor(history).predict(job(6), 1)
+    assert ratio == pytest.approx(scheduler.timeout_inflation)
+
+def test_allot_threads():
+    predictor = scheduler.RuntimePredictor()
+    jobs = [job(20), job(1), job(1), dict(job(20), parameters={"RD" : 20, "p" : 2})]
+    threads, times = scheduler.allot_threads(jobs, predictor, cores=8, max_threads=8)
+    assert threads[0] > 1
+    assert threads[1] == threads[2] == 1
+    assert threads[3] == 2
+    assert times == [predictor.predict(j, p) for j, p in zip(jobs, threads)]
+
+def test_simulate():
+    # two cores: the long job runs next to the two short ones
+    assert scheduler.simulate([4.0, 2.0, 2.0], [1, 1, 1], 2) == 4.0
+    # a job that does not fit lets the next one start before it
+    assert scheduler.simulate([4.0, 4.0, 1.0], [1, 2, 1], 2) == 8.0
+    assert math.isclose(scheduler.simulate([3.0], [4], 4), 3.0)
+
+def memory_record(RD, threads, max_rss, memory_samples=5, **fields):
+    return record(RD, threads, 10.0, max_rss=max_rss, memory_samples=memory_samples, **fields)
+
+def test_memory_of_the_same_configuration():
+    planner = scheduler.MemoryPlanner([memory_record(5, 1, 100.0), memory_record(5, 3, 300.0)])
+    # the largest high-water mark, scaled from 3 to 7 threads by (7 + 1)/(3 + 1)
+    assert planner.project(job(5), 7) == pytest.approx(600.0)
+    # the threads and the time limit do not change the configuration
+    assert planner.project(dict(job(5), parameters={"RD" : 5, "p" : 7, "tl" : 60}), 3) == pytest.approx(300.0)
+
+def test_memory_of_the_same_variant():
+    planner = scheduler.MemoryPlanner([memory_record(5, 1, 100.0), memory_record(4, 1, 100.0)])
+    # the largest memory per unit of model size (that of 4 rounds), scaled to 8 rounds
+    assert planner.project(job(8), 1) == pytest.approx(200.0)
+
+def test_memory_without_history():
+    planner = scheduler.MemoryPlanner(default_memory=1000)
+    assert planner.project(job(5), 1) == 1000
+    assert planner.project(job(5), 3) == 2000
+
+@pytest.mark.parametrize("ignored", [memory_record(5, 1, 500.0, memory_samples=1),
+                                     memory_record(5, 1, 0.0),
+                                     memory_record(5, 1, None),
+                                     dict(memory_record(5, 1, 500.0), exit_code=1)])
+def test_memory_records_that_are_ignored(ignored):
+    planner = scheduler.MemoryPlanner([ignored], default_memory=1000)
+    assert planner.peaks == dict()
+    assert planner.project(job(5), 1) == 1000
+
+def test_memory_of_preempted_runs():
+    preempted = dict(memory_record(5, 1, 500.0), exit_code=-9, preempted=True)
+    assert scheduler.MemoryPlanner([preempted]).project(job(5), 1) == pytest.approx(500.0)
+
+def test_admission_control(tmp_path):
+    jobs = [job(5), dict(job(5), parameters={"RD" : 5, "p" : 4})]
+    queue = scheduler.Scheduler(jobs, 8, history_file=str(tmp_path / "history.jsonl"), memory_budget=3000, default_memory=1000)
+    if queue.memory_budget is None:
+        pytest.skip("the memory is only controlled with /proc")
+    running = [{"projected_memory" : 1000, "max_rss" : 0.0}]
+    # 4 threads would need 2500 MB next to the 1000 MB of the running job, 2 threads need 1500 MB
+    assert queue.admit(0, 4, running) == 2
+    # a job fixing its threads waits
+    assert queue.admit(1, 4, running) == 0
+    # the observed memory of a running job counts if it exceeds the projection
+    assert queue.admit(0, 4, [{"projected_memory" : 1000, "max_rss" : 2500.0}]) == 0
+    # a job always fits if nothing else is running
+    assert queue.admit(0, 8, []) == 8